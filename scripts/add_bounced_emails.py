@@ -6,6 +6,7 @@ so they will be skipped in future email campaigns.
 
 Usage:
     python add_bounced_emails.py email1@example.com email2@example.com
+    python add_bounced_emails.py --rebuild-domain-stats   # repair per-domain bounce stats
     
     Or run interactively without arguments.
 """
@@ -81,6 +82,20 @@ def sync_from_sent_log():
     print(f"✅ Synced {synced} bounced emails from sent log")
 
 
+def rebuild_domain_stats():
+    """Rebuild the per-domain sent/bounced counters from the raw sent log."""
+    from utils.domain_stats import DomainBounceStats
+    
+    stats = DomainBounceStats()
+    rows = stats.rebuild()
+    problematic = stats.problematic_domains()
+    print(f"✅ Rebuilt stats for {len(stats.stats)} domains from {rows} sent-log rows")
+    print(f"📄 Table location: {stats.path}")
+    print(f"⚠️ Problematic domains: {len(problematic)}")
+    for domain, reason in sorted(problematic.items()):
+        print(f"   🚫 {domain}: {reason}")
+
+
 def show_bounced_emails():
     """Display all bounced emails in the database."""
     data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
@@ -110,6 +125,8 @@ def main():
             sync_from_sent_log()
         elif sys.argv[1] == '--show':
             show_bounced_emails()
+        elif sys.argv[1] == '--rebuild-domain-stats':
+            rebuild_domain_stats()
         else:
             # Add emails from command line
             emails = sys.argv[1:]
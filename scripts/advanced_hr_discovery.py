@@ -21,23 +21,23 @@ Sources:
 
 import os
 import re
+import sys
 import time
 import random
 import logging
 import hashlib
 import requests
 import pandas as pd
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 from urllib.parse import quote_plus, urlparse
 from typing import Dict, List, Optional, Set, Tuple
 import json
 
-try:
-    import dns.resolver
-    HAS_DNS = True
-except ImportError:
-    HAS_DNS = False
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.dns_cache import HAS_DNS, get_dns_cache
+from utils.html_parse import find_cards, page_text
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 
@@ -111,7 +111,7 @@ class AdvancedHRDiscovery:
         self._update_headers()
         
         # DNS cache for MX validation
-        self.dns_cache = {}
+        self.dns_cache = get_dns_cache()
         
         # Statistics
         self.stats = {
@@ -219,16 +219,7 @@ class AdvancedHRDiscovery:
         if not HAS_DNS:
             return True  # Assume valid if no DNS library
         
-        if domain in self.dns_cache:
-            return self.dns_cache[domain]
-        
-        try:
-            dns.resolver.resolve(domain, 'MX')
-            self.dns_cache[domain] = True
-            return True
-        except Exception:
-            self.dns_cache[domain] = False
-            return False
+        return self.dns_cache.resolve(domain, 'MX').ok
     
     def _add_hr_email(self, email: str, company: str, source: str, 
                       query: str = '', email_type: str = 'general'):
@@ -368,10 +359,8 @@ class AdvancedHRDiscovery:
                 html = self._search_bing(query)
             
             if html:
-                soup = BeautifulSoup(html, 'html.parser')
-                
                 # Extract LinkedIn profile URLs and names
-                for link in soup.find_all('a', href=True):
+                for link in find_cards(html, 'a', {'href': True}):
                     href = link.get('href', '')
                     if 'linkedin.com/in/' in href:
                         # Extract name from link text
@@ -386,7 +375,7 @@ class AdvancedHRDiscovery:
                             )
                 
                 # Also extract emails from page
-                emails = self.EMAIL_REGEX.findall(soup.get_text())
+                emails = self.EMAIL_REGEX.findall(page_text(html))
                 for email in emails:
                     if self._is_valid_email(email):
                         self._add_hr_email(email, company, 'linkedin_search', query)
@@ -406,8 +395,7 @@ class AdvancedHRDiscovery:
             
             html = self._search_duckduckgo(query)
             if html:
-                soup = BeautifulSoup(html, 'html.parser')
-                emails = self.EMAIL_REGEX.findall(soup.get_text())
+                emails = self.EMAIL_REGEX.findall(page_text(html))
                 
                 for email in emails:
                     if self._is_valid_email(email) and domain in email.lower():
@@ -428,8 +416,7 @@ class AdvancedHRDiscovery:
             
             html = self._search_duckduckgo(query)
             if html:
-                soup = BeautifulSoup(html, 'html.parser')
-                emails = self.EMAIL_REGEX.findall(soup.get_text())
+                emails = self.EMAIL_REGEX.findall(page_text(html))
                 
                 for email in emails:
                     if self._is_valid_email(email) and domain in email.lower():
@@ -451,8 +438,7 @@ class AdvancedHRDiscovery:
                 
                 html = self._search_bing(query)  # Bing is better for filetype search
                 if html:
-                    soup = BeautifulSoup(html, 'html.parser')
-                    emails = self.EMAIL_REGEX.findall(soup.get_text())
+                    emails = self.EMAIL_REGEX.findall(page_text(html))
                     
                     for email in emails:
                         if self._is_valid_email(email):
@@ -477,8 +463,7 @@ class AdvancedHRDiscovery:
             
             html = self._search_duckduckgo(query)
             if html:
-                soup = BeautifulSoup(html, 'html.parser')
-                emails = self.EMAIL_REGEX.findall(soup.get_text())
+                emails = self.EMAIL_REGEX.findall(page_text(html))
                 
                 for email in emails:
                     if self._is_valid_email(email):
@@ -500,8 +485,7 @@ class AdvancedHRDiscovery:
                 
                 html = self._search_duckduckgo(query)
                 if html:
-                    soup = BeautifulSoup(html, 'html.parser')
-                    emails = self.EMAIL_REGEX.findall(soup.get_text())
+                    emails = self.EMAIL_REGEX.findall(page_text(html))
                     
                     for email in emails:
                         if self._is_valid_email(email):
@@ -655,10 +639,8 @@ class AdvancedHRDiscovery:
             
             html = self._search_duckduckgo(query)
             if html:
-                soup = BeautifulSoup(html, 'html.parser')
-                
                 # Extract emails
-                emails = self.EMAIL_REGEX.findall(soup.get_text())
+                emails = self.EMAIL_REGEX.findall(page_text(html))
                 for email in emails:
                     if self._is_valid_email(email):
                         domain = email.split('@')[1]
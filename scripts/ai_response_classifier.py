@@ -4,8 +4,16 @@ Auto-classifies HR responses using AI (OpenAI, Gemini, etc.)
 """
 
 import os
-import pandas as pd
+import sys
 import logging
+from email.header import decode_header, make_header
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.inbox_scanner import InboxHandler
+from utils.storage import get_storage
+from scripts.reply_detector import ReplyDetector
 
 # Dummy classifier for placeholder
 # In production, replace with actual AI API calls
@@ -24,20 +32,70 @@ def classify_response(text):
         return "acknowledgment"
     return "needs_review"
 
+
+class ResponseClassifierHandler(InboxHandler):
+    """Classifies HR responses straight from the shared inbox pass."""
+
+    name = "classifier"
+    body_parts = ("text/plain",)
+
+    def __init__(self, accept=None):
+        # accept(message) -> bool on headers, e.g. ReplyHandler.wants
+        self.accept = accept
+        self.storage = get_storage()
+        self.rows = []
+        self._saved = 0
+
+    def wants(self, message):
+        return self.accept(message) if self.accept else True
+
+    def handle(self, message, body):
+        try:
+            subject = str(make_header(decode_header(message.headers.get("Subject", ""))))
+        except Exception:
+            subject = message.headers.get("Subject", "")
+        # Out-of-office and other auto-replies aren't HR responses
+        if ReplyDetector.AUTO_REPLY_RE.search(f"{subject} {body}".lower()):
+            return
+        self.rows.append({
+            "from_email": message.from_address,
+            "subject": subject[:200],
+            "date": message.headers.get("Date", ""),
+            "response_text": body[:1000],
+            "classification": classify_response(f"{subject}\n{body}"),
+        })
+
+    def save(self):
+        new = self.rows[self._saved:]
+        if not new:
+            return
+        self.storage.upsert_rows("hr_replies_classified", new)
+        self._saved = len(self.rows)
+        logging.info(f"Classified {len(new)} new responses into hr_replies_classified")
+
 def main():
     logging.basicConfig(level=logging.INFO)
-    replies_path = os.path.join("data", "hr_replies.csv")
-    if not os.path.exists(replies_path):
-        logging.error(f"Replies file not found: {replies_path}")
+    storage = get_storage()
+    df = storage.read_table("hr_replies")
+    if df.empty:
+        logging.error("No replies recorded yet (hr_replies is empty).")
         return
-    df = pd.read_csv(replies_path)
-    if "response_text" not in df.columns:
+    # Older reply logs kept the full text; the reply detector stores a preview
+    text_column = next((c for c in ("response_text", "body_preview") if c in df.columns), None)
+    if text_column is None:
         logging.error("Missing 'response_text' column in replies file.")
         return
-    df["classification"] = df["response_text"].fillna("").apply(classify_response)
-    out_path = os.path.join("data", "hr_replies_classified.csv")
-    df.to_csv(out_path, index=False)
-    logging.info(f"Classified responses saved to {out_path}")
+    df = df.fillna("")
+    rows = [{
+        "from_email": row.get("from_email", ""),
+        "subject": row.get("subject", ""),
+        "date": row.get("date", ""),
+        "response_text": row[text_column],
+        "classification": classify_response(str(row[text_column])),
+    } for row in df.to_dict("records")]
+    # Merge by (from_email, subject, date) under the table lock instead of overwriting the file
+    storage.upsert_rows("hr_replies_classified", rows)
+    logging.info(f"Classified {len(rows)} responses into hr_replies_classified")
 
 if __name__ == "__main__":
     main()
@@ -13,6 +13,8 @@ from enum import Enum
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from utils.storage import get_storage
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 
 
@@ -38,6 +40,9 @@ class ApplicationTracker:
         # Current sender for multi-user support
         self.sender_email = os.getenv('SENDER_EMAIL', '')
         
+        # CSV files, or SQLite with STORAGE_BACKEND=sqlite
+        self.storage = get_storage()
+        
         # Main tracking file
         self.tracker_path = os.path.join(self.data_path, 'application_tracker.csv')
         
@@ -52,8 +57,8 @@ class ApplicationTracker:
     
     def _load_tracker(self) -> pd.DataFrame:
         """Load existing tracker or create new one."""
-        if os.path.exists(self.tracker_path):
-            return pd.read_csv(self.tracker_path)
+        if self.storage.exists('application_tracker'):
+            return self.storage.read_table('application_tracker')
         
         return pd.DataFrame(columns=[
             'application_id', 'company', 'job_title', 'hr_email', 'job_url',
@@ -77,15 +82,12 @@ class ApplicationTracker:
         
         Only imports applications sent by the current sender (multi-user support).
         """
-        if not os.path.exists(self.sent_log_path):
+        if not self.storage.exists('sent_emails'):
             logging.info("No sent emails log found")
             return 0
         
-        sent_df = pd.read_csv(self.sent_log_path)
-        
         # Filter by sender_email for multi-user support
-        if 'sender_email' in sent_df.columns and self.sender_email:
-            sent_df = sent_df[sent_df['sender_email'].str.lower() == self.sender_email.lower()]
+        sent_df = self.storage.read_table('sent_emails', sender_email=self.sender_email or None)
         
         new_count = 0
         
@@ -140,11 +142,11 @@ class ApplicationTracker:
     
     def sync_from_replies(self):
         """Update statuses based on detected replies."""
-        if not os.path.exists(self.replies_path):
+        if not self.storage.exists('hr_replies'):
             logging.info("No replies log found")
             return 0
         
-        replies_df = pd.read_csv(self.replies_path)
+        replies_df = self.storage.read_table('hr_replies')
         update_count = 0
         
         for _, reply in replies_df.iterrows():
@@ -192,10 +194,10 @@ class ApplicationTracker:
     
     def sync_from_bounces(self):
         """Mark bounced applications."""
-        if not os.path.exists(self.bounced_path):
+        if not self.storage.exists('bounced_emails'):
             return 0
         
-        bounced_df = pd.read_csv(self.bounced_path)
+        bounced_df = self.storage.read_table('bounced_emails')
         update_count = 0
         
         bounced_emails = set()
@@ -262,8 +264,8 @@ class ApplicationTracker:
         return self.get_summary()
     
     def save(self):
-        """Save tracker to CSV."""
-        self.tracker_df.to_csv(self.tracker_path, index=False)
+        """Save tracker to CSV (or the SQLite store)."""
+        self.storage.write_table('application_tracker', self.tracker_df)
         logging.info(f"💾 Saved tracker with {len(self.tracker_df)} applications")
     
     def get_summary(self) -> dict:
@@ -6,6 +6,7 @@ Only retries with valid, verified alternate email addresses
 
 import os
 import re
+import sys
 import json
 import logging
 import smtplib
@@ -16,7 +17,11 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
 from typing import Optional, Dict, List, Tuple
-import dns.resolver
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.dns_cache import get_dns_cache
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 
@@ -94,21 +99,18 @@ class EmailVerifier:
             score -= 30
         
         # 4. DNS MX record check (30 points)
-        try:
-            mx_records = dns.resolver.resolve(domain, 'MX')
-            if mx_records:
-                score += 30
-                reasons.append("Valid MX records")
-            else:
-                reasons.append("No MX records found")
-        except dns.resolver.NXDOMAIN:
+        answer = get_dns_cache().resolve(domain, 'MX')
+        if answer.status == 'ok':
+            score += 30
+            reasons.append("Valid MX records")
+        elif answer.status == 'nxdomain':
             result = (False, 0, "Domain does not exist")
             self._cache_result(email, result)
             return result
-        except dns.resolver.NoAnswer:
+        elif answer.status == 'noanswer':
             reasons.append("No MX records")
-        except Exception as e:
-            reasons.append(f"DNS check failed: {str(e)[:30]}")
+        else:
+            reasons.append(f"DNS check failed: {answer.error[:30]}")
         
         # 5. Check for HR-related patterns (bonus points)
         hr_patterns = ['hr', 'recruit', 'career', 'talent', 'hiring', 'jobs', 
@@ -158,8 +160,10 @@ class EmailVerifier:
         """
         try:
             domain = email.split('@')[1]
-            mx_records = dns.resolver.resolve(domain, 'MX')
-            mx_host = str(mx_records[0].exchange)
+            mx_hosts = get_dns_cache().mx_hosts(domain)
+            if not mx_hosts:
+                return False
+            mx_host = mx_hosts[0]
             
             server = smtplib.SMTP(timeout=10)
             server.connect(mx_host)
@@ -0,0 +1,135 @@
+"""
+Benchmark: full html.parser soup vs the utils.html_parse helpers
+
+Builds a synthetic job search page (200 job cards wrapped in the navigation,
+scripts and footer real boards ship), then times what the scrapers read from
+it both ways, checks both give the same answers and prints the timings and
+peak Python-heap memory (tracemalloc does not see libxml2's own buffers):
+
+- job cards        find_all on a full soup  vs  find_cards (SoupStrainer + lxml)
+                   and vs xpath/first (lxml elements, the LinkedIn card fast path)
+- page text        soup.get_text()          vs  page_text (lxml)
+- mailto links     find_all(href=mailto)    vs  mailto_addresses (lxml XPath)
+
+Usage:
+    python scripts/benchmark_html_parse.py [cards] [rounds]
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import tracemalloc
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from utils.html_parse import element_text, find_cards, first, mailto_addresses, page_text, xpath
+
+
+TITLES = ['Data Analyst', 'Python Developer', 'Backend Engineer', 'Product Manager', 'QA Engineer']
+COMPANIES = ['Infosys', 'Razorpay', 'Flipkart', 'Swiggy', 'Zoho', 'Freshworks', 'CRED']
+CARD_CLASS = re.compile(r'job-search-card|base-card')
+
+
+def build_page(cards: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    nav = ''.join(f'<li class="nav-item"><a href="/c/{i}">Category {i}</a></li>' for i in range(150))
+    script = '<script>window.__STATE__ = {' + ','.join(f'"k{i}": "{"x" * 40}"' for i in range(400)) + '};</script>'
+    body = []
+    for i in range(cards):
+        title, company = rng.choice(TITLES), rng.choice(COMPANIES)
+        contact = (f'<a href="mailto:hr{i}@{company.lower()}.com?subject=Application">Apply by email</a>'
+                   if i % 10 == 0 else '')
+        body.append(
+            f'<div class="base-card job-search-card" data-id="{i}">'
+            f'<a class="base-card__full-link" href="https://www.linkedin.com/jobs/view/{1000 + i}"></a>'
+            f'<div class="base-search-card__info"><h3 class="base-search-card__title">{title}</h3>'
+            f'<h4 class="base-search-card__subtitle"><a href="/company/{company}">{company}</a></h4>'
+            f'<span class="job-search-card__location">Bangalore</span><time datetime="2024-01-01">1 day ago</time>'
+            f'<p class="snippet">{" ".join(rng.choice(TITLES) for _ in range(30))}</p>{contact}</div></div>'
+        )
+    footer = '<footer class="footer">' + ''.join(f'<a href="/p/{i}">Link {i}</a>' for i in range(200)) + \
+             '<a href="mailto:careers@example.com">careers@example.com</a></footer>'
+    return (f'<!DOCTYPE html><html><head><title>Jobs</title>{script}<style>.x{{color:red}}</style></head>'
+            f'<body><nav><ul>{nav}</ul></nav><main><ul>{"".join(body)}</ul></main>{footer}</body></html>')
+
+
+# --- Reference: the full html.parser soup the scrapers used to build -------
+
+def legacy_cards(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    return [card.find('h3').get_text(strip=True) for card in soup.find_all('div', {'class': CARD_CLASS})]
+
+
+def legacy_text(html):
+    return BeautifulSoup(html, 'html.parser').get_text(separator=' ').split()
+
+
+def legacy_mailto(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    return [link['href'].replace('mailto:', '').split('?')[0].strip()
+            for link in soup.find_all('a', href=re.compile(r'^mailto:', re.I))]
+
+
+def helper_cards(html):
+    return [card.find('h3').get_text(strip=True) for card in find_cards(html, 'div', {'class': CARD_CLASS})]
+
+
+def xpath_cards(html):
+    return [element_text(first(card, './/h3'))
+            for card in xpath(html, "//div[re:test(@class, 'job-search-card|base-card')]")]
+
+
+def helper_text(html):
+    return page_text(html).split()
+
+
+# --------------------------------------------------------------------------
+
+def measure(func, html, rounds):
+    tracemalloc.start()
+    result = func(html)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(html)
+    return result, (time.perf_counter() - start) / rounds, peak
+
+
+def compare(name, legacy, helper, html, rounds):
+    old, old_time, old_peak = measure(legacy, html, rounds)
+    new, new_time, new_peak = measure(helper, html, rounds)
+    same = old == new
+    print(f"{name:<14} {old_time * 1000:>8.1f} ms {new_time * 1000:>8.1f} ms {old_time / new_time:>7.1f}x "
+          f"{old_peak / 2**20:>8.1f} MB {new_peak / 2**20:>7.1f} MB   {'✅ identical' if same else '❌ MISMATCH'}")
+    return same
+
+
+def main():
+    cards = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    html = build_page(cards)
+
+    print(f"\n📊 HTML parse benchmark ({cards} cards, {len(html) / 1024:.0f} KB page, {rounds} rounds)")
+    print("=" * 86)
+    print(f"{'extract':<14} {'html.parser':>11} {'helper':>11} {'speedup':>8} {'old heap':>11} {'new heap':>10}")
+    results = [
+        compare('job cards', legacy_cards, helper_cards, html, rounds),
+        compare('cards (xpath)', legacy_cards, xpath_cards, html, rounds),
+        compare('page text', legacy_text, helper_text, html, rounds),
+        compare('mailto links', legacy_mailto, mailto_addresses, html, rounds),
+    ]
+    print("=" * 86)
+
+    if not all(results):
+        print("❌ Helpers disagree with the html.parser reference!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark: per-rule loops vs compiled single-pass bounce/reply rules
+
+Builds a synthetic corpus of inbox subjects, senders and bodies (5k messages
+by default), runs the old one-search-per-rule checks from BounceChecker and
+ReplyDetector next to the compiled tables that replaced them, checks they
+give exactly the same answers and prints the timings.
+
+Usage:
+    python scripts/benchmark_inbox_rules.py [messages]
+"""
+
+import os
+import re
+import sys
+import time
+import random
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.bounce_checker import BounceChecker
+from scripts.reply_detector import ReplyDetector
+
+
+SUBJECTS = [
+    'Re: Application for Data Analyst', 'Undeliverable: Application for Python Developer',
+    'Delivery Status Notification (Failure)', 'Mail delivery failed: returning message to sender',
+    'Interview schedule for next week', 'Automatic reply: Out of Office', 'Thank you for applying',
+    'Your application at Acme', 'Update on your candidature', 'Re: Quick question',
+    'Returned mail: see transcript for details', 'Failure Notice', 'Congratulations!',
+]
+SENDERS = [
+    'Priya <priya@acme.io>', 'Mail Delivery Subsystem <mailer-daemon@googlemail.com>',
+    'postmaster@outlook.com', 'careers@flipkart.com', 'no-reply@workday.com',
+    'HR Team <hr@razorpay.com>', 'John <john.doe@infosys.com>',
+]
+SENTENCES = [
+    'Thank you for your interest in the role.', 'We would like to schedule an interview with you.',
+    'Unfortunately we have decided not to proceed at this time.', 'Please share your availability.',
+    'We have received your application and will review it shortly.', 'I am out of office until Monday.',
+    'We are pleased to extend an offer and welcome aboard!', 'We will keep your resume for future opportunities.',
+    'Your profile looks impressive and we would like to move forward.', 'Let us set up a call to discuss.',
+    'The position has been filled.', 'Regards, Talent Acquisition', 'Looking forward to hearing from you.',
+    '> On Mon, you wrote: I am writing to apply for the open position at your company.',
+    '> Please find my resume attached for your consideration.',
+]
+
+
+def build_corpus(messages: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(messages):
+        body = ' '.join(rng.choice(SENTENCES) for _ in range(rng.randint(3, 40)))
+        corpus.append((rng.choice(SUBJECTS), rng.choice(SENDERS), body))
+    return corpus
+
+
+# --- Reference: the per-rule loops the compiled tables replaced ------------
+
+def legacy_is_bounce(subject, from_addr):
+    subject_lower = subject.lower()
+    from_lower = from_addr.lower()
+    for pattern in BounceChecker.BOUNCE_SENDER_PATTERNS:
+        if pattern in from_lower:
+            return True
+    for pattern in BounceChecker.BOUNCE_SUBJECT_PATTERNS:
+        if re.search(pattern, subject_lower, re.IGNORECASE):
+            return True
+    return False
+
+
+def legacy_is_auto_reply(subject, body):
+    text = (subject + ' ' + body).lower()
+    for pattern in ReplyDetector.AUTO_REPLY_PATTERNS:
+        if re.search(pattern, text, re.IGNORECASE):
+            return True
+    return False
+
+
+def legacy_categorize(subject, body):
+    text = (subject + ' ' + body).lower()
+    positive_matches = [kw for kw in ReplyDetector.POSITIVE_KEYWORDS if kw in text]
+    if positive_matches:
+        confidence = min(100, 50 + len(positive_matches) * 15)
+        if any(kw in text for kw in ['interview', 'schedule', 'call', 'meeting']):
+            return ('INTERVIEW_REQUEST', confidence, positive_matches)
+        elif any(kw in text for kw in ['offer', 'join', 'welcome']):
+            return ('OFFER', confidence, positive_matches)
+        else:
+            return ('POSITIVE_RESPONSE', confidence, positive_matches)
+    rejection_matches = [kw for kw in ReplyDetector.REJECTION_KEYWORDS if kw in text]
+    if rejection_matches:
+        return ('REJECTION', min(100, 50 + len(rejection_matches) * 15), rejection_matches)
+    ack_matches = [kw for kw in ReplyDetector.ACKNOWLEDGMENT_KEYWORDS if kw in text]
+    if ack_matches:
+        return ('ACKNOWLEDGMENT', 60, ack_matches)
+    return ('NEEDS_REVIEW', 30, [])
+
+
+# --------------------------------------------------------------------------
+
+def timed(func, corpus):
+    start = time.perf_counter()
+    result = [func(*args) for args in corpus]
+    return result, time.perf_counter() - start
+
+
+def compare(name, legacy, compiled, corpus):
+    old, old_time = timed(legacy, corpus)
+    new, new_time = timed(compiled, corpus)
+    same = old == new
+    speedup = old_time / new_time if new_time else float('inf')
+    print(f"{name:<22} {old_time * 1000:>10.1f} ms {new_time * 1000:>10.1f} ms {speedup:>8.1f}x   "
+          f"{'✅ identical' if same else '❌ MISMATCH'}")
+    return same, old_time, new_time
+
+
+def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    corpus = build_corpus(messages)
+    # The rule checks don't touch instance state; skip __init__ (storage, config)
+    checker = BounceChecker.__new__(BounceChecker)
+    detector = ReplyDetector.__new__(ReplyDetector)
+
+    headers = [(subject, sender) for subject, sender, _ in corpus]
+    texts = [(subject, body) for subject, _, body in corpus]
+
+    print(f"\n📊 Inbox rule benchmark ({messages:,} messages)")
+    print("=" * 78)
+    print(f"{'check':<22} {'per rule':>13} {'compiled':>13} {'speedup':>9}")
+    results = [
+        compare('bounce header check', legacy_is_bounce, checker.is_bounce_email, headers),
+        compare('auto-reply check', legacy_is_auto_reply, detector.is_auto_reply, texts),
+        compare('reply category', legacy_categorize, detector.categorize_reply, texts),
+    ]
+    print("=" * 78)
+    total_old = sum(r[1] for r in results)
+    total_new = sum(r[2] for r in results)
+    print(f"{'total':<22} {total_old * 1000:>10.1f} ms {total_new * 1000:>10.1f} ms "
+          f"{total_old / total_new:>8.1f}x")
+
+    if not all(r[0] for r in results):
+        print("❌ Compiled rules disagree with the per-rule reference!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Benchmark: row-by-row vs vectorized pre-send filtering
+
+Builds a synthetic contact frame (50k rows by default), runs the old
+DataFrame.apply(axis=1) filters from send_bulk_emails()/main() next to the
+vectorized masks that replaced them, checks they select exactly the same rows
+and prints the timings.
+
+Usage:
+    python scripts/benchmark_presend_filter.py [rows]
+"""
+
+import os
+import sys
+import time
+import random
+
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.email_sender import (
+    EmailValidator, already_sent_mask, valid_email_mask,
+    not_blacklisted_mask, job_matches_mask,
+)
+from utils.suppression_index import KeySet
+
+
+LOCAL_PARTS = ['careers', 'hr', 'info', 'support', 'john.doe', 'talent', 'jobs', 'contact',
+               'sales', 'recruit', 'priya', 'service', 'people', 'cc', 'admin', 'team']
+DOMAINS = ['tcs.com', 'infosys.com', 'gmail.com', 'acme.io', 'startup.in', 'flipkart.com',
+           'yahoo.com', 'razorpay.com', 'example.org', 'zoho.com']
+COMPANIES = ['TCS', 'Infosys', 'Acme', 'Startup', 'Flipkart', 'Razorpay', 'Zoho', None]
+TITLES = ['Data Analyst', 'Python Developer', 'Senior Data Engineer', 'HR Executive',
+          'Business Analyst', 'ML Engineer', '', None]
+SKILLS = ['python, sql', 'excel', '', None, ['python', 'tableau'], 'java']
+
+
+def build_frame(rows: int, seed: int = 42) -> pd.DataFrame:
+    rng = random.Random(seed)
+    records = []
+    for _ in range(rows):
+        roll = rng.random()
+        if roll < 0.02:
+            email = None
+        elif roll < 0.03:
+            email = '   '
+        else:
+            email = f"{rng.choice(LOCAL_PARTS)}{rng.randint(0, 50) if rng.random() < 0.3 else ''}@{rng.choice(DOMAINS)}"
+            if rng.random() < 0.1:
+                email = f"  {email.upper()} "
+        records.append({
+            'hr_email': email,
+            'company': rng.choice(COMPANIES),
+            'job_title': rng.choice(TITLES),
+            'title': rng.choice(TITLES),
+            'skills': rng.choice(SKILLS),
+            'from_excel_list': rng.random() < 0.05,
+        })
+    return pd.DataFrame(records)
+
+
+# --- Reference: the row-by-row filters these masks replaced ---------------
+
+def legacy_already_sent(df, sent_emails):
+    def is_already_sent(row):
+        email = str(row.get('hr_email', '')).lower().strip() if pd.notna(row.get('hr_email', '')) else ''
+        job = str(row.get('job_title', '')).lower().strip()
+        return f"{email}|{job}" in sent_emails
+    return df.apply(is_already_sent, axis=1)
+
+
+def legacy_valid_email(df):
+    return df['hr_email'].apply(lambda x: isinstance(x, str) and pd.notna(x) and x.strip() != '')
+
+
+def legacy_hr_related(df, validator):
+    return df['hr_email'].apply(validator.is_hr_related_email)
+
+
+def legacy_not_blacklisted(df, blacklisted_companies):
+    return df.apply(
+        lambda row: (
+            (str(row.get('company', '')).lower().strip(), str(row.get('hr_email', '')).lower().strip())
+            not in blacklisted_companies
+            if isinstance(row.get('hr_email', ''), str) and row.get('hr_email', '').strip() != ''
+            else False
+        ),
+        axis=1
+    )
+
+
+def legacy_job_matches(df, target_role, job_keywords, applicant_skills):
+    def job_matches(row):
+        job_title = str(row.get('job_title', '') or row.get('title', '')).strip().lower()
+        keyword_match = any(kw in job_title for kw in job_keywords) if job_keywords else True
+        role_match = target_role in job_title if target_role else True
+        skills_col = row.get('skills', '')
+        if isinstance(skills_col, str):
+            job_skills = skills_col.lower()
+        elif isinstance(skills_col, list):
+            job_skills = ','.join(skills_col).lower()
+        else:
+            job_skills = ''
+        skills_match = any(sk in job_skills for sk in applicant_skills) if applicant_skills and job_skills else True
+        return keyword_match and role_match and skills_match
+    return df.apply(job_matches, axis=1)
+
+
+# --------------------------------------------------------------------------
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def compare(name, legacy, vectorized, args_legacy, args_vectorized):
+    old, old_time = timed(legacy, *args_legacy)
+    new, new_time = timed(vectorized, *args_vectorized)
+    same = old.astype(bool).tolist() == new.astype(bool).tolist()
+    speedup = old_time / new_time if new_time else float('inf')
+    print(f"{name:<22} {old_time * 1000:>10.1f} ms {new_time * 1000:>10.1f} ms {speedup:>8.1f}x   "
+          f"{'✅ identical' if same else '❌ MISMATCH'}")
+    return same, old_time, new_time
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    df = build_frame(rows)
+    validator = EmailValidator()
+
+    # Suppression state as the sender builds it: ~20% of rows already sent, a few blacklisted pairs
+    sample = df.sample(frac=0.2, random_state=1)
+    sent_keys = {
+        f"{str(e).lower().strip() if pd.notna(e) else ''}|{str(j).lower().strip()}"
+        for e, j in zip(sample['hr_email'], sample['job_title'])
+    }
+    sent_emails = KeySet(sent_keys)
+    blacklist = {(str(c).lower().strip(), str(e).lower().strip())
+                 for c, e in zip(sample['company'][:500], sample['hr_email'][:500])}
+
+    # HR check runs on the rows that survive the validity filter, as in send_bulk_emails()
+    valid_df = df[legacy_valid_email(df)]
+    criteria = ('engineer', ['data', 'python'], ['python', 'sql'])
+
+    print(f"\n📊 Pre-send filter benchmark ({rows:,} rows)")
+    print("=" * 78)
+    print(f"{'filter':<22} {'row apply':>13} {'vectorized':>13} {'speedup':>9}")
+    results = [
+        compare('already sent', legacy_already_sent, already_sent_mask, (df, sent_emails), (df, sent_emails)),
+        compare('valid hr_email', legacy_valid_email, lambda d: valid_email_mask(d['hr_email']), (df,), (df,)),
+        compare('HR-related', legacy_hr_related, lambda d: validator.hr_related_mask(d['hr_email']),
+                (valid_df, validator), (valid_df,)),
+        compare('not blacklisted', legacy_not_blacklisted, not_blacklisted_mask,
+                (valid_df, blacklist), (valid_df, blacklist)),
+        compare('job matches', legacy_job_matches, job_matches_mask, (df, *criteria), (df, *criteria)),
+    ]
+    print("=" * 78)
+    total_old = sum(r[1] for r in results)
+    total_new = sum(r[2] for r in results)
+    print(f"{'total':<22} {total_old * 1000:>10.1f} ms {total_new * 1000:>10.1f} ms "
+          f"{total_old / total_new:>8.1f}x")
+
+    if not all(r[0] for r in results):
+        print("❌ Vectorized filters disagree with the row-by-row reference!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
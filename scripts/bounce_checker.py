@@ -3,23 +3,34 @@ Bounce Checker - Monitors inbox for bounced emails and updates email status
 """
 
 import imaplib
-import email
 from email.header import decode_header
 import pandas as pd
 import os
 import sys
 import logging
 import re
-from datetime import datetime, timedelta
+from datetime import datetime
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.config import USER_DETAILS
+from utils.domain_stats import DomainBounceStats, is_bounce_status
+from utils.inbox_scanner import InboxHandler, InboxScanner
+from utils.storage import get_storage
+from utils.text_rules import compile_any
+from utils.verification_cache import get_verification_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 
+EMAIL_RE = r'([a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,})'
+# RFC 3463 enhanced status code: class (2/4/5) . subject . detail
+ENHANCED_STATUS_RE = re.compile(r'\b([245])\.(\d{1,3})\.(\d{1,3})\b')
+# Enhanced code as it appears in prose bounces: right after the SMTP reply
+# code ("550 5.1.1 ..."), so IP addresses and version numbers are not taken
+REPLY_STATUS_RE = re.compile(r'\b([45])\d\d[ -]([45]\.\d{1,3}\.\d{1,3})\b')
+
 
 class BounceChecker:
     """Checks inbox for bounced emails and tracks delivery status."""
@@ -62,15 +73,21 @@ class BounceChecker:
         'no-reply',
     ]
     
-    # Patterns to extract the bounced email address
+    # Subject table compiled once into a single scan (applied to the lower-cased subject)
+    BOUNCE_SUBJECT_RE = compile_any(BOUNCE_SUBJECT_PATTERNS)
+    
+    # Patterns to extract the bounced email address from non-standard bounces
+    # (no delivery-status part). Applied to lower-cased text; every gap is
+    # bounded to one line so a long quoted original cannot cause backtracking.
     BOUNCED_EMAIL_PATTERNS = [
-        r'delivery to the following recipient failed.*?([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-        r'failed to deliver to.*?([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-        r'recipient.*?([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}).*?rejected',
-        r'<([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})>.*?fail',
-        r'original.*?to:.*?([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-        r'final.*?recipient.*?([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
+        re.compile(r'^[ \t>]*delivery to the following recipients? failed[^\n]*\n(?:[ \t>]*\n){0,2}[ \t>]*<?' + EMAIL_RE, re.M),
+        re.compile(r'failed to deliver to[^\n@]{0,60}?<?' + EMAIL_RE),
+        re.compile(r'recipient[^\n@]{0,60}?<?' + EMAIL_RE + r'>?[^\n]{0,80}?rejected'),
+        re.compile(r'<' + EMAIL_RE + r'>[^\n]{0,80}?fail'),
+        re.compile(r'^[ \t>]*original[^\n:]{0,20}?(?:to|recipient)[ \t]*:[^\n@]{0,40}?' + EMAIL_RE, re.M),
+        re.compile(r'^[ \t>]*final-?[ \t]*recipient[ \t]*:[^\n@]{0,40}?' + EMAIL_RE, re.M),
     ]
+    ANY_EMAIL_PATTERN = re.compile(EMAIL_RE)
     
     # Common bounce reasons
     BOUNCE_REASONS = {
@@ -89,6 +106,21 @@ class BounceChecker:
         'recipient not found': 'Recipient not found in system',
         'invalid address': 'Invalid email address format',
     }
+    BOUNCE_REASON_PATTERN = re.compile('|'.join(re.escape(keyword) for keyword in BOUNCE_REASONS))
+    BOUNCE_REASON_ORDER = {keyword: index for index, keyword in enumerate(BOUNCE_REASONS)}
+    
+    # Enhanced status "subject.detail" -> reason (RFC 3463)
+    STATUS_REASONS = {
+        '1.1': 'Email address does not exist',
+        '1.2': 'Domain does not exist',
+        '1.3': 'Invalid email address format',
+        '1.6': 'Recipient has moved',
+        '1.10': 'Recipient has a null MX - domain accepts no mail',
+        '2.1': 'Mailbox disabled',
+        '2.2': 'Mailbox quota exceeded',
+        '4.4': 'Domain cannot receive email',
+        '7.1': 'Email was blocked by recipient',
+    }
     
     def __init__(self):
         self.imap_server = os.getenv('IMAP_SERVER', 'imap.gmail.com')
@@ -105,6 +137,7 @@ class BounceChecker:
         self.sent_log_path = os.path.join(self.data_dir, 'sent_emails_log.csv')
         self.verified_emails_path = os.path.join(self.data_dir, 'verified_emails.csv')
         self.problematic_emails_path = os.path.join(self.data_dir, 'problematic_emails.csv')
+        self.storage = get_storage()
         
     def connect_to_inbox(self):
         """Connect to email inbox via IMAP."""
@@ -118,33 +151,104 @@ class BounceChecker:
     
     def is_bounce_email(self, subject: str, from_addr: str) -> bool:
         """Check if an email is a bounce notification."""
-        subject_lower = subject.lower()
-        from_lower = from_addr.lower()
-        
         # Check from address against all bounce sender patterns
+        from_lower = from_addr.lower()
         for pattern in self.BOUNCE_SENDER_PATTERNS:
             if pattern in from_lower:
                 return True
         
         # Check subject patterns
-        for pattern in self.BOUNCE_SUBJECT_PATTERNS:
-            if re.search(pattern, subject_lower, re.IGNORECASE):
-                return True
+        return self.BOUNCE_SUBJECT_RE.search(subject.lower()) is not None
+    
+    def parse_dsn(self, dsn_text: str) -> list:
+        """Parse an RFC 3464 message/delivery-status part.
+        
+        Returns one dict per recipient block: recipient, action, status,
+        diagnostic. The first block holds per-message fields and has no
+        Final-Recipient, so it is skipped.
+        """
+        recipients = []
+        # Blocks are separated by blank lines; continuation lines start with whitespace
+        for block in re.split(r'\r?\n[ \t]*\r?\n', dsn_text or ''):
+            fields = {}
+            name = None
+            for line in block.splitlines():
+                if line[:1] in (' ', '\t') and name:
+                    fields[name] += ' ' + line.strip()
+                    continue
+                name, sep, value = line.partition(':')
+                if not sep:
+                    name = None
+                    continue
+                name = name.strip().lower()
+                fields[name] = value.strip()
+            
+            recipient = fields.get('final-recipient') or fields.get('original-recipient')
+            if not recipient:
+                continue
+            # "rfc822; user@example.com"
+            address = recipient.split(';', 1)[-1].strip().strip('<>').lower()
+            status = ENHANCED_STATUS_RE.search(fields.get('status', ''))
+            recipients.append({
+                'recipient': address,
+                'action': fields.get('action', '').lower(),
+                'status': status.group(0) if status else '',
+                'diagnostic': fields.get('diagnostic-code', ''),
+            })
+        return recipients
+    
+    def status_reason(self, status: str, diagnostic: str = '') -> str:
+        """Readable reason for an enhanced status code."""
+        parts = status.split('.')
+        if len(parts) == 3 and f"{parts[1]}.{parts[2]}" in self.STATUS_REASONS:
+            return self.STATUS_REASONS[f"{parts[1]}.{parts[2]}"]
+        if diagnostic:
+            reason = self.extract_bounce_reason(diagnostic)
+            if reason != "Unknown delivery failure":
+                return reason
+        if status.startswith('4.'):
+            return 'Temporary delivery failure'
+        if status.startswith('5.'):
+            return 'Permanent delivery failure'
+        return "Unknown delivery failure"
+    
+    @staticmethod
+    def bounce_type(status: str) -> str:
+        """'hard' for 5.x.x, 'soft' for 4.x.x, '' when unknown."""
+        return {'5': 'hard', '4': 'soft'}.get(status[:1], '')
+    
+    @staticmethod
+    def reply_status(body: str) -> str:
+        """Enhanced status code quoted after an SMTP reply of the same class.
         
-        return False
+        '' when there is none; the bounce is then left untyped (i.e. hard).
+        """
+        for match in REPLY_STATUS_RE.finditer(body):
+            if match.group(2)[0] == match.group(1):
+                return match.group(2)
+        return ''
+    
+    @staticmethod
+    def permanent_bounces(bounces: list) -> list:
+        """Bounces that should block the address for good.
+        
+        Soft (4.x.x) failures - mailbox full, greylisting, rate limits - clear
+        up on their own, so they never reach bounced_emails, the sent log or
+        the domain stats. Untyped bounces are treated as hard, as before.
+        """
+        return [b for b in bounces if b.get('bounce_type') != 'soft']
     
     def extract_bounced_email(self, body: str, subject: str) -> str:
-        """Extract the bounced email address from the message."""
+        """Extract the bounced email address from a non-standard bounce message."""
         text = f"{subject}\n{body}".lower()
         
         for pattern in self.BOUNCED_EMAIL_PATTERNS:
-            match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+            match = pattern.search(text)
             if match:
                 return match.group(1).lower()
         
         # Fallback: find any email in the body
-        email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-        emails_found = re.findall(email_pattern, body)
+        emails_found = self.ANY_EMAIL_PATTERN.findall(body.lower())
         
         # Filter out our own email and common system emails
         for found_email in emails_found:
@@ -158,11 +262,10 @@ class BounceChecker:
     
     def extract_bounce_reason(self, body: str) -> str:
         """Extract the reason for bounce from the message body."""
-        body_lower = body.lower()
-        
-        for keyword, reason in self.BOUNCE_REASONS.items():
-            if keyword in body_lower:
-                return reason
+        # One pass over the body; the earliest-listed keyword found wins
+        found = {match.group(0) for match in self.BOUNCE_REASON_PATTERN.finditer(body.lower())}
+        if found:
+            return self.BOUNCE_REASONS[min(found, key=self.BOUNCE_REASON_ORDER.get)]
         
         return "Unknown delivery failure"
     
@@ -187,9 +290,57 @@ class BounceChecker:
         
         return body
     
+    def decode_subject(self, msg) -> str:
+        """Decode the Subject header (first encoded word)."""
+        subject = ""
+        if msg['Subject']:
+            decoded = decode_header(msg['Subject'])
+            subject = decoded[0][0]
+            if isinstance(subject, bytes):
+                subject = subject.decode('utf-8', errors='ignore')
+        return subject
+    
+    def parse_bounces(self, msg, subject: str, body: str, dsn_text: str = '') -> list:
+        """Bounce records for a notification.
+        
+        A delivery-status report is authoritative: one record per recipient
+        whose Action is "failed" (delayed/relayed/delivered notices are not
+        bounces), typed hard or soft by its status class. Without a report the
+        regex path extracts at most one address from the readable text.
+        """
+        if dsn_text:
+            reports = self.parse_dsn(dsn_text)
+            if reports:
+                return [{
+                    'bounced_email': report['recipient'],
+                    'reason': self.status_reason(report['status'], report['diagnostic']),
+                    'bounce_date': msg.get('Date', ''),
+                    'subject': subject[:100],
+                    'bounce_type': self.bounce_type(report['status']) or 'hard',
+                    'status_code': report['status'],
+                } for report in reports if report['action'] == 'failed']
+        
+        bounced_email = self.extract_bounced_email(body, subject)
+        if not bounced_email:
+            return []
+        status = self.reply_status(body)
+        return [{
+            'bounced_email': bounced_email,
+            'reason': self.extract_bounce_reason(body),
+            'bounce_date': msg.get('Date', ''),
+            'subject': subject[:100],
+            'bounce_type': self.bounce_type(status),
+            'status_code': status,
+        }]
+    
     def check_for_bounces(self, days_back: int = 7) -> list:
-        """Check inbox for bounce notifications."""
-        logging.info(f"🔍 Checking inbox for bounce notifications (last {days_back} days)...")
+        """Check inbox for bounce notifications.
+        
+        Only mail newer than the last scan is read; ``days_back`` is the window
+        used on the first run or after the mailbox's UIDVALIDITY changes. The
+        bounces found are saved before the scan position is.
+        """
+        logging.info(f"🔍 Checking inbox for bounce notifications (new mail, or last {days_back} days)...")
         
         if not self.email_password:
             logging.error("❌ SENDER_PASSWORD not set. Cannot check inbox.")
@@ -199,74 +350,23 @@ class BounceChecker:
         if not mail:
             return []
         
-        bounces = []
+        handler = BounceHandler(self)
+        scanner = InboxScanner(self.imap_server, self.imap_port, self.email_address, self.email_password)
+        scanner.run([handler], days_back=days_back, mail=mail)
         
-        try:
-            mail.select('INBOX')
-            
-            # Search for emails from the last N days
-            date_since = (datetime.now() - timedelta(days=days_back)).strftime("%d-%b-%Y")
-            
-            # Search for potential bounce emails
-            search_criteria = f'(SINCE {date_since})'
-            status, messages = mail.search(None, search_criteria)
-            
-            if status != 'OK':
-                logging.warning("Failed to search inbox")
-                return []
-            
-            email_ids = messages[0].split()
-            logging.info(f"📬 Found {len(email_ids)} emails to check")
-            
-            for email_id in email_ids:
-                try:
-                    status, msg_data = mail.fetch(email_id, '(RFC822)')
-                    if status != 'OK':
-                        continue
-                    
-                    msg = email.message_from_bytes(msg_data[0][1])
-                    
-                    # Decode subject
-                    subject = ""
-                    if msg['Subject']:
-                        decoded = decode_header(msg['Subject'])
-                        subject = decoded[0][0]
-                        if isinstance(subject, bytes):
-                            subject = subject.decode('utf-8', errors='ignore')
-                    
-                    # Get from address
-                    from_addr = msg.get('From', '')
-                    
-                    # Check if this is a bounce
-                    if self.is_bounce_email(subject, from_addr):
-                        body = self.get_email_body(msg)
-                        bounced_email = self.extract_bounced_email(body, subject)
-                        
-                        if bounced_email:
-                            reason = self.extract_bounce_reason(body)
-                            bounce_info = {
-                                'bounced_email': bounced_email,
-                                'reason': reason,
-                                'bounce_date': msg.get('Date', ''),
-                                'subject': subject[:100],
-                            }
-                            bounces.append(bounce_info)
-                            logging.info(f"   ❌ Bounce detected: {bounced_email} - {reason}")
-                
-                except Exception as e:
-                    logging.debug(f"Error processing email: {e}")
-                    continue
-            
-            mail.logout()
-            
-        except Exception as e:
-            logging.error(f"Error checking bounces: {e}")
-        
-        logging.info(f"📊 Found {len(bounces)} bounced emails")
-        return bounces
+        logging.info(f"📊 Found {len(handler.bounces)} bounced emails")
+        return handler.bounces
     
-    def save_bounces(self, bounces: list):
-        """Save bounced emails to CSV in the correct format."""
+    def save_bounces(self, bounces: list, append: bool = False):
+        """Save bounced emails to CSV in the correct format.
+        
+        ``append`` writes the records as new rows instead of rewriting the
+        table, so a campaign already following bounced_emails (see
+        EmailSender) blocks the addresses before its next send. Addresses the
+        table already has are skipped (email is its key), so a message offered
+        again after a handler error, or a repeat bounce, adds no second row.
+        """
+        bounces = self.permanent_bounces(bounces)
         if not bounces:
             return
         
@@ -279,23 +379,33 @@ class BounceChecker:
                 'reason': b.get('reason', 'Unknown delivery failure'),
                 'bounce_date': b.get('bounce_date', datetime.now().strftime('%Y-%m-%d')),
                 'detected_at': datetime.now().isoformat(),
-                'source': 'bounce_checker_inbox'
+                'source': 'bounce_checker_inbox',
+                'bounce_type': b.get('bounce_type', ''),
+                'status_code': b.get('status_code', ''),
             })
         
-        df_new = pd.DataFrame(records)
-        
-        if os.path.exists(self.bounce_log_path):
-            df_existing = pd.read_csv(self.bounce_log_path)
-            if df_existing.empty:
-                df_combined = df_new
-            else:
-                df_combined = pd.concat([df_existing, df_new], ignore_index=True)
-            df_combined = df_combined.drop_duplicates(subset=['email'], keep='last')
+        if append:
+            known = set()
+            if self.storage.exists('bounced_emails'):
+                table = self.storage.read_table('bounced_emails')
+                if 'email' in table.columns:
+                    known = set(table['email'].astype(str).str.lower().str.strip())
+            new_records = []
+            for record in records:
+                if record['email'] not in known:
+                    known.add(record['email'])
+                    new_records.append(record)
+            self.storage.append_rows('bounced_emails', new_records)
         else:
-            df_combined = df_new
-        
-        df_combined.to_csv(self.bounce_log_path, index=False)
+            # Upsert on email - a re-detected bounce replaces the old record
+            self.storage.upsert_rows('bounced_emails', records)
         logging.info(f"💾 Saved {len(bounces)} bounces to {self.bounce_log_path}")
+        
+        # A bounced address's cached "valid" verdict is wrong - re-probe it if it comes up again
+        verification_cache = get_verification_cache()
+        for record in records:
+            verification_cache.invalidate(record['email'])
+        verification_cache.save()
     
     def sync_bounced_from_sent_log(self):
         """Sync bounced emails from sent_emails_log.csv to bounced_emails.csv.
@@ -304,12 +414,12 @@ class BounceChecker:
         are added to the bounced emails database for future filtering.
         Includes sender_email for multi-user support.
         """
-        if not os.path.exists(self.sent_log_path):
+        if not self.storage.exists('sent_emails'):
             logging.info("No sent emails log found to sync")
             return 0
         
         try:
-            df = pd.read_csv(self.sent_log_path)
+            df = self.storage.read_table('sent_emails')
             if df.empty or 'status' not in df.columns:
                 return 0
             
@@ -335,20 +445,8 @@ class BounceChecker:
                     'sender_email': row.get('sender_email', self.email_address)  # Track which user sent this
                 })
             
-            df_new = pd.DataFrame(records)
-            
             # Merge with existing bounced emails
-            if os.path.exists(self.bounce_log_path):
-                df_existing = pd.read_csv(self.bounce_log_path)
-                if not df_existing.empty:
-                    df_combined = pd.concat([df_existing, df_new], ignore_index=True)
-                    df_combined = df_combined.drop_duplicates(subset=['email'], keep='last')
-                else:
-                    df_combined = df_new
-            else:
-                df_combined = df_new
-            
-            df_combined.to_csv(self.bounce_log_path, index=False)
+            self.storage.upsert_rows('bounced_emails', records)
             
             logging.info(f"✅ Synced {len(records)} bounced emails from sent log to database")
             return len(records)
@@ -358,31 +456,36 @@ class BounceChecker:
             return 0
     
     def update_sent_log_with_bounces(self, bounces: list):
-        """Update sent_emails_log.csv with bounce status."""
-        if not bounces or not os.path.exists(self.sent_log_path):
+        """Update sent_emails_log.csv with bounce status (hard bounces only)."""
+        bounces = self.permanent_bounces(bounces)
+        if not bounces or not self.storage.exists('sent_emails'):
             return
         
-        df = pd.read_csv(self.sent_log_path)
         bounced_emails = {b['bounced_email'].lower(): b['reason'] for b in bounces}
         
-        updated_count = 0
-        for idx, row in df.iterrows():
-            email_lower = row['recipient_email'].lower()
-            if email_lower in bounced_emails:
-                df.at[idx, 'status'] = f"bounced: {bounced_emails[email_lower]}"
-                updated_count += 1
+        domain_stats = DomainBounceStats(storage=self.storage)
+        
+        for row in self.storage.iter_rows('sent_emails'):
+            email_lower = str(row.get('recipient_email') or '').lower()
+            # Rows that already counted as bounced must not be counted twice
+            if email_lower in bounced_emails and not is_bounce_status(row.get('status')):
+                domain_stats.record_bounce(email_lower)
+        
+        updated_count = self.storage.update_column(
+            'sent_emails', 'status', 'recipient_email',
+            {email: f"bounced: {reason}" for email, reason in bounced_emails.items()})
         
         if updated_count > 0:
-            df.to_csv(self.sent_log_path, index=False)
+            domain_stats.save()
             logging.info(f"📝 Updated {updated_count} entries in sent log with bounce status")
     
     def generate_email_quality_report(self):
         """Generate a report of verified vs problematic emails."""
-        if not os.path.exists(self.sent_log_path):
+        if not self.storage.exists('sent_emails'):
             logging.warning("No sent emails log found")
             return
         
-        df = pd.read_csv(self.sent_log_path)
+        df = self.storage.read_table('sent_emails')
         
         # Categorize emails
         verified = []
@@ -406,13 +509,13 @@ class BounceChecker:
         # Save verified emails
         if verified:
             df_verified = pd.DataFrame(verified)
-            df_verified.to_csv(self.verified_emails_path, index=False)
+            self.storage.write_table('verified_emails', df_verified)
             logging.info(f"✅ {len(verified)} verified emails saved to {self.verified_emails_path}")
         
         # Save problematic emails
         if problematic:
             df_problematic = pd.DataFrame(problematic)
-            df_problematic.to_csv(self.problematic_emails_path, index=False)
+            self.storage.write_table('problematic_emails', df_problematic)
             logging.info(f"⚠️ {len(problematic)} problematic emails saved to {self.problematic_emails_path}")
         
         # Print summary
@@ -426,6 +529,45 @@ class BounceChecker:
                 logging.info(f"   - {p['email']} ({p['company']}): {p['reason']}")
 
 
+class BounceHandler(InboxHandler):
+    """Bounce extraction as a consumer of the shared inbox pass."""
+    
+    name = 'bounces'
+    # The readable notice plus the machine-readable delivery report
+    body_parts = ('text/plain', 'message/delivery-status')
+    
+    def __init__(self, checker: BounceChecker = None, append: bool = False):
+        self.checker = checker or BounceChecker()
+        # Watch mode appends so in-flight campaigns pick bounces up right away
+        self.append = append
+        self.bounces = []
+        self._saved = 0
+    
+    def wants(self, message) -> bool:
+        subject = self.checker.decode_subject(message.headers)
+        return self.checker.is_bounce_email(subject, message.from_header)
+    
+    def handle(self, message, body: str):
+        subject = self.checker.decode_subject(message.headers)
+        report_parts = [part for part in message.parts if part.mime_type == 'message/delivery-status']
+        text_parts = [part for part in message.parts if part.mime_type != 'message/delivery-status']
+        for bounce_info in self.checker.parse_bounces(message.headers, subject, message.body(text_parts),
+                                                      message.body(report_parts)):
+            self.bounces.append(bounce_info)
+            if bounce_info['bounce_type'] == 'soft':
+                logging.info(f"   ⏳ Soft bounce (not blocked): {bounce_info['bounced_email']} - {bounce_info['reason']}")
+                continue
+            kind = f" ({bounce_info['bounce_type']})" if bounce_info['bounce_type'] else ''
+            logging.info(f"   ❌ Bounce detected{kind}: {bounce_info['bounced_email']} - {bounce_info['reason']}")
+    
+    def save(self):
+        new = self.bounces[self._saved:]
+        if new:
+            self.checker.save_bounces(new, append=self.append)
+            self.checker.update_sent_log_with_bounces(new)
+            self._saved = len(self.bounces)
+
+
 def main():
     """Main function to check for bounces."""
     logging.info("="*60)
@@ -439,13 +581,8 @@ def main():
     
     checker = BounceChecker()
     
-    # Check for bounces in the last 7 days
-    bounces = checker.check_for_bounces(days_back=7)
-    
-    # Save bounces
-    if bounces:
-        checker.save_bounces(bounces)
-        checker.update_sent_log_with_bounces(bounces)
+    # Check for bounces in the last 7 days (saved as part of the scan)
+    checker.check_for_bounces(days_back=7)
     
     # ALWAYS sync bounced emails from sent log (even if no new inbox bounces)
     synced = checker.sync_bounced_from_sent_log()
@@ -456,9 +593,9 @@ def main():
     checker.generate_email_quality_report()
     
     # Show summary of bounced emails database
-    if os.path.exists(checker.bounce_log_path):
+    if checker.storage.exists('bounced_emails'):
         try:
-            df = pd.read_csv(checker.bounce_log_path)
+            df = checker.storage.read_table('bounced_emails')
             logging.info(f"\n📊 BOUNCED EMAILS DATABASE:")
             logging.info(f"   Total blocked emails: {len(df)}")
             if not df.empty:
@@ -466,6 +603,7 @@ def main():
         except:
             pass
     
+    checker.storage.flush()
     logging.info("="*60)
     logging.info("✅ Bounce check completed!")
     logging.info("="*60)
@@ -2,17 +2,21 @@
 HR Email Scraper - Extracts recruiter/HR emails from job postings and company pages
 """
 
-import requests
-from bs4 import BeautifulSoup
 import re
 import logging
 import pandas as pd
 import os
-import time
+import sys
 import random
 from urllib.parse import urljoin, urlparse
 import json
 
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.html_parse import mailto_addresses, page_text, parse_html
+from utils.http_engine import FetchRequest, get_fetch_engine
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 
@@ -31,9 +35,12 @@ class HREmailScraper:
         'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36',
     ]
     
+    # Jobs fetched per batch when scraping the jobs CSV (pages are held until the batch is parsed)
+    BATCH_SIZE = int(os.getenv('EMAIL_SCRAPE_BATCH', '20'))
+    
     def __init__(self):
-        self.session = requests.Session()
-        self._update_headers()
+        # Shared fetch engine: per-host rate limits and retries replace the random sleeps
+        self.engine = get_fetch_engine()
         
         # Email pattern
         self.email_pattern = re.compile(
@@ -56,9 +63,9 @@ class HREmailScraper:
         
         self.scraped_emails = []
     
-    def _update_headers(self):
-        """Update session with fresh randomized headers."""
-        self.session.headers.update({
+    def _get_headers(self) -> dict:
+        """Fresh randomized headers for one request."""
+        return {
             'User-Agent': random.choice(self.USER_AGENTS),
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.9,en-IN;q=0.8',
@@ -73,7 +80,7 @@ class HREmailScraper:
             'Sec-Ch-Ua-Mobile': '?0',
             'Sec-Ch-Ua-Platform': '"Windows"',
             'Cache-Control': 'max-age=0',
-        })
+        }
         
     def is_valid_hr_email(self, email: str, company_domain: str = None) -> bool:
         """Check if email looks like an HR/recruiter email."""
@@ -120,42 +127,51 @@ class HREmailScraper:
                 
         return list(set(valid_emails))
     
+    def fetch_pages(self, urls: list, timeout: int = 15) -> dict:
+        """Fetch ``urls`` as one batch; returns {url: response or exception}.
+        
+        A 403 gets one more try without the cookies that got us flagged.
+        """
+        urls = list(dict.fromkeys(urls))
+        pages = {}
+        blocked = []
+        batch = [FetchRequest(url, headers=self._get_headers(), timeout=timeout) for url in urls]
+        for result in self.engine.fetch_all(batch):
+            url = result.request.url
+            pages[url] = result.response if result.response is not None else result.error
+            if result.status_code == 403:
+                logging.debug(f"Got 403 for {url}, retrying without cookies...")
+                blocked.append(url)
+        
+        if blocked:
+            batch = [FetchRequest(url, headers=self._get_headers(), timeout=timeout, cookies=False)
+                     for url in blocked]
+            for result in self.engine.fetch_all(batch):
+                pages[result.request.url] = result.response if result.response is not None else result.error
+        return pages
+    
     def scrape_page(self, url: str, company_name: str = None) -> list:
         """Scrape a single page for emails with anti-detection measures."""
+        return self.emails_from_page(url, self.fetch_pages([url])[url])
+    
+    def emails_from_page(self, url: str, page) -> list:
+        """HR emails on a page fetched by ``fetch_pages``."""
         try:
-            # Rotate headers before each request
-            self._update_headers()
-            
-            # Add small random delay to appear more human-like
-            time.sleep(random.uniform(0.5, 2))
-            
-            response = self.session.get(url, timeout=15)
-            
-            # Handle 403 Forbidden - retry with fresh session
-            if response.status_code == 403:
-                logging.debug(f"Got 403 for {url}, retrying with fresh session...")
-                self.session = requests.Session()
-                self._update_headers()
-                time.sleep(random.uniform(2, 4))
-                response = self.session.get(url, timeout=15)
-            
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
+            if isinstance(page, Exception):
+                raise page
+            page.raise_for_status()
             
             # Get company domain from URL
             parsed_url = urlparse(url)
             company_domain = parsed_url.netloc.replace('www.', '')
             
             # Extract text content
-            text = soup.get_text(separator=' ')
+            text = page_text(page.text)
             
             # Also check href attributes for mailto links
-            mailto_links = soup.find_all('a', href=re.compile(r'^mailto:', re.I))
             mailto_emails = []
-            for link in mailto_links:
-                href = link.get('href', '')
-                email_match = self.email_pattern.search(href)
+            for address in mailto_addresses(page.text):
+                email_match = self.email_pattern.search(address)
                 if email_match:
                     mailto_emails.append(email_match.group())
             
@@ -169,11 +185,14 @@ class HREmailScraper:
             logging.warning(f"Error scraping {url}: {e}")
             return []
     
-    def scrape_company_careers_page(self, company_name: str, careers_url: str) -> dict:
-        """Scrape a company's careers page for HR emails."""
+    def scrape_company_careers_page(self, company_name: str, careers_url: str, page=None) -> dict:
+        """Scrape a company's careers page for HR emails (``page``: already fetched)."""
         logging.info(f"🔍 Scraping {company_name} careers page: {careers_url}")
         
-        emails = self.scrape_page(careers_url, company_name)
+        if page is None:
+            emails = self.scrape_page(careers_url, company_name)
+        else:
+            emails = self.emails_from_page(careers_url, page)
         
         # DISABLED: Additional path scraping generates too many 404 errors
         # Most company websites block bots or have non-standard URL structures
@@ -194,8 +213,8 @@ class HREmailScraper:
         logging.info(f"🔍 Checking LinkedIn job: {job_url}")
         
         try:
-            response = self.session.get(job_url, timeout=15)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            response = self.engine.get(job_url, headers=self._get_headers(), timeout=15)
+            soup = parse_html(response.text)
             
             # Extract company name
             company_elem = soup.find('a', {'class': re.compile(r'company', re.I)})
@@ -220,8 +239,12 @@ class HREmailScraper:
             logging.warning(f"Error scraping LinkedIn job: {e}")
             return None
     
-    def search_company_emails(self, company_name: str) -> list:
-        """Search for company HR emails using various methods."""
+    @staticmethod
+    def company_search_url(company_name: str) -> str:
+        return f"https://www.google.com/search?q={company_name.replace(' ', '+')}+careers+contact+email"
+    
+    def search_company_emails(self, company_name: str, page=None) -> list:
+        """Search for company HR emails using various methods (``page``: search results already fetched)."""
         emails = []
         
         # Common HR email patterns to try
@@ -235,17 +258,63 @@ class HREmailScraper:
         ]
         
         # Try to find company website
-        search_url = f"https://www.google.com/search?q={company_name.replace(' ', '+')}+careers+contact+email"
-        
         try:
-            response = self.session.get(search_url, timeout=10)
-            found_emails = self.extract_emails_from_text(response.text)
+            if page is None:
+                search_url = self.company_search_url(company_name)
+                page = self.fetch_pages([search_url], timeout=10)[search_url]
+            found_emails = self.extract_emails_from_text(page.text)
             emails.extend(found_emails)
         except:
             pass
         
         return list(set(emails))
     
+    def _collect_job_emails(self, idx, job, total: int, pages: dict, results: list):
+        """Emails for one jobs-CSV row from its prefetched pages; appends result rows."""
+        company = job.get('company', 'Unknown')
+        job_title = job.get('title', 'Unknown Position')
+        job_url = job.get('url') or job.get('link', '')
+        source = job.get('source', 'unknown')
+        
+        logging.info(f"Processing {idx+1}/{total}: {job_title} at {company}")
+        
+        emails = []
+        
+        # Scrape job URL if available
+        if isinstance(job_url, str) and job_url.startswith('http'):
+            page_emails = self.emails_from_page(job_url, pages[job_url])
+            emails.extend(page_emails)
+        
+        # Search for company emails
+        search_url = self.company_search_url(str(company))
+        company_emails = self.search_company_emails(str(company), pages[search_url])
+        emails.extend(company_emails)
+        
+        emails = list(set(emails))
+        
+        if emails:
+            for email in emails:
+                results.append({
+                    'company': company,
+                    'job_title': job_title,
+                    'job_url': job_url,
+                    'source': source,
+                    'hr_email': email,
+                    'scraped_at': pd.Timestamp.now().isoformat()
+                })
+            logging.info(f"  ✅ Found {len(emails)} emails: {emails}")
+        else:
+            # Add entry with no email found
+            results.append({
+                'company': company,
+                'job_title': job_title,
+                'job_url': job_url,
+                'source': source,
+                'hr_email': None,
+                'scraped_at': pd.Timestamp.now().isoformat()
+            })
+            logging.info(f"  ⚠️ No emails found")
+    
     def scrape_from_jobs_csv(self, jobs_csv_path: str) -> pd.DataFrame:
         """Scrape emails from jobs listed in the jobs CSV."""
         if not os.path.exists(jobs_csv_path):
@@ -256,53 +325,21 @@ class HREmailScraper:
         logging.info(f"📊 Processing {len(jobs_df)} jobs from CSV")
         
         results = []
+        rows = list(jobs_df.iterrows())
         
-        for idx, job in jobs_df.iterrows():
-            company = job.get('company', 'Unknown')
-            job_title = job.get('title', 'Unknown Position')
-            job_url = job.get('url') or job.get('link', '')
-            source = job.get('source', 'unknown')
-            
-            logging.info(f"Processing {idx+1}/{len(jobs_df)}: {job_title} at {company}")
-            
-            emails = []
-            
-            # Scrape job URL if available
-            if job_url and job_url.startswith('http'):
-                page_emails = self.scrape_page(job_url, company)
-                emails.extend(page_emails)
-            
-            # Search for company emails
-            company_emails = self.search_company_emails(company)
-            emails.extend(company_emails)
-            
-            emails = list(set(emails))
-            
-            if emails:
-                for email in emails:
-                    results.append({
-                        'company': company,
-                        'job_title': job_title,
-                        'job_url': job_url,
-                        'source': source,
-                        'hr_email': email,
-                        'scraped_at': pd.Timestamp.now().isoformat()
-                    })
-                logging.info(f"  ✅ Found {len(emails)} emails: {emails}")
-            else:
-                # Add entry with no email found
-                results.append({
-                    'company': company,
-                    'job_title': job_title,
-                    'job_url': job_url,
-                    'source': source,
-                    'hr_email': None,
-                    'scraped_at': pd.Timestamp.now().isoformat()
-                })
-                logging.info(f"  ⚠️ No emails found")
-            
-            # Be respectful with rate limiting
-            time.sleep(random.uniform(2, 5))
+        # Job pages and company searches for a chunk of jobs go out as one batch
+        for start in range(0, len(rows), self.BATCH_SIZE):
+            chunk = rows[start:start + self.BATCH_SIZE]
+            urls = []
+            for _, job in chunk:
+                job_url = job.get('url') or job.get('link', '')
+                if isinstance(job_url, str) and job_url.startswith('http'):
+                    urls.append(job_url)
+                urls.append(self.company_search_url(str(job.get('company', 'Unknown'))))
+            pages = self.fetch_pages(urls)
+            
+            for idx, job in chunk:
+                self._collect_job_emails(idx, job, len(jobs_df), pages, results)
         
         return pd.DataFrame(results)
     
@@ -310,16 +347,19 @@ class HREmailScraper:
         """Scrape emails from a list of companies with their career URLs."""
         results = []
         
+        targets = []
         for company_info in companies:
             if isinstance(company_info, dict):
-                company_name = company_info.get('name', 'Unknown')
-                careers_url = company_info.get('careers_url', '')
+                targets.append((company_info.get('name', 'Unknown'), company_info.get('careers_url', '')))
             else:
-                company_name = str(company_info)
-                careers_url = ''
-            
+                targets.append((str(company_info), ''))
+        
+        # Every careers page is fetched in one batch, then parsed in order
+        pages = self.fetch_pages([url for _, url in targets if url])
+        
+        for company_name, careers_url in targets:
             if careers_url:
-                data = self.scrape_company_careers_page(company_name, careers_url)
+                data = self.scrape_company_careers_page(company_name, careers_url, pages[careers_url])
                 for email in data.get('emails', []):
                     results.append({
                         'company': company_name,
@@ -327,8 +367,6 @@ class HREmailScraper:
                         'hr_email': email,
                         'scraped_at': pd.Timestamp.now().isoformat()
                     })
-            
-            time.sleep(random.uniform(2, 4))
         
         return pd.DataFrame(results)
 
@@ -364,22 +402,22 @@ def search_emails_duckduckgo(scraper, search_terms: list) -> pd.DataFrame:
     
     results = []
     
-    for term in search_terms[:5]:  # Limit to 5 terms
+    # DuckDuckGo HTML search (bot-friendly, no API key needed), limit to 5 terms
+    batch = [
+        FetchRequest(f"https://html.duckduckgo.com/html/?q={f'{term} bangalore careers hr email contact'.replace(' ', '+')}",
+                     headers=scraper._get_headers(), timeout=10, tag=term)
+        for term in search_terms[:5]
+    ]
+    
+    for result in scraper.engine.fetch_all(batch):
+        term = result.request.tag
         try:
-            scraper._update_headers()
+            if result.response is None:
+                raise result.error
             
-            # DuckDuckGo HTML search (bot-friendly, no API key needed)
-            search_query = f'{term} bangalore careers hr email contact'
-            search_url = f"https://html.duckduckgo.com/html/?q={search_query.replace(' ', '+')}"
-            
-            response = scraper.session.get(search_url, timeout=10)
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
+            if result.ok:
                 # Extract emails from search results
-                page_text = soup.get_text()
-                emails = scraper.email_pattern.findall(page_text)
+                emails = scraper.email_pattern.findall(page_text(result.response.text))
                 
                 for email in emails:
                     if scraper.is_valid_hr_email(email):
@@ -391,8 +429,6 @@ def search_emails_duckduckgo(scraper, search_terms: list) -> pd.DataFrame:
                             'scraped_at': pd.Timestamp.now().isoformat()
                         })
             
-            time.sleep(random.uniform(1, 2))
-            
         except Exception as e:
             logging.debug(f"DuckDuckGo search error for '{term}': {e}")
     
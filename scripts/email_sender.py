@@ -4,9 +4,7 @@ With integrated email verification, bounce tracking, and optimization
 """
 
 import smtplib
-import ssl
 import socket
-import dns.resolver
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
@@ -21,6 +19,7 @@ import re
 import signal
 from datetime import datetime
 from string import Template
+from typing import Optional
 
 # Global flag for graceful shutdown on SIGTERM (GitHub Actions cancel)
 SHUTDOWN_REQUESTED = False
@@ -30,6 +29,8 @@ def signal_handler(signum, frame):
     global SHUTDOWN_REQUESTED
     SHUTDOWN_REQUESTED = True
     logging.info("🛑 Shutdown signal received - finishing current operation and exiting...")
+    # Persist buffered log rows now in case the runner kills us before the loop exits
+    flush_all_writers()
 
 # Register signal handlers for graceful cancellation
 signal.signal(signal.SIGTERM, signal_handler)
@@ -39,6 +40,13 @@ signal.signal(signal.SIGINT, signal_handler)
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.config import USER_DETAILS, BASE_RESUME_PATH
+from utils.smtp_pool import get_smtp_pool
+from utils.csv_log import flush_all_writers
+from utils.suppression_index import SuppressionIndex, KeySet
+from utils.storage import get_storage
+from utils.domain_stats import DomainBounceStats, email_domain, is_bounce_status
+from utils.prevalidation import PrevalidationPipeline
+from utils.dns_cache import get_dns_cache
 
 # Import email verifier for pre-send validation
 try:
@@ -70,6 +78,111 @@ if CI_MODE:
     logging.info("🚀 CI Mode detected - using optimized delays for GitHub Actions")
 
 
+# ---------------------------------------------------------------------------
+# Vectorized pre-send filters. Each returns a boolean mask aligned with the
+# frame and matches the row-by-row checks send_bulk_emails()/main() used to run
+# (see scripts/benchmark_presend_filter.py).
+# ---------------------------------------------------------------------------
+
+def _as_str(series: pd.Series) -> pd.Series:
+    """Vectorized ``str(value)`` (None -> 'None', NaN -> 'nan' on every pandas version)."""
+    text = series.astype(str).astype(object)
+    missing = series.isna()
+    if missing.any():
+        text[missing] = series[missing].map(str)
+    return text
+
+
+def _normalized(series: pd.Series) -> pd.Series:
+    """Vectorized ``str(value).lower().strip()``."""
+    return _as_str(series).str.lower().str.strip()
+
+
+def _column(df: pd.DataFrame, name: str, default='') -> pd.Series:
+    """Vectorized ``row.get(name, default)``."""
+    if name in df.columns:
+        return df[name]
+    return pd.Series(default, index=df.index, dtype=object)
+
+
+def _str_values(series: pd.Series) -> pd.Series:
+    """Lower-cased value for str cells, NaN for everything else."""
+    try:
+        return series.str.lower()
+    except AttributeError:
+        # .str refuses columns without any strings (e.g. all-NaN floats)
+        return pd.Series(float('nan'), index=series.index, dtype=object)
+
+
+def valid_email_mask(emails: pd.Series) -> pd.Series:
+    """``isinstance(x, str) and x.strip() != ''`` per cell."""
+    try:
+        stripped = emails.str.strip()
+    except AttributeError:
+        return pd.Series(False, index=emails.index)
+    return (stripped.notna() & stripped.ne('')).fillna(False).astype(bool)
+
+
+def already_sent_mask(df: pd.DataFrame, sent_keys) -> pd.Series:
+    """True where the row's ``email|job_title`` key is in ``sent_keys``."""
+    hr_email = df['hr_email']
+    emails = _normalized(hr_email).where(hr_email.notna(), '')
+    keys = emails + '|' + _normalized(_column(df, 'job_title'))
+    if isinstance(sent_keys, KeySet):
+        return pd.Series(sent_keys.contains_many(keys), index=df.index, dtype=bool)
+    return keys.isin(sent_keys)
+
+
+def not_blacklisted_mask(df: pd.DataFrame, blacklist: set) -> pd.Series:
+    """True where ``(company, hr_email)`` is not blacklisted (and the email is usable)."""
+    valid = valid_email_mask(df['hr_email'])
+    if not blacklist:
+        return valid
+    # \x1f (unit separator) never appears in a company name or an email
+    keys = _normalized(_column(df, 'company')) + '\x1f' + _normalized(df['hr_email'])
+    blacklisted = keys.isin({f"{company}\x1f{email}" for company, email in blacklist})
+    return valid & ~blacklisted
+
+
+def job_matches_mask(df: pd.DataFrame, target_role: str, job_keywords: list,
+                     applicant_skills: list) -> pd.Series:
+    """Rows whose title matches the target role/keywords and whose skills overlap."""
+    # str(row.get('job_title', '') or row.get('title', '')): fall back on falsy titles
+    job_title = _column(df, 'job_title')
+    job_title = job_title.where(job_title.astype(bool), _column(df, 'title'))
+    job_title = _as_str(job_title).str.strip().str.lower()
+    
+    mask = pd.Series(True, index=df.index)
+    if job_keywords:
+        keyword_re = re.compile('|'.join(map(re.escape, job_keywords)))
+        mask &= job_title.str.contains(keyword_re)
+    if target_role:
+        mask &= job_title.str.contains(target_role, regex=False)
+    
+    if applicant_skills and 'skills' in df.columns:
+        skills = df['skills']
+        # str cells are lower-cased, list cells are joined, anything else counts as no skills
+        job_skills = _str_values(skills)
+        is_list = skills.map(type).eq(list)
+        if is_list.any():
+            job_skills = job_skills.where(~is_list, skills[is_list].str.join(',').str.lower())
+        job_skills = job_skills.fillna('')
+        skills_re = re.compile('|'.join(map(re.escape, applicant_skills)))
+        mask &= job_skills.eq('') | job_skills.str.contains(skills_re)
+    return mask.astype(bool)
+
+
+def substring_pattern(words) -> str:
+    """Regex alternation equivalent to ``any(word in text for word in words)``.
+    
+    Words that contain another word (e.g. 'careers' vs 'career') can never
+    change the answer, so they are dropped to keep the alternation short.
+    """
+    words = set(words)
+    needed = sorted(w for w in words if not any(o != w and o in w for o in words))
+    return '|'.join(map(re.escape, needed))
+
+
 class EmailValidator:
     """Validates email addresses before sending."""
     
@@ -105,7 +218,7 @@ class EmailValidator:
     }
     
     def __init__(self):
-        self.dns_cache = {}  # Cache DNS lookups
+        self.dns = get_dns_cache()  # Shared, persistent MX cache
         
     def is_valid_format(self, email: str) -> bool:
         """Check if email has valid format."""
@@ -131,29 +244,13 @@ class EmailValidator:
         try:
             domain = email.split('@')[1].lower()
             
-            # Check cache first
-            if domain in self.dns_cache:
-                return self.dns_cache[domain]
-            
             # Known valid domains - skip DNS check
             if domain in self.KNOWN_VALID_DOMAINS:
-                self.dns_cache[domain] = True
                 return True
             
-            # Try DNS MX lookup
-            try:
-                mx_records = dns.resolver.resolve(domain, 'MX', lifetime=5)
-                has_mx = len(list(mx_records)) > 0
-                self.dns_cache[domain] = has_mx
-                return has_mx
-            except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, dns.resolver.NoNameservers):
-                # Domain doesn't exist or has no MX records
-                self.dns_cache[domain] = False
-                return False
-            except dns.exception.Timeout:
-                # Timeout - assume valid (don't block on slow DNS)
-                self.dns_cache[domain] = True
-                return True
+            # Domain doesn't exist or has no MX records -> False;
+            # timeouts/errors -> None -> assume valid (don't block on slow DNS)
+            return self.dns.resolve(domain, 'MX').exists is not False
                 
         except Exception as e:
             logging.debug(f"MX check error for {email}: {e}")
@@ -183,44 +280,50 @@ class EmailValidator:
         
         return True, "Valid"
     
+    # HR/recruitment keywords that should be in the local part
+    HR_KEYWORDS = [
+        'career', 'careers', 'hr', 'recruit', 'recruiting', 'recruitment',
+        'hiring', 'jobs', 'job', 'talent', 'people', 'human', 'staffing',
+        'resume', 'resumes', 'apply', 'application', 'applications',
+        'india.recruiting', 'indiatalent', 'indiacareers', 'intalent',
+        'askhr', 'hrcare', 'in_careers'
+    ]
+    
+    # Generic info/support emails (these are NOT HR)
+    NON_HR_PATTERNS = [
+        'info@', 'support@', 'contact@', 'help@', 'service@',
+        'sales@', 'marketing@', 'admin@', 'office@', 'press@',
+        'media@', 'legal@', 'finance@', 'billing@', 'accounts@',
+        'customer@', 'enquir', 'query', 'feedback@', 'complaints@',
+        'ombuds', 'federal@', 'serv', 'gsc@', 'cc@', 'szerviz@',
+        '.luxembourg', 'directo@'
+    ]
+    
+    # Personal email domains (gmail, yahoo, etc.) - only company emails allowed
+    PERSONAL_DOMAINS = {'gmail.com', 'yahoo.com', 'outlook.com', 'hotmail.com', 'rediffmail.com'}
+    
+    # One alternation each, so a check is a single regex scan
+    HR_KEYWORD_RE = re.compile(substring_pattern(HR_KEYWORDS))
+    # Same keywords, but only before the first '@' (the local part) of a whole address
+    HR_LOCAL_PART_RE = re.compile(r'^[^@]*(?:' + substring_pattern(HR_KEYWORDS) + ')')
+    NON_HR_RE = re.compile(substring_pattern(NON_HR_PATTERNS))
+    
     def is_hr_related_email(self, email: str) -> bool:
         """Check if the email is HR/recruitment related."""
         email_lower = email.lower()
         local_part = email_lower.split('@')[0]
         
-        # HR/recruitment keywords that should be in the email
-        hr_keywords = [
-            'career', 'careers', 'hr', 'recruit', 'recruiting', 'recruitment',
-            'hiring', 'jobs', 'job', 'talent', 'people', 'human', 'staffing',
-            'resume', 'resumes', 'apply', 'application', 'applications',
-            'india.recruiting', 'indiatalent', 'indiacareers', 'intalent',
-            'askhr', 'hrcare', 'in_careers'
-        ]
-        
         # Check if local part contains HR keywords
-        for keyword in hr_keywords:
-            if keyword in local_part:
-                return True
-        
-        # Skip generic info/support emails (these are NOT HR)
-        non_hr_patterns = [
-            'info@', 'support@', 'contact@', 'help@', 'service@',
-            'sales@', 'marketing@', 'admin@', 'office@', 'press@',
-            'media@', 'legal@', 'finance@', 'billing@', 'accounts@',
-            'customer@', 'enquir', 'query', 'feedback@', 'complaints@',
-            'ombuds', 'federal@', 'serv', 'gsc@', 'cc@', 'szerviz@',
-            '.luxembourg', 'directo@'
-        ]
+        if self.HR_KEYWORD_RE.search(local_part):
+            return True
         
-        for pattern in non_hr_patterns:
-            if pattern in email_lower:
-                return False
+        # Skip generic info/support emails
+        if self.NON_HR_RE.search(email_lower):
+            return False
         
-        # Block personal email domains (gmail, yahoo, etc.) - only company emails allowed
-        personal_domains = ['gmail.com', 'yahoo.com', 'outlook.com', 'hotmail.com', 'rediffmail.com']
         domain = email.split('@')[1].lower()
         
-        if domain in personal_domains:
+        if domain in self.PERSONAL_DOMAINS:
             # Don't send to personal email addresses - not genuine HR
             return False
         
@@ -229,6 +332,26 @@ class EmailValidator:
             return True
         
         return False
+    
+    def hr_related_mask(self, emails: pd.Series) -> pd.Series:
+        """Vectorized ``is_hr_related_email`` over a Series of email strings.
+        
+        Addresses without an '@' (which make the scalar check raise) are
+        treated as not HR-related.
+        """
+        # Scraped lists repeat one HR address across many jobs - check each address once
+        codes, uniques = pd.factorize(emails.str.lower(), use_na_sentinel=False)
+        lower = pd.Series(uniques, dtype=object)
+        result = lower.str.contains(self.HR_LOCAL_PART_RE, na=False).astype(bool)
+        
+        # Only addresses without an HR keyword get the non-HR check, then the domain check
+        undecided = ~result
+        if undecided.any():
+            undecided[undecided] = ~lower[undecided].str.contains(self.NON_HR_RE, na=False).astype(bool)
+        if undecided.any():
+            domain = lower[undecided].str.extract(r'^[^@]*@([^@]*)', expand=False)
+            result[undecided] = domain.isin(self.KNOWN_VALID_DOMAINS) & ~domain.isin(self.PERSONAL_DOMAINS)
+        return pd.Series(result.to_numpy()[codes], index=emails.index, dtype=bool)
 
 
 class PersonalizedEmailSender:
@@ -290,14 +413,25 @@ class PersonalizedEmailSender:
         # Resume path from config
         self.resume_path = BASE_RESUME_PATH
         
+        # Shared SMTP session pool - one login per campaign instead of one per email
+        self.smtp_pool = get_smtp_pool()
+        
         # Email validator
         self.validator = EmailValidator()
         
+        # Application state (CSV files, or SQLite with STORAGE_BACKEND=sqlite)
+        self.storage = get_storage()
+        
+        # Every "do not send" rule, built once per campaign (O(1) checks per recipient)
+        self.suppression = SuppressionIndex()
+        self.suppression.known_bad.update(self.KNOWN_BAD_EMAILS)
+        
         # Track sent emails
         self.sent_log_path = os.path.join(
             os.path.dirname(__file__), '..', 'data', 'sent_emails_log.csv'
         )
-        self.sent_emails = self._load_sent_log()
+        self.suppression.sent.update(self._load_sent_log())
+        self.sent_emails = self.suppression.sent
         
         # Track invalid emails
         self.invalid_log_path = os.path.join(
@@ -318,16 +452,23 @@ class PersonalizedEmailSender:
         self.bounced_emails_file = os.path.join(
             os.path.dirname(__file__), '..', 'data', 'bounced_emails.csv'
         )
-        self.bounced_emails = self._load_bounced_emails()
+        self._bounced_db_emails = set()  # Emails already present in bounced_emails.csv
+        self.suppression.bounced.update(self._load_bounced_emails())
+        self.bounced_emails = self.suppression.bounced
+        # Picks up bounces other processes append while this campaign runs
+        self._bounced_follower = self.storage.follow('bounced_emails')
         
-        # Load problematic domains from sent log
-        self.problematic_domains = self._analyze_problematic_domains()
+        # Load problematic domains from the incrementally maintained per-domain stats
+        self.domain_stats = DomainBounceStats(storage=self.storage)
+        self.suppression.problematic_domains.update(self._analyze_problematic_domains())
+        self.problematic_domains = self.suppression.problematic_domains
         
         # Load blacklisted companies - companies to never send to
         self.blacklist_file = os.path.join(
             os.path.dirname(__file__), '..', 'data', 'company_blacklist.csv'
         )
-        self.blacklisted_companies = self._load_blacklist()
+        self.suppression.blacklist.update(self._load_blacklist())
+        self.blacklisted_companies = self.suppression.blacklist
 
         # Initialize email verifier if available
         self.verifier = None
@@ -389,11 +530,11 @@ class PersonalizedEmailSender:
         """Load blacklisted companies - never send to these."""
         blacklist = set()
         
-        if not os.path.exists(self.blacklist_file):
+        if not self.storage.exists('company_blacklist'):
             return blacklist
         
         try:
-            df = pd.read_csv(self.blacklist_file)
+            df = self.storage.read_table('company_blacklist')
             if 'company' in df.columns and 'hr_email' in df.columns:
                 for _, row in df.iterrows():
                     company = str(row.get('company', '')).lower().strip()
@@ -411,19 +552,20 @@ class PersonalizedEmailSender:
         bounced = set()
         
         # Load from bounced_emails.csv
-        if os.path.exists(self.bounced_emails_file):
+        if self.storage.exists('bounced_emails'):
             try:
-                df = pd.read_csv(self.bounced_emails_file)
+                df = self.storage.read_table('bounced_emails')
                 if 'email' in df.columns:
                     bounced.update(df['email'].str.lower().dropna().tolist())
+                    self._bounced_db_emails = set(bounced)
                 logging.info(f"📄 Loaded {len(bounced)} bounced emails from database")
             except Exception as e:
                 logging.warning(f"⚠️ Could not load bounced emails: {e}")
         
         # Also check sent_emails_log.csv for bounced status
-        if os.path.exists(self.sent_log_path):
+        if self.storage.exists('sent_emails'):
             try:
-                df = pd.read_csv(self.sent_log_path)
+                df = self.storage.read_table('sent_emails')
                 if 'status' in df.columns and 'recipient_email' in df.columns:
                     # Find emails with bounced or failed status
                     bounce_mask = df['status'].str.lower().str.contains('bounced|undeliverable|failed|rejected', na=False, regex=True)
@@ -435,9 +577,9 @@ class PersonalizedEmailSender:
                 logging.debug(f"Could not check sent log for bounces: {e}")
         
         # Also load from problematic_emails.csv
-        if os.path.exists(self.problematic_log_path):
+        if self.storage.exists('problematic_emails'):
             try:
-                df = pd.read_csv(self.problematic_log_path)
+                df = self.storage.read_table('problematic_emails')
                 if 'email' in df.columns:
                     bounced.update(df['email'].str.lower().dropna().tolist())
             except Exception as e:
@@ -446,41 +588,24 @@ class PersonalizedEmailSender:
         return bounced
     
     def _analyze_problematic_domains(self) -> dict:
-        """Analyze sent log to find domains with high bounce rates."""
+        """Find domains with high bounce rates from the per-domain stats table."""
         problematic = dict(self.PROBLEMATIC_DOMAINS)  # Start with known bad domains
         
-        if not os.path.exists(self.sent_log_path):
-            return problematic
-        
-        try:
-            df = pd.read_csv(self.sent_log_path)
-            if df.empty or 'recipient_email' not in df.columns or 'status' not in df.columns:
-                return problematic
-            
-            # Extract domain from email
-            df['domain'] = df['recipient_email'].str.lower().str.split('@').str[-1]
-            
-            # Count success/failure by domain
-            domain_stats = df.groupby('domain').apply(
-                lambda x: pd.Series({
-                    'total': len(x),
-                    'bounced': x['status'].str.lower().str.contains('bounced|failed|undeliverable|rejected', na=False, regex=True).sum()
-                })
-            ).reset_index()
-            
-            # Domains with >50% bounce rate and at least 2 bounces are problematic
-            for _, row in domain_stats.iterrows():
-                if row['total'] >= 2 and row['bounced'] / row['total'] >= 0.5:
-                    domain = row['domain']
-                    if domain not in problematic:
-                        problematic[domain] = f"High bounce rate ({int(row['bounced'])}/{int(row['total'])} emails bounced)"
-                        logging.info(f"⚠️ Identified problematic domain: {domain}")
-        
-        except Exception as e:
-            logging.debug(f"Could not analyze domains: {e}")
+        for domain, reason in self.domain_stats.problematic_domains().items():
+            if domain not in problematic:
+                problematic[domain] = reason
+                logging.info(f"⚠️ Identified problematic domain: {domain}")
         
         return problematic
     
+    def _refresh_bounced_emails(self):
+        """Add bounces appended to bounced_emails.csv since the last check."""
+        for row in self._bounced_follower.read_new_rows():
+            email = str(row.get('email', '')).lower().strip()
+            if email:
+                self._bounced_db_emails.add(email)
+                self.suppression.add_bounced(email)
+    
     def _add_to_bounced_database(self, email: str, company: str, reason: str):
         """Add an email to the bounced emails database."""
         try:
@@ -493,15 +618,10 @@ class PersonalizedEmailSender:
                 'source': 'email_sender'
             }
             
-            if os.path.exists(self.bounced_emails_file):
-                df = pd.read_csv(self.bounced_emails_file)
-                # Check if already exists
-                if email.lower() not in df['email'].str.lower().values:
-                    df = pd.concat([df, pd.DataFrame([log_entry])], ignore_index=True)
-            else:
-                df = pd.DataFrame([log_entry])
-            
-            df.to_csv(self.bounced_emails_file, index=False)
+            # Append only - skip emails the database already has
+            if email.lower() not in self._bounced_db_emails:
+                self.storage.append_rows('bounced_emails', [log_entry])
+                self._bounced_db_emails.add(email.lower())
             self.bounced_emails.add(email.lower())
             logging.info(f"📝 Added {email} to bounced emails database")
             
@@ -514,16 +634,13 @@ class PersonalizedEmailSender:
         Now tracks by (email + job_title) combination so we can apply
         to NEW job openings at the same company.
         """
-        if os.path.exists(self.sent_log_path):
-            df = pd.read_csv(self.sent_log_path)
-            # Track by email + job_title combination (allows same company for different jobs)
-            sent_combinations = set()
-            for _, row in df.iterrows():
-                email = str(row.get('recipient_email', '')).lower().strip()
-                job = str(row.get('job_title', '')).lower().strip()
-                sent_combinations.add(f"{email}|{job}")
-            return sent_combinations
-        return set()
+        # Track by email + job_title combination (allows same company for different jobs)
+        sent_combinations = set()
+        for row in self.storage.iter_rows('sent_emails'):
+            email = str(row.get('recipient_email') or '').lower().strip()
+            job = str(row.get('job_title') or '').lower().strip()
+            sent_combinations.add(f"{email}|{job}")
+        return sent_combinations
     
     def _save_sent_log(self, recipient_email: str, company: str, job_title: str, status: str):
         """Log sent email with sender identification for multi-user support."""
@@ -536,17 +653,16 @@ class PersonalizedEmailSender:
             'sender_email': self.sender_email  # Track which user sent this email
         }
         
-        if os.path.exists(self.sent_log_path):
-            df = pd.read_csv(self.sent_log_path)
-            new_row = pd.DataFrame([log_entry])
-            if df.empty:
-                df = new_row
-            else:
-                df = pd.concat([df, new_row], ignore_index=True)
-        else:
-            df = pd.DataFrame([log_entry])
+        self.storage.append_rows('sent_emails', [log_entry])
         
-        df.to_csv(self.sent_log_path, index=False)
+        # Keep per-domain counters current; suppress the domain as soon as it crosses the threshold
+        self.domain_stats.record_send(recipient_email, status)
+        if is_bounce_status(status):
+            domain = email_domain(recipient_email)
+            reason = self.domain_stats.verdict(domain)
+            if reason and domain not in self.problematic_domains:
+                self.problematic_domains[domain] = reason
+                logging.info(f"⚠️ Identified problematic domain: {domain}")
         # Track by email + job_title combination
         self.sent_emails.add(f"{recipient_email.lower()}|{job_title.lower().strip()}")
     
@@ -818,35 +934,102 @@ ${name}
             'checked_at': datetime.now().isoformat()
         }
         
-        if os.path.exists(self.invalid_log_path):
-            df = pd.read_csv(self.invalid_log_path)
-            df = pd.concat([df, pd.DataFrame([log_entry])], ignore_index=True)
+        self.storage.append_rows('invalid_emails', [log_entry])
+    
+    def _check_domain_deliverable(self, domain: str) -> Optional[bool]:
+        """Check if domain has valid MX records and is deliverable.
+        
+        Returns None when DNS could not answer (timeout, no nameservers) -
+        only a definite answer (NXDOMAIN, or neither MX nor A records) is False.
+        """
+        dns_cache = get_dns_cache()
+        mx = dns_cache.resolve(domain, 'MX')
+        if mx.ok:
+            return True
+        if mx.exists is None or mx.status == 'nxdomain':
+            return mx.exists
+        # No MX records - try A record as fallback
+        return dns_cache.resolve(domain, 'A').exists
+    
+    def _verify_recipient(self, recipient_email: str, from_excel_list: bool = False) -> dict:
+        """Network checks for one recipient: MX records, SMTP RCPT TO and deliverability score.
+        
+        Thread-safe - it only talks to DNS/SMTP and returns what to log/record,
+        so the prevalidation pipeline can run it ahead of the send loop.
+        Returns {'ok', 'messages': [(level, text)], 'invalid_reason', 'bounce_reason'}.
+        """
+        messages = []
+        
+        def reject(message, invalid_reason, bounce_reason=None):
+            messages.append((logging.WARNING, message))
+            return {'ok': False, 'messages': messages, 'invalid_reason': invalid_reason,
+                    'bounce_reason': bounce_reason}
+        
+        # CHECK 4: Domain deliverability (MX record check)
+        domain = recipient_email.split('@')[-1].lower()
+        deliverable = self._check_domain_deliverable(domain)
+        if deliverable is None:
+            # A failed lookup says nothing about the domain - don't record a bounce for it
+            messages.append((logging.INFO, f"⚠️ DNS lookup failed for {domain} - proceeding with {recipient_email}"))
+        elif not deliverable:
+            return reject(f"⚠️ Skipping {recipient_email} - Domain has no MX records: {domain}",
+                          f"Domain not deliverable: {domain}", f"No MX records for domain {domain}")
+        
+        # CHECK 5: SMTP RCPT TO verification - catches "address not found" BEFORE sending
+        # This runs for ALL emails (including Excel) to prevent bounces
+        if self.verifier:
+            smtp_valid, smtp_msg = self.verifier.smtp_verify(recipient_email, timeout=10)
+            if smtp_valid is False:
+                # Definitively rejected by recipient server (550 = mailbox doesn't exist)
+                return reject(f"🚫 Skipping {recipient_email} - SMTP verification FAILED: {smtp_msg}",
+                              f"SMTP rejected: {smtp_msg}", f"SMTP RCPT TO rejected: {smtp_msg}")
+            elif smtp_valid is True:
+                messages.append((logging.INFO, f"✅ SMTP verified: {recipient_email} mailbox exists"))
+            # smtp_valid is None means inconclusive (server doesn't support VRFY) - proceed anyway
+        
+        # CHECK 6: Enhanced email verification (deliverability score)
+        # SKIP deliverability check for emails from emailslist.xlsx (trusted source)
+        if from_excel_list:
+            messages.append((logging.INFO, f"✅ Bypassing deliverability score check for {recipient_email} (from Excel list)"))
+        elif self.verifier:
+            result = self.verifier.calculate_deliverability_score(recipient_email)
+            if result['score'] < 60:
+                return reject(f"⚠️ Skipping {recipient_email} - Low deliverability score: {result['score']}/100",
+                              result['recommendation'])
+            elif result['score'] < 75:
+                messages.append((logging.INFO, f"⚠️ Warning: {recipient_email} has medium score: {result['score']}/100 - proceeding anyway"))
         else:
-            df = pd.DataFrame([log_entry])
+            # Fallback to basic validation
+            is_valid, reason = self.validator.validate_email(recipient_email)
+            if not is_valid:
+                return reject(f"⚠️ Skipping {recipient_email} - {reason}", reason)
         
-        df.to_csv(self.invalid_log_path, index=False)
+        return {'ok': True, 'messages': messages, 'invalid_reason': None, 'bounce_reason': None}
     
-    def _check_domain_deliverable(self, domain: str) -> bool:
-        """Check if domain has valid MX records and is deliverable."""
-        try:
-            import dns.resolver
-            # Check MX records
-            mx_records = dns.resolver.resolve(domain, 'MX')
-            return len(mx_records) > 0
-        except Exception:
-            # If no MX records, try A record as fallback
-            try:
-                dns.resolver.resolve(domain, 'A')
-                return True
-            except Exception:
-                return False
+    def _prevalidate_batch(self, rows):
+        """Pipeline batch hook: resolve the batch's domains, then SMTP-probe it with one session per MX host.
+        
+        Per-recipient checks in _verify_recipient then hit the DNS and SMTP caches.
+        """
+        emails = [row['hr_email'] for row in rows if not self.suppression.suppression_reason(row['hr_email'])]
+        get_dns_cache().resolve_many(str(email).split('@')[-1] for email in emails)
+        if self.verifier:
+            self.verifier.smtp_verify_batch(emails, timeout=10)
     
-    def send_email(self, recipient_email: str, company: str, job_title: str, job_url: str = None, from_excel_list: bool = False, hr_name: str = None) -> bool:
+    def _prevalidate_row(self, row):
+        """Pipeline worker: verify a queued row unless it is already suppressed."""
+        recipient = row['hr_email']
+        if self.suppression.suppression_reason(recipient):
+            return None  # send_email() skips it before verification matters (or verifies inline)
+        return self._verify_recipient(recipient, from_excel_list=bool(row.get('from_excel_list', False)))
+    
+    def send_email(self, recipient_email: str, company: str, job_title: str, job_url: str = None, from_excel_list: bool = False, hr_name: str = None, verification: dict = None) -> bool:
         """Send a personalized email to a single recipient with comprehensive bounce protection.
         
         Args:
             from_excel_list: If True, skip deliverability score check (trusted Excel source)
             hr_name: Name of HR person for personalized greeting
+            verification: Result of _verify_recipient() computed ahead of time; run inline if None
         """
         
         recipient_lower = recipient_email.lower().strip()
@@ -878,47 +1061,18 @@ ${name}
             self._log_invalid_email(recipient_email, company, f"Problematic domain: {reason}")
             return False
         
-        # CHECK 4: Domain deliverability (MX record check)
-        if not self._check_domain_deliverable(domain):
-            logging.warning(f"⚠️ Skipping {recipient_email} - Domain has no MX records: {domain}")
-            self._log_invalid_email(recipient_email, company, f"Domain not deliverable: {domain}")
-            self._add_to_bounced_database(recipient_email, company, f"No MX records for domain {domain}")
+        # CHECKS 4-6: MX, SMTP RCPT TO and deliverability score - normally already
+        # run by the prevalidation pipeline while the previous send's delay elapsed
+        if verification is None:
+            verification = self._verify_recipient(recipient_email, from_excel_list)
+        for level, message in verification['messages']:
+            logging.log(level, message)
+        if not verification['ok']:
+            self._log_invalid_email(recipient_email, company, verification['invalid_reason'])
+            if verification['bounce_reason']:
+                self._add_to_bounced_database(recipient_email, company, verification['bounce_reason'])
             return False
         
-        # CHECK 5: SMTP RCPT TO verification - catches "address not found" BEFORE sending
-        # This runs for ALL emails (including Excel) to prevent bounces
-        if self.verifier:
-            smtp_valid, smtp_msg = self.verifier.smtp_verify(recipient_email, timeout=10)
-            if smtp_valid is False:
-                # Definitively rejected by recipient server (550 = mailbox doesn't exist)
-                logging.warning(f"🚫 Skipping {recipient_email} - SMTP verification FAILED: {smtp_msg}")
-                self._log_invalid_email(recipient_email, company, f"SMTP rejected: {smtp_msg}")
-                self._add_to_bounced_database(recipient_email, company, f"SMTP RCPT TO rejected: {smtp_msg}")
-                return False
-            elif smtp_valid is True:
-                logging.info(f"✅ SMTP verified: {recipient_email} mailbox exists")
-            # smtp_valid is None means inconclusive (server doesn't support VRFY) - proceed anyway
-        
-        # CHECK 6: Enhanced email verification (deliverability score)
-        # SKIP deliverability check for emails from emailslist.xlsx (trusted source)
-        if from_excel_list:
-            logging.info(f"✅ Bypassing deliverability score check for {recipient_email} (from Excel list)")
-        elif self.verifier:
-            result = self.verifier.calculate_deliverability_score(recipient_email)
-            if result['score'] < 60:
-                logging.warning(f"⚠️ Skipping {recipient_email} - Low deliverability score: {result['score']}/100")
-                self._log_invalid_email(recipient_email, company, result['recommendation'])
-                return False
-            elif result['score'] < 75:
-                logging.info(f"⚠️ Warning: {recipient_email} has medium score: {result['score']}/100 - proceeding anyway")
-        else:
-            # Fallback to basic validation
-            is_valid, reason = self.validator.validate_email(recipient_email)
-            if not is_valid:
-                logging.warning(f"⚠️ Skipping {recipient_email} - {reason}")
-                self._log_invalid_email(recipient_email, company, reason)
-                return False
-        
         # Validate SMTP configuration
         if not self.sender_email or not self.sender_password:
             logging.error("❌ SENDER_EMAIL and SENDER_PASSWORD environment variables must be set!")
@@ -931,13 +1085,11 @@ ${name}
             body = self.generate_email_body(job_title, company, job_url, recipient_email, hr_name=hr_name)
             message = self.create_email_message(recipient_email, subject, body)
             
-            # Connect and send
-            context = ssl.create_default_context()
-            
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls(context=context)
-                server.login(self.sender_email, self.sender_password)
-                server.sendmail(self.sender_email, recipient_email, message.as_string())
+            # Send over the pooled (already authenticated) session
+            self.smtp_pool.sendmail(
+                self.smtp_server, self.smtp_port, self.sender_email, self.sender_password,
+                self.sender_email, recipient_email, message.as_string()
+            )
             
             logging.info(f"✅ Email sent successfully to {recipient_email} ({company})")
             self._save_sent_log(recipient_email, company, job_title, 'sent')
@@ -981,37 +1133,24 @@ ${name}
             return {'sent': 0, 'failed': 0, 'skipped': 0}
 
         # Filter out already sent - now tracks by (email + job_title) combination
-        def is_already_sent(row):
-            email = str(row.get('hr_email', '')).lower().strip() if pd.notna(row.get('hr_email', '')) else ''
-            job = str(row.get('job_title', '')).lower().strip()
-            return f"{email}|{job}" in self.sent_emails
-
-        already_sent_mask = emails_df.apply(is_already_sent, axis=1)
-        new_jobs_count = (~already_sent_mask).sum()
-        logging.info(f"📬 Found {new_jobs_count} NEW job applications (filtered {already_sent_mask.sum()} already-sent)")
-        emails_df = emails_df[~already_sent_mask]
-        emails_df = emails_df[emails_df['hr_email'].apply(lambda x: isinstance(x, str) and pd.notna(x) and x.strip() != '')]
+        sent_mask = already_sent_mask(emails_df, self.sent_emails)
+        new_jobs_count = (~sent_mask).sum()
+        logging.info(f"📬 Found {new_jobs_count} NEW job applications (filtered {sent_mask.sum()} already-sent)")
+        emails_df = emails_df[~sent_mask]
+        emails_df = emails_df[valid_email_mask(emails_df['hr_email'])]
 
         excel_emails_df = emails_df[emails_df.get('from_excel_list', False) == True].copy() if 'from_excel_list' in emails_df.columns else pd.DataFrame()
         non_excel_emails_df = emails_df[emails_df.get('from_excel_list', False) != True].copy() if 'from_excel_list' in emails_df.columns else emails_df.copy()
 
         if not non_excel_emails_df.empty:
-            hr_mask = non_excel_emails_df['hr_email'].apply(self.validator.is_hr_related_email)
+            hr_mask = self.validator.hr_related_mask(non_excel_emails_df['hr_email'])
             non_hr_count = len(non_excel_emails_df) - hr_mask.sum()
             if non_hr_count > 0:
                 logging.info(f"🚫 Filtered out {non_hr_count} non-HR emails from curated list (info@, support@, cc@, etc.)")
             non_excel_emails_df = non_excel_emails_df[hr_mask]
 
         if not non_excel_emails_df.empty:
-            blacklist_mask = non_excel_emails_df.apply(
-                lambda row: (
-                    (str(row.get('company', '')).lower().strip(), str(row.get('hr_email', '')).lower().strip())
-                    not in self.blacklisted_companies
-                    if isinstance(row.get('hr_email', ''), str) and row.get('hr_email', '').strip() != ''
-                    else False
-                ),
-                axis=1
-            )
+            blacklist_mask = not_blacklisted_mask(non_excel_emails_df, self.blacklisted_companies)
             blacklisted_count = len(non_excel_emails_df) - blacklist_mask.sum()
             if blacklisted_count > 0:
                 logging.info(f"🚫 Filtered out {blacklisted_count} blacklisted companies from curated list")
@@ -1029,14 +1168,28 @@ ${name}
 
         stats = {'sent': 0, 'failed': 0, 'skipped': 0}
 
-        for idx, row in emails_to_send.iterrows():
-            # Reload bounced_emails before each send to ensure latest bounces are checked
-            self.bounced_emails = self._load_bounced_emails()
+        # Verify the next few recipients in the background while we wait between sends;
+        # each new batch is resolved and SMTP-probed by MX host first
+        rows = [row for _, row in emails_to_send.iterrows()]
+        pipeline = PrevalidationPipeline(
+            rows, self._prevalidate_row,
+            key=lambda row: (row['hr_email'], bool(row.get('from_excel_list', False))),
+            prepare=self._prevalidate_batch
+        )
+
+        for idx, row in enumerate(rows):
+            # Check for bounces recorded since the last send (reads only the new rows)
+            self._refresh_bounced_emails()
 
             if SHUTDOWN_REQUESTED:
                 logging.info("🛑 Shutdown requested - stopping email campaign gracefully")
                 break
 
+            # A rejected login will fail every remaining row - stop the campaign instead
+            if self.smtp_pool.is_auth_failed(self.smtp_server, self.smtp_port, self.sender_email):
+                logging.error("🛑 SMTP authentication failed - stopping email campaign")
+                break
+
             recipient = row['hr_email']
             company = row.get('company', 'Your Company')
             job_title = row.get('job_title', 'Open Position')
@@ -1047,7 +1200,8 @@ ${name}
             name_info = f" ({hr_name})" if hr_name and str(hr_name).strip() and str(hr_name).lower() not in ['nan', 'none'] else ""
             logging.info(f"📤 Sending email {stats['sent'] + stats['failed'] + 1}/{len(emails_to_send)} to {recipient}{name_info}")
 
-            success = self.send_email(recipient, company, job_title, job_url, from_excel_list=from_excel_list, hr_name=hr_name)
+            success = self.send_email(recipient, company, job_title, job_url, from_excel_list=from_excel_list,
+                                      hr_name=hr_name, verification=pipeline.result(idx))
 
             if success:
                 stats['sent'] += 1
@@ -1065,6 +1219,11 @@ ${name}
                         break
                     time.sleep(1)
 
+        pipeline.close()
+        self.smtp_pool.close(self.smtp_server, self.smtp_port, self.sender_email)
+        self.storage.flush()
+        self.domain_stats.save()
+
         logging.info(f"\n📊 Email Campaign Summary:")
         logging.info(f"   ✅ Sent: {stats['sent']}")
         logging.info(f"   ❌ Failed: {stats['failed']}")
@@ -1227,10 +1386,12 @@ def main():
             except Exception as e:
                 logging.warning(f"⚠️ Could not load emails from emailslist.xlsx: {e}")
 
+        # Sources 2-4 are storage tables (CSV files, or SQLite with STORAGE_BACKEND=sqlite)
+        storage = get_storage()
+
         # Source 2: Curated HR database (most reliable)
-        curated_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'curated_hr_emails.csv')
-        if os.path.exists(curated_path):
-            curated_df = pd.read_csv(curated_path)
+        curated_df = storage.read_table('curated_hr_emails')
+        if not curated_df.empty:
             # Rename 'email' to 'hr_email' for compatibility
             if 'email' in curated_df.columns:
                 curated_df = curated_df.rename(columns={'email': 'hr_email'})
@@ -1242,17 +1403,16 @@ def main():
             logging.info(f"📋 Loaded {len(curated_df)} curated HR emails")
 
         # Source 3: Scraped emails
-        scraped_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'all_hr_emails.csv')
-        if os.path.exists(scraped_path):
-            scraped_df = pd.read_csv(scraped_path)
+        scraped_df = storage.read_table('all_hr_emails')
+        if not scraped_df.empty:
             if 'hr_email' in scraped_df.columns:
+                scraped_df = scraped_df.dropna(subset=['hr_email'])
                 emails_df = pd.concat([emails_df, scraped_df], ignore_index=True)
                 logging.info(f"🔍 Loaded {len(scraped_df)} scraped HR emails")
 
         # Source 4: Growing HR database from advanced discovery
-        discovered_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'discovered_hr_emails.csv')
-        if os.path.exists(discovered_path):
-            discovered_df = pd.read_csv(discovered_path)
+        discovered_df = storage.read_table('discovered_hr_emails')
+        if not discovered_df.empty:
             if 'email' in discovered_df.columns:
                 discovered_df = discovered_df.rename(columns={'email': 'hr_email'})
             # Use JOB_KEYWORDS for job title
@@ -1356,24 +1516,6 @@ def main():
     job_keywords = [kw.strip().lower() for kw in os.getenv('JOB_KEYWORDS', '').split(',') if kw.strip()]
     applicant_skills = [sk.strip().lower() for sk in os.getenv('APPLICANT_SKILLS', '').split(',') if sk.strip()]
 
-    def job_matches(row):
-        # Check job title against target role and keywords
-        job_title = str(row.get('job_title', '') or row.get('title', '')).strip().lower()
-        # Check for any keyword match in job title
-        keyword_match = any(kw in job_title for kw in job_keywords) if job_keywords else True
-        # Check for target role match
-        role_match = target_role in job_title if target_role else True
-        # Check for skills match (if skills column exists)
-        skills_col = row.get('skills', '')
-        if isinstance(skills_col, str):
-            job_skills = skills_col.lower()
-        elif isinstance(skills_col, list):
-            job_skills = ','.join(skills_col).lower()
-        else:
-            job_skills = ''
-        skills_match = any(sk in job_skills for sk in applicant_skills) if applicant_skills and job_skills else True
-        return keyword_match and role_match and skills_match
-
     # Apply filtering if any criteria are set
     # BUT: Excel emails (from_excel_list=True) ALWAYS bypass filtering
     if target_role or job_keywords or applicant_skills:
@@ -1384,7 +1526,9 @@ def main():
         
         # Only filter non-Excel emails
         if not non_excel_emails.empty:
-            filtered_non_excel = non_excel_emails[non_excel_emails.apply(job_matches, axis=1)]
+            filtered_non_excel = non_excel_emails[
+                job_matches_mask(non_excel_emails, target_role, job_keywords, applicant_skills)
+            ]
         else:
             filtered_non_excel = pd.DataFrame()
         
@@ -2,9 +2,9 @@
 Email Verifier - Validates email addresses before sending using multiple methods
 """
 
+import uuid
 import socket
 import smtplib
-import dns.resolver
 import re
 import os
 import sys
@@ -16,6 +16,9 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from utils.dns_cache import get_dns_cache
+from utils.verification_cache import get_verification_cache
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 
@@ -82,9 +85,16 @@ class EmailVerifier:
         'careers@apple.com': 'Apple uses ATS only',
     }
     
+    # RCPT TO commands per probe transaction before an RSET (servers must accept >= 100)
+    SMTP_MAX_RCPT_PER_TRANSACTION = 50
+    # MX hosts verified in parallel by smtp_verify_batch
+    SMTP_VERIFY_WORKERS = int(os.getenv('SMTP_VERIFY_WORKERS', '4'))
+    
     def __init__(self):
-        self.mx_cache = {}  # Cache MX lookups
+        self.dns = get_dns_cache()  # Shared, persistent MX cache
+        self.cache = get_verification_cache()  # Verdicts persisted across runs
         self.smtp_cache = {}  # Cache SMTP verification results
+        self.catch_all_cache = {}  # domain -> True/False/None (accepts any local part?)
         self.data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
         self.verification_log_path = os.path.join(self.data_dir, 'email_verification_log.csv')
         
@@ -160,28 +170,18 @@ class EmailVerifier:
         try:
             domain = email.split('@')[1].lower()
             
-            # Check cache
-            if domain in self.mx_cache:
-                return self.mx_cache[domain]
-            
-            # Try MX lookup
-            try:
-                mx_records = dns.resolver.resolve(domain, 'MX', lifetime=5)
-                mx_hosts = [str(r.exchange) for r in mx_records]
-                self.mx_cache[domain] = (True, f"MX records found: {mx_hosts[0]}")
-                return True, f"MX records found"
-            except dns.resolver.NXDOMAIN:
-                self.mx_cache[domain] = (False, "Domain does not exist")
+            answer = self.dns.resolve(domain, 'MX')
+            if answer.status == 'ok':
+                return True, "MX records found"
+            if answer.status == 'nxdomain':
                 return False, "Domain does not exist"
-            except dns.resolver.NoAnswer:
-                self.mx_cache[domain] = (False, "No MX records")
+            if answer.status == 'noanswer':
                 return False, "No MX records"
-            except dns.resolver.NoNameservers:
-                self.mx_cache[domain] = (False, "No nameservers")
+            if answer.status == 'nonameservers':
                 return False, "No nameservers"
-            except dns.exception.Timeout:
-                self.mx_cache[domain] = (True, "DNS timeout (assumed valid)")
+            if answer.status == 'timeout':
                 return True, "DNS timeout (assumed valid)"
+            return True, f"MX check error: {answer.error}"
                 
         except Exception as e:
             return True, f"MX check error: {e}"
@@ -192,56 +192,198 @@ class EmailVerifier:
         Note: Many servers don't allow this or give false positives.
         """
         try:
-            domain = email.split('@')[1].lower()
-            
             # Check cache
             cache_key = email.lower()
-            if cache_key in self.smtp_cache:
-                return self.smtp_cache[cache_key]
-            
-            # Get MX record
-            try:
-                mx_records = dns.resolver.resolve(domain, 'MX', lifetime=5)
-                mx_host = str(mx_records[0].exchange).rstrip('.')
-            except:
-                return None, "Could not get MX record for SMTP check"
+            cached = self._cached_smtp(cache_key)
+            if cached is not None:
+                return cached
             
-            # Try SMTP verification
-            try:
-                smtp = smtplib.SMTP(timeout=timeout)
-                smtp.connect(mx_host)
-                smtp.helo('verify.local')
+            return self.smtp_verify_batch([email], timeout=timeout)[cache_key]
+                
+        except Exception as e:
+            return None, f"Verification error: {e}"
+    
+    def _cached_smtp(self, key: str):
+        """SMTP verdict from this run, else from the persistent cache if still fresh."""
+        if key in self.smtp_cache:
+            return self.smtp_cache[key]
+        verdict = self.cache.get_smtp(key)
+        if verdict is not None:
+            self.smtp_cache[key] = verdict
+        return verdict
+    
+    def _is_catch_all(self, domain: str):
+        """(known, catch_all) from this run or the persistent cache."""
+        if domain in self.catch_all_cache:
+            return True, self.catch_all_cache[domain]
+        known, catch_all = self.cache.get_catch_all(domain)
+        if known:
+            self.catch_all_cache[domain] = catch_all
+        return known, catch_all
+    
+    @staticmethod
+    def _rcpt_verdict(code: int) -> tuple:
+        if code == 250:
+            return True, "SMTP verified - mailbox exists"
+        if code == 550:
+            return False, "Mailbox does not exist"
+        return None, f"SMTP response: {code}"
+    
+    @staticmethod
+    def _smtp_error_verdict(e: Exception) -> tuple:
+        if isinstance(e, smtplib.SMTPServerDisconnected):
+            return None, "Server disconnected"
+        if isinstance(e, smtplib.SMTPConnectError):
+            return None, "Could not connect to mail server"
+        if isinstance(e, socket.timeout):
+            return None, "Connection timeout"
+        return None, f"SMTP error: {str(e)[:50]}"
+    
+    def _verify_on_mx_host(self, mx_host: str, by_domain: dict, timeout: int) -> dict:
+        """RCPT TO every address of every domain served by ``mx_host`` over one session.
+        
+        The first RCPT for a domain not seen before is a random local part: if
+        the server accepts that too, the domain is catch-all and a 250 for a
+        real address proves nothing.
+        """
+        results = {}
+        pending = [(domain, key, email) for domain, emails in by_domain.items() for key, email in emails.items()]
+        
+        try:
+            smtp = smtplib.SMTP(timeout=timeout)
+            smtp.connect(mx_host)
+            smtp.helo('verify.local')
+            smtp.mail('test@verify.local')
+        except Exception as e:
+            verdict = self._smtp_error_verdict(e)
+            return {key: verdict for _, key, _ in pending}
+        
+        rcpt_count = 0
+        
+        def rcpt(address):
+            nonlocal rcpt_count
+            # Keep transactions short - servers may cap recipients per message
+            if rcpt_count >= self.SMTP_MAX_RCPT_PER_TRANSACTION:
+                smtp.rset()
+                smtp.mail('test@verify.local')
+                rcpt_count = 0
+            code, _ = smtp.rcpt(address)
+            rcpt_count += 1
+            if code == 503:
+                # Bad sequence (server dropped the transaction) - RSET and retry once
+                smtp.rset()
                 smtp.mail('test@verify.local')
-                code, message = smtp.rcpt(email)
-                smtp.quit()
+                code, _ = smtp.rcpt(address)
+                rcpt_count = 1
+            return code
+        
+        try:
+            for domain, key, email in pending:
+                if not self._is_catch_all(domain)[0]:
+                    probe_code = rcpt(f"{uuid.uuid4().hex[:16]}@{domain}")
+                    self.catch_all_cache[domain] = (
+                        True if probe_code == 250 else False if probe_code == 550 else None
+                    )
+                    self.cache.put_catch_all(domain, self.catch_all_cache[domain])
+                    if self.catch_all_cache[domain]:
+                        logging.debug(f"{domain} accepts any address (catch-all)")
                 
-                if code == 250:
-                    self.smtp_cache[cache_key] = (True, "SMTP verified - mailbox exists")
-                    return True, "SMTP verified - mailbox exists"
-                elif code == 550:
-                    self.smtp_cache[cache_key] = (False, "Mailbox does not exist")
-                    return False, "Mailbox does not exist"
+                code = rcpt(email)
+                if code == 250 and self.catch_all_cache.get(domain):
+                    verdict = (None, "Catch-all domain - mailbox cannot be verified")
                 else:
-                    self.smtp_cache[cache_key] = (None, f"SMTP response: {code}")
-                    return None, f"SMTP response: {code}"
-                    
-            except smtplib.SMTPServerDisconnected:
-                return None, "Server disconnected"
-            except smtplib.SMTPConnectError:
-                return None, "Could not connect to mail server"
-            except socket.timeout:
-                return None, "Connection timeout"
-            except Exception as e:
-                return None, f"SMTP error: {str(e)[:50]}"
-                
+                    verdict = self._rcpt_verdict(code)
+                self.smtp_cache[key] = verdict
+                self.cache.put_smtp(key, verdict)
+                results[key] = verdict
+                if code == 421:
+                    break  # Server is closing the channel
+            smtp.quit()
         except Exception as e:
-            return None, f"Verification error: {e}"
+            verdict = self._smtp_error_verdict(e)
+            for _, key, _ in pending:
+                results.setdefault(key, verdict)
+            try:
+                smtp.close()
+            except Exception:
+                pass
+        
+        for _, key, _ in pending:
+            results.setdefault(key, (None, "Server closed connection"))
+        return results
+    
+    def smtp_verify_batch(self, emails: list, timeout: int = 10, max_workers: int = None) -> dict:
+        """SMTP-verify many addresses with one connection per MX host.
+        
+        Addresses are grouped by their domain's most-preferred MX, so every
+        guess for one company (hr@, careers@, talent@...) shares a session and
+        the catch-all probe runs once per domain. Hosts are verified in parallel.
+        Returns {email.lower(): (valid, message)} like smtp_verify().
+        """
+        results = {}
+        by_host = {}
+        
+        for email in emails:
+            key = str(email).strip().lower()
+            if key in results:
+                continue
+            cached = self._cached_smtp(key)
+            if cached is not None:
+                results[key] = cached
+                continue
+            domain = key.rpartition('@')[2] if '@' in key else ''
+            if not domain:
+                results[key] = (None, "Verification error: no domain")
+                continue
+            mx_hosts = self.dns.mx_hosts(domain)
+            if not mx_hosts:
+                results[key] = (None, "Could not get MX record for SMTP check")
+                continue
+            by_host.setdefault(mx_hosts[0], {}).setdefault(domain, {}).setdefault(key, str(email).strip())
+        
+        if not by_host:
+            return results
+        
+        workers = max(1, min(max_workers or self.SMTP_VERIFY_WORKERS, len(by_host)))
+        if workers == 1:
+            for mx_host, by_domain in by_host.items():
+                results.update(self._verify_on_mx_host(mx_host, by_domain, timeout))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(self._verify_on_mx_host, mx_host, by_domain, timeout)
+                           for mx_host, by_domain in by_host.items()]
+                for future in as_completed(futures):
+                    results.update(future.result())
+        
+        checked = sum(len(emails) for by_domain in by_host.values() for emails in by_domain.values())
+        if checked > 1:
+            logging.info(f"📮 SMTP-verified {checked} addresses over {len(by_host)} MX connection(s)")
+        return results
+    
+    def _reaches_smtp_check(self, email: str) -> bool:
+        """True if calculate_deliverability_score() would get as far as the SMTP probe."""
+        return (self.validate_syntax(email)[0]
+                and self.check_known_status(email)[0] is not False
+                and self.is_hr_related(email)[0] is not False)
     
     def calculate_deliverability_score(self, email: str) -> dict:
         """
         Calculate a deliverability score (0-100) for an email.
         Returns dict with score and details.
+        A still-fresh verdict from an earlier run is returned without any network checks.
         """
+        if isinstance(email, str):
+            cached = self.cache.get_result(email)
+            if cached is not None:
+                return cached
+        
+        result = self._score_email(email)
+        if isinstance(email, str):
+            self.cache.put_result(email, result)
+        return result
+    
+    def _score_email(self, email: str) -> dict:
+        """Run the checks behind calculate_deliverability_score()."""
         result = {
             'email': email,
             'score': 0,
@@ -325,6 +467,15 @@ class EmailVerifier:
         
         logging.info(f"🔍 Verifying {len(emails)} emails...")
         
+        # Addresses verified recently enough need no network checks at all
+        fresh = [e for e in emails if not (isinstance(e, str) and self.cache.get_result(e) is not None)]
+        if len(fresh) < len(emails):
+            logging.info(f"♻️ {len(emails) - len(fresh)} verdicts reused from the verification cache")
+        
+        # One SMTP session per MX host up front for every address that will reach
+        # the SMTP step; the per-email scores below then hit the cache
+        self.smtp_verify_batch([e for e in fresh if self._reaches_smtp_check(e)], timeout=5)
+        
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             future_to_email = {
                 executor.submit(self.calculate_deliverability_score, email): email 
@@ -350,6 +501,8 @@ class EmailVerifier:
         
         df = pd.DataFrame(results)
         
+        self.cache.save()
+        
         # Save verification log
         df['verified_at'] = datetime.now().isoformat()
         if os.path.exists(self.verification_log_path):
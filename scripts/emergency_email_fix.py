@@ -164,10 +164,17 @@ def create_hr_email_finder():
 Smart HR Email Finder - Finds specific HR professional emails
 """
 
-import requests
+import os
 import re
+import sys
+import requests
 from typing import List
 
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.dns_cache import get_dns_cache
+
 def find_hr_emails(company_name: str) -> List[str]:
     """Find HR-specific emails for a company."""
     
@@ -193,14 +200,9 @@ def verify_email_deliverability(email: str) -> bool:
     if any(pattern in email.lower() for pattern in bad_patterns):
         return False
     
-    # Check domain exists
+    # Check domain exists (shared, persistent MX cache)
     domain = email.split('@')[-1]
-    try:
-        import dns.resolver
-        dns.resolver.resolve(domain, 'MX')
-        return True
-    except:
-        return False
+    return get_dns_cache().resolve(domain, 'MX').ok
 
 if __name__ == "__main__":
     # Test with sample companies
@@ -3,12 +3,10 @@ Enhanced Job Scraper - Adds more job sources including AngelList, Instahyre, and
 Uses multiple APIs and scraping techniques for comprehensive job coverage
 """
 
-import requests
 import pandas as pd
 import os
 import sys
 import logging
-import time
 import json
 import re
 from datetime import datetime, timedelta
@@ -18,6 +16,13 @@ from urllib.parse import quote, urljoin
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from utils.html_parse import find_cards
+from utils.http_engine import FetchRequest, get_fetch_engine
+from utils.job_dedup import dedupe_jobs
+from utils.seen_jobs import get_seen_jobs
+from utils.source_fanout import emit, fan_out, log_result
+from utils.source_health import get_source_health
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 
 
@@ -40,8 +45,21 @@ class EnhancedJobScraper:
             'Accept-Language': 'en-US,en;q=0.9',
         }
         
+        # Shared fetch engine: per-host rate limits and retries instead of sleeps
+        self.engine = get_fetch_engine()
+        # Sources that keep failing are skipped until their circuit lets them be probed again
+        self.health = get_source_health()
+        self.seen_jobs = get_seen_jobs()
+        
         self.all_jobs = []
     
+    @staticmethod
+    def _add_job(jobs: list, job: dict):
+        """Keep a job in the scrape's own list and report it to fan_out right away,
+        so a source that hits its deadline still contributes what it found."""
+        jobs.append(job)
+        emit(job)
+    
     def scrape_wellfound_api(self) -> list:
         """
         Scrape from Wellfound (formerly AngelList Talent) API.
@@ -54,45 +72,41 @@ class EnhancedJobScraper:
         base_url = "https://wellfound.com/api/v1/jobs/search"
         
         try:
-            for keyword in self.keywords[:2]:  # Limit queries
-                params = {
+            batch = [
+                FetchRequest(base_url, params={
                     'query': keyword,
                     'location': 'india',
                     'remote': 'true',
                     'page': 1,
                     'per_page': 50
-                }
-                
-                response = requests.get(
-                    base_url,
-                    params=params,
-                    headers=self.headers,
-                    timeout=15
-                )
-                
-                if response.status_code == 200:
-                    try:
-                        data = response.json()
-                        listings = data.get('jobs', data.get('results', []))
-                        
-                        for job in listings:
-                            parsed = {
-                                'title': job.get('title', ''),
-                                'company': job.get('company', {}).get('name', job.get('company_name', '')),
-                                'location': job.get('location', 'Remote'),
-                                'url': job.get('url', f"https://wellfound.com/jobs/{job.get('id', '')}"),
-                                'source': 'Wellfound',
-                                'scraped_at': datetime.now().isoformat(),
-                                'remote': job.get('remote', True),
-                                'salary': job.get('salary', '')
-                            }
+                }, headers=self.headers, timeout=15)
+                for keyword in self.keywords[:2]  # Limit queries
+            ]
+            
+            for result in self.engine.fetch_all(batch):
+                if not result.ok:
+                    continue
+                response = result.response
+                try:
+                    data = response.json()
+                    listings = data.get('jobs', data.get('results', []))
+                    
+                    for job in listings:
+                        parsed = {
+                            'title': job.get('title', ''),
+                            'company': job.get('company', {}).get('name', job.get('company_name', '')),
+                            'location': job.get('location', 'Remote'),
+                            'url': job.get('url', f"https://wellfound.com/jobs/{job.get('id', '')}"),
+                            'source': 'Wellfound',
+                            'scraped_at': datetime.now().isoformat(),
+                            'remote': job.get('remote', True),
+                            'salary': job.get('salary', '')
+                        }
                             
-                            if parsed['title'] and parsed['company']:
-                                jobs.append(parsed)
-                    except json.JSONDecodeError:
-                        pass
-                
-                time.sleep(1)  # Rate limiting
+                        if parsed['title'] and parsed['company']:
+                            self._add_job(jobs, parsed)
+                except json.JSONDecodeError:
+                    pass
                 
         except Exception as e:
             logging.warning(f"Wellfound API error: {e}")
@@ -118,7 +132,7 @@ class EnhancedJobScraper:
                 'page_size': 50
             }
             
-            response = requests.get(
+            response = self.engine.get(
                 base_url,
                 params=params,
                 headers=self.headers,
@@ -143,7 +157,7 @@ class EnhancedJobScraper:
                         }
                         
                         if parsed['title'] and parsed['company']:
-                            jobs.append(parsed)
+                            self._add_job(jobs, parsed)
                 except json.JSONDecodeError:
                     pass
                 
@@ -169,7 +183,7 @@ class EnhancedJobScraper:
                 'experience': {'min': 0, 'max': 5}
             }
             
-            response = requests.post(
+            response = self.engine.post(
                 base_url,
                 json=payload,
                 headers={**self.headers, 'Content-Type': 'application/json'},
@@ -194,7 +208,7 @@ class EnhancedJobScraper:
                         }
                         
                         if parsed['title'] and parsed['company']:
-                            jobs.append(parsed)
+                            self._add_job(jobs, parsed)
                 except json.JSONDecodeError:
                     pass
                     
@@ -223,7 +237,7 @@ class EnhancedJobScraper:
                 'start': 0
             }
             
-            response = requests.get(
+            response = self.engine.get(
                 rss_url,
                 params=params,
                 headers=self.headers,
@@ -231,9 +245,7 @@ class EnhancedJobScraper:
             )
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                for card in soup.find_all('div', class_='base-card'):
+                for card in find_cards(response.text, 'div', {'class': 'base-card'}):
                     try:
                         title_elem = card.find('h3', class_='base-search-card__title')
                         company_elem = card.find('h4', class_='base-search-card__subtitle')
@@ -252,7 +264,7 @@ class EnhancedJobScraper:
                         }
                         
                         if parsed['title'] and parsed['company']:
-                            jobs.append(parsed)
+                            self._add_job(jobs, parsed)
                     except Exception:
                         continue
                         
@@ -280,7 +292,7 @@ class EnhancedJobScraper:
                 'jobType': 'all',
             }
             
-            response = requests.get(
+            response = self.engine.get(
                 base_url,
                 params=params,
                 headers=self.headers,
@@ -288,10 +300,8 @@ class EnhancedJobScraper:
             )
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Try to find job cards
-                for card in soup.find_all(['li', 'div'], class_=re.compile(r'job.*card|react-job')):
+                # Try to find job cards (only they are parsed)
+                for card in find_cards(response.text, ['li', 'div'], {'class': re.compile(r'job.*card|react-job')}):
                     try:
                         title_elem = card.find(['a', 'span'], class_=re.compile(r'job.*title'))
                         company_elem = card.find(['a', 'span'], class_=re.compile(r'employer'))
@@ -311,7 +321,7 @@ class EnhancedJobScraper:
                                 'remote': False,
                                 'salary': ''
                             }
-                            jobs.append(parsed)
+                            self._add_job(jobs, parsed)
                     except Exception:
                         continue
                         
@@ -337,7 +347,7 @@ class EnhancedJobScraper:
                 'sort': 'date'
             }
             
-            response = requests.get(
+            response = self.engine.get(
                 rss_url,
                 params=params,
                 headers=self.headers,
@@ -370,7 +380,7 @@ class EnhancedJobScraper:
                         }
                         
                         if parsed['title']:
-                            jobs.append(parsed)
+                            self._add_job(jobs, parsed)
                     except Exception:
                         continue
                         
@@ -398,7 +408,7 @@ class EnhancedJobScraper:
                 'limit': 50
             }
             
-            response = requests.post(
+            response = self.engine.post(
                 api_url,
                 json=payload,
                 headers={**self.headers, 'Content-Type': 'application/json'},
@@ -423,7 +433,7 @@ class EnhancedJobScraper:
                         }
                         
                         if parsed['title'] and parsed['company']:
-                            jobs.append(parsed)
+                            self._add_job(jobs, parsed)
                 except json.JSONDecodeError:
                     pass
                     
@@ -452,13 +462,14 @@ class EnhancedJobScraper:
             self.scrape_foundit,
         ]
         
-        for scraper in scrapers:
-            try:
-                jobs = scraper()
-                all_jobs.extend(jobs)
-            except Exception as e:
-                logging.warning(f"Scraper error: {e}")
-            time.sleep(2)  # Be polite between scrapers
+        # Every source is a different host, so they run side by side; the
+        # fetch engine keeps each host within its own rate limit
+        sources = [(scraper.__name__, scraper) for scraper in scrapers]
+        for result in fan_out(self.health.admit(sources)):
+            log_result(result)
+            self.health.record(result, new_jobs=self.seen_jobs.record(result.items))
+            all_jobs.extend(result.items)
+        self.health.log_summary([name for name, _ in sources])
         
         # Create DataFrame
         df = pd.DataFrame(all_jobs)
@@ -470,8 +481,9 @@ class EnhancedJobScraper:
             df = df[df['title'] != '']
             df = df[df['company'] != '']
             
-            # Remove duplicates
+            # Remove duplicates, then the same posting listed by several sources
             df = df.drop_duplicates(subset=['title', 'company'], keep='first')
+            df = dedupe_jobs(df)
             
             # Save
             df.to_csv(self.output_path, index=False)
@@ -509,6 +521,7 @@ class EnhancedJobScraper:
             else:
                 merged = pd.concat([existing_df, enhanced_df], ignore_index=True)
             merged = merged.drop_duplicates(subset=['title', 'company'], keep='first')
+            merged = dedupe_jobs(merged)
             
             # Save back
             merged.to_csv(existing_path, index=False)
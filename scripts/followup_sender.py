@@ -6,8 +6,6 @@ Stage 3: Day 14 - Final follow-up with urgency
 Increases response rate by 40-60%
 """
 
-import smtplib
-import ssl
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
@@ -25,6 +23,8 @@ from string import Template
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.config import USER_DETAILS, BASE_RESUME_PATH
+from utils.smtp_pool import get_smtp_pool
+from utils.storage import get_storage
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
@@ -66,6 +66,12 @@ class SmartFollowUpSender:
         self.applicant_phone = os.getenv('APPLICANT_PHONE', USER_DETAILS.get('phone', ''))
         self.applicant_linkedin = USER_DETAILS.get('linkedin_url', '')
         
+        # Shared SMTP session pool (same one email_sender.py uses)
+        self.smtp_pool = get_smtp_pool()
+        
+        # Sent/follow-up logs (CSV files, or SQLite with STORAGE_BACKEND=sqlite)
+        self.storage = get_storage()
+        
         # Paths
         self.sent_log_path = os.path.join(
             os.path.dirname(__file__), '..', 'data', 'sent_emails_log.csv'
@@ -90,8 +96,8 @@ class SmartFollowUpSender:
         
     def _load_followup_log(self) -> pd.DataFrame:
         """Load follow-up history."""
-        if os.path.exists(self.followup_log_path):
-            return pd.read_csv(self.followup_log_path)
+        if self.storage.exists('followup_log'):
+            return self.storage.read_table('followup_log')
         return pd.DataFrame(columns=['recipient_email', 'company', 'sent_at', 'status', 'stage', 'sender_email'])
     
     def _load_interviewed_companies(self) -> set:
@@ -172,23 +178,11 @@ class SmartFollowUpSender:
         Each user maintains their own follow-up count - User A sending to company@example.com
         doesn't affect User B's follow-up count to the same email.
         """
-        if self.followup_history.empty:
-            return 0
-        
         # Filter by both recipient email AND sender email for multi-user support
-        filter_conditions = (
-            (self.followup_history['recipient_email'].str.lower() == email.lower()) &
-            (self.followup_history['status'] == 'sent')
+        # (an indexed lookup with the SQLite backend; sender is ignored on legacy logs)
+        return self.storage.count_rows(
+            'followup_log', recipient_email=email, status='sent', sender_email=self.sender_email or None
         )
-        
-        # If sender_email column exists, filter by current sender
-        if 'sender_email' in self.followup_history.columns and self.sender_email:
-            filter_conditions = filter_conditions & (
-                self.followup_history['sender_email'].str.lower() == self.sender_email.lower()
-            )
-        
-        sent = self.followup_history[filter_conditions]
-        return len(sent)
     
     def _save_followup_log(self, recipient_email: str, company: str, status: str, stage: int):
         """Log sent follow-up email with stage and sender for multi-user support."""
@@ -206,7 +200,7 @@ class SmartFollowUpSender:
             pd.DataFrame([log_entry])
         ], ignore_index=True)
         
-        self.followup_history.to_csv(self.followup_log_path, index=False)
+        self.storage.append_rows('followup_log', [log_entry])
     
     def get_contacts_to_followup(self) -> pd.DataFrame:
         """Get contacts who should receive follow-up emails based on stage.
@@ -214,11 +208,11 @@ class SmartFollowUpSender:
         IMPORTANT: Only returns contacts that were originally emailed by the current sender.
         This prevents cross-user follow-ups (e.g., Shweta won't follow up on Yogeshwari's applications).
         """
-        if not os.path.exists(self.sent_log_path):
+        if not self.storage.exists('sent_emails'):
             logging.info("No sent emails log found - no follow-ups to send")
             return pd.DataFrame()
         
-        df = pd.read_csv(self.sent_log_path)
+        df = self.storage.read_table('sent_emails')
         
         # Filter for successful sends only
         df = df[df['status'] == 'sent']
@@ -433,12 +427,10 @@ ${phone}"""
             message['Subject'] = subject
             message.attach(MIMEText(body, 'plain'))
             
-            context = ssl.create_default_context()
-            
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls(context=context)
-                server.login(self.sender_email, self.sender_password)
-                server.sendmail(self.sender_email, recipient_email, message.as_string())
+            self.smtp_pool.sendmail(
+                self.smtp_server, self.smtp_port, self.sender_email, self.sender_password,
+                self.sender_email, recipient_email, message.as_string()
+            )
             
             stage_names = {1: "Gentle Reminder", 2: "Value-Add", 3: "Final Follow-up"}
             logging.info(f"✅ Stage {stage} ({stage_names.get(stage)}) sent to {recipient_email} ({company})")
@@ -466,6 +458,11 @@ ${phone}"""
         stats = {'sent': 0, 'failed': 0, 'by_stage': {1: 0, 2: 0, 3: 0}}
         
         for idx, row in contacts.iterrows():
+            # Every later send would fail the same way after a rejected login
+            if self.smtp_pool.is_auth_failed(self.smtp_server, self.smtp_port, self.sender_email):
+                logging.error("🛑 SMTP authentication failed - stopping follow-up campaign")
+                break
+            
             stage = row.get('next_stage', 1)
             success = self.send_followup(
                 row['recipient_email'],
@@ -490,6 +487,9 @@ ${phone}"""
                 logging.info(f"⏳ Waiting {delay:.0f}s before next follow-up...")
                 time.sleep(delay)
         
+        self.smtp_pool.close(self.smtp_server, self.smtp_port, self.sender_email)
+        self.storage.flush()
+        
         logging.info(f"\n📊 Multi-Stage Follow-Up Summary:")
         logging.info(f"   ✅ Total Sent: {stats['sent']}")
         logging.info(f"      - Stage 1 (Day 3 - Gentle): {stats['by_stage'].get(1, 0)}")
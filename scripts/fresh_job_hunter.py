@@ -9,17 +9,22 @@ Key Features:
 4. Urgent application flagging
 """
 
-import requests
-from bs4 import BeautifulSoup
 import feedparser
 import logging
 import pandas as pd
 import os
 import re
+import sys
 from datetime import datetime, timedelta
 from urllib.parse import quote_plus
 import json
 
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.html_parse import parse_html
+from utils.http_engine import FetchRequest, get_fetch_engine
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 
 
@@ -43,11 +48,12 @@ class FreshJobHunter:
     }
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        })
+        }
+        # Shared fetch engine: each hunt sends its pages as one rate-limited batch
+        self.engine = get_fetch_engine()
         self.fresh_jobs = []
         
         # Get job keywords from environment
@@ -176,34 +182,39 @@ class FreshJobHunter:
         
         return 168  # Default to 1 week if can't parse
     
+    def _fetch_batch(self, urls: dict, timeout: int = 10):
+        """Fetch ``{tag: url}`` as one batch; yields (tag, response) for 200 responses."""
+        batch = [FetchRequest(url, headers=self.headers, timeout=timeout, tag=tag) for tag, url in urls.items()]
+        for result in self.engine.fetch_all(batch):
+            if result.ok:
+                yield result.request.tag, result.response
+    
     def _hunt_linkedin_fresh(self):
         """Hunt LinkedIn for jobs posted today."""
         logging.info("📡 Hunting LinkedIn fresh jobs...")
         try:
-            for keyword in self.keywords[:2]:  # Top 2 keywords
-                # LinkedIn jobs RSS/API (public listings)
-                encoded = quote_plus(keyword)
-                url = f"https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search?keywords={encoded}&location=India&f_TPR=r86400&start=0"
-                
-                resp = self.session.get(url, timeout=10)
-                if resp.status_code == 200:
-                    soup = BeautifulSoup(resp.text, 'html.parser')
-                    for card in soup.select('.job-search-card')[:10]:
-                        title = card.select_one('.base-search-card__title')
-                        company = card.select_one('.base-search-card__subtitle')
-                        link = card.select_one('a.base-card__full-link')
-                        time_posted = card.select_one('time')
-                        
-                        if title and company:
-                            self.fresh_jobs.append({
-                                'title': title.get_text(strip=True),
-                                'company': company.get_text(strip=True),
-                                'url': link.get('href', '') if link else '',
-                                'date_posted': time_posted.get('datetime', 'today') if time_posted else 'today',
-                                'source': 'linkedin_fresh',
-                                'priority': 'high'
-                            })
-                    logging.info(f"   Found {len(soup.select('.job-search-card'))} fresh LinkedIn jobs for '{keyword}'")
+            # LinkedIn jobs RSS/API (public listings), top 2 keywords
+            urls = {keyword: f"https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search?keywords={quote_plus(keyword)}&location=India&f_TPR=r86400&start=0"
+                    for keyword in self.keywords[:2]}
+            
+            for keyword, resp in self._fetch_batch(urls):
+                soup = parse_html(resp.text, attrs={'class': 'job-search-card'})
+                for card in soup.select('.job-search-card')[:10]:
+                    title = card.select_one('.base-search-card__title')
+                    company = card.select_one('.base-search-card__subtitle')
+                    link = card.select_one('a.base-card__full-link')
+                    time_posted = card.select_one('time')
+                    
+                    if title and company:
+                        self.fresh_jobs.append({
+                            'title': title.get_text(strip=True),
+                            'company': company.get_text(strip=True),
+                            'url': link.get('href', '') if link else '',
+                            'date_posted': time_posted.get('datetime', 'today') if time_posted else 'today',
+                            'source': 'linkedin_fresh',
+                            'priority': 'high'
+                        })
+                logging.info(f"   Found {len(soup.select('.job-search-card'))} fresh LinkedIn jobs for '{keyword}'")
         except Exception as e:
             logging.debug(f"   LinkedIn: {e}")
     
@@ -211,28 +222,26 @@ class FreshJobHunter:
         """Hunt Naukri for jobs posted today (freshness=1)."""
         logging.info("📡 Hunting Naukri fresh jobs (today)...")
         try:
-            for keyword in self.keywords[:2]:
-                encoded = keyword.replace(' ', '-')
-                # freshness=1 means posted today
-                url = f"https://www.naukri.com/{encoded}-jobs?freshness=1"
-                
-                resp = self.session.get(url, timeout=10)
-                if resp.status_code == 200:
-                    soup = BeautifulSoup(resp.text, 'html.parser')
-                    for card in soup.select('.srp-jobtuple-wrapper, .jobTuple')[:15]:
-                        title_elem = card.select_one('.title, .desig')
-                        company_elem = card.select_one('.comp-name, .companyInfo a')
-                        
-                        if title_elem:
-                            self.fresh_jobs.append({
-                                'title': title_elem.get_text(strip=True),
-                                'company': company_elem.get_text(strip=True) if company_elem else 'Unknown',
-                                'url': card.get('href', '') or (title_elem.get('href', '') if title_elem else ''),
-                                'date_posted': 'today',
-                                'source': 'naukri_fresh',
-                                'priority': 'high'
-                            })
-                    logging.info(f"   Found Naukri jobs posted today for '{keyword}'")
+            # freshness=1 means posted today
+            urls = {keyword: f"https://www.naukri.com/{keyword.replace(' ', '-')}-jobs?freshness=1"
+                    for keyword in self.keywords[:2]}
+            
+            for keyword, resp in self._fetch_batch(urls):
+                soup = parse_html(resp.text, attrs={'class': ['srp-jobtuple-wrapper', 'jobTuple']})
+                for card in soup.select('.srp-jobtuple-wrapper, .jobTuple')[:15]:
+                    title_elem = card.select_one('.title, .desig')
+                    company_elem = card.select_one('.comp-name, .companyInfo a')
+                    
+                    if title_elem:
+                        self.fresh_jobs.append({
+                            'title': title_elem.get_text(strip=True),
+                            'company': company_elem.get_text(strip=True) if company_elem else 'Unknown',
+                            'url': card.get('href', '') or (title_elem.get('href', '') if title_elem else ''),
+                            'date_posted': 'today',
+                            'source': 'naukri_fresh',
+                            'priority': 'high'
+                        })
+                logging.info(f"   Found Naukri jobs posted today for '{keyword}'")
         except Exception as e:
             logging.debug(f"   Naukri: {e}")
     
@@ -240,28 +249,26 @@ class FreshJobHunter:
         """Hunt Indeed for jobs posted in last 24 hours."""
         logging.info("📡 Hunting Indeed fresh jobs (last 24h)...")
         try:
-            for keyword in self.keywords[:2]:
-                encoded = quote_plus(keyword)
-                # fromage=1 means last 24 hours
-                url = f"https://in.indeed.com/jobs?q={encoded}&l=India&fromage=1"
-                
-                resp = self.session.get(url, timeout=10)
-                if resp.status_code == 200:
-                    soup = BeautifulSoup(resp.text, 'html.parser')
-                    for card in soup.select('.job_seen_beacon, .resultContent')[:10]:
-                        title_elem = card.select_one('.jobTitle span, h2 a')
-                        company_elem = card.select_one('.companyName, .company')
-                        
-                        if title_elem:
-                            self.fresh_jobs.append({
-                                'title': title_elem.get_text(strip=True),
-                                'company': company_elem.get_text(strip=True) if company_elem else 'Unknown',
-                                'url': '',
-                                'date_posted': 'today',
-                                'source': 'indeed_fresh',
-                                'priority': 'high'
-                            })
-                    logging.info(f"   Found Indeed jobs from last 24 hours for '{keyword}'")
+            # fromage=1 means last 24 hours
+            urls = {keyword: f"https://in.indeed.com/jobs?q={quote_plus(keyword)}&l=India&fromage=1"
+                    for keyword in self.keywords[:2]}
+            
+            for keyword, resp in self._fetch_batch(urls):
+                soup = parse_html(resp.text, attrs={'class': ['job_seen_beacon', 'resultContent']})
+                for card in soup.select('.job_seen_beacon, .resultContent')[:10]:
+                    title_elem = card.select_one('.jobTitle span, h2 a')
+                    company_elem = card.select_one('.companyName, .company')
+                    
+                    if title_elem:
+                        self.fresh_jobs.append({
+                            'title': title_elem.get_text(strip=True),
+                            'company': company_elem.get_text(strip=True) if company_elem else 'Unknown',
+                            'url': '',
+                            'date_posted': 'today',
+                            'source': 'indeed_fresh',
+                            'priority': 'high'
+                        })
+                logging.info(f"   Found Indeed jobs from last 24 hours for '{keyword}'")
         except Exception as e:
             logging.debug(f"   Indeed: {e}")
     
@@ -275,13 +282,12 @@ class FreshJobHunter:
         """Hunt Google Jobs for fresh listings."""
         logging.info("📡 Hunting Google Jobs...")
         try:
-            for keyword in self.keywords[:2]:
-                encoded = quote_plus(f"{keyword} India")
-                url = f"https://www.google.com/search?q={encoded}+jobs&ibp=htl;jobs"
-                
-                resp = self.session.get(url, timeout=10)
+            urls = {keyword: f"https://www.google.com/search?q={quote_plus(f'{keyword} India')}+jobs&ibp=htl;jobs"
+                    for keyword in self.keywords[:2]}
+            
+            for keyword, resp in self._fetch_batch(urls):
                 # Google Jobs requires JS rendering, but we can get some metadata
-                if resp.status_code == 200 and 'job' in resp.text.lower():
+                if 'job' in resp.text.lower():
                     logging.info(f"   Google Jobs available for '{keyword}'")
         except Exception as e:
             logging.debug(f"   Google Jobs: {e}")
@@ -292,9 +298,9 @@ class FreshJobHunter:
         try:
             # Wellfound API
             url = "https://wellfound.com/role/data-analyst"
-            resp = self.session.get(url, timeout=10)
+            resp = self.engine.get(url, headers=self.headers, timeout=10)
             if resp.status_code == 200:
-                soup = BeautifulSoup(resp.text, 'html.parser')
+                soup = parse_html(resp.text, attrs={'data-test': 'StartupResult'})
                 for card in soup.select('[data-test="StartupResult"]')[:10]:
                     name = card.select_one('.styles_component__DzUj0')
                     if name:
@@ -328,32 +334,29 @@ class FreshJobHunter:
             ('Meesho', 'https://www.meesho.com/careers'),
         ]
         
-        for company, url in hot_companies[:5]:
-            try:
-                resp = self.session.get(url, timeout=5)
-                if resp.status_code == 200:
-                    # Check if any of our keywords are mentioned
-                    page_text = resp.text.lower()
-                    for keyword in self.keywords:
-                        if keyword.lower() in page_text:
-                            self.fresh_jobs.append({
-                                'title': f'{keyword.title()} Openings',
-                                'company': company,
-                                'url': url,
-                                'date_posted': 'recent',
-                                'source': 'career_page',
-                                'priority': 'medium'
-                            })
-                            break
-            except:
-                pass
+        # Every career page is on its own host, so the batch runs in parallel
+        career_pages = dict(hot_companies[:5])
+        for company, resp in self._fetch_batch(career_pages, timeout=5):
+            # Check if any of our keywords are mentioned
+            page_text = resp.text.lower()
+            for keyword in self.keywords:
+                if keyword.lower() in page_text:
+                    self.fresh_jobs.append({
+                        'title': f'{keyword.title()} Openings',
+                        'company': company,
+                        'url': career_pages[company],
+                        'date_posted': 'recent',
+                        'source': 'career_page',
+                        'priority': 'medium'
+                    })
+                    break
     
     def _hunt_remote_fresh(self):
         """Hunt remote job boards that update hourly."""
         logging.info("📡 Hunting remote job boards...")
         try:
             # RemoteOK - updates frequently
-            resp = self.session.get('https://remoteok.com/api', timeout=10)
+            resp = self.engine.get('https://remoteok.com/api', headers=self.headers, timeout=10)
             if resp.status_code == 200:
                 jobs = resp.json()
                 for job in jobs[1:15]:  # Skip first (legal notice)
@@ -384,13 +387,8 @@ class FreshJobHunter:
             ('Hirist', 'https://www.hirist.tech/jobs'),
         ]
         
-        for name, url in startup_sources:
-            try:
-                resp = self.session.get(url, timeout=5)
-                if resp.status_code == 200:
-                    logging.info(f"   {name} job board accessible")
-            except:
-                pass
+        for name, _ in self._fetch_batch(dict(startup_sources), timeout=5):
+            logging.info(f"   {name} job board accessible")
     
     def get_hiring_managers(self, companies: list) -> pd.DataFrame:
         """Try to find hiring managers for companies with fresh openings."""
@@ -9,22 +9,21 @@ Sources:
 4. Naukri/LinkedIn public job posts with emails
 """
 
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 import os
+import sys
 import logging
 import re
-import time
 import random
 from datetime import datetime
 from urllib.parse import urljoin, quote_plus
 
-try:
-    import dns.resolver
-    HAS_DNS = True
-except ImportError:
-    HAS_DNS = False
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.dns_cache import HAS_DNS, get_dns_cache
+from utils.html_parse import find_cards, mailto_addresses, page_text
+from utils.http_engine import FetchRequest, get_fetch_engine
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 
@@ -55,15 +54,15 @@ class RealHREmailFinder:
                      'newsletter', 'unsubscribe', 'feedback', 'example.com', 'test@']
     
     def __init__(self):
-        self.session = requests.Session()
-        self._update_headers()
+        # Shared fetch engine: per-host rate limits and retries replace the random sleeps
+        self.engine = get_fetch_engine()
         self.found_emails = []
-        self.dns_cache = {}
+        self.dns_cache = get_dns_cache()
     
-    def _update_headers(self):
-        """Update session headers with a random User-Agent for anti-detection."""
+    def _get_headers(self) -> dict:
+        """Request headers with a random User-Agent for anti-detection."""
         ua = random.choice(self.USER_AGENTS)
-        self.session.headers.update({
+        return {
             'User-Agent': ua,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.9',
@@ -77,7 +76,30 @@ class RealHREmailFinder:
             'Sec-Fetch-User': '?1',
             'Upgrade-Insecure-Requests': '1',
             'Cache-Control': 'max-age=0',
-        })
+        }
+    
+    def _fetch_batch(self, urls: dict, timeout: int = 10):
+        """Fetch ``{tag: url}`` as one batch; yields (tag, response) for each 200 response.
+        
+        Pages that answer 403 get one more try, without cookies, in a second batch.
+        """
+        blocked = {}
+        batch = [FetchRequest(url, headers=self._get_headers(), timeout=timeout, tag=tag) for tag, url in urls.items()]
+        for result in self.engine.fetch_all(batch):
+            if result.status_code == 403:
+                blocked[result.request.tag] = result.request.url
+            elif result.ok:
+                yield result.request.tag, result.response
+            elif result.error is not None:
+                logging.debug(f"Fetch error for {result.request.url}: {result.error}")
+        
+        if blocked:
+            logging.debug(f"403 from {len(blocked)} pages, retrying without cookies...")
+            batch = [FetchRequest(url, headers=self._get_headers(), timeout=timeout, tag=tag, cookies=False)
+                     for tag, url in blocked.items()]
+            for result in self.engine.fetch_all(batch):
+                if result.ok:
+                    yield result.request.tag, result.response
         
     def find_real_hr_emails(self) -> pd.DataFrame:
         """Find real HR emails from multiple sources."""
@@ -120,36 +142,25 @@ class RealHREmailFinder:
             search_terms = ["jobs", "careers", "hiring"]
         
         # Search for career page emails
-        for term in search_terms:
+        # DuckDuckGo HTML search (no API key needed, bot-friendly), all terms in one batch
+        urls = {term: f"https://html.duckduckgo.com/html/?q={quote_plus(f'{term} bangalore careers email contact hr')}"
+                for term in search_terms}
+        for term, response in self._fetch_batch(urls):
             try:
-                self._update_headers()
-                
-                # DuckDuckGo HTML search (no API key needed, bot-friendly)
-                search_query = f'{term} bangalore careers email contact hr'
-                search_url = f"https://html.duckduckgo.com/html/?q={quote_plus(search_query)}"
+                # Extract emails from search results
+                emails = self.EMAIL_REGEX.findall(page_text(response.text))
                 
-                response = self.session.get(search_url, timeout=10)
+                for email in emails:
+                    if self._is_valid_hr_email(email):
+                        self._add_email(email, 'Unknown', 'duckduckgo_search', term)
                 
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Extract emails from search results
-                    page_text = soup.get_text()
-                    emails = self.EMAIL_REGEX.findall(page_text)
-                    
-                    for email in emails:
+                # Also check result snippets for company career emails
+                for result in find_cards(response.text, 'a', {'class': 'result__a'}):
+                    result_text = result.get_text()
+                    result_emails = self.EMAIL_REGEX.findall(result_text)
+                    for email in result_emails:
                         if self._is_valid_hr_email(email):
                             self._add_email(email, 'Unknown', 'duckduckgo_search', term)
-                    
-                    # Also check result snippets for company career emails
-                    for result in soup.find_all('a', class_='result__a'):
-                        result_text = result.get_text()
-                        result_emails = self.EMAIL_REGEX.findall(result_text)
-                        for email in result_emails:
-                            if self._is_valid_hr_email(email):
-                                self._add_email(email, 'Unknown', 'duckduckgo_search', term)
-                
-                time.sleep(random.uniform(1, 2))
                 
             except Exception as e:
                 logging.debug(f"DuckDuckGo search error: {e}")
@@ -162,27 +173,16 @@ class RealHREmailFinder:
     
     def _search_career_emails_bing(self, search_terms: list):
         """Search for career/HR emails using Bing (more bot-friendly than Google)."""
-        for term in search_terms[:2]:  # Limit to 2 terms
+        urls = {term: f"https://www.bing.com/search?q={quote_plus(f'{term} bangalore careers hr email')}"
+                for term in search_terms[:2]}  # Limit to 2 terms
+        for term, response in self._fetch_batch(urls):
             try:
-                self._update_headers()
+                # Extract emails from search results
+                emails = self.EMAIL_REGEX.findall(page_text(response.text))
                 
-                search_query = f'{term} bangalore careers hr email'
-                search_url = f"https://www.bing.com/search?q={quote_plus(search_query)}"
-                
-                response = self.session.get(search_url, timeout=10)
-                
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Extract emails from search results
-                    page_text = soup.get_text()
-                    emails = self.EMAIL_REGEX.findall(page_text)
-                    
-                    for email in emails:
-                        if self._is_valid_hr_email(email):
-                            self._add_email(email, 'Unknown', 'bing_search', term)
-                
-                time.sleep(random.uniform(1, 2))
+                for email in emails:
+                    if self._is_valid_hr_email(email):
+                        self._add_email(email, 'Unknown', 'bing_search', term)
                 
             except Exception as e:
                 logging.debug(f"Bing search error: {e}")
@@ -200,49 +200,30 @@ class RealHREmailFinder:
             # Generic fallback - workflow should always provide JOB_KEYWORDS
             keywords = [f"jobs {location}", f"careers {location}"]
         
-        for keyword in keywords:
+        # Naukri search URLs, one batch
+        urls = {keyword: f"https://www.naukri.com/{keyword.replace(' ', '-')}-jobs" for keyword in keywords}
+        for keyword, response in self._fetch_batch(urls, timeout=15):
             try:
-                # Rotate headers for each request
-                self._update_headers()
+                # Find all job cards (only they are parsed)
+                job_cards = find_cards(response.text, ['article', 'div'],
+                                       {'class': lambda x: x and 'job' in str(x).lower()})
                 
-                # Reduced delay for speed
-                time.sleep(random.uniform(0.5, 1.0))
-                
-                # Naukri search URL
-                url = f"https://www.naukri.com/{keyword.replace(' ', '-')}-jobs"
-                
-                response = self.session.get(url, timeout=15)
-                
-                # Handle 403 - retry with fresh session
-                if response.status_code == 403:
-                    logging.debug(f"Naukri 403, retrying with fresh session...")
-                    time.sleep(random.uniform(3, 6))
-                    self.session = requests.Session()
-                    self._update_headers()
-                    response = self.session.get(url, timeout=15)
+                for card in job_cards[:20]:
+                    # Look for mailto links
+                    mailto_links = card.find_all('a', href=lambda x: x and 'mailto:' in str(x).lower())
+                    for link in mailto_links:
+                        email = link['href'].replace('mailto:', '').split('?')[0].strip()
+                        if self._is_valid_hr_email(email):
+                            company = self._extract_company(card)
+                            self._add_email(email, company, 'naukri', keyword)
                 
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Find all job cards
-                    job_cards = soup.find_all(['article', 'div'], class_=lambda x: x and 'job' in str(x).lower())
-                    
-                    for card in job_cards[:20]:
-                        # Look for mailto links
-                        mailto_links = card.find_all('a', href=lambda x: x and 'mailto:' in str(x).lower())
-                        for link in mailto_links:
-                            email = link['href'].replace('mailto:', '').split('?')[0].strip()
-                            if self._is_valid_hr_email(email):
-                                company = self._extract_company(card)
-                                self._add_email(email, company, 'naukri', keyword)
-                        
-                        # Also search for emails in text
-                        text = card.get_text()
-                        emails = self.EMAIL_REGEX.findall(text)
-                        for email in emails:
-                            if self._is_valid_hr_email(email):
-                                company = self._extract_company(card)
-                                self._add_email(email, company, 'naukri', keyword)
+                    # Also search for emails in text
+                    text = card.get_text()
+                    emails = self.EMAIL_REGEX.findall(text)
+                    for email in emails:
+                        if self._is_valid_hr_email(email):
+                            company = self._extract_company(card)
+                            self._add_email(email, company, 'naukri', keyword)
                 
             except Exception as e:
                 logging.debug(f"Naukri error for {keyword}: {e}")
@@ -260,31 +241,20 @@ class RealHREmailFinder:
         else:
             keywords = ["interior+designer", "autocad+designer"]
         
-        for keyword in keywords:
+        urls = {keyword: f"https://in.indeed.com/jobs?q={keyword}&l=Bangalore" for keyword in keywords}
+        for keyword, response in self._fetch_batch(urls):
             try:
-                url = f"https://in.indeed.com/jobs?q={keyword}&l=Bangalore"
+                # Find email patterns in the page
+                emails = self.EMAIL_REGEX.findall(page_text(response.text))
                 
-                response = self.session.get(url, timeout=10)
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Find email patterns in the page
-                    page_text = soup.get_text()
-                    emails = self.EMAIL_REGEX.findall(page_text)
-                    
-                    for email in emails:
-                        if self._is_valid_hr_email(email):
-                            self._add_email(email, 'Unknown', 'indeed', keyword)
-                    
-                    # Check mailto links
-                    mailto_links = soup.find_all('a', href=lambda x: x and 'mailto:' in str(x).lower())
-                    for link in mailto_links:
-                        email = link['href'].replace('mailto:', '').split('?')[0].strip()
-                        if self._is_valid_hr_email(email):
-                            self._add_email(email, 'Unknown', 'indeed', keyword)
+                for email in emails:
+                    if self._is_valid_hr_email(email):
+                        self._add_email(email, 'Unknown', 'indeed', keyword)
                 
-                # Reduced delay
-                time.sleep(random.uniform(0.5, 1.0))
+                # Check mailto links
+                for email in mailto_addresses(response.text):
+                    if self._is_valid_hr_email(email):
+                        self._add_email(email, 'Unknown', 'indeed', keyword)
                 
             except Exception as e:
                 logging.debug(f"Indeed error: {e}")
@@ -317,43 +287,22 @@ class RealHREmailFinder:
             ("Infosys", "https://www.infosys.com/careers.html"),
         ]
         
-        for company, url in career_pages:
+        # Every career page is on its own host, so the batch runs in parallel
+        for company, response in self._fetch_batch(dict(career_pages)):
             try:
-                # Rotate headers before each request
-                self._update_headers()
-                
-                # Reduced delay for speed
-                time.sleep(random.uniform(0.3, 0.8))
-                
-                response = self.session.get(url, timeout=10)
-                
-                # Handle 403 - retry with fresh headers
-                if response.status_code == 403:
-                    logging.debug(f"403 from {company}, retrying with fresh headers...")
-                    time.sleep(random.uniform(2, 5))
-                    self._update_headers()
-                    self.session = requests.Session()  # Fresh session
-                    self._update_headers()
-                    response = self.session.get(url, timeout=10)
+                # Find all mailto links
+                for email in mailto_addresses(response.text):
+                    if self._is_valid_hr_email(email):
+                        self._add_email(email, company, 'career_page', 'direct')
                 
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Find all mailto links
-                    mailto_links = soup.find_all('a', href=lambda x: x and 'mailto:' in str(x).lower())
-                    for link in mailto_links:
-                        email = link['href'].replace('mailto:', '').split('?')[0].strip()
+                # Search for emails in contact sections
+                contact_sections = find_cards(response.text, ['div', 'section', 'footer'],
+                                              {'class': lambda x: x and any(k in str(x).lower() for k in ['contact', 'footer', 'connect'])})
+                for section in contact_sections:
+                    emails = self.EMAIL_REGEX.findall(section.get_text())
+                    for email in emails:
                         if self._is_valid_hr_email(email):
                             self._add_email(email, company, 'career_page', 'direct')
-                    
-                    # Search for emails in contact sections
-                    contact_sections = soup.find_all(['div', 'section', 'footer'], 
-                                                     class_=lambda x: x and any(k in str(x).lower() for k in ['contact', 'footer', 'connect']))
-                    for section in contact_sections:
-                        emails = self.EMAIL_REGEX.findall(section.get_text())
-                        for email in emails:
-                            if self._is_valid_hr_email(email):
-                                self._add_email(email, company, 'career_page', 'direct')
                 
             except Exception as e:
                 logging.debug(f"Career page error for {company}: {e}")
@@ -371,24 +320,16 @@ class RealHREmailFinder:
         else:
             keywords = ["interior designer india"]
         
-        for keyword in keywords:
+        urls = {keyword: f"https://www.linkedin.com/jobs/search?keywords={quote_plus(keyword)}&location=India"
+                for keyword in keywords}
+        for keyword, response in self._fetch_batch(urls):
             try:
-                url = f"https://www.linkedin.com/jobs/search?keywords={quote_plus(keyword)}&location=India"
+                # Find emails in the page
+                emails = self.EMAIL_REGEX.findall(page_text(response.text))
                 
-                response = self.session.get(url, timeout=10)
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Find emails in the page
-                    page_text = soup.get_text()
-                    emails = self.EMAIL_REGEX.findall(page_text)
-                    
-                    for email in emails:
-                        if self._is_valid_hr_email(email):
-                            self._add_email(email, 'Unknown', 'linkedin_jobs', keyword)
-                
-                # Reduced delay
-                time.sleep(random.uniform(0.5, 1.0))
+                for email in emails:
+                    if self._is_valid_hr_email(email):
+                        self._add_email(email, 'Unknown', 'linkedin_jobs', keyword)
                 
             except Exception as e:
                 logging.debug(f"LinkedIn error: {e}")
@@ -408,13 +349,10 @@ class RealHREmailFinder:
             keyword = keywords_env.split(',')[0].strip().replace(' ', '-')
             url = f"https://www.glassdoor.co.in/Job/bangalore-{keyword}-jobs-SRCH_IL.0,9_IC2940587.htm"
             
-            response = self.session.get(url, timeout=10)
+            response = self.engine.get(url, headers=self._get_headers(), timeout=10)
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
                 # Find emails
-                page_text = soup.get_text()
-                emails = self.EMAIL_REGEX.findall(page_text)
+                emails = self.EMAIL_REGEX.findall(page_text(response.text))
                 
                 for email in emails:
                     if self._is_valid_hr_email(email):
@@ -440,28 +378,18 @@ class RealHREmailFinder:
                 f"https://internshala.com/jobs/{keyword}-jobs-in-bangalore/",
             ]
             
-            for url in urls:
-                response = self.session.get(url, timeout=10)
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Find emails in job cards
-                    page_text = soup.get_text()
-                    emails = self.EMAIL_REGEX.findall(page_text)
-                    
-                    for email in emails:
-                        if self._is_valid_hr_email(email):
-                            self._add_email(email, 'Unknown', 'internshala', 'fresher')
-                    
-                    # Check mailto links
-                    mailto_links = soup.find_all('a', href=lambda x: x and 'mailto:' in str(x).lower())
-                    for link in mailto_links:
-                        email = link['href'].replace('mailto:', '').split('?')[0].strip()
-                        if self._is_valid_hr_email(email):
-                            self._add_email(email, 'Unknown', 'internshala', 'fresher')
+            for _, response in self._fetch_batch(dict(enumerate(urls))):
+                # Find emails in job cards
+                emails = self.EMAIL_REGEX.findall(page_text(response.text))
+                
+                for email in emails:
+                    if self._is_valid_hr_email(email):
+                        self._add_email(email, 'Unknown', 'internshala', 'fresher')
                 
-                # Reduced delay
-                time.sleep(random.uniform(0.5, 1.0))
+                # Check mailto links
+                for email in mailto_addresses(response.text):
+                    if self._is_valid_hr_email(email):
+                        self._add_email(email, 'Unknown', 'internshala', 'fresher')
             
         except Exception as e:
             logging.debug(f"Internshala error: {e}")
@@ -538,17 +466,7 @@ class RealHREmailFinder:
         if not HAS_DNS:
             return True  # Skip if dns module not available
         
-        if domain in self.dns_cache:
-            return self.dns_cache[domain]
-        
-        try:
-            mx_records = dns.resolver.resolve(domain, 'MX', lifetime=5)
-            has_mx = len(list(mx_records)) > 0
-            self.dns_cache[domain] = has_mx
-            return has_mx
-        except:
-            self.dns_cache[domain] = False
-            return False
+        return self.dns_cache.resolve(domain, 'MX').ok
     
     def _process_results(self) -> pd.DataFrame:
         """Process and save results."""
@@ -563,6 +481,8 @@ class RealHREmailFinder:
         # Verify MX records
         if HAS_DNS:
             logging.info("🔍 Verifying email domains...")
+            # One concurrent batch; the per-row checks below are then cache hits
+            self.dns_cache.resolve_many(df['email'].str.split('@').str[1].dropna())
             valid_mask = df['email'].apply(lambda x: self._verify_mx_record(x.split('@')[1]))
             invalid_count = (~valid_mask).sum()
             if invalid_count > 0:
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Inbox Scan - bounce detection, reply detection and response classification
+in one IMAP login and one incremental pass over new mail.
+
+Each handler writes the same output files its standalone script does
+(bounced_emails / sent log, hr_replies / interview_requests,
+hr_replies_classified.csv). The standalone scripts keep working and share
+the per-handler UID cursors, so nothing is read twice.
+
+With --watch the scan keeps running: it waits for new mail with IMAP IDLE
+(NOOP polling if the server lacks it) and handles each message within
+seconds. Bounces are appended to bounced_emails as they arrive, so a
+campaign sending at the same time stops mailing those addresses.
+
+Usage:
+    python scripts/inbox_scan.py [days_back] [--watch]
+"""
+
+import os
+import sys
+import logging
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.config import USER_DETAILS
+from utils.inbox_scanner import InboxScanner
+from scripts.bounce_checker import BounceHandler
+from scripts.reply_detector import ReplyHandler
+from scripts.ai_response_classifier import ResponseClassifierHandler
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    watch = '--watch' in sys.argv[1:]
+    days_back = int(args[0]) if args else 7
+
+    logging.info("=" * 60)
+    logging.info(f"📬 INBOX {'WATCH' if watch else 'SCAN'} (bounces + replies + classification)")
+    logging.info("=" * 60)
+
+    password = os.getenv('SENDER_PASSWORD', '')
+    if not password:
+        logging.error("❌ SENDER_PASSWORD environment variable not set!")
+        return
+
+    bounces = BounceHandler(append=watch)
+    replies = ReplyHandler()
+    classifier = ResponseClassifierHandler(accept=replies.wants)
+    handlers = [bounces, replies, classifier]
+
+    scanner = InboxScanner(
+        os.getenv('IMAP_SERVER', 'imap.gmail.com'),
+        int(os.getenv('IMAP_PORT', '993')),
+        os.getenv('SENDER_EMAIL') or USER_DETAILS.get('email', ''),
+        password,
+    )
+    # Handlers save at the end of every pass, before their cursors move on
+    if watch:
+        scanner.watch(handlers, days_back=days_back)
+    elif not scanner.run(handlers, days_back=days_back):
+        return
+
+    # Same follow-up as bounce_checker.py: blocklist bounces recorded in the sent log too
+    bounces.checker.sync_bounced_from_sent_log()
+    bounces.checker.storage.flush()
+
+    logging.info(f"📊 {len(bounces.bounces)} bounces, {len(replies.replies)} replies, "
+                 f"{len(classifier.rows)} classified responses")
+    logging.info("✅ Inbox scan completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,17 +3,20 @@ LinkedIn Job Scraper - Scrapes job postings from LinkedIn public pages
 Uses public RSS/API approaches that don't require authentication
 """
 
-import requests
-from bs4 import BeautifulSoup
 import re
 import logging
 import pandas as pd
 import os
-import time
-import random
+import sys
 from urllib.parse import quote_plus
 import json
 
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.html_parse import element_text, first, parse_html, xpath
+from utils.http_engine import FetchRequest, get_fetch_engine
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 
 
@@ -21,88 +24,102 @@ class LinkedInPublicScraper:
     """Scrapes LinkedIn jobs from public pages without authentication."""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
-        })
+        }
+        # Shared fetch engine: per-host rate limits and retries instead of sleeps
+        self.engine = get_fetch_engine()
         
     def search_jobs(self, keywords: str, location: str = "India", num_jobs: int = 25) -> list:
         """Search for jobs on LinkedIn public job listings."""
-        jobs = []
+        return self.search_many([keywords], location, num_jobs)[keywords]
+    
+    def search_many(self, keywords_list: list, location: str = "India", num_jobs: int = 25) -> dict:
+        """Search several keywords at once; returns {keywords: jobs}.
         
-        # LinkedIn public job search URL
-        encoded_keywords = quote_plus(keywords)
+        Every keyword's first URL goes out as one batch; keywords that found
+        nothing retry on the next URL in the following batch.
+        """
+        results = {keywords: [] for keywords in keywords_list}
         encoded_location = quote_plus(location)
         
-        # Try LinkedIn's public job listing page
-        urls_to_try = [
-            f"https://www.linkedin.com/jobs/search/?keywords={encoded_keywords}&location={encoded_location}",
-            f"https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search?keywords={encoded_keywords}&location={encoded_location}&start=0",
-        ]
+        # Try LinkedIn's public job listing page, then the guest API
+        pending = {
+            keywords: [
+                f"https://www.linkedin.com/jobs/search/?keywords={quote_plus(keywords)}&location={encoded_location}",
+                f"https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search?keywords={quote_plus(keywords)}&location={encoded_location}&start=0",
+            ]
+            for keywords in results
+        }
         
-        for url in urls_to_try:
-            try:
-                logging.info(f"🔍 Searching: {url[:80]}...")
-                response = self.session.get(url, timeout=15)
-                
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Find job cards
-                    job_cards = soup.find_all('div', {'class': re.compile(r'job-search-card|base-card')})
-                    
-                    for card in job_cards[:num_jobs]:
-                        try:
-                            job = self._parse_job_card(card)
-                            if job:
-                                jobs.append(job)
-                        except Exception as e:
-                            logging.debug(f"Error parsing job card: {e}")
-                            continue
-                    
+        while pending:
+            batch = [FetchRequest(urls[0], headers=self.headers, timeout=15, tag=keywords)
+                     for keywords, urls in pending.items()]
+            next_round = {}
+            for result in self.engine.fetch_all(batch):
+                keywords = result.request.tag
+                logging.info(f"🔍 Searching: {result.request.url[:80]}...")
+                if result.ok:
+                    jobs = self._parse_search_page(result.response, num_jobs)
                     if jobs:
                         logging.info(f"✅ Found {len(jobs)} jobs for '{keywords}'")
-                        break
+                        results[keywords] = jobs
+                        continue
+                elif result.response is not None:
+                    logging.warning(f"Got status {result.status_code} from LinkedIn")
                 else:
-                    logging.warning(f"Got status {response.status_code} from LinkedIn")
-                    
+                    logging.warning(f"Error searching LinkedIn: {result.error}")
+                
+                if len(pending[keywords]) > 1:
+                    next_round[keywords] = pending[keywords][1:]
+            pending = next_round
+        
+        return results
+    
+    def _parse_search_page(self, response, num_jobs: int) -> list:
+        """Job dicts from a LinkedIn search results page."""
+        jobs = []
+        # Find job cards (lxml elements: the hottest page, so no BeautifulSoup tree)
+        job_cards = xpath(response.text, "//div[re:test(@class, 'job-search-card|base-card')]")
+        
+        for card in job_cards[:num_jobs]:
+            try:
+                job = self._parse_job_card(card)
+                if job:
+                    jobs.append(job)
             except Exception as e:
-                logging.warning(f"Error searching LinkedIn: {e}")
+                logging.debug(f"Error parsing job card: {e}")
                 continue
-            
-            time.sleep(random.uniform(2, 4))
         
         return jobs
     
     def _parse_job_card(self, card) -> dict:
-        """Parse a LinkedIn job card element."""
+        """Parse a LinkedIn job card (lxml element)."""
         job = {}
         
         # Job title
-        title_elem = card.find(['h3', 'h4'], {'class': re.compile(r'title|job-title')})
-        if title_elem:
-            job['title'] = title_elem.get_text(strip=True)
+        title_elem = first(card, ".//*[self::h3 or self::h4][re:test(@class, 'title|job-title')]")
+        if title_elem is not None:
+            job['title'] = element_text(title_elem)
         
         # Company name
-        company_elem = card.find(['h4', 'a'], {'class': re.compile(r'company|subtitle')})
-        if company_elem:
-            job['company'] = company_elem.get_text(strip=True)
+        company_elem = first(card, ".//*[self::h4 or self::a][re:test(@class, 'company|subtitle')]")
+        if company_elem is not None:
+            job['company'] = element_text(company_elem)
         
         # Location
-        location_elem = card.find(['span', 'div'], {'class': re.compile(r'location|job-search-card__location')})
-        if location_elem:
-            job['location'] = location_elem.get_text(strip=True)
+        location_elem = first(card, ".//*[self::span or self::div][re:test(@class, 'location|job-search-card__location')]")
+        if location_elem is not None:
+            job['location'] = element_text(location_elem)
         
         # Job URL
-        link_elem = card.find('a', href=True)
-        if link_elem:
-            href = link_elem.get('href', '')
-            if '/jobs/' in href:
-                job['url'] = href if href.startswith('http') else f"https://www.linkedin.com{href}"
+        href = str(first(card, ".//a/@href") or '')
+        if '/jobs/' in href:
+            job['url'] = href if href.startswith('http') else f"https://www.linkedin.com{href}"
         
         # Job ID
         if 'url' in job:
@@ -118,8 +135,9 @@ class LinkedInPublicScraper:
     def get_job_details(self, job_url: str) -> dict:
         """Get detailed job information from a job page."""
         try:
-            response = self.session.get(job_url, timeout=15)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            response = self.engine.get(job_url, headers=self.headers, timeout=15)
+            soup = parse_html(response.text, 'div', {
+                'class': re.compile(r'description|show-more-less-html|job-poster|posted-by')})
             
             details = {
                 'url': job_url,
@@ -154,49 +172,61 @@ class NaukriPublicScraper:
     """Scrapes Naukri jobs from public pages."""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-        })
+        }
+        self.engine = get_fetch_engine()
     
     def search_jobs(self, keywords: str, location: str = "bangalore", num_jobs: int = 25) -> list:
         """Search for jobs on Naukri public listings."""
-        jobs = []
-        
-        # Format keywords for URL
-        formatted_keywords = keywords.lower().replace(' ', '-')
+        return self.search_many([keywords], location, num_jobs)[keywords]
+    
+    def search_many(self, keywords_list: list, location: str = "bangalore", num_jobs: int = 25) -> dict:
+        """Search several keywords in one batch; returns {keywords: jobs}."""
+        results = {keywords: [] for keywords in keywords_list}
         formatted_location = location.lower().replace(' ', '-')
         
         # Naukri public search URL
-        url = f"https://www.naukri.com/{formatted_keywords}-jobs-in-{formatted_location}"
+        batch = [
+            FetchRequest(f"https://www.naukri.com/{keywords.lower().replace(' ', '-')}-jobs-in-{formatted_location}",
+                         headers=self.headers, timeout=15, tag=keywords)
+            for keywords in results
+        ]
         
+        for result in self.engine.fetch_all(batch):
+            logging.info(f"🔍 Searching Naukri: {result.request.url}")
+            if result.response is None:
+                logging.warning(f"Error searching Naukri: {result.error}")
+            elif not result.ok:
+                logging.warning(f"Got status {result.status_code} from Naukri")
+            else:
+                results[result.request.tag] = self._parse_search_page(result.response, num_jobs)
+        
+        return results
+    
+    def _parse_search_page(self, response, num_jobs: int) -> list:
+        """Job dicts from a Naukri search results page."""
+        jobs = []
         try:
-            logging.info(f"🔍 Searching Naukri: {url}")
-            response = self.session.get(url, timeout=15)
+            # Find job cards (only they are parsed)
+            soup = parse_html(response.text, ['article', 'div'],
+                              {'class': re.compile(r'jobTuple|srp-jobtuple|cust-job-tuple')})
+            job_cards = soup.find_all('article', {'class': re.compile(r'jobTuple|srp-jobtuple')})
+            if not job_cards:
+                job_cards = soup.find_all('div', {'class': re.compile(r'jobTuple|cust-job-tuple')})
             
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Find job cards
-                job_cards = soup.find_all('article', {'class': re.compile(r'jobTuple|srp-jobtuple')})
-                if not job_cards:
-                    job_cards = soup.find_all('div', {'class': re.compile(r'jobTuple|cust-job-tuple')})
-                
-                for card in job_cards[:num_jobs]:
-                    try:
-                        job = self._parse_job_card(card)
-                        if job:
-                            jobs.append(job)
-                    except Exception as e:
-                        logging.debug(f"Error parsing Naukri job: {e}")
-                        continue
-                
-                logging.info(f"✅ Found {len(jobs)} jobs on Naukri")
-            else:
-                logging.warning(f"Got status {response.status_code} from Naukri")
-                
+            for card in job_cards[:num_jobs]:
+                try:
+                    job = self._parse_job_card(card)
+                    if job:
+                        jobs.append(job)
+                except Exception as e:
+                    logging.debug(f"Error parsing Naukri job: {e}")
+                    continue
+            
+            logging.info(f"✅ Found {len(jobs)} jobs on Naukri")
         except Exception as e:
             logging.warning(f"Error searching Naukri: {e}")
         
@@ -247,19 +277,11 @@ def scrape_jobs_public(keywords_list: list = None, location: str = "Bangalore")
     
     all_jobs = []
     
-    # LinkedIn scraper
-    linkedin_scraper = LinkedInPublicScraper()
-    for keyword in keywords_list:
-        jobs = linkedin_scraper.search_jobs(keyword, location, num_jobs=10)
-        all_jobs.extend(jobs)
-        time.sleep(random.uniform(3, 6))
-    
-    # Naukri scraper
-    naukri_scraper = NaukriPublicScraper()
-    for keyword in keywords_list:
-        jobs = naukri_scraper.search_jobs(keyword, location, num_jobs=10)
-        all_jobs.extend(jobs)
-        time.sleep(random.uniform(3, 6))
+    # Each site gets all keywords as one batch; the fetch engine paces requests per host
+    for scraper in (LinkedInPublicScraper(), NaukriPublicScraper()):
+        jobs_by_keyword = scraper.search_many(keywords_list, location, num_jobs=10)
+        for keyword in keywords_list:
+            all_jobs.extend(jobs_by_keyword.get(keyword, []))
     
     if all_jobs:
         df = pd.DataFrame(all_jobs)
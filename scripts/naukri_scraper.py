@@ -5,7 +5,7 @@ Scrapes job listings from Naukri.com - India's leading job portal.
 
 import os
 import re
-import time
+import sys
 import random
 import logging
 import requests
@@ -15,6 +15,14 @@ from typing import List, Dict, Optional
 from urllib.parse import quote_plus
 from bs4 import BeautifulSoup
 
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.html_parse import parse_html
+from utils.http_engine import get_fetch_engine
+from utils.job_dedup import dedupe_jobs
+from utils.seen_jobs import get_seen_jobs
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
@@ -73,6 +81,10 @@ class NaukriScraper:
         'remote': 'work-from-home-jobs',
     }
     
+    # Classes of the job card elements matched in scrape_page (with type="tuple"
+    # cards, the only part of the page parsed)
+    CARD_CLASSES = ['jobTuple', 'srp-jobtuple', 'job', 'list-item', 'job-card', 'cust-job-tuple']
+    
     # Experience levels
     EXPERIENCE_MAPPING = {
         'fresher': '0to1',
@@ -84,20 +96,23 @@ class NaukriScraper:
     
     def __init__(self, output_dir: str = 'data'):
         """Initialize the scraper."""
-        self.session = requests.Session()
+        # Shared fetch engine: per-host rate limit and retries replace the random sleeps
+        self.engine = get_fetch_engine()
+        # Jobs collected by earlier runs; pagination stops at the first fully known page
+        self.seen_jobs = get_seen_jobs()
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
         
-        # Rotate headers on each request
-        self._update_session_headers()
-        
         logging.info("🔍 Naukri.com Job Scraper initialized")
     
-    def _update_session_headers(self):
-        """Update session with fresh randomized headers."""
-        self.session.headers.update(self._get_headers())
+    def _page_is_known(self, jobs: List[Dict]) -> bool:
+        """Record a page of jobs; True if an earlier run had already seen all of them."""
+        known = self.seen_jobs.all_known(jobs)
+        self.seen_jobs.record(jobs)
+        return known
     
-    def _try_naukri_api(self, keywords: str, location: str = 'bangalore', experience: str = '3') -> List[Dict]:
+    def _try_naukri_api(self, keywords: str, location: str = 'bangalore', experience: str = '3',
+                        max_pages: int = 1) -> List[Dict]:
         """Try Naukri's internal API for better results."""
         jobs = []
         
@@ -128,43 +143,32 @@ class NaukriScraper:
                     'location': location,
                     'experience': experience,
                     'sort': 'relevance',
-                    'pageNo': 1,
                 }
                 
-                self._update_session_headers()
+                # Rotate headers on each request
                 api_headers = {
+                    **self._get_headers(),
                     'appid': '109',
                     'systemid': 'Starter',
                     'Accept': 'application/json',
                     'clientid': 'd3skt0p',
                     'gid': 'LOCATION,ENTITY,FUNCTION,EXPERIENCE,QUALIFICATION,COURSE,JOBAGE,INDUSTRY,SALARY',
                 }
-                self.session.headers.update(api_headers)
-                
-                response = self.session.get(api_url, params=params, timeout=15)
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    job_details = data.get('jobDetails', [])
+                for page in range(1, max_pages + 1):
+                    response = self.engine.get(api_url, params={**params, 'pageNo': page},
+                                               headers=api_headers, timeout=15)
+                    if response.status_code != 200:
+                        logging.debug(f"   {endpoint['type']} returned status {response.status_code}")
+                        break
                     
-                    for job_data in job_details:
-                        job = {
-                            'title': job_data.get('title', ''),
-                            'company': job_data.get('companyName', ''),
-                            'location': job_data.get('placeholders', [{}])[1].get('label', '') if len(job_data.get('placeholders', [])) > 1 else '',
-                            'experience': job_data.get('placeholders', [{}])[0].get('label', '') if job_data.get('placeholders') else '',
-                            'salary': job_data.get('placeholders', [{}])[2].get('label', '') if len(job_data.get('placeholders', [])) > 2 else '',
-                            'link': f"https://www.naukri.com{job_data.get('jdURL', '')}",
-                            'skills': ', '.join(job_data.get('tagsAndSkills', '').split(',')[:10]),
-                            'source': 'naukri.com',
-                            'scraped_at': datetime.now().isoformat(),
-                        }
-                        if job['title'] and job['company']:
-                            jobs.append(job)
-                            
-                    logging.info(f"   ✅ {endpoint['type']} returned {len(jobs)} jobs")
-                else:
-                    logging.debug(f"   {endpoint['type']} returned status {response.status_code}")
+                    page_jobs = self._parse_api_jobs(response.json().get('jobDetails', []))
+                    jobs.extend(page_jobs)
+                    if not page_jobs or self._page_is_known(page_jobs):
+                        break
+                
+                if jobs:
+                    logging.info(f"   ✅ {endpoint['type']} returned {len(jobs)} jobs ({page} page(s))")
                     
             except Exception as e:
                 logging.debug(f"{endpoint['type']} approach failed: {e}")
@@ -172,9 +176,30 @@ class NaukriScraper:
         # If APIs failed, try RSS feed (publicly accessible)
         if not jobs:
             jobs = self._try_naukri_rss(keywords, location)
+            self.seen_jobs.record(jobs)
         
         return jobs
     
+    @staticmethod
+    def _parse_api_jobs(job_details: List[Dict]) -> List[Dict]:
+        """Job dicts from one page of the search API's ``jobDetails``."""
+        jobs = []
+        for job_data in job_details:
+            job = {
+                'title': job_data.get('title', ''),
+                'company': job_data.get('companyName', ''),
+                'location': job_data.get('placeholders', [{}])[1].get('label', '') if len(job_data.get('placeholders', [])) > 1 else '',
+                'experience': job_data.get('placeholders', [{}])[0].get('label', '') if job_data.get('placeholders') else '',
+                'salary': job_data.get('placeholders', [{}])[2].get('label', '') if len(job_data.get('placeholders', [])) > 2 else '',
+                'link': f"https://www.naukri.com{job_data.get('jdURL', '')}",
+                'skills': ', '.join(job_data.get('tagsAndSkills', '').split(',')[:10]),
+                'source': 'naukri.com',
+                'scraped_at': datetime.now().isoformat(),
+            }
+            if job['title'] and job['company']:
+                jobs.append(job)
+        return jobs
+    
     def _try_naukri_rss(self, keywords: str, location: str = 'bangalore') -> List[Dict]:
         """Try Naukri RSS feed as fallback - less likely to be blocked."""
         jobs = []
@@ -183,8 +208,7 @@ class NaukriScraper:
             keyword_slug = keywords.replace(' ', '-').lower()
             rss_url = f"https://www.naukri.com/rss/{keyword_slug}-jobs-in-{location}"
             
-            self._update_session_headers()
-            response = self.session.get(rss_url, timeout=15)
+            response = self.engine.get(rss_url, headers=self._get_headers(), timeout=15)
             
             if response.status_code == 200:
                 soup = BeautifulSoup(response.text, 'xml')
@@ -311,33 +335,30 @@ class NaukriScraper:
             logging.debug(f"Error extracting job: {e}")
             return None
     
+    @classmethod
+    def _is_card(cls, name: str, attrs: dict) -> bool:
+        """Tags any of the job card selectors below can match."""
+        return attrs.get('type') == 'tuple' or any(c in cls.CARD_CLASSES for c in attrs.get('class', '').split())
+    
     def scrape_page(self, url: str) -> List[Dict]:
         """Scrape a single page of job listings."""
         jobs = []
         
         try:
-            # Rotate headers before each request
-            self._update_session_headers()
-            
-            # Add random delay to appear more human-like
-            time.sleep(random.uniform(1, 3))
-            
             logging.info(f"🌐 Fetching: {url[:80]}...")
-            response = self.session.get(url, timeout=15)
+            # Rotate headers before each request
+            response = self.engine.get(url, headers=self._get_headers(), timeout=15)
             
             if response.status_code == 403:
                 logging.warning("⚠️ Access blocked - trying alternative approach...")
-                # Try with fresh session
-                self.session = requests.Session()
-                self._update_session_headers()
-                time.sleep(random.uniform(3, 5))
-                response = self.session.get(url, timeout=15)
+                # Try again without the cookies that got us flagged
+                response = self.engine.get(url, headers=self._get_headers(), timeout=15, cookies=False)
             
             if response.status_code != 200:
                 logging.warning(f"⚠️ Got status {response.status_code}")
                 return jobs
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = parse_html(response.text, match=self._is_card)
             
             # Try different job card selectors
             job_cards = (
@@ -366,7 +387,11 @@ class NaukriScraper:
                     experience: str = None,
                     max_pages: int = 3,
                     max_jobs: int = 50) -> List[Dict]:
-        """Search for jobs with given criteria."""
+        """Search for jobs with given criteria.
+        
+        Pages are fetched in order until one is empty, ``max_jobs`` is reached
+        or every job on a page was already seen by an earlier run.
+        """
         
         all_jobs = []
         
@@ -381,7 +406,8 @@ class NaukriScraper:
         api_jobs = self._try_naukri_api(
             keywords=' '.join(keywords),
             location=location or 'bangalore',
-            experience=exp_code
+            experience=exp_code,
+            max_pages=max_pages
         )
         
         if api_jobs:
@@ -400,15 +426,16 @@ class NaukriScraper:
                 logging.info(f"📊 Page {page}: Got {len(jobs)} jobs (Total: {len(all_jobs)})")
                 
                 if len(all_jobs) >= max_jobs:
+                    self.seen_jobs.record(jobs)
                     all_jobs = all_jobs[:max_jobs]
                     break
                 
                 if not jobs:
                     break
                 
-                # Be polite - random delay between pages
-                delay = random.uniform(2, 4)
-                time.sleep(delay)
+                if self._page_is_known(jobs):
+                    logging.info(f"⏹️ Page {page} only has jobs seen before - stopping")
+                    break
         
         return all_jobs
     
@@ -416,6 +443,7 @@ class NaukriScraper:
         """Run multiple search queries and combine results."""
         all_jobs = []
         seen_links = set()
+        known_before = len(self.seen_jobs)
         
         for search in searches:
             keywords = search.get('keywords', [])
@@ -436,10 +464,8 @@ class NaukriScraper:
                 if link and link not in seen_links:
                     seen_links.add(link)
                     all_jobs.append(job)
-            
-            # Delay between searches
-            time.sleep(random.uniform(3, 5))
         
+        logging.info(f"🆕 {len(self.seen_jobs) - known_before} jobs not seen in earlier runs")
         return all_jobs
     
     def save_results(self, jobs: List[Dict], filename: str = 'naukri_jobs.csv') -> str:
@@ -485,6 +511,8 @@ class NaukriScraper:
                 combined = combined.drop_duplicates(subset=['link'], keep='first')
             else:
                 combined = combined.drop_duplicates(subset=['title', 'company'], keep='first')
+            # Same posting from other sources under a slightly different title/company
+            combined = dedupe_jobs(combined)
             
             combined.to_csv(filepath, index=False)
             logging.info(f"📊 Merged: {len(new_jobs)} new + {len(existing_df)} existing = {len(combined)} total jobs")
@@ -3,18 +3,27 @@ Reliable Job Scraper - Uses multiple reliable sources that actually work
 Includes RSS feeds, Google Jobs, and curated company career pages
 """
 
-import requests
-from bs4 import BeautifulSoup
 import feedparser
 import logging
 import pandas as pd
 import os
+import sys
 import time
 import random
 import re
 from urllib.parse import quote_plus
 from datetime import datetime
 
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.html_parse import find_cards
+from utils.http_engine import FetchRequest, get_fetch_engine
+from utils.job_dedup import dedupe_jobs
+from utils.seen_jobs import get_seen_jobs
+from utils.source_fanout import emit, fan_out, log_result
+from utils.source_health import get_source_health
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 
 
@@ -31,12 +40,11 @@ class ReliableJobScraper:
     
     def __init__(self, location: str = "Bangalore"):
         self.location = location
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9',
-        })
+        # Shared fetch engine: the same per-host limits (HTTP_*) as every other scraper
+        self.engine = get_fetch_engine()
+        # Sources that keep failing are skipped until their circuit lets them be probed again
+        self.health = get_source_health()
+        self.seen_jobs = get_seen_jobs()
         self.all_jobs = []
         
         # Target keywords for jobs - read from environment variable (REQUIRED)
@@ -57,51 +65,91 @@ class ReliableJobScraper:
             ]
         
     def scrape_all_sources(self) -> list:
-        """Scrape from all reliable sources."""
-        logging.info("🚀 Starting reliable job scraping from multiple sources...")
-        
-        # 1. RemoteOK API (actually works, free, no auth)
-        self._scrape_remoteok()
-        
-        # 2. Arbeitnow API (free, no auth, remote jobs)
-        self._scrape_arbeitnow()
-        
-        # 3. Himalayas API (free, remote jobs)
-        self._scrape_himalayas()
-        
-        # 4. Jobicy API (free, remote jobs)
-        self._scrape_jobicy()
-        
-        # 5. Adzuna API (free tier, global jobs)
-        self._scrape_adzuna()
-        
-        # 6. Direct company career pages (most reliable)
-        self._scrape_direct_career_pages()
+        """Scrape from all reliable sources concurrently.
         
-        # 7. Google Jobs via RSS proxies
-        self._scrape_google_jobs_rss()
-        
-        # 8. Indian job sites
-        self._scrape_indian_job_sites()
-        
-        # 9. Startup/tech specific sites
-        self._scrape_startup_jobs()
-        
-        # 10. Job aggregator RSS feeds
-        self._scrape_job_aggregators()
+        Sources run on a bounded pool (SCRAPE_WORKERS) and their jobs are
+        merged as each one finishes; a source that overruns its deadline
+        (SCRAPE_SOURCE_DEADLINE) contributes what it found so far. Sources
+        with an open circuit (utils.source_health) are skipped.
+        """
+        logging.info("🚀 Starting reliable job scraping from multiple sources...")
+        started = time.monotonic()
+        
+        sources = [
+            # RemoteOK API (actually works, free, no auth)
+            ('RemoteOK', self._scrape_remoteok),
+            # Arbeitnow API (free, no auth, remote jobs)
+            ('Arbeitnow', self._scrape_arbeitnow),
+            # Himalayas API (free, remote jobs)
+            ('Himalayas', self._scrape_himalayas),
+            # Jobicy API (free, remote jobs)
+            ('Jobicy', self._scrape_jobicy),
+            # Adzuna API (free tier, global jobs)
+            ('Adzuna', self._scrape_adzuna),
+            # Direct company career pages (most reliable)
+            ('Career pages', self._scrape_direct_career_pages),
+            # Google Jobs via RSS proxies
+            ('Google Jobs RSS', self._scrape_google_jobs_rss),
+            # Indian job sites
+            ('Freshersworld', self._scrape_freshersworld),
+            ('Instahyre', self._scrape_instahyre),
+            ('Cutshort', self._scrape_cutshort),
+            ('Hirist', self._scrape_hirist),
+            ('IIMJobs', self._scrape_iimjobs),
+            # Startup/tech specific sites
+            ('Startup sites', self._scrape_startup_jobs),
+            # Job aggregator RSS feeds
+            ('Aggregators', self._scrape_job_aggregators),
+            # GitHub/Dev focused job boards
+            ('WeWorkRemotely', self._scrape_weworkremotely),
+            ('Working Nomads', self._scrape_workingnomads),
+            ('Authentic Jobs', self._scrape_authentic_jobs),
+        ]
         
-        # 11. GitHub/Dev focused job boards
-        self._scrape_dev_job_boards()
+        for result in fan_out(self.health.admit(sources)):
+            log_result(result)
+            self.health.record(result, new_jobs=self.seen_jobs.record(result.items))
+            self.all_jobs.extend(result.items)
         
-        logging.info(f"✅ Total jobs scraped: {len(self.all_jobs)}")
+        self.health.log_summary([name for name, _ in sources])
+        logging.info(f"✅ Total jobs scraped: {len(self.all_jobs)} in {time.monotonic() - started:.1f}s")
         return self.all_jobs
     
+    def _add_job(self, job_entry: dict):
+        """Record a job for the running source (or directly when called on its own)."""
+        if not emit(job_entry):
+            self.all_jobs.append(job_entry)
+    
+    def _get_cached(self, url: str, source: str):
+        """GET through the fetch engine and the HTTP cache (304s are served from disk)."""
+        return self.engine.get(url, cache_source=source, timeout=15)
+    
+    def _parse_feed(self, url: str, source: str):
+        """Fetch an RSS feed through the fetch engine (timeout + host limits) and parse it."""
+        response = self._get_cached(url, source)
+        return feedparser.parse(response.content)
+    
+    def _fetch_batch(self, urls: dict, timeout: int = 15, cache_source: str = None):
+        """Fetch ``{tag: url}`` as one batch; yields (tag, response) for 200 responses."""
+        batch = [FetchRequest(url, timeout=timeout, tag=tag, cache_source=cache_source)
+                 for tag, url in urls.items()]
+        for result in self.engine.fetch_all(batch):
+            if result.ok:
+                yield result.request.tag, result.response
+    
+    def _parse_feeds(self, urls: dict, source: str):
+        """Fetch ``{tag: url}`` RSS feeds as one cached batch; yields (tag, parsed feed)."""
+        batch = [FetchRequest(url, timeout=15, tag=tag, cache_source=source) for tag, url in urls.items()]
+        for result in self.engine.fetch_all(batch):
+            if result.response is not None:
+                yield result.request.tag, feedparser.parse(result.response.content)
+    
     def _scrape_arbeitnow(self):
         """Arbeitnow - Free API for remote jobs, no auth required."""
         try:
             logging.info("📡 Scraping Arbeitnow API (free, no auth)...")
             url = "https://www.arbeitnow.com/api/job-board-api"
-            response = self.session.get(url, timeout=15)
+            response = self._get_cached(url, 'arbeitnow')
             
             if response.status_code == 200:
                 data = response.json()
@@ -122,29 +170,53 @@ class ReliableJobScraper:
                     }
                     
                     if job_entry['title'] and job_entry['company']:
-                        self.all_jobs.append(job_entry)
+                        self._add_job(job_entry)
                         count += 1
                         
                 logging.info(f"   ✅ Found {count} jobs from Arbeitnow")
                 
         except Exception as e:
             logging.warning(f"   ⚠️ Arbeitnow error: {e}")
-        
-        time.sleep(0.3)
     
     def _scrape_himalayas(self):
-        """Himalayas.app - DISABLED due to consistent 403 blocks."""
-        # Himalayas is consistently blocking requests with 403 Forbidden
-        # Skipping to save time and avoid wasted API calls
-        logging.info("📡 Skipping Himalayas API (blocked by 403)")
-        return
+        """Himalayas.app - Free remote jobs API (often answers 403; its circuit backs it off)."""
+        try:
+            logging.info("📡 Scraping Himalayas API (free, remote jobs)...")
+            url = "https://himalayas.app/jobs/api?limit=50"
+            response = self._get_cached(url, 'himalayas')
+            
+            if response.status_code == 200:
+                jobs_data = response.json().get('jobs', [])
+                count = 0
+                
+                for job in jobs_data:
+                    job_entry = {
+                        'title': job.get('title', ''),
+                        'company': job.get('companyName', ''),
+                        'location': ', '.join(job.get('locationRestrictions') or []) or 'Remote',
+                        'url': job.get('applicationLink', ''),
+                        'description': (job.get('excerpt') or '')[:500],
+                        'source': 'himalayas',
+                        'scraped_at': datetime.now().isoformat(),
+                    }
+                    
+                    if job_entry['title'] and job_entry['company']:
+                        self._add_job(job_entry)
+                        count += 1
+                
+                logging.info(f"   ✅ Found {count} jobs from Himalayas")
+            else:
+                logging.warning(f"   ⚠️ Himalayas returned status {response.status_code}")
+                
+        except Exception as e:
+            logging.warning(f"   ⚠️ Himalayas error: {e}")
     
     def _scrape_jobicy(self):
         """Jobicy - Free remote jobs API."""
         try:
             logging.info("📡 Scraping Jobicy API (free, remote jobs)...")
             url = "https://jobicy.com/api/v2/remote-jobs?count=50"
-            response = self.session.get(url, timeout=15)
+            response = self._get_cached(url, 'jobicy')
             
             if response.status_code == 200:
                 data = response.json()
@@ -165,47 +237,37 @@ class ReliableJobScraper:
                     }
                     
                     if job_entry['title'] and job_entry['company']:
-                        self.all_jobs.append(job_entry)
+                        self._add_job(job_entry)
                         count += 1
                         
                 logging.info(f"   ✅ Found {count} jobs from Jobicy")
                 
         except Exception as e:
             logging.warning(f"   ⚠️ Jobicy error: {e}")
-        
-        time.sleep(0.3)
     
     def _scrape_adzuna(self):
         """Adzuna - Job search with free RSS feeds."""
         try:
             logging.info("📡 Scraping Adzuna RSS feeds...")
             
-            # Adzuna India RSS feeds (no API key needed for RSS)
-            for keyword in self.search_keywords[:3]:
-                encoded = quote_plus(keyword)
-                rss_url = f"https://www.adzuna.in/search/rss?q={encoded}&loc=India"
-                
-                try:
-                    feed = feedparser.parse(rss_url)
-                    
-                    for entry in feed.entries[:10]:
-                        job_entry = {
-                            'title': entry.get('title', ''),
-                            'company': self._extract_company_from_title(entry.get('title', '')),
-                            'location': self.location,
-                            'url': entry.get('link', ''),
-                            'description': entry.get('summary', '')[:500],
-                            'source': 'adzuna',
-                            'scraped_at': datetime.now().isoformat()
-                        }
-                        
-                        if job_entry['title']:
-                            self.all_jobs.append(job_entry)
-                            
-                except Exception:
-                    pass
+            # Adzuna India RSS feeds (no API key needed for RSS), fetched as one batch
+            feeds = {keyword: f"https://www.adzuna.in/search/rss?q={quote_plus(keyword)}&loc=India"
+                     for keyword in self.search_keywords[:3]}
+            
+            for _, feed in self._parse_feeds(feeds, 'adzuna'):
+                for entry in feed.entries[:10]:
+                    job_entry = {
+                        'title': entry.get('title', ''),
+                        'company': self._extract_company_from_title(entry.get('title', '')),
+                        'location': self.location,
+                        'url': entry.get('link', ''),
+                        'description': entry.get('summary', '')[:500],
+                        'source': 'adzuna',
+                        'scraped_at': datetime.now().isoformat()
+                    }
                     
-                time.sleep(0.5)
+                    if job_entry['title']:
+                        self._add_job(job_entry)
                 
             logging.info(f"   ✅ Scraped Adzuna RSS feeds")
                 
@@ -222,34 +284,14 @@ class ReliableJobScraper:
                 return parts[-1].strip()
         return 'Various'
     
-    def _scrape_indian_job_sites(self):
-        """Scrape Indian-specific job sites."""
-        logging.info("🇮🇳 Scraping Indian job sites...")
-        
-        # Freshersworld (for freshers)
-        self._scrape_freshersworld()
-        
-        # Instahyre
-        self._scrape_instahyre()
-        
-        # Cutshort
-        self._scrape_cutshort()
-        
-        # Hirist
-        self._scrape_hirist()
-        
-        # IIMJobs
-        self._scrape_iimjobs()
-    
     def _scrape_freshersworld(self):
         """Freshersworld - Indian freshers job portal."""
         try:
             url = "https://www.freshersworld.com/jobs/category/it-software-jobs"
-            response = self.session.get(url, timeout=15)
+            response = self.engine.get(url, timeout=15)
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                job_cards = soup.find_all('div', {'class': re.compile(r'job-container|job_listing')})
+                job_cards = find_cards(response.text, 'div', {'class': re.compile(r'job-container|job_listing')})
                 count = 0
                 
                 for card in job_cards[:15]:
@@ -266,7 +308,7 @@ class ReliableJobScraper:
                             'source': 'freshersworld',
                             'scraped_at': datetime.now().isoformat()
                         }
-                        self.all_jobs.append(job_entry)
+                        self._add_job(job_entry)
                         count += 1
                 
                 if count:
@@ -274,19 +316,16 @@ class ReliableJobScraper:
                     
         except Exception as e:
             logging.debug(f"   Freshersworld: {e}")
-        
-        time.sleep(0.3)
     
     def _scrape_instahyre(self):
         """Instahyre - Indian tech job portal."""
         try:
             # Instahyre public job listings page
             url = "https://www.instahyre.com/search-jobs/"
-            response = self.session.get(url, timeout=15)
+            response = self.engine.get(url, timeout=15)
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                job_cards = soup.find_all('div', {'class': re.compile(r'job-card|opportunity')})
+                job_cards = find_cards(response.text, 'div', {'class': re.compile(r'job-card|opportunity')})
                 count = 0
                 
                 for card in job_cards[:20]:
@@ -302,7 +341,7 @@ class ReliableJobScraper:
                             'source': 'instahyre',
                             'scraped_at': datetime.now().isoformat()
                         }
-                        self.all_jobs.append(job_entry)
+                        self._add_job(job_entry)
                         count += 1
                 
                 if count:
@@ -310,18 +349,15 @@ class ReliableJobScraper:
                     
         except Exception as e:
             logging.debug(f"   Instahyre: {e}")
-        
-        time.sleep(0.3)
     
     def _scrape_cutshort(self):
         """Cutshort - Indian startup job portal."""
         try:
             url = "https://cutshort.io/jobs"
-            response = self.session.get(url, timeout=15)
+            response = self.engine.get(url, timeout=15)
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                job_cards = soup.find_all('div', {'class': re.compile(r'job-card|opportunity-card')})
+                job_cards = find_cards(response.text, 'div', {'class': re.compile(r'job-card|opportunity-card')})
                 count = 0
                 
                 for card in job_cards[:20]:
@@ -337,7 +373,7 @@ class ReliableJobScraper:
                             'source': 'cutshort',
                             'scraped_at': datetime.now().isoformat()
                         }
-                        self.all_jobs.append(job_entry)
+                        self._add_job(job_entry)
                         count += 1
                 
                 if count:
@@ -345,36 +381,31 @@ class ReliableJobScraper:
                     
         except Exception as e:
             logging.debug(f"   Cutshort: {e}")
-        
-        time.sleep(0.3)
     
     def _scrape_hirist(self):
         """Hirist - Indian tech/startup jobs."""
         try:
-            for keyword in ['python', 'data-analyst', 'software-engineer']:
-                url = f"https://www.hirist.tech/{keyword}-jobs"
-                response = self.session.get(url, timeout=15)
+            urls = {keyword: f"https://www.hirist.tech/{keyword}-jobs"
+                    for keyword in ['python', 'data-analyst', 'software-engineer']}
+            
+            for keyword, response in self._fetch_batch(urls):
+                url = urls[keyword]
+                job_cards = find_cards(response.text, 'div', {'class': re.compile(r'job|listing')})
                 
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    job_cards = soup.find_all('div', {'class': re.compile(r'job|listing')})
+                for card in job_cards[:10]:
+                    title_elem = card.find(['h2', 'h3', 'a'])
+                    company_elem = card.find(['span', 'div'], {'class': re.compile(r'company')})
                     
-                    for card in job_cards[:10]:
-                        title_elem = card.find(['h2', 'h3', 'a'])
-                        company_elem = card.find(['span', 'div'], {'class': re.compile(r'company')})
-                        
-                        if title_elem:
-                            job_entry = {
-                                'title': title_elem.get_text(strip=True),
-                                'company': company_elem.get_text(strip=True) if company_elem else 'Tech Company',
-                                'location': self.location,
-                                'url': url,
-                                'source': 'hirist',
-                                'scraped_at': datetime.now().isoformat()
-                            }
-                            self.all_jobs.append(job_entry)
-                
-                time.sleep(0.5)
+                    if title_elem:
+                        job_entry = {
+                            'title': title_elem.get_text(strip=True),
+                            'company': company_elem.get_text(strip=True) if company_elem else 'Tech Company',
+                            'location': self.location,
+                            'url': url,
+                            'source': 'hirist',
+                            'scraped_at': datetime.now().isoformat()
+                        }
+                        self._add_job(job_entry)
                 
         except Exception as e:
             logging.debug(f"   Hirist: {e}")
@@ -383,11 +414,10 @@ class ReliableJobScraper:
         """IIMJobs - Indian management/professional jobs."""
         try:
             url = "https://www.iimjobs.com/j/data-analyst-jobs.html"
-            response = self.session.get(url, timeout=15)
+            response = self.engine.get(url, timeout=15)
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                job_cards = soup.find_all('div', {'class': re.compile(r'job-wrap|listing')})
+                job_cards = find_cards(response.text, 'div', {'class': re.compile(r'job-wrap|listing')})
                 count = 0
                 
                 for card in job_cards[:15]:
@@ -403,7 +433,7 @@ class ReliableJobScraper:
                             'source': 'iimjobs',
                             'scraped_at': datetime.now().isoformat()
                         }
-                        self.all_jobs.append(job_entry)
+                        self._add_job(job_entry)
                         count += 1
                 
                 if count:
@@ -411,51 +441,28 @@ class ReliableJobScraper:
                     
         except Exception as e:
             logging.debug(f"   IIMJobs: {e}")
-        
-        time.sleep(0.3)
-    
-    def _scrape_dev_job_boards(self):
-        """Scrape developer-focused job boards."""
-        logging.info("💻 Scraping developer job boards...")
-        
-        # WeWorkRemotely
-        self._scrape_weworkremotely()
-        
-        # Working Nomads
-        self._scrape_workingnomads()
-        
-        # Authentic Jobs
-        self._scrape_authentic_jobs()
     
     def _scrape_weworkremotely(self):
         """WeWorkRemotely - Popular remote job board."""
         try:
             categories = ['programming', 'devops-sysadmin', 'data']
+            feeds = {category: f"https://weworkremotely.com/categories/{category}/jobs.rss"
+                     for category in categories}
             
-            for category in categories:
-                url = f"https://weworkremotely.com/categories/{category}/jobs.rss"
-                
-                try:
-                    feed = feedparser.parse(url)
-                    
-                    for entry in feed.entries[:10]:
-                        job_entry = {
-                            'title': entry.get('title', ''),
-                            'company': entry.get('author', 'Remote Company'),
-                            'location': 'Remote',
-                            'url': entry.get('link', ''),
-                            'description': entry.get('summary', '')[:500],
-                            'source': 'weworkremotely',
-                            'scraped_at': datetime.now().isoformat()
-                        }
-                        
-                        if job_entry['title']:
-                            self.all_jobs.append(job_entry)
-                            
-                except Exception:
-                    pass
+            for _, feed in self._parse_feeds(feeds, 'weworkremotely'):
+                for entry in feed.entries[:10]:
+                    job_entry = {
+                        'title': entry.get('title', ''),
+                        'company': entry.get('author', 'Remote Company'),
+                        'location': 'Remote',
+                        'url': entry.get('link', ''),
+                        'description': entry.get('summary', '')[:500],
+                        'source': 'weworkremotely',
+                        'scraped_at': datetime.now().isoformat()
+                    }
                     
-                time.sleep(0.5)
+                    if job_entry['title']:
+                        self._add_job(job_entry)
                 
             logging.info("   ✅ Scraped WeWorkRemotely")
                 
@@ -466,7 +473,7 @@ class ReliableJobScraper:
         """Working Nomads - Remote job aggregator with RSS."""
         try:
             url = "https://www.workingnomads.com/jobs.rss"
-            feed = feedparser.parse(url)
+            feed = self._parse_feed(url, 'workingnomads')
             count = 0
             
             for entry in feed.entries[:20]:
@@ -481,7 +488,7 @@ class ReliableJobScraper:
                 }
                 
                 if job_entry['title']:
-                    self.all_jobs.append(job_entry)
+                    self._add_job(job_entry)
                     count += 1
                     
             if count:
@@ -489,14 +496,12 @@ class ReliableJobScraper:
                 
         except Exception as e:
             logging.debug(f"   Working Nomads: {e}")
-        
-        time.sleep(0.3)
     
     def _scrape_authentic_jobs(self):
         """Authentic Jobs - Design & dev jobs with RSS."""
         try:
             url = "https://authenticjobs.com/rss/"
-            feed = feedparser.parse(url)
+            feed = self._parse_feed(url, 'authenticjobs')
             count = 0
             
             for entry in feed.entries[:15]:
@@ -511,7 +516,7 @@ class ReliableJobScraper:
                 }
                 
                 if job_entry['title']:
-                    self.all_jobs.append(job_entry)
+                    self._add_job(job_entry)
                     count += 1
                     
             if count:
@@ -525,7 +530,7 @@ class ReliableJobScraper:
         try:
             logging.info("📡 Scraping RemoteOK (free API)...")
             url = "https://remoteok.com/api"
-            response = self.session.get(url, timeout=15)
+            response = self._get_cached(url, 'remoteok')
             
             if response.status_code == 200:
                 jobs_data = response.json()
@@ -546,15 +551,13 @@ class ReliableJobScraper:
                         }
                         
                         if job_entry['title'] and job_entry['company']:
-                            self.all_jobs.append(job_entry)
+                            self._add_job(job_entry)
                             count += 1
                             
                 logging.info(f"   ✅ Found {count} jobs from RemoteOK")
                 
         except Exception as e:
             logging.warning(f"   ⚠️ RemoteOK error: {e}")
-            
-        time.sleep(0.3)
     
     def _scrape_direct_career_pages(self):
         """Scrape directly from company career pages - most reliable."""
@@ -602,29 +605,22 @@ class ReliableJobScraper:
         # Use JOB_KEYWORDS for job title instead of hardcoded "Data Analyst"
         job_title_from_keywords = self.search_keywords[0].title() if self.search_keywords else 'Open Positions'
         
-        for company_name, career_url in career_pages:
-            try:
-                response = self.session.get(career_url, timeout=10)
-                
-                if response.status_code == 200:
-                    # Create a job entry for each company (HR contact reference)
-                    job_entry = {
-                        'title': job_title_from_keywords,
-                        'company': company_name,
-                        'location': self.location,
-                        'url': career_url,
-                        'description': f'Career opportunities at {company_name}',
-                        'source': 'direct_career_page',
-                        'scraped_at': datetime.now().isoformat(),
-                        'career_page': career_url
-                    }
-                    self.all_jobs.append(job_entry)
-                    
-            except Exception as e:
-                logging.debug(f"   Skipping {company_name}: {e}")
-                continue
-                
-            time.sleep(0.5)
+        # One batch: the pages are on ~30 different hosts, so they load side by side
+        pages = dict(career_pages)
+        for company_name, _ in self._fetch_batch(pages, timeout=10):
+            career_url = pages[company_name]
+            # Create a job entry for each company (HR contact reference)
+            job_entry = {
+                'title': job_title_from_keywords,
+                'company': company_name,
+                'location': self.location,
+                'url': career_url,
+                'description': f'Career opportunities at {company_name}',
+                'source': 'direct_career_page',
+                'scraped_at': datetime.now().isoformat(),
+                'career_page': career_url
+            }
+            self._add_job(job_entry)
             
         logging.info(f"   ✅ Added {len(career_pages)} company career page references")
     
@@ -633,31 +629,23 @@ class ReliableJobScraper:
         try:
             logging.info("📡 Trying Google Jobs RSS feeds...")
             
-            # Use RSS aggregators that index Google Jobs
-            for keyword in self.search_keywords[:3]:
-                # Try Google News search for job postings (as a fallback)
-                encoded = quote_plus(f"{keyword} jobs {self.location}")
-                rss_url = f"https://news.google.com/rss/search?q={encoded}+hiring&hl=en-IN&gl=IN&ceid=IN:en"
-                
-                try:
-                    feed = feedparser.parse(rss_url)
-                    
-                    for entry in feed.entries[:5]:
-                        job_entry = {
-                            'title': entry.get('title', keyword),
-                            'company': 'Various (see link)',
-                            'location': self.location,
-                            'url': entry.get('link', ''),
-                            'description': entry.get('summary', '')[:500],
-                            'source': 'google_news_jobs',
-                            'scraped_at': datetime.now().isoformat()
-                        }
-                        self.all_jobs.append(job_entry)
-                        
-                except Exception:
-                    pass
-                    
-                time.sleep(0.3)
+            # Google News search for job postings (as a fallback), one feed per keyword
+            feeds = {keyword: "https://news.google.com/rss/search?q="
+                              f"{quote_plus(f'{keyword} jobs {self.location}')}+hiring&hl=en-IN&gl=IN&ceid=IN:en"
+                     for keyword in self.search_keywords[:3]}
+            
+            for keyword, feed in self._parse_feeds(feeds, 'google_news'):
+                for entry in feed.entries[:5]:
+                    job_entry = {
+                        'title': entry.get('title', keyword),
+                        'company': 'Various (see link)',
+                        'location': self.location,
+                        'url': entry.get('link', ''),
+                        'description': entry.get('summary', '')[:500],
+                        'source': 'google_news_jobs',
+                        'scraped_at': datetime.now().isoformat()
+                    }
+                    self._add_job(job_entry)
                 
         except Exception as e:
             logging.warning(f"   ⚠️ Google Jobs RSS error: {e}")
@@ -670,12 +658,10 @@ class ReliableJobScraper:
             # HasJob (Indian startup jobs, actually works)
             try:
                 url = "https://hasjob.co/?location=Bangalore"
-                response = self.session.get(url, timeout=15)
+                response = self.engine.get(url, timeout=15)
                 
                 if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    job_listings = soup.find_all('a', {'class': 'post-title'})
+                    job_listings = find_cards(response.text, 'a', {'class': 'post-title'})
                     count = 0
                     
                     for listing in job_listings[:20]:
@@ -691,7 +677,7 @@ class ReliableJobScraper:
                                 'source': 'hasjob',
                                 'scraped_at': datetime.now().isoformat()
                             }
-                            self.all_jobs.append(job_entry)
+                            self._add_job(job_entry)
                             count += 1
                             
                     logging.info(f"   ✅ Found {count} jobs from HasJob")
@@ -707,40 +693,29 @@ class ReliableJobScraper:
         try:
             logging.info("📋 Scraping job aggregators...")
             
-            # SimplyHired RSS (when available)
-            for keyword in self.search_keywords[:2]:
-                try:
-                    encoded = quote_plus(keyword)
-                    location_encoded = quote_plus(self.location)
-                    
-                    # Try SimplyHired
-                    url = f"https://www.simplyhired.com/search?q={encoded}&l={location_encoded}"
-                    response = self.session.get(url, timeout=10)
-                    
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.text, 'html.parser')
-                        
-                        job_cards = soup.find_all('article', {'class': re.compile(r'jobCard|SerpJob')})
-                        
-                        for card in job_cards[:10]:
-                            title_elem = card.find(['h2', 'h3', 'a'])
-                            company_elem = card.find(['span', 'div'], {'class': re.compile(r'company|employer')})
-                            
-                            if title_elem:
-                                job_entry = {
-                                    'title': title_elem.get_text(strip=True),
-                                    'company': company_elem.get_text(strip=True) if company_elem else 'Various',
-                                    'location': self.location,
-                                    'url': url,
-                                    'source': 'simplyhired',
-                                    'scraped_at': datetime.now().isoformat()
-                                }
-                                self.all_jobs.append(job_entry)
-                                
-                except Exception:
-                    pass
+            # SimplyHired search pages, one per keyword, fetched as one batch
+            location_encoded = quote_plus(self.location)
+            urls = {keyword: f"https://www.simplyhired.com/search?q={quote_plus(keyword)}&l={location_encoded}"
+                    for keyword in self.search_keywords[:2]}
+            
+            for keyword, response in self._fetch_batch(urls, timeout=10):
+                url = urls[keyword]
+                job_cards = find_cards(response.text, 'article', {'class': re.compile(r'jobCard|SerpJob')})
+                
+                for card in job_cards[:10]:
+                    title_elem = card.find(['h2', 'h3', 'a'])
+                    company_elem = card.find(['span', 'div'], {'class': re.compile(r'company|employer')})
                     
-                time.sleep(0.3)
+                    if title_elem:
+                        job_entry = {
+                            'title': title_elem.get_text(strip=True),
+                            'company': company_elem.get_text(strip=True) if company_elem else 'Various',
+                            'location': self.location,
+                            'url': url,
+                            'source': 'simplyhired',
+                            'scraped_at': datetime.now().isoformat()
+                        }
+                        self._add_job(job_entry)
                 
         except Exception as e:
             logging.warning(f"   ⚠️ Aggregator error: {e}")
@@ -757,8 +732,9 @@ class ReliableJobScraper:
         if self.all_jobs:
             df = pd.DataFrame(self.all_jobs)
             
-            # Remove duplicates by title+company
+            # Remove duplicates by title+company, then near-duplicates across sources
             df = df.drop_duplicates(subset=['title', 'company'], keep='first')
+            df = dedupe_jobs(df)
             
             df.to_csv(filepath, index=False)
             logging.info(f"💾 Saved {len(df)} jobs to {filepath}")
@@ -4,19 +4,21 @@ Automatically categorizes responses and updates application status
 """
 
 import imaplib
-import email
 from email.header import decode_header
-import re
 import os
 import sys
 import logging
-import pandas as pd
-from datetime import datetime, timedelta
+import time
+from datetime import datetime
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.config import USER_DETAILS
+from utils.storage import get_storage
+from utils.company_index import CompanyIndex
+from utils.text_rules import compile_any
+from utils.inbox_scanner import InboxHandler, InboxScanner
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 
@@ -57,6 +59,13 @@ class ReplyDetector:
         r'do not reply', r'noreply', r'no-reply'
     ]
     
+    # Positive keywords that make a positive reply an interview request / offer
+    INTERVIEW_HINTS = frozenset(['interview', 'schedule', 'call', 'meeting'])
+    OFFER_HINTS = frozenset(['offer', 'join'])
+    
+    # Compiled once into a single scan (applied to lower-cased text)
+    AUTO_REPLY_RE = compile_any(AUTO_REPLY_PATTERNS)
+    
     def __init__(self):
         self.email_address = USER_DETAILS.get('email', '')
         self.password = os.getenv('SENDER_PASSWORD', '')
@@ -69,6 +78,7 @@ class ReplyDetector:
         # Paths for output files
         self.replies_log_path = os.path.join(self.data_path, 'hr_replies.csv')
         self.interview_requests_path = os.path.join(self.data_path, 'interview_requests.csv')
+        self.storage = get_storage()
         
     def connect_to_inbox(self):
         """Connect to email inbox via IMAP."""
@@ -122,10 +132,7 @@ class ReplyDetector:
     def is_auto_reply(self, subject: str, body: str) -> bool:
         """Check if email is an auto-reply."""
         text = (subject + ' ' + body).lower()
-        for pattern in self.AUTO_REPLY_PATTERNS:
-            if re.search(pattern, text, re.IGNORECASE):
-                return True
-        return False
+        return self.AUTO_REPLY_RE.search(text) is not None
     
     def categorize_reply(self, subject: str, body: str) -> tuple:
         """
@@ -141,10 +148,10 @@ class ReplyDetector:
             # High confidence if multiple positive keywords
             confidence = min(100, 50 + len(positive_matches) * 15)
             
-            # Check for specific interview indicators
-            if any(kw in text for kw in ['interview', 'schedule', 'call', 'meeting']):
+            # Check for specific interview indicators (already scanned as positive keywords)
+            if not self.INTERVIEW_HINTS.isdisjoint(positive_matches):
                 return ('INTERVIEW_REQUEST', confidence, positive_matches)
-            elif any(kw in text for kw in ['offer', 'join', 'welcome']):
+            elif not self.OFFER_HINTS.isdisjoint(positive_matches) or 'welcome' in text:
                 return ('OFFER', confidence, positive_matches)
             else:
                 return ('POSITIVE_RESPONSE', confidence, positive_matches)
@@ -163,55 +170,54 @@ class ReplyDetector:
         # Unknown - needs manual review
         return ('NEEDS_REVIEW', 30, [])
     
-    def load_sent_emails(self) -> set:
-        """Load companies we've sent emails to.
+    def load_sent_emails(self) -> CompanyIndex:
+        """Index the applications we've sent by recipient address, domain and company.
         
-        Only returns companies that the current user has emailed (multi-user support).
+        Only covers emails the current user has sent (multi-user support).
         """
-        sent_log_path = os.path.join(self.data_path, 'sent_emails_log.csv')
-        companies = set()
-        
-        if os.path.exists(sent_log_path):
-            df = pd.read_csv(sent_log_path)
-            # Filter by sender_email for multi-user support
-            if 'sender_email' in df.columns and self.email_address:
-                df = df[df['sender_email'].str.lower() == self.email_address.lower()]
-            if 'company' in df.columns:
-                companies = set(df['company'].str.lower().dropna())
-            if 'recipient_email' in df.columns:
-                # Also track domains we've emailed
-                for email in df['recipient_email'].dropna():
-                    if '@' in str(email):
-                        domain = email.split('@')[1].replace('.com', '').replace('.in', '')
-                        companies.add(domain.lower())
-        
-        return companies
+        if not self.storage.exists('sent_emails'):
+            return CompanyIndex()
+        # Filter by sender_email for multi-user support
+        df = self.storage.read_table('sent_emails', sender_email=self.email_address or None)
+        return CompanyIndex.from_frame(df)
     
-    def is_from_company_we_emailed(self, from_address: str, sent_companies: set) -> bool:
+    def is_from_company_we_emailed(self, from_address: str, sent_companies: CompanyIndex) -> bool:
         """Check if the reply is from a company we emailed."""
-        from_lower = from_address.lower()
+        return sent_companies.match(from_address) is not None
+    
+    def parse_reply(self, msg, from_header: str, from_address: str, body: str) -> dict:
+        """Categorized reply record, or None for auto-replies."""
+        subject = self.decode_email_subject(msg)
         
-        # Extract domain
-        if '@' in from_lower:
-            domain = from_lower.split('@')[1]
-            domain_name = domain.split('.')[0]
-            
-            if domain_name in sent_companies:
-                return True
-            
-            # Check variations
-            for company in sent_companies:
-                if company in domain_name or domain_name in company:
-                    return True
+        # Skip auto-replies
+        if self.is_auto_reply(subject, body):
+            return None
+        
+        # Categorize the reply
+        category, confidence, keywords = self.categorize_reply(subject, body)
         
-        return False
+        return {
+            'from_email': from_address,
+            'from_name': from_header.split('<')[0].strip() if '<' in from_header else '',
+            'subject': subject[:200],  # Truncate long subjects
+            'date': msg.get('Date', ''),
+            'category': category,
+            'confidence': confidence,
+            'keywords_matched': ', '.join(keywords[:5]),
+            'body_preview': body[:500] if body else '',
+            'detected_at': datetime.now().isoformat()
+        }
     
     def scan_for_replies(self, days_back: int = 7) -> list:
         """
         Scan inbox for HR replies.
         
+        Only mail newer than the last scan is read; the replies found are saved
+        before the scan position is.
+        
         Args:
-            days_back: How many days back to scan
+            days_back: How many days back to scan on the first run (or after
+                the mailbox's UIDVALIDITY changes)
             
         Returns:
             List of reply dictionaries
@@ -228,111 +234,24 @@ class ReplyDetector:
         if not mail:
             return []
         
-        replies = []
-        sent_companies = self.load_sent_emails()
-        logging.info(f"📋 Tracking replies from {len(sent_companies)} companies")
+        handler = ReplyHandler(self)
+        logging.info(f"📋 Tracking replies from {len(handler.sent_companies)} companies")
         
-        try:
-            mail.select('INBOX')
-            
-            # Search for emails from last N days
-            since_date = (datetime.now() - timedelta(days=days_back)).strftime('%d-%b-%Y')
-            _, message_numbers = mail.search(None, f'(SINCE {since_date})')
-            
-            email_ids = message_numbers[0].split()
-            logging.info(f"📧 Scanning {len(email_ids)} emails from last {days_back} days...")
-            
-            for email_id in email_ids:
-                try:
-                    _, msg_data = mail.fetch(email_id, '(RFC822)')
-                    email_body = msg_data[0][1]
-                    msg = email.message_from_bytes(email_body)
-                    
-                    # Get sender
-                    from_header = msg.get('From', '')
-                    from_address = ''
-                    if '<' in from_header:
-                        from_address = from_header.split('<')[1].split('>')[0]
-                    else:
-                        from_address = from_header
-                    
-                    # Skip if not from a company we emailed
-                    if not self.is_from_company_we_emailed(from_address, sent_companies):
-                        continue
-                    
-                    # Get email content
-                    subject = self.decode_email_subject(msg)
-                    body = self.decode_email_body(msg)
-                    
-                    # Skip auto-replies
-                    if self.is_auto_reply(subject, body):
-                        continue
-                    
-                    # Categorize the reply
-                    category, confidence, keywords = self.categorize_reply(subject, body)
-                    
-                    # Get date
-                    date_str = msg.get('Date', '')
-                    
-                    reply_info = {
-                        'from_email': from_address,
-                        'from_name': from_header.split('<')[0].strip() if '<' in from_header else '',
-                        'subject': subject[:200],  # Truncate long subjects
-                        'date': date_str,
-                        'category': category,
-                        'confidence': confidence,
-                        'keywords_matched': ', '.join(keywords[:5]),
-                        'body_preview': body[:500] if body else '',
-                        'detected_at': datetime.now().isoformat()
-                    }
-                    
-                    replies.append(reply_info)
-                    
-                    # Log based on category
-                    if category == 'INTERVIEW_REQUEST':
-                        logging.info(f"   🎉 INTERVIEW: {from_address} - {subject[:50]}")
-                    elif category == 'OFFER':
-                        logging.info(f"   🏆 OFFER: {from_address} - {subject[:50]}")
-                    elif category == 'POSITIVE_RESPONSE':
-                        logging.info(f"   ✅ POSITIVE: {from_address} - {subject[:50]}")
-                    elif category == 'REJECTION':
-                        logging.info(f"   ❌ REJECTION: {from_address} - {subject[:50]}")
-                    elif category == 'ACKNOWLEDGMENT':
-                        logging.info(f"   📥 ACK: {from_address} - {subject[:50]}")
-                    else:
-                        logging.info(f"   📧 REVIEW: {from_address} - {subject[:50]}")
-                        
-                except Exception as e:
-                    logging.debug(f"Error processing email: {e}")
-                    continue
-            
-            mail.logout()
-            
-        except Exception as e:
-            logging.error(f"Error scanning inbox: {e}")
+        scanner = InboxScanner(self.imap_server, self.imap_port, self.email_address, self.password)
+        if not scanner.run([handler], days_back=days_back, mail=mail):
             return []
         
-        logging.info(f"\n📊 Found {len(replies)} relevant replies")
-        return replies
+        logging.info(f"\n📊 Found {len(handler.replies)} relevant replies")
+        return handler.replies
     
     def save_replies(self, replies: list):
         """Save detected replies to CSV files."""
         if not replies:
             return
         
-        replies_df = pd.DataFrame(replies)
-        
-        # Save all replies
-        if os.path.exists(self.replies_log_path):
-            existing = pd.read_csv(self.replies_log_path)
-            # Avoid duplicates based on from_email + subject + date
-            replies_df = pd.concat([existing, replies_df], ignore_index=True)
-            replies_df = replies_df.drop_duplicates(
-                subset=['from_email', 'subject', 'date'], 
-                keep='last'
-            )
-        
-        replies_df.to_csv(self.replies_log_path, index=False)
+        # Save all replies - upsert on from_email + subject + date to avoid duplicates
+        self.storage.upsert_rows('hr_replies', replies)
+        replies_df = self.storage.read_table('hr_replies')
         logging.info(f"💾 Saved {len(replies_df)} replies to {self.replies_log_path}")
         
         # Extract interview requests separately
@@ -341,7 +260,7 @@ class ReplyDetector:
         ]
         
         if not interview_df.empty:
-            interview_df.to_csv(self.interview_requests_path, index=False)
+            self.storage.write_table('interview_requests', interview_df)
             logging.info(f"🎯 Saved {len(interview_df)} interview/positive responses!")
     
     def get_summary(self) -> dict:
@@ -356,8 +275,8 @@ class ReplyDetector:
             'needs_review': 0
         }
         
-        if os.path.exists(self.replies_log_path):
-            df = pd.read_csv(self.replies_log_path)
+        if self.storage.exists('hr_replies'):
+            df = self.storage.read_table('hr_replies')
             summary['total_replies'] = len(df)
             
             if 'category' in df.columns:
@@ -371,15 +290,77 @@ class ReplyDetector:
         return summary
 
 
+class ReplyHandler(InboxHandler):
+    """Reply categorization as a consumer of the shared inbox pass."""
+    
+    name = 'replies'
+    body_parts = ('text/plain',)
+    # Watch mode: re-read the sent log at most this often to track new companies
+    REFRESH_SECONDS = int(os.getenv('REPLY_COMPANIES_REFRESH_SECONDS', '300'))
+    
+    def __init__(self, detector: ReplyDetector = None):
+        self.detector = detector or ReplyDetector()
+        self.sent_companies = self.detector.load_sent_emails()
+        self._loaded_at = time.monotonic()
+        self.replies = []
+        self._saved = 0
+        # uid -> CompanyMatch from the header filter, used when the body arrives
+        self._matches = {}
+    
+    def before_pass(self):
+        self._matches.clear()
+        if time.monotonic() - self._loaded_at >= self.REFRESH_SECONDS:
+            self.sent_companies = self.detector.load_sent_emails()
+            self._loaded_at = time.monotonic()
+    
+    def wants(self, message) -> bool:
+        # Skip if not from a company we emailed
+        match = self.sent_companies.match(message.from_address)
+        if match:
+            self._matches[message.uid] = match
+        return match is not None
+    
+    def handle(self, message, body: str):
+        match = self._matches.pop(message.uid, None)
+        reply_info = self.detector.parse_reply(message.headers, message.from_header, message.from_address, body)
+        if not reply_info:
+            return
+        if match:
+            # Link the reply to the application it answers
+            application = match.latest
+            reply_info['company'] = match.company
+            reply_info['job_title'] = application.get('job_title', '')
+            reply_info['applied_at'] = application.get('sent_at', '')
+        self.replies.append(reply_info)
+        
+        # Log based on category
+        category, from_address, subject = reply_info['category'], reply_info['from_email'], reply_info['subject']
+        if category == 'INTERVIEW_REQUEST':
+            logging.info(f"   🎉 INTERVIEW: {from_address} - {subject[:50]}")
+        elif category == 'OFFER':
+            logging.info(f"   🏆 OFFER: {from_address} - {subject[:50]}")
+        elif category == 'POSITIVE_RESPONSE':
+            logging.info(f"   ✅ POSITIVE: {from_address} - {subject[:50]}")
+        elif category == 'REJECTION':
+            logging.info(f"   ❌ REJECTION: {from_address} - {subject[:50]}")
+        elif category == 'ACKNOWLEDGMENT':
+            logging.info(f"   📥 ACK: {from_address} - {subject[:50]}")
+        else:
+            logging.info(f"   📧 REVIEW: {from_address} - {subject[:50]}")
+    
+    def save(self):
+        new = self.replies[self._saved:]
+        if new:
+            self.detector.save_replies(new)
+            self._saved = len(self.replies)
+
+
 def main():
     """Main function to detect replies."""
     detector = ReplyDetector()
     
-    # Scan for replies
-    replies = detector.scan_for_replies(days_back=14)
-    
-    # Save results
-    detector.save_replies(replies)
+    # Scan for replies (saved as part of the scan)
+    detector.scan_for_replies(days_back=14)
     
     # Print summary
     summary = detector.get_summary()
@@ -9,9 +9,6 @@ import re
 import os
 from urllib.parse import quote_plus
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-import random
 
 # --- Configuration ---
 # Job roles from JOB_KEYWORDS environment variable - NO HARDCODED DEFAULTS
@@ -23,6 +20,7 @@ INDEED_BASE_URL = "https://www.indeed.com/rss"
 
 # --- Path Configuration ---
 from utils.config import DATA_DIR, JOBS_CSV_PATH, ERROR_LOG_PATH, BASE_RESUME_PATH
+from utils.http_engine import FetchRequest, get_fetch_engine
 
 # --- Setup Logging ---
 logging.basicConfig(
@@ -138,153 +136,110 @@ def clean_summary(summary_html):
     soup = BeautifulSoup(summary_html, "lxml")
     return soup.get_text().strip()
 
-def create_session_with_retries():
-    """Creates a requests session with advanced anti-detection measures."""
-    session = requests.Session()
-    
-    # Configure retry strategy
-    retry_strategy = Retry(
-        total=2,  # Reduced retries for speed
-        backoff_factor=0.5,  # Faster backoff
-        status_forcelist=[429, 500, 502, 503, 504],
-    )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
-    
-    # Advanced anti-detection headers
-    session.headers.update({
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Cache-Control': 'no-cache',
-        'Pragma': 'no-cache',
-        'Sec-Ch-Ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
-        'Sec-Ch-Ua-Mobile': '?0',
-        'Sec-Ch-Ua-Platform': '"Windows"',
-        'Sec-Fetch-Dest': 'document',
-        'Sec-Fetch-Mode': 'navigate',
-        'Sec-Fetch-Site': 'none',
-        'Sec-Fetch-User': '?1',
-        'Upgrade-Insecure-Requests': '1',
-        'DNT': '1',
-        'Connection': 'keep-alive',
-    })
-    
-    return session
+# Browser-like headers for the feed requests (sent through the shared fetch engine)
+RSS_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Cache-Control': 'no-cache',
+    'Pragma': 'no-cache',
+    'Sec-Ch-Ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
+    'Sec-Ch-Ua-Mobile': '?0',
+    'Sec-Ch-Ua-Platform': '"Windows"',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Upgrade-Insecure-Requests': '1',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+}
+
+# Indeed endpoints tried in order until one serves the feed
+INDEED_ALTERNATIVES = [
+    "https://rss.indeed.com/rss",  # Alternative RSS endpoint
+    "https://www.indeed.co.in/rss",  # India domain
+    "https://indeed.com/rss",  # No www
+]
+
+def _feed_jobs(feed, portal):
+    """Job dicts for the entries of a parsed feed."""
+    return [{
+        "title": entry.title,
+        "company": entry.get("author", "N/A"),
+        "link": entry.link,
+        "published": entry.get("published", "N/A"),
+        "summary": clean_summary(entry.get("summary", "")),
+        "location": "Bangalore",
+        "portal": portal
+    } for entry in feed.entries]
 
 def fetch_jobs(rss_feeds):
-    """Fetches jobs from RSS feeds with advanced anti-detection."""
+    """Fetches jobs from RSS feeds with advanced anti-detection.
+
+    All feeds go to the fetch engine as one batch (per-host rate limits and
+    retries replace the sleeps between feeds). An Indeed feed that fails on
+    one endpoint is retried on the next alternative in the following round.
+    """
     jobs_list = []
-    session = create_session_with_retries()
-    
-    # Try different Indeed domains and approaches
-    indeed_alternatives = [
-        "https://rss.indeed.com/rss",  # Alternative RSS endpoint
-        "https://www.indeed.co.in/rss",  # India domain  
-        "https://indeed.com/rss",  # No www
-    ]
-    
+    engine = get_fetch_engine()
+
+    pending = {}
     for feed_name, feed_url in rss_feeds.items():
         if "indeed.com" in feed_url.lower():
-            # Special handling for Indeed with multiple fallbacks
-            success = False
-            for alt_base in indeed_alternatives:
-                try:
-                    # Reconstruct URL with alternative base
-                    url_parts = feed_url.split('?', 1)
-                    if len(url_parts) > 1:
-                        alt_url = f"{alt_base}?{url_parts[1]}"
-                    else:
-                        alt_url = alt_base
-                    
-                    logging.info(f"Trying Indeed alternative: {alt_base}")
-                    
-                    # Random delay to avoid detection
-                    time.sleep(random.uniform(1, 3))
-                    
-                    # Fetch with session
-                    response = session.get(alt_url, timeout=15)
-                    
-                    if response.status_code == 403:
-                        logging.warning(f"403 Forbidden from {alt_base}, trying next...")
-                        continue
-                        
-                    response.raise_for_status()
-                    
-                    # Parse feed from response content
-                    feed = feedparser.parse(response.content)
-                    
-                    if hasattr(feed, 'entries') and len(feed.entries) > 0:
-                        logging.info(f"✅ SUCCESS: Found {len(feed.entries)} jobs from Indeed")
-                        
-                        for entry in feed.entries:
-                            job = {
-                                "title": entry.title,
-                                "company": entry.get("author", "N/A"),
-                                "link": entry.link,
-                                "published": entry.get("published", "N/A"),
-                                "summary": clean_summary(entry.get("summary", "")),
-                                "location": "Bangalore",
-                                "portal": "Indeed"
-                            }
-                            jobs_list.append(job)
-                        
-                        success = True
-                        break  # Exit alternative loop on success
-                        
-                except requests.exceptions.RequestException as e:
-                    logging.warning(f"Network error with {alt_base}: {e}")
-                    continue
-                except Exception as e:
-                    logging.warning(f"Parse error with {alt_base}: {e}")
-                    continue
-            
-            if not success:
-                logging.error(f"❌ All Indeed alternatives failed for {feed_name}")
+            # Reconstruct URL with each alternative base
+            url_parts = feed_url.split('?', 1)
+            pending[feed_name] = [f"{alt_base}?{url_parts[1]}" if len(url_parts) > 1 else alt_base
+                                  for alt_base in INDEED_ALTERNATIVES]
         else:
-            # Handle non-Indeed feeds normally  
-            try:
-                logging.info(f"Fetching jobs from: {feed_name}")
-                
-                # Fetch with proper headers using requests
-                response = session.get(feed_url, timeout=30)
-                response.raise_for_status()
-                
-                # Parse the RSS feed from the response content
-                feed = feedparser.parse(response.content)
-                
-                if feed.bozo:
-                    logging.warning(f"Could not parse feed {feed_name}: {feed.bozo_exception}")
-                    continue
-
-                if not feed.entries:
-                    logging.info(f"No jobs found in feed: {feed_name}")
-                    continue
-                    
-                logging.info(f"Found {len(feed.entries)} jobs in {feed_name}")
+            pending[feed_name] = [feed_url]
 
-                for entry in feed.entries:
-                    job = {
-                        "title": entry.title,
-                        "company": entry.get("author", "N/A"),
-                        "link": entry.link,
-                        "published": entry.get("published", "N/A"),
-                        "summary": clean_summary(entry.get("summary", "")),
-                        "location": "Bangalore",
-                        "portal": "RSS"
-                    }
-                    jobs_list.append(job)
-                    
+    while pending:
+        # Unchanged feeds are answered from the HTTP cache (304 Not Modified)
+        batch = [FetchRequest(urls[0], headers=RSS_HEADERS, tag=feed_name,
+                              timeout=15 if len(urls) > 1 or "indeed" in urls[0] else 30,
+                              cache_source="indeed" if "indeed" in urls[0] else "rss")
+                 for feed_name, urls in pending.items()]
+        logging.info(f"Fetching {len(batch)} feeds...")
+        next_round = {}
+        for result in engine.fetch_all(batch):
+            feed_name = result.request.tag
+            urls = pending[feed_name]
+            is_indeed = feed_name.startswith("Indeed") or "indeed" in result.request.url
+            try:
+                if result.response is None:
+                    raise result.error
+                if is_indeed and result.status_code == 403:
+                    logging.warning(f"403 Forbidden from {result.request.url.split('?')[0]}, trying next...")
+                else:
+                    result.response.raise_for_status()
+                    # Parse feed from response content
+                    feed = feedparser.parse(result.response.content)
+                    if is_indeed:
+                        if hasattr(feed, 'entries') and len(feed.entries) > 0:
+                            logging.info(f"✅ SUCCESS: Found {len(feed.entries)} jobs from Indeed")
+                            jobs_list.extend(_feed_jobs(feed, "Indeed"))
+                            continue
+                    elif feed.bozo:
+                        logging.warning(f"Could not parse feed {feed_name}: {feed.bozo_exception}")
+                    elif not feed.entries:
+                        logging.info(f"No jobs found in feed: {feed_name}")
+                    else:
+                        logging.info(f"Found {len(feed.entries)} jobs in {feed_name}")
+                        jobs_list.extend(_feed_jobs(feed, "RSS"))
             except requests.exceptions.RequestException as e:
-                logging.error(f"Network error fetching from {feed_name}: {e}")
+                logging.warning(f"Network error fetching from {feed_name}: {e}")
             except Exception as e:
-                logging.error(f"Could not parse feed {feed_name}: {e}")
+                logging.warning(f"Could not parse feed {feed_name}: {e}")
+
+            if is_indeed:
+                if len(urls) > 1:
+                    next_round[feed_name] = urls[1:]
+                else:
+                    logging.error(f"❌ All Indeed alternatives failed for {feed_name}")
+        pending = next_round
 
-        # Rate limiting between feeds
-        time.sleep(random.uniform(2, 4))
-    
     logging.info(f"📊 Total jobs fetched from RSS feeds: {len(jobs_list)}")
     return jobs_list
 
@@ -358,14 +313,10 @@ if __name__ == "__main__":
     # Step 3: Combine and format results
     all_jobs = []
     
-    # Add RSS jobs
-    for job in rss_jobs:
-        all_jobs.append({
-            "title": job["title"],
-            "company": job["company"],
     # Step 4: If no jobs from RSS (all blocked), try public scraper
     if not rss_jobs:
         logging.info("📡 RSS feeds blocked, trying public page scraping...")
+        location = os.getenv("JOB_LOCATION", "Bangalore")
         try:
             from scripts.linkedin_public_scraper import scrape_jobs_public
             public_jobs_df = scrape_jobs_public(location=location)
@@ -0,0 +1,36 @@
+import os
+import sys
+import functools
+
+import pytest
+
+# Tests import utils/ and scripts/ the way the scripts themselves do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts import bounce_checker
+from tests.imap_standin import StandInIMAPServer, StandInScanner
+from utils import domain_stats, imap_sync, storage, verification_cache
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Point storage, IMAP cursors, verification verdicts and domain stats at a temporary data/ directory."""
+    monkeypatch.setattr(storage, '_storage', storage.CSVStorage(str(tmp_path)))
+    monkeypatch.setattr(imap_sync, '_cursor_store', imap_sync.CursorStore(str(tmp_path / 'imap_cursors.json')))
+    monkeypatch.setattr(verification_cache, '_verification_cache',
+                        verification_cache.VerificationCache(str(tmp_path / 'verification_cache.json')))
+    stats = functools.partial(domain_stats.DomainBounceStats, str(tmp_path / 'domain_bounce_stats.csv'))
+    monkeypatch.setattr(bounce_checker, 'DomainBounceStats', stats)
+    return tmp_path
+
+
+@pytest.fixture
+def imap_server():
+    server = StandInIMAPServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def scanner(imap_server):
+    return StandInScanner('127.0.0.1', imap_server.port, 'me@example.com', 'secret')
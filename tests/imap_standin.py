@@ -0,0 +1,239 @@
+"""
+A small in-process IMAP server for exercising utils.inbox_scanner.
+
+It speaks just enough IMAP4rev1 for the scanner: LOGIN, SELECT/EXAMINE,
+STATUS, UID SEARCH (``UID n:*`` and ``SINCE``), UID FETCH of UID /
+BODYSTRUCTURE / header fields / body sections, NOOP, IDLE and LOGOUT.
+``StandInScanner`` is an InboxScanner that logs in to it without TLS.
+Messages added with ``deliver`` while a client is IDLE are announced with
+``* n EXISTS`` the way real servers do; mail already waiting when IDLE
+starts is announced in the same segment as the ``+`` continuation. Every
+command received is kept in
+``commands`` so tests can assert on what was fetched.
+"""
+
+import re
+import email
+import select
+import socket
+import imaplib
+import threading
+from email.message import Message
+from typing import List, Optional, Tuple
+
+from utils.inbox_scanner import InboxScanner
+
+
+def _quote(value: Optional[str]) -> str:
+    return 'NIL' if value is None else '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _body_structure(part: Message) -> str:
+    if part.get_content_maintype() == 'multipart':
+        children = ''.join(_body_structure(child) for child in part.get_payload())
+        return f'({children} {_quote(part.get_content_subtype())})'
+    raw = _section(part, '').decode('utf-8')
+    params = ' '.join(f'{_quote(k)} {_quote(v)}' for k, v in part.get_params()[1:]) if part.get_params() else ''
+    encoding = part.get('Content-Transfer-Encoding', '7bit')
+    return (f'({_quote(part.get_content_maintype())} {_quote(part.get_content_subtype())} '
+            f'{"(" + params + ")" if params else "NIL"} NIL NIL {_quote(encoding)} {len(raw.encode())} '
+            f'{raw.count(chr(10))})')
+
+
+def _section(message: Message, part_id: str) -> bytes:
+    part = message
+    for index in filter(None, part_id.split('.')):
+        if part.get_content_maintype() == 'multipart':
+            part = part.get_payload()[int(index) - 1]
+    payload = part.get_payload()
+    if isinstance(payload, list):  # message/delivery-status keeps its fields as sub-messages
+        return b'\n'.join(bytes(block) for block in payload)
+    return payload.encode('utf-8')
+
+
+def _uid_set(spec: str, uids: List[int]) -> List[int]:
+    wanted = set()
+    highest = max(uids) if uids else 0
+    for piece in spec.split(','):
+        lo, _, hi = piece.partition(':')
+        lo = highest if lo == '*' else int(lo)
+        hi = lo if not hi else (highest if hi == '*' else int(hi))
+        lo, hi = min(lo, hi), max(lo, hi)
+        wanted.update(uid for uid in uids if lo <= uid <= hi)
+    return sorted(wanted)
+
+
+class StandInScanner(InboxScanner):
+    """InboxScanner that logs in over plain TCP to the stand-in server."""
+
+    def connect(self):
+        mail = imaplib.IMAP4('127.0.0.1', self.port)
+        mail.login(self.account, self.password)
+        return mail
+
+
+class StandInIMAPServer:
+    """Threaded single-mailbox IMAP server on 127.0.0.1 (plain TCP)."""
+
+    def __init__(self, idle: bool = True, uidvalidity: int = 1):
+        self.idle = idle
+        self.uidvalidity = uidvalidity
+        self.messages: List[Tuple[int, bytes]] = []
+        self.commands: List[str] = []
+        self._next_uid = 1
+        self._lock = threading.Condition()
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(('127.0.0.1', 0))
+        self._sock.listen(5)
+        self.port = self._sock.getsockname()[1]
+        self._closed = False
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    # -- test API -------------------------------------------------------------
+
+    def deliver(self, raw) -> int:
+        """Add a message (bytes or str) and return its UID."""
+        if isinstance(raw, str):
+            raw = raw.encode('utf-8')
+        with self._lock:
+            uid = self._next_uid
+            self._next_uid += 1
+            self.messages.append((uid, raw))
+            self._lock.notify_all()
+        return uid
+
+    def reset_uids(self, uidvalidity: int):
+        """Renumber the mailbox under a new UIDVALIDITY (as after a mailbox rebuild)."""
+        with self._lock:
+            self.uidvalidity = uidvalidity
+            self.messages = [(1000 + index, raw) for index, (_, raw) in enumerate(self.messages)]
+            self._next_uid = 1000 + len(self.messages)
+
+    def fetches(self, kind: str) -> List[str]:
+        """UID FETCH commands whose query contains ``kind`` (e.g. 'BODY.PEEK[1]')."""
+        return [c for c in self.commands if c.upper().startswith('UID FETCH') and kind in c.upper()]
+
+    def close(self):
+        self._closed = True
+        self._sock.close()
+
+    # -- protocol -------------------------------------------------------------
+
+    def _accept(self):
+        while not self._closed:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: socket.socket):
+        reader = conn.makefile('rb')
+        caps = 'IMAP4rev1 IDLE' if self.idle else 'IMAP4rev1'
+        send = conn.sendall
+        send(b'* OK stand-in IMAP ready\r\n')
+        announced = 0
+        try:
+            while True:
+                line = reader.readline()
+                if not line:
+                    return
+                tag, _, rest = line.decode().rstrip('\r\n').partition(' ')
+                command, _, args = rest.partition(' ')
+                command = command.upper()
+                if command == 'UID':
+                    command, _, args = args.partition(' ')
+                    command = 'UID ' + command.upper()
+                self.commands.append(f'{command} {args}'.strip())
+
+                if command == 'CAPABILITY':
+                    send(f'* CAPABILITY {caps}\r\n{tag} OK done\r\n'.encode())
+                elif command == 'LOGIN':
+                    send(f'{tag} OK logged in\r\n'.encode())
+                elif command in ('SELECT', 'EXAMINE'):
+                    with self._lock:
+                        count, uidnext = len(self.messages), self._next_uid
+                    announced = count
+                    send(f'* {count} EXISTS\r\n* 0 RECENT\r\n'
+                         f'* OK [UIDVALIDITY {self.uidvalidity}] UIDs valid\r\n'
+                         f'* OK [UIDNEXT {uidnext}] next UID\r\n'
+                         f'{tag} OK [READ-WRITE] selected\r\n'.encode())
+                elif command == 'STATUS':
+                    send(f'* STATUS INBOX (UIDVALIDITY {self.uidvalidity} UIDNEXT {self._next_uid})\r\n'
+                         f'{tag} OK done\r\n'.encode())
+                elif command == 'UID SEARCH':
+                    send(f'* SEARCH {" ".join(map(str, self._search(args)))}\r\n{tag} OK done\r\n'.encode())
+                elif command == 'UID FETCH':
+                    spec, _, query = args.partition(' ')
+                    for response in self._fetch(spec, query):
+                        send(response)
+                    send(f'{tag} OK done\r\n'.encode())
+                elif command == 'NOOP':
+                    with self._lock:
+                        count = len(self.messages)
+                    if count > announced:
+                        send(f'* {count} EXISTS\r\n'.encode())
+                        announced = count
+                    send(f'{tag} OK done\r\n'.encode())
+                elif command == 'IDLE' and self.idle:
+                    announced = self._idle(conn, reader, tag, announced)
+                elif command == 'LOGOUT':
+                    send(f'* BYE bye\r\n{tag} OK done\r\n'.encode())
+                    return
+                else:
+                    send(f'{tag} BAD unsupported\r\n'.encode())
+        except (OSError, ValueError):
+            return
+        finally:
+            conn.close()
+
+    def _idle(self, conn: socket.socket, reader, tag: str, announced: int) -> int:
+        with self._lock:
+            count = len(self.messages)
+        greeting = b'+ idling\r\n'
+        if count > announced:
+            greeting += f'* {count} EXISTS\r\n'.encode()
+            announced = count
+        conn.sendall(greeting)
+        while True:
+            with self._lock:
+                count = len(self.messages)
+            if count > announced:
+                conn.sendall(f'* {count} EXISTS\r\n'.encode())
+                announced = count
+            ready, _, _ = select.select([conn], [], [], 0.05)
+            if ready:
+                line = reader.readline()
+                if not line or line.strip().upper() == b'DONE':
+                    conn.sendall(f'{tag} OK IDLE terminated\r\n'.encode())
+                    return announced
+
+    def _search(self, criteria: str) -> List[int]:
+        with self._lock:
+            uids = [uid for uid, _ in self.messages]
+        match = re.match(r'UID (\S+)', criteria, re.I)
+        if match:
+            return _uid_set(match.group(1), uids)
+        return uids  # SINCE <date>: every message counts as recent
+
+    def _fetch(self, spec: str, query: str):
+        with self._lock:
+            messages = dict(self.messages)
+        for seq, uid in enumerate(_uid_set(spec, sorted(messages)), start=1):
+            message = email.message_from_bytes(messages[uid])
+            items, literals = [f'UID {uid}'], []
+            if 'BODYSTRUCTURE' in query.upper():
+                items.append(f'BODYSTRUCTURE {_body_structure(message)}')
+            fields = re.search(r'HEADER\.FIELDS \(([^)]*)\)', query, re.I)
+            if fields:
+                names = fields.group(1).split()
+                headers = ''.join(f'{name}: {message[name]}\r\n' for name in names if message[name] is not None)
+                literals.append((f'BODY[HEADER.FIELDS ({fields.group(1)})]', (headers + '\r\n').encode()))
+            for part_id in re.findall(r'BODY\.PEEK\[([\d.]+)\]', query, re.I):
+                literals.append((f'BODY[{part_id}]', _section(message, part_id)))
+
+            response = f'* {seq} FETCH ({" ".join(items)}'.encode()
+            for name, data in literals:
+                response += f' {name} {{{len(data)}}}\r\n'.encode() + data
+            yield response + b')\r\n'
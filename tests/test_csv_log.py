@@ -0,0 +1,47 @@
+"""
+flush_all_writers from a signal handler while the same thread holds a file's lock.
+"""
+
+import threading
+
+from utils.csv_log import AppendOnlyCSVWriter, flush_all_writers, locked_file
+
+
+def test_flush_all_skips_files_locked_by_this_thread(tmp_path):
+    path = str(tmp_path / 'sent_emails_log.csv')
+    writer = AppendOnlyCSVWriter(path, ['recipient_email', 'status'], max_buffered=100)
+    writer.append({'recipient_email': 'hr@acme.com', 'status': 'sent'})
+    finished = threading.Event()
+
+    def interrupted_rewrite():
+        # What SIGTERM does when it lands inside CSVStorage._rewrite on the main thread
+        with locked_file(path):
+            flush_all_writers()
+            finished.set()
+
+    thread = threading.Thread(target=interrupted_rewrite, daemon=True)
+    thread.start()
+    thread.join(5)
+    assert finished.is_set(), "flush_all_writers waited on a lock its own thread holds"
+
+    # The row stayed buffered and goes out with the next flush
+    flush_all_writers()
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == 'recipient_email,status\nhr@acme.com,sent\n'
+    writer.close()
+
+
+def test_older_header_is_widened_instead_of_dropping_values(tmp_path):
+    path = tmp_path / 'bounced_emails.csv'
+    path.write_text('email,reason\nold@acme.com,"line one\nline two"\n', encoding='utf-8')
+    writer = AppendOnlyCSVWriter(str(path), ['email', 'reason', 'bounce_type'], max_buffered=1)
+    writer.append({'email': 'x@y.com', 'reason': 'gone', 'bounce_type': 'hard'})
+
+    assert path.read_text(encoding='utf-8') == (
+        'email,reason,bounce_type\nold@acme.com,"line one\nline two",\nx@y.com,gone,hard\n')
+
+    # A rewrite that narrows the header again is noticed on the next flush
+    path.write_text('email,reason\n', encoding='utf-8')
+    writer.append({'email': 'z@y.com', 'reason': 'gone', 'bounce_type': 'soft'})
+    assert path.read_text(encoding='utf-8') == 'email,reason,bounce_type\nz@y.com,gone,soft\n'
+    writer.close()
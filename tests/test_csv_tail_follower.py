@@ -0,0 +1,53 @@
+"""
+CSVTailFollower: appended rows only, rewrites detected, multiline fields kept whole.
+"""
+
+import os
+
+from utils.suppression_index import CSVTailFollower
+
+
+def write(path, text, mode='a'):
+    with open(path, mode, newline='', encoding='utf-8') as f:
+        f.write(text)
+
+
+def test_reads_only_appended_rows(tmp_path):
+    path = str(tmp_path / 'bounced_emails.csv')
+    write(path, 'email,reason\nold@acme.com,gone\n', 'w')
+    follower = CSVTailFollower(path)
+    assert follower.read_new_rows() == []
+
+    write(path, 'new@acme.com,full\n')
+    assert follower.read_new_rows() == [{'email': 'new@acme.com', 'reason': 'full'}]
+    assert follower.read_new_rows() == []
+
+
+def test_multiline_quoted_field_is_one_row(tmp_path):
+    path = str(tmp_path / 'bounced_emails.csv')
+    write(path, 'email,reason\n', 'w')
+    follower = CSVTailFollower(path)
+
+    write(path, 'a@acme.com,"550 user unknown\n')
+    assert follower.read_new_rows() == []  # the quoted field is still open
+    write(path, 'see ""help"""\nb@acme.com,full\n')
+    assert follower.read_new_rows() == [
+        {'email': 'a@acme.com', 'reason': '550 user unknown\nsee "help"'},
+        {'email': 'b@acme.com', 'reason': 'full'},
+    ]
+
+
+def test_rewrite_that_grows_the_file_is_reread(tmp_path):
+    path = str(tmp_path / 'bounced_emails.csv')
+    write(path, 'email,reason\na@acme.com,gone\n', 'w')
+    follower = CSVTailFollower(path)
+
+    # Replaced with a longer file (as a read-modify-replace rewrite does)
+    tmp = path + '.tmp'
+    write(tmp, 'email,reason,source\nb@acme.com,full,inbox\nc@acme.com,gone,inbox\n', 'w')
+    os.replace(tmp, path)
+    assert [row['email'] for row in follower.read_new_rows()] == ['b@acme.com', 'c@acme.com']
+
+    # Rewritten in place, same inode, larger than what was read
+    write(path, 'email,reason,source\nd@acme.com,gone,inbox\ne@acme.com,gone,inbox\nf@acme.com,x,y\n', 'w')
+    assert [row['email'] for row in follower.read_new_rows()] == ['d@acme.com', 'e@acme.com', 'f@acme.com']
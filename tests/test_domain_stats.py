@@ -0,0 +1,47 @@
+"""
+Domain bounce stats saved by several processes keep every process's counts.
+"""
+
+from utils.domain_stats import DomainBounceStats
+from utils.storage import CSVStorage
+
+
+def test_saves_merge_counts_from_other_writers(tmp_path):
+    path = str(tmp_path / 'domain_bounce_stats.csv')
+    storage = CSVStorage(str(tmp_path))
+    sender = DomainBounceStats(path, storage=storage)
+    checker = DomainBounceStats(path, storage=storage)  # loaded before the sender saved
+
+    sender.record_send('a@acme.com', 'sent')
+    sender.record_send('b@acme.com', 'sent')
+    sender.save()
+    checker.record_bounce('a@acme.com')
+    checker.record_send('x@globex.com', 'bounced: mailbox full')
+    checker.save()
+    sender.record_send('c@acme.com', 'sent')
+    sender.save()
+
+    merged = DomainBounceStats(path, storage=storage).stats
+    assert {d: (e['sent'], e['bounced']) for d, e in merged.items()} == {
+        'acme.com': (3, 1),
+        'globex.com': (1, 1),
+    }
+    # A save also picks up what the others wrote
+    assert sender.stats['globex.com']['bounced'] == 1
+
+
+def test_rebuild_replaces_the_file(tmp_path):
+    path = str(tmp_path / 'domain_bounce_stats.csv')
+    storage = CSVStorage(str(tmp_path))
+    storage.append_rows('sent_emails', [
+        {'recipient_email': 'a@acme.com', 'status': 'sent'},
+        {'recipient_email': 'b@acme.com', 'status': 'bounced: unknown user'},
+    ])
+    storage.flush()
+    stale = DomainBounceStats(path, storage=storage)
+    stale.record_send('z@acme.com', 'sent')
+    stale.save()
+
+    stats = DomainBounceStats(path, storage=storage)
+    assert stats.rebuild() == 2
+    assert DomainBounceStats(path, storage=storage).stats['acme.com']['sent'] == 2
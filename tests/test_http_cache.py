@@ -0,0 +1,97 @@
+"""
+Conditional-GET cache: max-age hits, validators, 304s served from disk, no-store.
+"""
+
+import types
+
+import pytest
+import requests
+
+from utils import http_cache
+from utils.http_cache import HTTPCache
+
+FEED = 'https://feeds.example.com/jobs.rss'
+
+
+class FakeSession:
+    """Returns the scripted (status, headers, body) replies in order; records request headers."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.sent = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.sent.append(dict(headers or {}))
+        status, response_headers, body = self.replies.pop(0)
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(response_headers)
+        response._content = body
+        response.url = url
+        return response
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(http_cache, 'time', types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return HTTPCache(str(tmp_path / 'http_cache'))
+
+
+VALIDATED = (200, {'ETag': '"v1"', 'Last-Modified': 'Mon, 12 Oct 2026 10:00:00 GMT',
+                   'Content-Type': 'application/rss+xml'}, b'<rss>v1</rss>')
+
+
+def test_fresh_entry_is_served_without_a_request(cache, clock):
+    session = FakeSession(VALIDATED)
+    assert cache.get(session, FEED, source='remoteok').content == b'<rss>v1</rss>'
+    clock[0] += 60
+    cached = cache.get(session, FEED, source='remoteok')
+    assert cached.content == b'<rss>v1</rss>' and cached.from_cache
+    assert len(session.sent) == 1 and cache.hits == 1
+
+
+def test_stale_entry_revalidates_and_304_serves_the_stored_body(cache, clock, tmp_path):
+    session = FakeSession(VALIDATED, (304, {}, b''))
+    cache.get(session, FEED, source='remoteok')
+    clock[0] += http_cache.HTTP_CACHE_MAX_AGE + 1
+
+    response = cache.get(session, FEED, source='remoteok')
+    assert session.sent[1]['If-None-Match'] == '"v1"'
+    assert session.sent[1]['If-Modified-Since'] == 'Mon, 12 Oct 2026 10:00:00 GMT'
+    assert (response.status_code, response.content) == (200, b'<rss>v1</rss>')
+    assert response.headers['Content-Type'] == 'application/rss+xml'
+    assert cache.not_modified == 1
+
+    # The 304 restarted max-age, and the index survives a reload
+    cache.save()
+    entry = next(iter(HTTPCache(str(tmp_path / 'http_cache'))._entries.values()))
+    assert entry['validated_at'] == clock[0]
+    assert cache.fresh(FEED, source='remoteok') is not None
+
+
+def test_per_source_max_age_override(cache, clock, monkeypatch):
+    monkeypatch.setenv('HTTP_CACHE_MAX_AGE_GOOGLE_NEWS', '30')
+    session = FakeSession(VALIDATED, (304, {}, b''))
+    cache.get(session, FEED, source='google_news')
+    clock[0] += 31
+    assert cache.fresh(FEED, source='google_news') is None
+    # Other sources keep the default
+    assert cache.fresh(FEED, source='remoteok') is not None
+    cache.get(session, FEED, source='google_news')
+    assert len(session.sent) == 2
+
+
+def test_no_store_responses_are_not_cached(cache):
+    session = FakeSession((200, {'Cache-Control': 'private, no-store', 'ETag': '"x"'}, b'{}'),
+                          (200, {}, b'{}'))
+    cache.get(session, FEED)
+    assert cache.downloads == 0 and cache.fresh(FEED) is None
+    cache.get(session, FEED)
+    assert len(session.sent) == 2
+    assert 'If-None-Match' not in session.sent[1]
@@ -0,0 +1,144 @@
+"""
+Fetch engine limits against a stub session: per-host spacing, retries, 429 pauses and host slots.
+"""
+
+import threading
+import time
+
+import pytest
+import requests
+
+from utils import http_engine
+from utils.http_engine import FetchEngine, FetchRequest, HostSlots, TokenBucket
+from utils.source_fanout import SourceDeadlineExceeded
+
+
+class StubSession:
+    """Answers from a script of (status, headers) per URL; records when each request went out."""
+
+    def __init__(self, script=None):
+        self.script = {url: list(replies) for url, replies in (script or {}).items()}
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        with self._lock:
+            self.sent.append((url, time.monotonic()))
+            replies = self.script.get(url)
+            status, headers = replies.pop(0) if replies and len(replies) > 1 else (replies or [(200, {})])[0]
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers)
+        response._content = b'ok'
+        response.url = url
+        return response
+
+    def times(self, url):
+        return [sent_at for sent_url, sent_at in self.sent if sent_url == url]
+
+
+@pytest.fixture
+def engine():
+    engines = []
+
+    def make(session=None, **kwargs):
+        engine = FetchEngine(**kwargs)
+        engine.session = engine._cookieless = session or StubSession()
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine._pool.shutdown(wait=True)
+
+
+@pytest.fixture
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(http_engine, 'HTTP_BACKOFF_BASE', 0.01)
+
+
+def test_token_bucket_reserve_and_pause(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(http_engine.time, 'monotonic', lambda: now[0])
+    bucket = TokenBucket(rate=2.0, burst=2)
+    assert [bucket.reserve(), bucket.reserve()] == [0.0, 0.0]
+    # Out of burst: the next tokens are half a second apart
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+
+    now[0] += 10  # Refilled to capacity, then paused for 3s
+    bucket.pause(3)
+    assert bucket.reserve() == pytest.approx(3.5)
+    assert TokenBucket(rate=0).reserve() == 0.0
+
+
+def test_host_slots_cap_and_release():
+    slots = HostSlots(2)
+    assert slots.try_acquire() and slots.try_acquire()
+    assert not slots.try_acquire()
+    slots.release()
+    assert slots.try_acquire()
+
+
+def test_requests_to_one_host_are_spaced_out(engine):
+    session = StubSession()
+    fetcher = engine(session, host_rate=10, host_burst=1)
+    urls = [f'https://a.example/{n}' for n in range(3)] + ['https://b.example/0']
+    assert all(result.ok for result in fetcher.fetch_all(urls))
+
+    starts = sorted(t for url, t in session.sent if 'a.example' in url)
+    assert all(later - earlier >= 0.09 for earlier, later in zip(starts, starts[1:]))
+    # Another host has its own bucket
+    assert session.times('https://b.example/0')[0] - starts[0] < 0.09
+
+
+def test_5xx_is_retried_up_to_the_retry_count(engine, fast_backoff):
+    url = 'https://a.example/flaky'
+    session = StubSession({url: [(503, {})]})
+    result = engine(session, host_rate=0, retries=2).fetch_all([url])[0]
+    assert (result.status_code, result.attempts, len(session.sent)) == (503, 3, 3)
+
+    # A 404 is final
+    missing = 'https://a.example/missing'
+    session.script[missing] = [(404, {})]
+    assert engine(session, host_rate=0, retries=2).fetch_all([missing])[0].attempts == 1
+
+
+def test_429_waits_for_retry_after_and_pauses_the_host(engine, fast_backoff, monkeypatch):
+    pauses = []
+    pause = TokenBucket.pause
+    monkeypatch.setattr(TokenBucket, 'pause', lambda bucket, seconds: (pauses.append(seconds), pause(bucket, seconds)))
+    url = 'https://a.example/busy'
+    session = StubSession({url: [(429, {'Retry-After': '0.3'}), (200, {})]})
+    result = engine(session, host_rate=100, host_burst=1).fetch_all([url])[0]
+    assert result.ok and result.attempts == 2
+    first, retry = session.times(url)
+    assert retry - first >= 0.3
+    # The whole host's bucket was held for Retry-After, not just this request
+    assert pauses == [0.3]
+
+
+def test_deadline_after_a_slot_is_taken_releases_it(engine, monkeypatch):
+    calls = [0]
+
+    def deadline_on_second_check():
+        # The first check runs before the rate limit wait, the second once the slot is held
+        calls[0] += 1
+        if calls[0] == 2:
+            raise SourceDeadlineExceeded('Paged')
+
+    monkeypatch.setattr(http_engine, 'check_deadline', deadline_on_second_check)
+    fetcher = engine(host_rate=0, host_concurrency=1)
+    with pytest.raises(SourceDeadlineExceeded):
+        fetcher.fetch_all(['https://a.example/late'])
+    assert fetcher._host_slots('https://a.example/late').in_flight == 0
+    assert fetcher.fetch_all(['https://a.example/next'])[0].ok
+
+
+def test_cookieless_requests_use_the_cookieless_session(engine):
+    jar, bare = StubSession(), StubSession()
+    fetcher = engine(jar, host_rate=0)
+    fetcher._cookieless = bare
+    fetcher.fetch_all([FetchRequest('https://a.example/1'), FetchRequest('https://a.example/2', cookies=False)])
+    assert [url for url, _ in jar.sent] == ['https://a.example/1']
+    assert [url for url, _ in bare.sent] == ['https://a.example/2']
@@ -0,0 +1,330 @@
+"""
+The shared inbox pass and watch mode against the local IMAP stand-in.
+"""
+
+import threading
+import time
+
+import pandas as pd
+
+from scripts.bounce_checker import BounceHandler
+from scripts.reply_detector import ReplyHandler
+from utils.inbox_scanner import InboxHandler
+from utils.storage import CSVStorage, get_storage
+from utils.verification_cache import get_verification_cache
+
+
+def plain_message(sender, subject, body, to='me@example.com'):
+    return (f"From: {sender}\r\nTo: {to}\r\nSubject: {subject}\r\n"
+            f"Date: Mon, 12 Oct 2026 10:00:00 +0000\r\nContent-Type: text/plain; charset=utf-8\r\n\r\n{body}\r\n")
+
+
+def bounce_message(recipient, status='5.1.1'):
+    """Multipart/report bounce with a machine-readable delivery-status part."""
+    return (
+        "From: Mail Delivery Subsystem <mailer-daemon@googlemail.com>\r\n"
+        "To: me@example.com\r\nSubject: Delivery Status Notification (Failure)\r\n"
+        "Date: Mon, 12 Oct 2026 10:00:00 +0000\r\nMIME-Version: 1.0\r\n"
+        'Content-Type: multipart/report; report-type=delivery-status; boundary="b1"\r\n\r\n'
+        "--b1\r\nContent-Type: text/plain; charset=utf-8\r\n\r\n"
+        f"Your message wasn't delivered to {recipient} because the address couldn't be found.\r\n"
+        "--b1\r\nContent-Type: message/delivery-status\r\n\r\n"
+        "Reporting-MTA: dns; googlemail.com\r\n\r\n"
+        f"Final-Recipient: rfc822; {recipient}\r\nAction: failed\r\nStatus: {status}\r\n"
+        "Diagnostic-Code: smtp; 550 5.1.1 user unknown\r\n\r\n"
+        "--b1--\r\n"
+    )
+
+
+class Recorder(InboxHandler):
+    """Collects what the scanner dispatches; optionally only wants some senders."""
+
+    name = 'recorder'
+
+    def __init__(self, senders=None):
+        self.senders = senders
+        self.seen = []
+        self.saves = 0
+
+    def wants(self, message):
+        return self.senders is None or message.from_address in self.senders
+
+    def handle(self, message, body):
+        self.seen.append((message.uid, message.from_address, body.strip()))
+
+    def save(self):
+        self.saves += 1
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_second_pass_reads_only_new_mail(data_dir, imap_server, scanner):
+    imap_server.deliver(plain_message('a@acme.com', 'One', 'first'))
+    imap_server.deliver(plain_message('b@acme.com', 'Two', 'second'))
+
+    first = Recorder()
+    assert scanner.run([first], days_back=7)
+    assert [uid for uid, _, _ in first.seen] == [1, 2]
+
+    imap_server.deliver(plain_message('c@acme.com', 'Three', 'third'))
+    imap_server.commands.clear()
+    second = Recorder()
+    assert scanner.run([second], days_back=7)
+    assert second.seen == [(3, 'c@acme.com', 'third')]
+    assert 'UID SEARCH UID 3:*' in imap_server.commands
+
+
+def test_uidvalidity_change_falls_back_to_date_window(data_dir, imap_server, scanner):
+    imap_server.deliver(plain_message('a@acme.com', 'One', 'first'))
+    assert scanner.run([Recorder()], days_back=7)
+
+    imap_server.reset_uids(uidvalidity=2)
+    imap_server.commands.clear()
+    rescan = Recorder()
+    assert scanner.run([rescan], days_back=7)
+    assert [uid for uid, _, _ in rescan.seen] == [1000]
+    assert any(c.startswith('UID SEARCH (SINCE') for c in imap_server.commands)
+
+
+def test_bodies_fetched_only_for_wanted_messages(data_dir, imap_server, scanner):
+    imap_server.deliver(plain_message('news@letters.com', 'Digest', 'not interesting'))
+    wanted = imap_server.deliver(plain_message('hr@acme.com', 'Interview', 'let us talk'))
+
+    recorder = Recorder(senders={'hr@acme.com'})
+    assert scanner.run([recorder], days_back=7)
+    assert recorder.seen == [(wanted, 'hr@acme.com', 'let us talk')]
+    body_fetches = imap_server.fetches('BODY.PEEK[1]')
+    assert body_fetches == [f'UID FETCH {wanted} (UID BODY.PEEK[1])']
+
+
+def test_handlers_keep_separate_cursors(data_dir, imap_server, scanner):
+    imap_server.deliver(plain_message('a@acme.com', 'One', 'first'))
+    early = Recorder()
+    assert scanner.run([early], days_back=7)
+
+    imap_server.deliver(plain_message('b@acme.com', 'Two', 'second'))
+    late = Recorder()
+    late.name = 'late'
+    again = Recorder()
+    assert scanner.run([again, late], days_back=7)
+    assert [uid for uid, _, _ in again.seen] == [2]
+    assert [uid for uid, _, _ in late.seen] == [1, 2]
+
+
+class Flaky(Recorder):
+    """Raises on the first attempt at each message in ``fail_once``."""
+
+    name = 'flaky'
+
+    def __init__(self, fail_once):
+        super().__init__()
+        self.fail_once = set(fail_once)
+
+    def handle(self, message, body):
+        if message.uid in self.fail_once:
+            self.fail_once.discard(message.uid)
+            raise RuntimeError('transient failure')
+        super().handle(message, body)
+
+
+def test_failed_message_is_retried_next_pass(data_dir, imap_server, scanner):
+    for n in range(3):
+        imap_server.deliver(plain_message(f'hr{n}@acme.com', 'Hello', f'body {n}'))
+
+    flaky, other = Flaky(fail_once={2}), Recorder()
+    assert scanner.run([flaky, other], days_back=7)
+    assert [uid for uid, _, _ in flaky.seen] == [1, 3]
+    assert [uid for uid, _, _ in other.seen] == [1, 2, 3]
+
+    # Only the failing handler goes back, and only from the failed message on
+    assert scanner.run([flaky, other], days_back=7)
+    assert [uid for uid, _, _ in flaky.seen] == [1, 3, 2, 3]
+    assert [uid for uid, _, _ in other.seen] == [1, 2, 3]
+
+
+class UnsavedRecorder(Recorder):
+    """Fails to write its results the first time it is saved."""
+
+    name = 'unsaved'
+
+    def save(self):
+        super().save()
+        if self.saves == 1:
+            raise OSError('storage locked')
+
+
+def test_failed_save_keeps_the_cursor(data_dir, imap_server, scanner):
+    imap_server.deliver(plain_message('a@acme.com', 'One', 'first'))
+
+    unsaved, other = UnsavedRecorder(), Recorder()
+    assert scanner.run([unsaved, other], days_back=7)
+    assert unsaved.saves == other.saves == 1
+
+    # The failed handler reads its mail again; the other one has moved on
+    again, other_again = UnsavedRecorder(), Recorder()
+    assert scanner.run([again, other_again], days_back=7)
+    assert [uid for uid, _, _ in again.seen] == [1]
+    assert other_again.seen == []
+
+
+def run_watch(scanner, handlers, **kwargs):
+    stop = threading.Event()
+    thread = threading.Thread(target=scanner.watch, args=(handlers,), kwargs={'stop': stop, **kwargs},
+                              daemon=True)
+    thread.start()
+    return stop, thread
+
+
+def test_watch_handles_mail_announced_by_idle(data_dir, imap_server, scanner):
+    recorder = Recorder()
+    stop, thread = run_watch(scanner, [recorder])
+    try:
+        assert wait_for(lambda: any(c == 'IDLE' for c in imap_server.commands))
+        imap_server.deliver(plain_message('hr@acme.com', 'Interview', 'are you free'))
+        assert wait_for(lambda: recorder.seen)
+        assert recorder.seen == [(1, 'hr@acme.com', 'are you free')]
+        assert recorder.saves >= 1
+    finally:
+        stop.set()
+        thread.join(10)
+    assert not thread.is_alive()
+
+
+def test_idle_notices_exists_sent_with_the_continuation(data_dir, imap_server, scanner):
+    """``* n EXISTS`` read into imaplib's buffer along with ``+`` must not wait for the timeout."""
+    mail = scanner.connect()
+    try:
+        assert mail.select('INBOX')[0] == 'OK'
+        imap_server.deliver(plain_message('hr@acme.com', 'Interview', 'are you free'))
+        started = time.monotonic()
+        assert scanner._idle(mail, 5, threading.Event())
+        assert time.monotonic() - started < 2
+    finally:
+        mail.logout()
+
+
+def test_watch_polls_with_noop_without_idle(data_dir, imap_server, scanner):
+    imap_server.idle = False
+    recorder = Recorder()
+    stop, thread = run_watch(scanner, [recorder], poll_seconds=0.1)
+    try:
+        assert wait_for(lambda: 'NOOP' in imap_server.commands)
+        imap_server.deliver(plain_message('hr@acme.com', 'Interview', 'are you free'))
+        assert wait_for(lambda: recorder.seen)
+    finally:
+        stop.set()
+        thread.join(10)
+    assert 'IDLE' not in imap_server.commands
+
+
+def test_watch_bounces_keep_rows_a_campaign_appended(data_dir, imap_server, scanner):
+    """The watcher's sent-log rewrite must not drop rows another process appended."""
+    campaign = CSVStorage(str(data_dir))  # the sending process, with its own cache
+    campaign.append_rows('sent_emails', [
+        {'recipient_email': 'hr@acme.com', 'company': 'Acme', 'job_title': 'Analyst', 'status': 'sent'},
+    ])
+    campaign.flush()
+    get_verification_cache().put_smtp('gone@globex.com', (True, 'Mailbox verified'))
+
+    bounces = BounceHandler(append=True)
+    replies = ReplyHandler()
+    replies.REFRESH_SECONDS = 0
+    stop, thread = run_watch(scanner, [bounces, replies])
+    try:
+        assert wait_for(lambda: any(c == 'IDLE' for c in imap_server.commands))
+        # The watcher read the sent log at start-up; the campaign keeps sending
+        campaign.append_rows('sent_emails', [
+            {'recipient_email': 'gone@globex.com', 'company': 'Globex', 'job_title': 'Analyst', 'status': 'sent'},
+            {'recipient_email': 'jobs@initech.com', 'company': 'Initech', 'job_title': 'Analyst', 'status': 'sent'},
+        ])
+        campaign.flush()
+
+        imap_server.deliver(bounce_message('gone@globex.com'))
+        imap_server.deliver(plain_message('Jane <jobs@initech.com>', 'Re: Analyst', 'Can we schedule an interview?'))
+        assert wait_for(lambda: bounces.bounces and replies.replies)
+        assert wait_for(lambda: len(get_storage().read_table('bounced_emails')) == 1)
+    finally:
+        stop.set()
+        thread.join(10)
+
+    sent = pd.read_csv(data_dir / 'sent_emails_log.csv').set_index('recipient_email')['status']
+    assert sent.to_dict() == {
+        'hr@acme.com': 'sent',
+        'gone@globex.com': 'bounced: Email address does not exist',
+        'jobs@initech.com': 'sent',
+    }
+    assert get_storage().read_table('bounced_emails')['email'].tolist() == ['gone@globex.com']
+    # Its cached "valid" verdict was dropped with the bounce
+    assert get_verification_cache().get_smtp('gone@globex.com') is None
+    # The refreshed sent log linked the reply to the application sent after start-up
+    assert replies.replies[0]['company'] == 'Initech'
+    assert replies.replies[0]['category'] == 'INTERVIEW_REQUEST'
+
+
+def test_soft_bounce_does_not_block_the_address(data_dir, imap_server, scanner):
+    storage = get_storage()
+    storage.append_rows('sent_emails', [
+        {'recipient_email': 'full@globex.com', 'company': 'Globex', 'job_title': 'Analyst', 'status': 'sent'},
+    ])
+    storage.flush()
+    imap_server.deliver(bounce_message('full@globex.com', status='4.2.2'))
+
+    bounces = BounceHandler()
+    assert scanner.run([bounces], days_back=7)
+    assert [(b['bounced_email'], b['bounce_type']) for b in bounces.bounces] == [('full@globex.com', 'soft')]
+    bounces.save()
+
+    # Mailbox full clears up: nothing permanent was recorded
+    assert not storage.exists('bounced_emails') or storage.read_table('bounced_emails').empty
+    assert storage.read_table('sent_emails')['status'].tolist() == ['sent']
+    assert not (data_dir / 'domain_bounce_stats.csv').exists()
+
+
+def test_prose_bounce_takes_its_status_from_the_smtp_reply(data_dir, imap_server, scanner):
+    imap_server.deliver(plain_message(
+        'MAILER-DAEMON@mx.example.net', 'Undelivered Mail Returned to Sender',
+        'I could not deliver to <gone@globex.com>.\r\n'
+        'Remote server (10.4.2.17) said: 550 5.1.1 <gone@globex.com>: user unknown'))
+
+    bounces = BounceHandler()
+    assert scanner.run([bounces], days_back=7)
+    # The IP address is not read as a 4.x.x code, so the bounce stays hard
+    assert [(b['bounced_email'], b['bounce_type'], b['status_code']) for b in bounces.bounces] == [
+        ('gone@globex.com', 'hard', '5.1.1')]
+
+
+LEGACY_BOUNCES_HEADER = 'email,company,reason,bounce_date,detected_at,source\n'
+
+
+def test_bounce_fields_survive_an_older_bounced_emails_header(data_dir):
+    checker = BounceHandler().checker
+    bounce = {'bounced_email': 'x@y.com', 'reason': 'Email address does not exist',
+              'bounce_type': 'hard', 'status_code': '5.1.1'}
+    for append in (True, False):
+        (data_dir / 'bounced_emails.csv').write_text(
+            LEGACY_BOUNCES_HEADER + 'old@acme.com,Acme,gone,2026-01-01,2026-01-01T00:00:00,email_sender\n',
+            encoding='utf-8')
+        checker.save_bounces([bounce], append=append)
+        checker.storage.flush()
+
+        table = get_storage().read_table('bounced_emails').set_index('email')
+        assert (table.loc['x@y.com', 'bounce_type'], table.loc['x@y.com', 'status_code']) == ('hard', '5.1.1')
+        assert table.loc['old@acme.com', 'source'] == 'email_sender'
+
+
+def test_appended_bounces_skip_addresses_already_recorded(data_dir):
+    checker = BounceHandler(append=True).checker
+    bounce = {'bounced_email': 'x@y.com', 'reason': 'Email address does not exist', 'bounce_type': 'hard'}
+    checker.save_bounces([bounce, dict(bounce)], append=True)
+    # The same message handled again on a later pass, then a repeat bounce
+    checker.save_bounces([bounce], append=True)
+    checker.save_bounces([dict(bounce, bounced_email='X@Y.com')], append=True)
+    checker.storage.flush()
+    assert get_storage().read_table('bounced_emails')['email'].tolist() == ['x@y.com']
@@ -0,0 +1,43 @@
+"""
+Near-duplicate job clustering: reposts merge, different levels of one role don't.
+"""
+
+from utils.job_dedup import cluster_jobs, title_levels
+
+DESCRIPTION = ('We are hiring an engineer to build data pipelines in Python and SQL, '
+               'own services end to end and work with product teams across Bangalore.')
+
+
+def job(title, company='Acme Technologies Pvt Ltd', description=DESCRIPTION):
+    return {'title': title, 'company': company, 'description': description}
+
+
+def test_reposts_of_one_opening_merge():
+    records = [job('Sr. Data Analyst'), job('Senior Data Analyst', 'Acme Technologies'), job('Data Analyst', 'Globex')]
+    assert sorted(map(sorted, cluster_jobs(records))) == [[0, 1], [2]]
+
+
+def test_different_levels_stay_separate():
+    records = [job('Software Engineer'), job('Software Engineer II'), job('Software Engineer 2'),
+               job('Senior Software Engineer'), job('Lead Software Engineer')]
+    assert sorted(map(sorted, cluster_jobs(records))) == [[0], [1, 2], [3], [4]]
+
+
+def test_title_levels():
+    assert title_levels('Software Engineer III') == {'3'}
+    assert title_levels('SDE L2') == {'2'}
+    assert title_levels('Sr Manager') == {'senior'}
+    assert title_levels('Data Analyst') == frozenset()
+
+
+def test_placeholder_companies_never_merge():
+    records = [job('Data Analyst', 'Various'), job('Data Analyst', 'Various'), job('Data Analyst', 'Tech Company'),
+               job('Data Analyst', 'Startup'), job('Data Analyst', ''), job('Data Analyst', None),
+               job('Data Analyst', 'Remote Company'), job('Data Analyst', 'Corporate')]
+    assert sorted(map(sorted, cluster_jobs(records))) == [[i] for i in range(len(records))]
+
+
+def test_one_company_many_titles_stays_apart():
+    titles = ['Data Analyst', 'Backend Developer', 'QA Engineer', 'Product Manager', 'Cloud Architect']
+    records = [job(title, description=f'{title} role') for title in titles] + [job('Data Analyst')]
+    assert sorted(map(sorted, cluster_jobs(records))) == [[0, 5], [1], [2], [3], [4]]
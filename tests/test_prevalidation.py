@@ -0,0 +1,38 @@
+"""
+The prevalidation pipeline hands its prepare hook the rows about to be sent, in batches.
+"""
+
+import threading
+
+from utils.prevalidation import PrevalidationPipeline
+
+
+def test_prepare_sees_windowed_batches_before_verify():
+    rows = [f'user{i}@acme.com' for i in range(12)] + ['user0@acme.com']
+    prepared, lock = set(), threading.Lock()
+    batches = []
+
+    def prepare(batch):
+        with lock:
+            batches.append(list(batch))
+            prepared.update(batch)
+
+    def verify(row):
+        with lock:
+            return row in prepared
+
+    with PrevalidationPipeline(rows, verify, key=lambda row: row, lookahead=4, prepare=prepare) as pipeline:
+        assert all(pipeline.result(index) for index in range(len(rows)))
+
+    # Nothing is prepared up front for the whole list, only window-sized batches
+    assert all(len(batch) <= 5 for batch in batches)
+    assert sorted(row for batch in batches for row in batch) == sorted(set(rows))
+    assert len(batches) < len(set(rows))
+
+
+def test_failed_prepare_still_verifies():
+    def prepare(batch):
+        raise RuntimeError('DNS down')
+
+    with PrevalidationPipeline(['a', 'b', 'c'], str.upper, lookahead=2, prepare=prepare) as pipeline:
+        assert [pipeline.result(index) for index in range(3)] == ['A', 'B', 'C']
@@ -0,0 +1,34 @@
+"""
+Seen-job index: jobs are known by title/company, not by a shared listing URL.
+"""
+
+from utils.seen_jobs import SeenJobIndex, canonical_url
+
+LISTING = 'https://www.instahyre.com/search-jobs/?q=python'
+
+
+def test_jobs_on_one_listing_page_stay_separate(tmp_path):
+    index = SeenJobIndex(str(tmp_path / 'seen.json'))
+    jobs = [{'title': title, 'company': 'Acme', 'url': LISTING} for title in ('Analyst', 'Engineer', 'Designer')]
+    assert index.record(jobs) == 3
+    assert len(index) == 3
+    assert not index.is_known({'title': 'Recruiter', 'company': 'Globex', 'url': LISTING})
+    # A shared URL doesn't identify jobs without a title/company either
+    assert not index.is_known({'url': LISTING})
+
+
+def test_url_identifies_jobs_without_title_or_company(tmp_path):
+    path = str(tmp_path / 'seen.json')
+    index = SeenJobIndex(path)
+    index.record([{'title': 'Analyst', 'company': 'Acme', 'url': 'https://jobs.example.com/123?utm_source=x'}])
+    index.save()
+
+    reloaded = SeenJobIndex(path)
+    assert reloaded.is_known({'url': 'https://Jobs.example.com/123/#apply'})
+    assert not reloaded.is_known({'url': 'https://jobs.example.com/124'})
+
+
+def test_canonical_url_keeps_identifying_query():
+    assert canonical_url('https://www.indeed.co.in/viewjob?jk=abc&utm_campaign=x&from=serp') == \
+        'https://www.indeed.co.in/viewjob?from=serp&jk=abc'
+    assert canonical_url('https://www.simplyhired.co.in/job?job=1') != canonical_url('https://www.simplyhired.co.in/job?job=2')
@@ -0,0 +1,35 @@
+"""
+SMTP session pool: a session that fails while being set up is closed.
+"""
+
+import smtplib
+
+import pytest
+
+from utils import smtp_pool
+from utils.smtp_pool import SMTPSessionPool
+
+
+class BrokenTLS:
+    instances = []
+
+    def __init__(self, *args, **kwargs):
+        self.closed = False
+        BrokenTLS.instances.append(self)
+
+    def starttls(self, context=None):
+        raise smtplib.SMTPServerDisconnected('handshake failed')
+
+    def quit(self):
+        raise smtplib.SMTPServerDisconnected('not connected')
+
+    def close(self):
+        self.closed = True
+
+
+def test_failed_starttls_closes_the_connection(monkeypatch):
+    monkeypatch.setattr(smtp_pool.smtplib, 'SMTP', BrokenTLS)
+    pool = SMTPSessionPool()
+    with pytest.raises(smtplib.SMTPServerDisconnected):
+        pool._connect(('smtp.example.com', 587, 'me@example.com'), 'secret')
+    assert BrokenTLS.instances[-1].closed
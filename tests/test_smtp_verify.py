@@ -0,0 +1,134 @@
+"""
+SMTP RCPT verification: one session per MX host, catch-all probes, RSET batching, 503 recovery.
+"""
+
+import pytest
+
+from scripts import email_verifier
+from scripts.email_verifier import EmailVerifier
+
+
+class FakeSMTP:
+    """Mail server stand-in: ``mailboxes`` exist, ``catch_all`` domains accept anything.
+
+    ``drop_after`` makes the server forget the transaction (503) once that
+    many RCPTs have been accepted in it, like a server enforcing its own cap.
+    """
+
+    mailboxes = set()
+    catch_all = set()
+    drop_after = None
+    sessions = []
+
+    def __init__(self, timeout=None):
+        self.host = None
+        self.log = []
+        self.in_transaction = False
+        self.rcpts = 0
+        FakeSMTP.sessions.append(self)
+
+    def connect(self, host):
+        self.host = host
+        self.log.append('CONNECT')
+
+    def helo(self, name):
+        self.log.append('HELO')
+
+    def mail(self, sender):
+        self.log.append('MAIL')
+        self.in_transaction, self.rcpts = True, 0
+
+    def rset(self):
+        self.log.append('RSET')
+        self.in_transaction = False
+
+    def rcpt(self, address):
+        self.log.append(f'RCPT {address}')
+        if not self.in_transaction:
+            return 503, b'5.5.1 Need MAIL command'
+        if self.drop_after is not None and self.rcpts >= self.drop_after:
+            self.in_transaction = False
+            return 503, b'5.5.1 Need MAIL command'
+        self.rcpts += 1
+        domain = address.rpartition('@')[2]
+        return (250, b'OK') if address in self.mailboxes or domain in self.catch_all else (550, b'No such user')
+
+    def quit(self):
+        self.log.append('QUIT')
+
+    def close(self):
+        pass
+
+    def rcpt_log(self):
+        return [entry[5:] for entry in self.log if entry.startswith('RCPT ')]
+
+
+class FakeDNS:
+    MX = {'acme.com': ['mx.google.test'], 'globex.com': ['mx.google.test'], 'initech.com': ['mx.initech.test']}
+
+    def mx_hosts(self, domain):
+        return self.MX.get(domain, [])
+
+
+@pytest.fixture
+def verifier(data_dir, monkeypatch):
+    monkeypatch.setattr(email_verifier.smtplib, 'SMTP', FakeSMTP)
+    monkeypatch.setattr(FakeSMTP, 'mailboxes', {'hr@acme.com', 'jobs@globex.com', 'talent@initech.com'})
+    monkeypatch.setattr(FakeSMTP, 'catch_all', set())
+    monkeypatch.setattr(FakeSMTP, 'drop_after', None)
+    monkeypatch.setattr(FakeSMTP, 'sessions', [])
+    checker = EmailVerifier()
+    checker.dns = FakeDNS()
+    return checker
+
+
+def test_one_session_per_mx_host_and_one_probe_per_domain(verifier):
+    results = verifier.smtp_verify_batch(['hr@acme.com', 'careers@acme.com', 'jobs@globex.com', 'talent@initech.com'],
+                                         max_workers=1)
+    assert results['hr@acme.com'] == (True, "SMTP verified - mailbox exists")
+    assert results['careers@acme.com'] == (False, "Mailbox does not exist")
+    assert results['jobs@globex.com'][0] is True and results['talent@initech.com'][0] is True
+
+    assert sorted(session.host for session in FakeSMTP.sessions) == ['mx.google.test', 'mx.initech.test']
+    google = next(session for session in FakeSMTP.sessions if session.host == 'mx.google.test')
+    probes = [address for address in google.rcpt_log()
+              if address.partition('@')[0] not in ('hr', 'careers', 'jobs')]
+    assert sorted(address.partition('@')[2] for address in probes) == ['acme.com', 'globex.com']
+
+    # smtp_verify goes through the same path and reuses the verdicts
+    assert verifier.smtp_verify('careers@acme.com') == (False, "Mailbox does not exist")
+    assert len(FakeSMTP.sessions) == 2
+
+
+def test_catch_all_domain_is_not_verified(verifier):
+    FakeSMTP.catch_all = {'acme.com'}
+    results = verifier.smtp_verify_batch(['hr@acme.com', 'nobody@acme.com'])
+    assert results == {
+        'hr@acme.com': (None, "Catch-all domain - mailbox cannot be verified"),
+        'nobody@acme.com': (None, "Catch-all domain - mailbox cannot be verified"),
+    }
+    assert verifier.cache.get_catch_all('acme.com') == (True, True)
+
+
+def test_transaction_is_reset_every_50_recipients(verifier):
+    FakeSMTP.mailboxes = {f'hr{n}@acme.com' for n in range(60)}
+    results = verifier.smtp_verify_batch([f'hr{n}@acme.com' for n in range(60)])
+    assert all(verdict[0] is True for verdict in results.values()) and len(results) == 60
+
+    session, = FakeSMTP.sessions
+    # 61 RCPTs (probe + 60): MAIL, 50 RCPTs, RSET, MAIL, 11 RCPTs
+    assert session.log.count('RSET') == 1
+    assert session.log.index('RSET') == session.log.index('MAIL') + 51
+
+
+def test_503_mid_batch_resets_and_retries_the_recipient(verifier):
+    FakeSMTP.drop_after = 3
+    emails = ['hr@acme.com', 'careers@acme.com', 'jobs@globex.com', 'ops@globex.com']
+    results = verifier.smtp_verify_batch(emails)
+    assert [results[email][0] for email in emails] == [True, False, True, False]
+
+    session, = FakeSMTP.sessions
+    # The RCPT that got 503 was sent again after RSET + MAIL, not skipped
+    assert session.log.count('RSET') >= 1
+    dropped = session.log[session.log.index('RSET') - 1][5:]
+    assert session.rcpt_log().count(dropped) == 2
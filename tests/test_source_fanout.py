@@ -0,0 +1,82 @@
+"""
+Source deadlines and per-host limits: a source that overruns keeps its partial
+results and stops; one host never gets more than its share of requests at once.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.http_engine import FetchEngine
+from utils.source_fanout import emit, fan_out
+
+
+class SlowPages(BaseHTTPRequestHandler):
+    delay = 0.3
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def slow_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SlowPages)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+
+
+def test_overrunning_source_keeps_partial_results_and_stops(slow_server):
+    engine = FetchEngine(host_rate=0)
+    requested = []
+
+    def paged_source():
+        for page in range(1, 50):
+            requested.append(page)
+            if engine.get(f'{slow_server}/jobs?page={page}').status_code == 200:
+                emit({'title': f'Job {page}', 'company': 'Acme'})
+
+    results = list(fan_out([('Paged', paged_source)], deadline=1.0))
+    assert len(results) == 1
+    result = results[0]
+    assert result.timed_out
+    assert 0 < len(result.items) < 49
+    assert result.status_codes[:len(result.items)] == [200] * len(result.items)
+
+    # The engine's deadline check ends the source instead of letting it page on
+    pages = len(requested)
+    time.sleep(1.0)
+    assert len(requested) <= pages + 1
+    engine.close()
+
+
+def test_batch_to_one_host_respects_the_per_host_cap(slow_server):
+    engine = FetchEngine(host_rate=0, host_concurrency=2)
+    in_flight, peak = [0], [0]
+    lock = threading.Lock()
+    send = engine._send
+
+    def counting_send(request, headers):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        try:
+            return send(request, headers)
+        finally:
+            with lock:
+                in_flight[0] -= 1
+
+    engine._send = counting_send
+    results = engine.fetch_all([f'{slow_server}/jobs?page={page}' for page in range(6)])
+    assert [result.status_code for result in results] == [200] * 6
+    assert peak[0] == 2
+    engine.close()
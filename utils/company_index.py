@@ -0,0 +1,204 @@
+"""
+Reply attribution - which application does an incoming email belong to?
+Built once from the sent log: the exact recipient address, the registrable
+domain (with known aliases such as fb.com -> meta.com) and the normalized
+company name each point at the sent-log rows they came from. Looking up a
+sender is a few dict hits; only senders whose domain is unknown fall back to
+a bounded fuzzy match over company-name tokens.
+"""
+
+import os
+import re
+import difflib
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+
+# Senders at these domains are attributed by exact address only
+FREE_MAIL_DOMAINS = frozenset({
+    'gmail.com', 'googlemail.com', 'yahoo.com', 'yahoo.co.in', 'hotmail.com', 'outlook.com',
+    'live.com', 'msn.com', 'icloud.com', 'me.com', 'aol.com', 'rediffmail.com', 'protonmail.com',
+    'proton.me', 'zoho.com', 'yandex.com', 'gmx.com', 'mail.com',
+})
+
+# Registrable domains that belong to the same employer: alias -> canonical domain
+DOMAIN_ALIASES = {
+    'fb.com': 'meta.com',
+    'facebook.com': 'meta.com',
+    'metamail.com': 'meta.com',
+    'instagram.com': 'meta.com',
+    'whatsapp.com': 'meta.com',
+    'alphabet.com': 'google.com',
+    'youtube.com': 'google.com',
+    'deepmind.com': 'google.com',
+    'amazon.jobs': 'amazon.com',
+    'amazon.in': 'amazon.com',
+    'a2z.com': 'amazon.com',
+    'amazonaws.com': 'amazon.com',
+    'microsoft.co.in': 'microsoft.com',
+    'github.com': 'microsoft.com',
+    'tataconsultancyservices.com': 'tcs.com',
+    'infosys.in': 'infosys.com',
+    'wipro.co.in': 'wipro.com',
+    'accenture.co.in': 'accenture.com',
+    'flipkart.in': 'flipkart.com',
+}
+
+# Second-level labels that sit below a country code (example.co.in, example.com.au)
+_SECOND_LEVEL_LABELS = {'co', 'com', 'net', 'org', 'ac', 'edu', 'gov', 'ltd', 'plc', 'firm', 'gen', 'ind', 'res'}
+
+# Words that don't identify a company on their own
+_NAME_STOPWORDS = {
+    'the', 'and', 'inc', 'ltd', 'limited', 'pvt', 'private', 'llc', 'llp', 'plc', 'corp',
+    'corporation', 'co', 'company', 'gmbh', 'group', 'india', 'technologies', 'technology',
+    'tech', 'solutions', 'services', 'systems', 'software', 'labs', 'global', 'consulting',
+}
+
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+
+# Fuzzy fallback bounds: candidates compared per sender and minimum similarity
+FUZZY_MAX_CANDIDATES = int(os.getenv('COMPANY_FUZZY_MAX_CANDIDATES', '25'))
+FUZZY_MIN_RATIO = float(os.getenv('COMPANY_FUZZY_MIN_RATIO', '0.88'))
+# Shorter names/labels are only matched exactly ("ai", "hp", "ge")
+FUZZY_MIN_LENGTH = 5
+
+
+def registrable_domain(domain: str) -> str:
+    """mail.careers.example.co.in -> example.co.in (heuristic, no public suffix list)."""
+    labels = [label for label in str(domain or '').strip().lower().rstrip('.').split('.') if label]
+    if len(labels) <= 2:
+        return '.'.join(labels)
+    if len(labels[-1]) == 2 and labels[-2] in _SECOND_LEVEL_LABELS:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+def company_key(name) -> str:
+    """'Infosys Ltd.' -> 'infosys'; '' for blanks."""
+    text = str(name or '').strip().lower()
+    if not text or text == 'nan':
+        return ''
+    tokens = [token for token in _NON_ALNUM_RE.split(text) if token]
+    significant = [token for token in tokens if token not in _NAME_STOPWORDS]
+    return ' '.join(significant or tokens)
+
+
+def _domain_label(domain: str) -> str:
+    """example.co.in -> example"""
+    return domain.split('.', 1)[0] if domain else ''
+
+
+@dataclass
+class CompanyMatch:
+    """Sent-log rows an incoming address was attributed to, and how."""
+    company: str
+    rows: List[dict] = field(default_factory=list)
+    how: str = 'domain'  # email | domain | company | fuzzy
+
+    @property
+    def latest(self) -> dict:
+        """The most recent application to this company."""
+        return max(self.rows, key=lambda row: str(row.get('sent_at') or ''), default={})
+
+
+class CompanyIndex:
+    """Reverse index from sender address to the applications we sent."""
+
+    def __init__(self, rows: Iterable[dict] = ()):
+        self.by_email: Dict[str, List[dict]] = {}
+        self.by_domain: Dict[str, List[dict]] = {}
+        self.by_company: Dict[str, List[dict]] = {}
+        # 'tata consultancy' is also reachable as the domain label 'tataconsultancy'
+        self.by_compact: Dict[str, List[dict]] = {}
+        # token / 4-letter token prefix -> company keys, for the fuzzy fallback
+        self.tokens: Dict[str, Set[str]] = {}
+        self.prefixes: Dict[str, Set[str]] = {}
+        for row in rows:
+            self.add(row)
+
+    @classmethod
+    def from_frame(cls, df) -> 'CompanyIndex':
+        if df is None or df.empty:
+            return cls()
+        return cls(df.to_dict('records'))
+
+    def add(self, row: dict):
+        email = str(row.get('recipient_email') or '').strip().lower()
+        if '@' in email:
+            self.by_email.setdefault(email, []).append(row)
+            domain = registrable_domain(email.split('@', 1)[1])
+            if domain and domain not in FREE_MAIL_DOMAINS:
+                self.by_domain.setdefault(DOMAIN_ALIASES.get(domain, domain), []).append(row)
+        key = company_key(row.get('company'))
+        if key:
+            self.by_company.setdefault(key, []).append(row)
+            if ' ' in key:
+                self.by_compact.setdefault(key.replace(' ', ''), []).append(row)
+            for token in key.split():
+                self.tokens.setdefault(token, set()).add(key)
+                self.prefixes.setdefault(token[:4], set()).add(key)
+
+    def __len__(self) -> int:
+        """Number of distinct companies."""
+        return len(self.by_company)
+
+    def __bool__(self) -> bool:
+        return bool(self.by_email or self.by_company)
+
+    @staticmethod
+    def _name(rows: List[dict], fallback: str) -> str:
+        for row in rows:
+            company = str(row.get('company') or '').strip()
+            if company and company.lower() != 'nan':
+                return company
+        return fallback
+
+    def match(self, from_address: str) -> Optional[CompanyMatch]:
+        """Attribute a sender to the applications we sent (None if unrelated)."""
+        address = str(from_address or '').strip().lower()
+        if '@' not in address:
+            return None
+        rows = self.by_email.get(address)
+        if rows:
+            return CompanyMatch(self._name(rows, address), rows, 'email')
+
+        domain = registrable_domain(address.split('@', 1)[1])
+        if not domain or domain in FREE_MAIL_DOMAINS:
+            return None
+        domain = DOMAIN_ALIASES.get(domain, domain)
+        rows = self.by_domain.get(domain)
+        if rows:
+            return CompanyMatch(self._name(rows, domain), rows, 'domain')
+
+        label = _domain_label(domain)
+        rows = self.by_company.get(label) or self.by_compact.get(label)
+        if rows:
+            return CompanyMatch(self._name(rows, label), rows, 'company')
+        return self._fuzzy(label)
+
+    def _fuzzy(self, label: str) -> Optional[CompanyMatch]:
+        """Closest company sharing a name token (or a 4-letter prefix) with ``label``."""
+        if len(label) < FUZZY_MIN_LENGTH:
+            return None
+        candidates: Set[str] = set()
+        for part in (p for p in _NON_ALNUM_RE.split(label) if p):
+            candidates |= self.tokens.get(part, set())
+        if not candidates:
+            candidates = self.prefixes.get(label[:4], set())
+        if not candidates:
+            return None
+
+        compact_label = _NON_ALNUM_RE.sub('', label)
+        scored = []
+        for key in sorted(candidates)[:FUZZY_MAX_CANDIDATES]:
+            compact = key.replace(' ', '')
+            if len(compact) < FUZZY_MIN_LENGTH:
+                continue
+            scored.append((difflib.SequenceMatcher(None, compact_label, compact).ratio(), key))
+        if not scored:
+            return None
+        ratio, key = max(scored)
+        if ratio < FUZZY_MIN_RATIO:
+            return None
+        rows = self.by_company[key]
+        return CompanyMatch(self._name(rows, key), rows, 'fuzzy')
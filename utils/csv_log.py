@@ -0,0 +1,205 @@
+"""
+Append-only, buffered CSV log writer.
+Replaces the read_csv -> concat -> to_csv pattern for logs that only ever
+grow, so writing a row costs the same no matter how large the file is.
+
+``locked_file`` is the cross-process lock every writer of a shared data file
+takes: appends here, and the read-modify-replace rewrites in utils.storage
+and utils.domain_stats, so a rewrite never drops rows appended meanwhile.
+"""
+
+import os
+import csv
+import time
+import atexit
+import logging
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Dict, List
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+DEFAULT_MAX_BUFFERED = int(os.getenv('CSV_LOG_MAX_BUFFERED', '10'))
+
+# Every live writer, so signal handlers / atexit can flush them all
+_writers = weakref.WeakSet()
+# (lock path, thread ident) for every locked_file taken or being taken in this process
+_held = set()
+
+
+@contextmanager
+def locked_file(path: str):
+    """Hold an exclusive lock on ``path`` shared with other processes.
+
+    The lock lives on a ``<path>.lock`` sidecar, so ``path`` itself can be
+    replaced while it is held. Not re-entrant: don't take it twice for the
+    same path on one thread.
+    """
+    lock_path = f"{os.path.abspath(path)}.lock"
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    # Recorded before locking, so a signal handler running mid-acquire sees it too
+    holder = (lock_path, threading.get_ident())
+    _held.add(holder)
+    try:
+        with _exclusive(lock_path):
+            yield
+    finally:
+        _held.discard(holder)
+
+
+def holds_lock(path: str) -> bool:
+    """True if this thread holds (or is acquiring) ``locked_file(path)``."""
+    return (f"{os.path.abspath(path)}.lock", threading.get_ident()) in _held
+
+
+@contextmanager
+def _exclusive(lock_path: str):
+    with open(lock_path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class AppendOnlyCSVWriter:
+    """Buffers rows in memory and appends them to a CSV file.
+
+    - The header is written only when the file is new or empty
+    - If the file already exists, rows follow its existing column order; a
+      file whose header lacks some of our fieldnames is rewritten once with
+      them added at the end, so their values are not dropped
+    - ``flush()`` appends buffered rows and fsyncs the file
+    """
+
+    def __init__(self, path: str, fieldnames: List[str], max_buffered: int = DEFAULT_MAX_BUFFERED):
+        self.path = path
+        self.fieldnames = list(fieldnames)
+        self.max_buffered = max(1, max_buffered)
+        self._buffer: List[Dict] = []
+        self._lock = threading.Lock()
+        _writers.add(self)
+
+    def append(self, row: Dict):
+        """Queue a row; flushes automatically once the buffer is full."""
+        self._buffer.append(row)
+        if len(self._buffer) >= self.max_buffered:
+            self.flush()
+
+    def _resolve_columns(self) -> List[str]:
+        """Use the on-disk header if there is one, else our own fieldnames.
+
+        Re-read on every flush (under ``locked_file``): another writer or a
+        rewrite may have changed the header since the last one.
+        """
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, 'r', newline='', encoding='utf-8') as f:
+                header = next(csv.reader(f), None)
+            if header:
+                missing = [c for c in self.fieldnames if c not in header]
+                if missing:
+                    return self._widen_header(header, missing)
+                return header
+        return self.fieldnames
+
+    def _widen_header(self, header: List[str], missing: List[str]) -> List[str]:
+        """Rewrite the file with ``missing`` appended to its header (caller holds the lock)."""
+        columns = header + missing
+        tmp_path = f"{self.path}.tmp"
+        with open(self.path, 'r', newline='', encoding='utf-8') as src, \
+                open(tmp_path, 'w', newline='', encoding='utf-8') as dst:
+            reader = csv.reader(src)
+            writer = csv.writer(dst, lineterminator='\n')
+            next(reader, None)
+            writer.writerow(columns)
+            for row in reader:
+                if row:
+                    writer.writerow(row + [''] * (len(columns) - len(row)))
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.replace(tmp_path, self.path)
+        logging.warning(f"⚠️ {os.path.basename(self.path)} had no column(s) {missing} - added them to its header")
+        return columns
+
+    def _needs_leading_newline(self) -> bool:
+        """True if the existing file does not end with a newline."""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return False
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) not in (b'\n', b'\r')
+
+    def flush(self):
+        """Append buffered rows to disk and fsync. Safe to call repeatedly."""
+        # Non-blocking so a flush from a signal handler can't deadlock an
+        # in-progress flush on the same thread - that flush will finish the job
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            if not self._buffer:
+                return
+            rows = list(self._buffer)
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+            # Locked so a concurrent rewrite can't replace the file under this append
+            with locked_file(self.path):
+                columns = self._resolve_columns()
+                is_new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+                leading_newline = self._needs_leading_newline()
+
+                with open(self.path, 'a', newline='', encoding='utf-8') as f:
+                    if leading_newline:
+                        f.write('\n')
+                    writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore',
+                                            lineterminator='\n')
+                    if is_new:
+                        writer.writeheader()
+                    writer.writerows(rows)
+                    f.flush()
+                    os.fsync(f.fileno())
+            # Drop rows only once they are safely on disk
+            del self._buffer[:len(rows)]
+        except Exception as e:
+            logging.warning(f"⚠️ Could not append to {self.path}: {e}")
+        finally:
+            self._lock.release()
+
+    def close(self):
+        self.flush()
+        _writers.discard(self)
+
+
+def flush_all_writers():
+    """Flush every open writer (campaign end, SIGTERM, interpreter exit).
+
+    Writers whose file lock this thread already holds are skipped: a signal
+    handler runs on the main thread, possibly in the middle of a locked
+    rewrite of that same file, and flock would wait on it forever. Their rows
+    stay buffered for the next flush.
+    """
+    for writer in list(_writers):
+        if holds_lock(writer.path):
+            continue
+        writer.flush()
+
+
+atexit.register(flush_all_writers)
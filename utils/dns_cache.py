@@ -0,0 +1,237 @@
+"""
+Shared DNS resolver cache - every MX/A lookup in the project goes through here.
+An in-process LRU backed by data/dns_cache.json, so a domain is resolved at
+most once per record TTL across all phases of a run and across runs.
+Negative answers (NXDOMAIN, NoAnswer) are cached too, with their own TTL;
+transient failures (timeouts, no nameservers) are only remembered briefly
+in memory.
+"""
+
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import dns.resolver
+    import dns.exception
+    import dns.rdatatype
+    HAS_DNS = True
+except ImportError:
+    HAS_DNS = False
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+DNS_CACHE_PATH = os.getenv('DNS_CACHE_PATH', os.path.join(DATA_DIR, 'dns_cache.json'))
+DNS_CACHE_MAX_ENTRIES = int(os.getenv('DNS_CACHE_MAX_ENTRIES', '20000'))
+# Record TTLs are clamped into [MIN, MAX] - tiny TTLs would defeat the cache,
+# huge ones would keep a moved mail server around for too long
+DNS_MIN_TTL = int(os.getenv('DNS_MIN_TTL', '3600'))
+DNS_MAX_TTL = int(os.getenv('DNS_MAX_TTL', str(7 * 86400)))
+# NXDOMAIN / NoAnswer (RFC 2308: the SOA minimum, capped at this)
+DNS_NEGATIVE_TTL = int(os.getenv('DNS_NEGATIVE_TTL', '86400'))
+# Timeouts / no nameservers - memory only, retried on the next run
+DNS_ERROR_TTL = int(os.getenv('DNS_ERROR_TTL', '300'))
+DNS_LIFETIME = float(os.getenv('DNS_LIFETIME', '5'))
+DNS_RESOLVE_WORKERS = int(os.getenv('DNS_RESOLVE_WORKERS', '16'))
+
+# Statuses that may be written to disk
+PERSISTENT_STATUSES = ('ok', 'nxdomain', 'noanswer')
+
+
+@dataclass
+class DNSAnswer:
+    """Outcome of one lookup: ``status`` is ok/nxdomain/noanswer/nonameservers/timeout/error."""
+    status: str
+    hosts: List[str] = field(default_factory=list)  # MX exchanges by preference, or addresses
+    expires_at: float = 0.0
+    error: str = ''
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 'ok' and bool(self.hosts)
+
+    @property
+    def exists(self) -> Optional[bool]:
+        """True/False when DNS gave a definite answer, None when the lookup failed."""
+        if self.status == 'ok':
+            return bool(self.hosts)
+        if self.status in ('nxdomain', 'noanswer'):
+            return False
+        return None
+
+
+def _negative_ttl(exc) -> int:
+    """SOA minimum from a negative response, else the configured default."""
+    try:
+        if isinstance(exc, dns.resolver.NXDOMAIN):
+            responses = list(exc.responses().values())
+        else:
+            responses = [exc.response()]
+        for response in responses:
+            for rrset in response.authority:
+                if rrset.rdtype == dns.rdatatype.SOA:
+                    return min(DNS_NEGATIVE_TTL, rrset.ttl, rrset[0].minimum)
+    except Exception:
+        pass
+    return DNS_NEGATIVE_TTL
+
+
+class DNSCache:
+    """Thread-safe TTL cache for DNS lookups with a persistent on-disk copy."""
+
+    def __init__(self, path: str = DNS_CACHE_PATH, max_entries: int = DNS_CACHE_MAX_ENTRIES,
+                 lifetime: float = DNS_LIFETIME):
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.lifetime = lifetime
+        self._entries: 'OrderedDict[str, DNSAnswer]' = OrderedDict()
+        self._inflight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    @staticmethod
+    def _key(domain: str, rdtype: str) -> str:
+        return f"{rdtype.upper()}:{str(domain or '').strip().lower().rstrip('.')}"
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            now = time.time()
+            # Oldest expiry first, so the LRU keeps the freshest entries if it overflows
+            for key, value in sorted(raw.items(), key=lambda kv: kv[1].get('expires_at', 0)):
+                answer = DNSAnswer(**value)
+                if answer.expires_at > now:
+                    self._entries[key] = answer
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        except Exception as e:
+            logging.warning(f"⚠️ Could not load DNS cache ({e}) - starting empty")
+            self._entries.clear()
+
+    def _get(self, key: str) -> Optional[DNSAnswer]:
+        answer = self._entries.get(key)
+        if answer is None:
+            return None
+        if answer.expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return answer
+
+    def _put(self, key: str, answer: DNSAnswer):
+        self._entries[key] = answer
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if answer.status in PERSISTENT_STATUSES:
+            self._dirty = True
+
+    def _lookup(self, domain: str, rdtype: str) -> DNSAnswer:
+        now = time.time()
+        if not HAS_DNS:
+            return DNSAnswer('error', expires_at=now + DNS_ERROR_TTL, error='dnspython not installed')
+        try:
+            records = dns.resolver.resolve(domain, rdtype, lifetime=self.lifetime)
+            if rdtype.upper() == 'MX':
+                ordered = sorted(records, key=lambda r: r.preference)
+                hosts = [str(r.exchange).rstrip('.') for r in ordered]
+            else:
+                hosts = [r.to_text() for r in records]
+            ttl = min(max(records.rrset.ttl, DNS_MIN_TTL), DNS_MAX_TTL)
+            return DNSAnswer('ok', hosts, now + ttl)
+        except dns.resolver.NXDOMAIN as e:
+            return DNSAnswer('nxdomain', expires_at=now + _negative_ttl(e), error='Domain does not exist')
+        except dns.resolver.NoAnswer as e:
+            return DNSAnswer('noanswer', expires_at=now + _negative_ttl(e), error=f'No {rdtype} records')
+        except dns.resolver.NoNameservers:
+            return DNSAnswer('nonameservers', expires_at=now + DNS_ERROR_TTL, error='No nameservers')
+        except dns.exception.Timeout:
+            return DNSAnswer('timeout', expires_at=now + DNS_ERROR_TTL, error='DNS timeout')
+        except Exception as e:
+            return DNSAnswer('error', expires_at=now + DNS_ERROR_TTL, error=str(e))
+
+    def resolve(self, domain: str, rdtype: str = 'MX') -> DNSAnswer:
+        """Cached lookup; concurrent callers for the same name share one query."""
+        key = self._key(domain, rdtype)
+        while True:
+            with self._lock:
+                answer = self._get(key)
+                if answer is not None:
+                    self.hits += 1
+                    return answer
+                event = self._inflight.get(key)
+                if event is None:
+                    event = self._inflight[key] = threading.Event()
+                    self.misses += 1
+                    break
+            # Someone else is resolving this name - wait for their answer
+            event.wait(self.lifetime + 1)
+
+        try:
+            answer = self._lookup(key.split(':', 1)[1], rdtype)
+            with self._lock:
+                self._put(key, answer)
+            return answer
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def resolve_many(self, domains: Iterable[str], rdtype: str = 'MX',
+                     max_workers: int = DNS_RESOLVE_WORKERS) -> Dict[str, DNSAnswer]:
+        """Resolve many domains concurrently (cache hits cost nothing)."""
+        unique = list(dict.fromkeys(str(d or '').strip().lower().rstrip('.') for d in domains))
+        unique = [d for d in unique if d]
+        if not unique:
+            return {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unique)))) as executor:
+            answers = dict(zip(unique, executor.map(lambda d: self.resolve(d, rdtype), unique)))
+        return answers
+
+    def mx_hosts(self, domain: str) -> List[str]:
+        return self.resolve(domain, 'MX').hosts
+
+    def save(self):
+        """Atomically write the persistent (non-expired, definite) entries."""
+        with self._lock:
+            if not self._dirty or not self.path:
+                return
+            now = time.time()
+            data = {key: asdict(answer) for key, answer in self._entries.items()
+                    if answer.status in PERSISTENT_STATUSES and answer.expires_at > now}
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.warning(f"⚠️ Could not save DNS cache: {e}")
+
+
+_dns_cache: Optional[DNSCache] = None
+_dns_cache_lock = threading.Lock()
+
+
+def get_dns_cache() -> DNSCache:
+    """Process-wide DNS cache (saved at interpreter exit)."""
+    global _dns_cache
+    with _dns_cache_lock:
+        if _dns_cache is None:
+            _dns_cache = DNSCache()
+            atexit.register(_dns_cache.save)
+        return _dns_cache
@@ -0,0 +1,185 @@
+"""
+Per-domain bounce statistics, maintained incrementally.
+A small persisted table (domain, sent, bounced, last_updated) that is updated
+as sends and bounces are recorded, so the problematic-domain verdict is a
+dictionary lookup instead of a groupby over the whole sent log.
+
+Several processes (the sender, the bounce checker) keep their own copy, so a
+save re-reads the file under a lock and adds this process's counts since its
+last save rather than overwriting the other writers' counts.
+"""
+
+import os
+import re
+import csv
+import atexit
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from utils.csv_log import locked_file
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+DOMAIN_STATS_PATH = os.path.join(DATA_DIR, 'domain_bounce_stats.csv')
+
+# Same status keywords the sent-log analysis has always treated as a bounce
+BOUNCE_STATUS_RE = re.compile(r'bounced|failed|undeliverable|rejected')
+
+# Domains with >= MIN_SENT emails and >= MIN_BOUNCE_RATIO bounced are problematic
+MIN_SENT = 2
+MIN_BOUNCE_RATIO = 0.5
+
+
+def is_bounce_status(status) -> bool:
+    return bool(status) and BOUNCE_STATUS_RE.search(str(status).lower()) is not None
+
+
+def email_domain(email) -> str:
+    email = str(email or '').strip().lower()
+    return email.split('@')[-1] if email and email != 'nan' else ''
+
+
+class DomainBounceStats:
+    """Persisted sent/bounced counters per recipient domain."""
+
+    COLUMNS = ['domain', 'sent', 'bounced', 'last_updated']
+
+    def __init__(self, path: str = DOMAIN_STATS_PATH, storage=None):
+        if storage is None:
+            from utils.storage import get_storage
+            storage = get_storage()
+        self.path = path
+        self.storage = storage
+        self.stats: Dict[str, dict] = {}
+        # Counts added since the last load/save; these are what a save merges
+        self._deltas: Dict[str, dict] = {}
+        # After a rebuild the in-memory table replaces the file outright
+        self._replace = False
+        self._dirty = False
+
+        if os.path.exists(self.path):
+            self._load()
+        elif self.storage.exists('sent_emails'):
+            # First run (or table lost from cache) - build it once from the raw log
+            logging.info("📊 Domain bounce stats not found - rebuilding from sent log")
+            self.rebuild()
+        atexit.register(self.save)
+
+    def _read(self) -> Dict[str, dict]:
+        stats = {}
+        if not os.path.exists(self.path):
+            return stats
+        with open(self.path, 'r', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                domain = row.get('domain', '')
+                if domain:
+                    stats[domain] = {
+                        'sent': int(row.get('sent') or 0),
+                        'bounced': int(row.get('bounced') or 0),
+                        'last_updated': row.get('last_updated', ''),
+                    }
+        return stats
+
+    def _load(self):
+        try:
+            self.stats = self._read()
+        except Exception as e:
+            logging.warning(f"⚠️ Could not load domain stats ({e}) - rebuilding from sent log")
+            self.rebuild()
+
+    def _count(self, domain: str, sent: int, bounced: int):
+        now = datetime.now().isoformat()
+        for table in (self.stats, self._deltas):
+            entry = table.get(domain)
+            if entry is None:
+                entry = table[domain] = {'sent': 0, 'bounced': 0, 'last_updated': ''}
+            entry['sent'] += sent
+            entry['bounced'] += bounced
+            entry['last_updated'] = now
+        self._dirty = True
+
+    def record_send(self, email: str, status: str):
+        """Count one sent-log row (any status) for the recipient's domain."""
+        domain = email_domain(email)
+        if not domain:
+            return
+        self._count(domain, 1, 1 if is_bounce_status(status) else 0)
+
+    def record_bounce(self, email: str):
+        """Count a bounce for a row that was previously logged as delivered."""
+        domain = email_domain(email)
+        if not domain:
+            return
+        self._count(domain, 0, 1)
+
+    def verdict(self, domain: str) -> Optional[str]:
+        """Reason string if ``domain`` has a high bounce rate, else None."""
+        entry = self.stats.get(domain)
+        if not entry or entry['sent'] < MIN_SENT:
+            return None
+        if entry['bounced'] / entry['sent'] >= MIN_BOUNCE_RATIO:
+            return f"High bounce rate ({entry['bounced']}/{entry['sent']} emails bounced)"
+        return None
+
+    def problematic_domains(self) -> Dict[str, str]:
+        problematic = {}
+        for domain in self.stats:
+            reason = self.verdict(domain)
+            if reason:
+                problematic[domain] = reason
+        return problematic
+
+    def rebuild(self) -> int:
+        """Recompute every counter from the raw sent log. Returns rows scanned."""
+        self.stats = {}
+        rows = 0
+        for row in self.storage.iter_rows('sent_emails'):
+            self.record_send(row.get('recipient_email'), row.get('status'))
+            rows += 1
+        self._deltas = {}
+        self._replace = True
+        self._dirty = True
+        self.save()
+        logging.info(f"📊 Rebuilt domain stats: {len(self.stats)} domains from {rows} sent-log rows")
+        return rows
+
+    def save(self):
+        """Merge this process's new counts into the file and atomically rewrite it.
+
+        The file is re-read under its lock, so counts another process saved
+        since we loaded are kept; ours are added on top as deltas.
+        """
+        if not self._dirty:
+            return
+        try:
+            with locked_file(self.path):
+                if self._replace:
+                    stats = self.stats
+                else:
+                    try:
+                        stats = self._read()
+                    except Exception as e:
+                        logging.warning(f"⚠️ Could not re-read domain stats ({e}) - writing ours")
+                        stats = self.stats
+                        self._deltas = {}
+                    for domain, delta in self._deltas.items():
+                        entry = stats.get(domain)
+                        if entry is None:
+                            entry = stats[domain] = {'sent': 0, 'bounced': 0, 'last_updated': ''}
+                        entry['sent'] += delta['sent']
+                        entry['bounced'] += delta['bounced']
+                        entry['last_updated'] = max(entry['last_updated'], delta['last_updated'])
+
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.DictWriter(f, fieldnames=self.COLUMNS, lineterminator='\n')
+                    writer.writeheader()
+                    for domain in sorted(stats):
+                        writer.writerow({'domain': domain, **stats[domain]})
+                os.replace(tmp_path, self.path)
+            self.stats = stats
+            self._deltas = {}
+            self._replace = False
+            self._dirty = False
+        except Exception as e:
+            logging.warning(f"⚠️ Could not save domain stats: {e}")
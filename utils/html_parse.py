@@ -0,0 +1,125 @@
+"""
+HTML parsing helpers for the scrapers.
+Scrapers used to build a full BeautifulSoup tree with the pure-Python
+'html.parser' for every page, even when they only read a few job cards or
+scanned the text for email addresses. These helpers:
+
+- parse with lxml (C parser, already in requirements.txt)
+- with a filter, build only the matching subtrees (``SoupStrainer``),
+  e.g. the job cards of a search page
+- answer the hottest questions - visible page text, mailto addresses and
+  job cards of the busiest boards - straight from an lxml tree with XPath,
+  without building BeautifulSoup objects at all
+"""
+
+import re
+from typing import Any, Callable, List, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree
+from lxml import html as lxml_html
+
+
+HTML_PARSER = 'lxml'
+
+
+# Text BeautifulSoup's get_text() leaves out as well
+_HIDDEN_TAGS = ('script', 'style', 'template')
+# XPath expressions may use EXSLT regexes, e.g. re:test(@class, 'title|job-title')
+_XPATH_NAMESPACES = {'re': 'http://exslt.org/regular-expressions'}
+_MAILTO_XPATH = "//a[starts-with(translate(normalize-space(@href), 'MAILTO', 'mailto'), 'mailto:')]/@href"
+
+
+class _MatchStrainer(SoupStrainer):
+    """Builds the elements for which ``match(name, attrs)`` is true.
+
+    A callable ``name`` only sees the tag name while parsing (bs4 >= 4.13), so
+    conditions across attributes ("this class OR that attribute") need the
+    raw tag data. ``attrs`` maps attribute names to their unsplit values.
+    """
+
+    def __init__(self, match: Callable[[str, dict], bool]):
+        super().__init__()
+        self._match = match
+
+    # bs4 >= 4.13
+    def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+        return bool(self._match(name, dict(attrs or {})))
+
+    def allow_string_creation(self, string) -> bool:
+        return False
+
+    # Older bs4
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        if isinstance(markup_name, str) and self._match(markup_name, dict(markup_attrs or {})):
+            return markup_name
+        return None
+
+
+def parse_html(markup: str, name=None, attrs: Optional[dict] = None,
+               match: Optional[Callable[[str, dict], bool]] = None, **kwargs) -> BeautifulSoup:
+    """BeautifulSoup tree built by lxml.
+
+    Given ``name``/``attrs`` (same meaning as in ``find_all``), only matching
+    elements and their descendants are built; everything else on the page
+    is skipped while parsing. ``match(name, attrs)`` filters on the raw tag
+    data instead, for conditions a ``SoupStrainer`` cannot express.
+    """
+    if match is not None:
+        only = _MatchStrainer(match)
+    else:
+        only = SoupStrainer(name, attrs or {}, **kwargs) if (name or attrs or kwargs) else None
+    return BeautifulSoup(markup, HTML_PARSER, parse_only=only)
+
+
+def find_cards(markup: str, name, attrs: Optional[dict] = None, limit: Optional[int] = None) -> list:
+    """``BeautifulSoup(markup).find_all(name, attrs)``, parsing only those elements."""
+    return parse_html(markup, name, attrs).find_all(name, attrs or {}, limit=limit)
+
+
+def _tree(markup: str):
+    try:
+        return lxml_html.document_fromstring(markup)
+    except ValueError:
+        # Unicode input with an XML encoding declaration
+        return lxml_html.document_fromstring(markup.encode('utf-8'))
+    except etree.ParserError:  # empty document
+        return None
+
+
+def page_text(markup: str) -> str:
+    """Visible text of a page, space separated (scripts, styles and comments left out)."""
+    root = _tree(markup)
+    if root is None:
+        return ''
+    etree.strip_elements(root, etree.Comment, *_HIDDEN_TAGS, with_tail=False)
+    return ' '.join(root.itertext())
+
+
+def mailto_addresses(markup: str) -> List[str]:
+    """Addresses of the page's mailto: links (query such as ?subject= dropped)."""
+    root = _tree(markup)
+    hrefs = root.xpath(_MAILTO_XPATH) if root is not None else []
+    return [re.sub(r'^mailto:', '', href.strip(), flags=re.I).split('?')[0].strip() for href in hrefs]
+
+
+def xpath(source, path: str) -> list:
+    """Results of an XPath over a page (markup) or an element from an earlier call."""
+    if isinstance(source, str):
+        source = _tree(source)
+        if source is None:
+            return []
+    return source.xpath(path, namespaces=_XPATH_NAMESPACES)
+
+
+def first(source, path: str) -> Optional[Any]:
+    """First result of ``xpath``, or None."""
+    results = xpath(source, path)
+    return results[0] if results else None
+
+
+def element_text(element) -> str:
+    """Whitespace-collapsed text of an lxml element ('' for None)."""
+    if element is None:
+        return ''
+    return ' '.join(element.text_content().split())
@@ -0,0 +1,239 @@
+"""
+On-disk HTTP cache with conditional GET for job feeds and JSON APIs.
+Every scheduled run used to download full RSS/JSON payloads even when the feed
+had not changed since the previous run. Responses are now stored under
+data/http_cache/ (one body file per URL plus an index.json of validators):
+
+- within a source's max-age the stored body is served without any request
+- after that the request carries If-None-Match / If-Modified-Since, and a
+  304 Not Modified is answered from the stored body
+
+Max-age is HTTP_CACHE_MAX_AGE seconds, overridable per source with
+HTTP_CACHE_MAX_AGE_<SOURCE> (e.g. HTTP_CACHE_MAX_AGE_REMOTEOK=3600).
+"""
+
+import os
+import re
+import json
+import time
+import atexit
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+HTTP_CACHE_DIR = os.getenv('HTTP_CACHE_DIR', os.path.join(DATA_DIR, 'http_cache'))
+HTTP_CACHE_MAX_AGE = int(os.getenv('HTTP_CACHE_MAX_AGE', '900'))
+HTTP_CACHE_MAX_ENTRIES = int(os.getenv('HTTP_CACHE_MAX_ENTRIES', '500'))
+# Entries not revalidated for this long are dropped at load
+HTTP_CACHE_RETENTION = int(os.getenv('HTTP_CACHE_RETENTION', str(7 * 86400)))
+
+# Response headers kept with the body (enough to rebuild a usable Response)
+_KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+def max_age_for(source: Optional[str]) -> int:
+    """Seconds a source's cached responses are served without revalidating."""
+    if source:
+        value = os.getenv(f"HTTP_CACHE_MAX_AGE_{re.sub(r'[^A-Z0-9]+', '_', source.upper())}")
+        if value:
+            return int(value)
+    return HTTP_CACHE_MAX_AGE
+
+
+class HTTPCache:
+    """Thread-safe store of response bodies and their validators, keyed by URL."""
+
+    def __init__(self, directory: str = HTTP_CACHE_DIR, max_entries: int = HTTP_CACHE_MAX_ENTRIES):
+        self.directory = directory
+        self.index_path = os.path.join(directory, 'index.json')
+        self.max_entries = max(1, max_entries)
+        self._entries: 'OrderedDict[str, dict]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.hits = 0
+        self.not_modified = 0
+        self.downloads = 0
+        self._load()
+
+    @staticmethod
+    def _url(url: str, params: Optional[dict] = None) -> str:
+        if not params:
+            return url
+        return requests.Request('GET', url, params=params).prepare().url
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.body")
+
+    def _load(self):
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            cutoff = time.time() - HTTP_CACHE_RETENTION
+            # Least recently validated first, so the LRU keeps the freshest if it overflows
+            for key, entry in sorted(raw.items(), key=lambda kv: kv[1].get('validated_at', 0)):
+                if entry.get('validated_at', 0) > cutoff and os.path.exists(self._body_path(key)):
+                    self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._evict()
+        except Exception as e:
+            logging.warning(f"⚠️ Could not load HTTP cache ({e}) - starting empty")
+            self._entries.clear()
+
+    def _evict(self):
+        key, _ = self._entries.popitem(last=False)
+        try:
+            os.remove(self._body_path(key))
+        except OSError:
+            pass
+        self._dirty = True
+
+    def _read_body(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._body_path(key), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _response(url: str, entry: dict, body: bytes, origin: Optional[requests.Response] = None) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response._content = body
+        response.headers = CaseInsensitiveDict(entry.get('headers', {}))
+        response.encoding = entry.get('encoding')
+        response.url = url
+        if origin is not None:
+            response.request = origin.request
+            response.elapsed = origin.elapsed
+        response.from_cache = True
+        return response
+
+    def fresh(self, url: str, params: Optional[dict] = None, source: Optional[str] = None) -> Optional[requests.Response]:
+        """The stored response if it is younger than the source's max-age."""
+        url = self._url(url, params)
+        key = self._key(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry['validated_at'] >= max_age_for(source):
+                return None
+            self._entries.move_to_end(key)
+        body = self._read_body(key)
+        if body is None:
+            return None
+        with self._lock:
+            self.hits += 1
+        return self._response(url, entry, body)
+
+    def conditional_headers(self, url: str, params: Optional[dict] = None,
+                            headers: Optional[dict] = None) -> Dict[str, str]:
+        """``headers`` plus If-None-Match / If-Modified-Since for a stored response."""
+        headers = dict(headers or {})
+        with self._lock:
+            entry = self._entries.get(self._key(self._url(url, params)))
+        if entry is not None:
+            validators = entry.get('headers', {})
+            if validators.get('ETag'):
+                headers['If-None-Match'] = validators['ETag']
+            if validators.get('Last-Modified'):
+                headers['If-Modified-Since'] = validators['Last-Modified']
+        return headers
+
+    def resolve(self, url: str, params: Optional[dict], response: requests.Response) -> requests.Response:
+        """Answer a 304 from the stored body; remember a 200 for next time."""
+        url = self._url(url, params)
+        key = self._key(url)
+        if response.status_code == 304:
+            with self._lock:
+                entry = self._entries.get(key)
+            body = self._read_body(key) if entry is not None else None
+            if body is None:
+                return response
+            with self._lock:
+                entry['validated_at'] = time.time()
+                self._entries.move_to_end(key)
+                self.not_modified += 1
+                self._dirty = True
+            return self._response(url, entry, body, response)
+
+        if response.status_code == 200 and 'no-store' not in response.headers.get('Cache-Control', ''):
+            self._store(key, url, response)
+        return response
+
+    def _store(self, key: str, url: str, response: requests.Response):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{self._body_path(key)}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(response.content)
+            os.replace(tmp_path, self._body_path(key))
+        except Exception as e:
+            logging.debug(f"Could not cache {url}: {e}")
+            return
+        now = time.time()
+        entry = {
+            'url': url,
+            'headers': {name: response.headers[name] for name in _KEPT_HEADERS if name in response.headers},
+            'encoding': response.encoding,
+            'stored_at': now,
+            'validated_at': now,
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self.downloads += 1
+            while len(self._entries) > self.max_entries:
+                self._evict()
+            self._dirty = True
+
+    def get(self, session, url: str, source: Optional[str] = None, **kwargs) -> requests.Response:
+        """``session.get(url, **kwargs)`` through the cache (any requests-like session)."""
+        params = kwargs.get('params')
+        cached = self.fresh(url, params, source)
+        if cached is not None:
+            return cached
+        kwargs['headers'] = self.conditional_headers(url, params, kwargs.get('headers'))
+        return self.resolve(url, params, session.get(url, **kwargs))
+
+    def save(self):
+        """Atomically write the index (bodies are written as they arrive)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = dict(self._entries)
+            self._dirty = False
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            logging.warning(f"⚠️ Could not save HTTP cache: {e}")
+
+
+_http_cache: Optional[HTTPCache] = None
+_http_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> HTTPCache:
+    """Process-wide HTTP cache (index saved at interpreter exit)."""
+    global _http_cache
+    with _http_cache_lock:
+        if _http_cache is None:
+            _http_cache = HTTPCache()
+            atexit.register(_http_cache.save)
+        return _http_cache
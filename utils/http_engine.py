@@ -0,0 +1,345 @@
+"""
+Shared HTTP fetch engine for the scrapers.
+Every scraper used to keep its own requests.Session and sleep a random 1-5
+seconds between requests, so a run was a long line of serial I/O. Scrapers
+now hand the engine batches of requests; it runs them on asyncio over a
+thread pool (requests is blocking and no async client is a dependency) with:
+
+- a token bucket per host (HTTP_HOST_RATE requests/s, bursts of HTTP_HOST_BURST)
+- a cap on requests in flight per host (HTTP_HOST_CONCURRENCY), so a batch
+  to one slow host doesn't take every connection
+- a global cap on requests in flight (HTTP_MAX_CONCURRENCY)
+- retries with jittered exponential backoff on 429/5xx and connection errors,
+  honouring Retry-After; a 429 also pauses that host's bucket
+- one keep-alive connection pool shared by every caller; requests marked
+  ``cookies=False`` (e.g. the retry after a 403) go out without the shared
+  cookie jar instead of clearing it for every other scraper
+- optional conditional-GET caching (utils.http_cache) for requests that
+  name a ``cache_source``
+- the calling source's fan-out deadline, checked before every attempt
+
+Throughput is bounded by the politeness limits instead of by serial waits.
+"""
+
+import os
+import time
+import random
+import atexit
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from http.cookiejar import DefaultCookiePolicy
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.http_cache import get_http_cache
+from utils.source_fanout import check_deadline, note_status
+
+
+HTTP_MAX_CONCURRENCY = int(os.getenv('HTTP_MAX_CONCURRENCY', '8'))
+# Sustained requests per second per host, and how many may go back to back
+HTTP_HOST_RATE = float(os.getenv('HTTP_HOST_RATE', '0.5'))
+HTTP_HOST_BURST = float(os.getenv('HTTP_HOST_BURST', '2'))
+HTTP_HOST_CONCURRENCY = int(os.getenv('HTTP_HOST_CONCURRENCY', '2'))
+# How often a request waiting for a host slot checks again
+HTTP_SLOT_POLL = 0.05
+HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', '3'))
+HTTP_BACKOFF_BASE = float(os.getenv('HTTP_BACKOFF_BASE', '1.0'))
+HTTP_BACKOFF_MAX = float(os.getenv('HTTP_BACKOFF_MAX', '30'))
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                  '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket; ``reserve`` hands out tokens ahead of time as waits."""
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.capacity = max(1.0, burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Take a token; returns the seconds to wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def pause(self, seconds: float):
+        """No tokens for the next ``seconds`` (the host asked us to slow down)."""
+        if self.rate <= 0 or seconds <= 0:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+
+class HostSlots:
+    """Thread-safe cap on requests in flight to one host.
+
+    Batches run on separate event loops (one per ``fetch_all`` call, from
+    several source threads at once), so an ``asyncio.Semaphore`` can't be
+    shared; ``acquire`` polls a counter instead.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.in_flight >= self.limit:
+                return False
+            self.in_flight += 1
+            return True
+
+    async def acquire(self):
+        while not self.try_acquire():
+            await asyncio.sleep(HTTP_SLOT_POLL)
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+
+@dataclass
+class FetchRequest:
+    """One request of a batch; ``tag`` is the caller's context, returned untouched.
+
+    GETs with a ``cache_source`` go through the on-disk HTTP cache under that
+    source's max-age. ``cookies=False`` neither sends nor stores cookies.
+    """
+    url: str
+    method: str = 'GET'
+    params: Optional[dict] = None
+    data: Any = None
+    json: Any = None
+    headers: Optional[dict] = None
+    timeout: float = 15
+    tag: Any = None
+    cache_source: Optional[str] = None
+    cookies: bool = True
+
+
+@dataclass
+class FetchResult:
+    """Outcome of a FetchRequest: the last response, or the error if there was none."""
+    request: FetchRequest
+    response: Optional[requests.Response] = None
+    error: Optional[Exception] = None
+    attempts: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.response is not None and self.response.status_code == 200
+
+    @property
+    def status_code(self) -> Optional[int]:
+        return self.response.status_code if self.response is not None else None
+
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class FetchEngine:
+    """Runs batches of HTTP requests concurrently within per-host and global limits."""
+
+    def __init__(self, max_concurrency: int = HTTP_MAX_CONCURRENCY, host_rate: float = HTTP_HOST_RATE,
+                 host_burst: float = HTTP_HOST_BURST, retries: int = HTTP_RETRIES,
+                 headers: Optional[dict] = None, host_concurrency: int = HTTP_HOST_CONCURRENCY):
+        self.max_concurrency = max(1, max_concurrency)
+        self.host_concurrency = max(1, host_concurrency)
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.retries = max(0, retries)
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        # Keep-alive pool large enough that concurrent requests to one host reuse connections
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=self.max_concurrency)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # Same headers and connections, but a jar that accepts no cookies
+        self._cookieless = requests.Session()
+        self._cookieless.headers.update(self.session.headers)
+        self._cookieless.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        self._cookieless.mount('https://', adapter)
+        self._cookieless.mount('http://', adapter)
+        # The pool size is the global cap on requests in flight
+        self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='fetch')
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._slots: Dict[str, HostSlots] = {}
+        self._host_limits: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def set_host_rate(self, host: str, rate: float, burst: float = 1.0):
+        """Override the politeness limit for one host (e.g. a stricter job board)."""
+        with self._lock:
+            self._host_limits[host.lower()] = (rate, burst)
+            self._buckets.pop(host.lower(), None)
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = (urlsplit(url).hostname or '').lower()
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self._host_limits.get(host, (self.host_rate, self.host_burst))
+                bucket = self._buckets[host] = TokenBucket(rate, burst)
+            return bucket
+
+    def _host_slots(self, url: str) -> HostSlots:
+        host = (urlsplit(url).hostname or '').lower()
+        with self._lock:
+            slots = self._slots.get(host)
+            if slots is None:
+                slots = self._slots[host] = HostSlots(self.host_concurrency)
+            return slots
+
+    def _backoff(self, attempt: int) -> float:
+        # Exponential with jitter so retries from parallel requests don't line up
+        return min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def _send(self, request: FetchRequest, headers: Optional[dict]) -> requests.Response:
+        session = self.session if request.cookies else self._cookieless
+        return session.request(request.method, request.url, params=request.params,
+                                    data=request.data, json=request.json,
+                                    headers=headers, timeout=request.timeout)
+
+    def _send_in_slot(self, slots: HostSlots, request: FetchRequest, headers: Optional[dict]) -> requests.Response:
+        # Released by the worker thread, so a cancelled caller can't leak the slot
+        try:
+            return self._send(request, headers)
+        finally:
+            slots.release()
+
+    async def _fetch(self, request: FetchRequest) -> FetchResult:
+        loop = asyncio.get_running_loop()
+        result = FetchResult(request)
+        headers = request.headers
+        cache = get_http_cache() if request.cache_source and request.method == 'GET' else None
+        if cache is not None:
+            result.response = cache.fresh(request.url, request.params, request.cache_source)
+            if result.response is not None:
+                return result
+            headers = cache.conditional_headers(request.url, request.params, headers)
+
+        bucket = self._bucket(request.url)
+        slots = self._host_slots(request.url)
+        for attempt in range(self.retries + 1):
+            # A source past its deadline (utils.source_fanout) stops here instead
+            # of running on in the background; raises SourceDeadlineExceeded
+            check_deadline()
+            wait = bucket.reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                check_deadline()
+            await slots.acquire()
+            try:
+                check_deadline()
+            except BaseException:
+                slots.release()
+                raise
+            result.attempts = attempt + 1
+            retry_after = None
+            try:
+                response = await loop.run_in_executor(self._pool, self._send_in_slot, slots, request, headers)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                result.response, result.error = None, e
+                note_status(type(e).__name__)
+            except requests.RequestException as e:
+                result.response, result.error = None, e
+                note_status(type(e).__name__)
+                return result
+            else:
+                # Runs on the caller's thread, so it lands on the calling source (if any)
+                note_status(response.status_code)
+                if cache is not None:
+                    response = cache.resolve(request.url, request.params, response)
+                result.response, result.error = response, None
+                if response.status_code not in RETRY_STATUSES:
+                    return result
+                retry_after = _retry_after(response)
+                if response.status_code == 429:
+                    bucket.pause(retry_after if retry_after is not None else self._backoff(attempt))
+            if attempt == self.retries:
+                break
+            delay = min(retry_after, HTTP_BACKOFF_MAX) if retry_after is not None else self._backoff(attempt)
+            logging.debug(f"Retrying {request.url} in {delay:.1f}s (attempt {attempt + 1}: "
+                          f"{result.status_code or result.error})")
+            await asyncio.sleep(delay)
+        return result
+
+    async def gather(self, requests_: Iterable[FetchRequest]) -> List[FetchResult]:
+        """Async entry point: fetch a batch, results in input order."""
+        return list(await asyncio.gather(*(self._fetch(request) for request in requests_)))
+
+    def fetch_all(self, batch: Iterable[Union[FetchRequest, str]]) -> List[FetchResult]:
+        """Fetch a batch of requests (or URLs) concurrently; results in input order."""
+        batch = [item if isinstance(item, FetchRequest) else FetchRequest(item) for item in batch]
+        if not batch:
+            return []
+        return asyncio.run(self.gather(batch))
+
+    def fetch(self, url: str, method: str = 'GET', **kwargs) -> requests.Response:
+        """One request under the same limits and retries; raises like ``requests`` if nothing came back."""
+        result = self.fetch_all([FetchRequest(url, method, **kwargs)])[0]
+        if result.response is None:
+            raise result.error
+        return result.response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.fetch(url, 'GET', **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.fetch(url, 'POST', **kwargs)
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+        self.session.close()
+        self._cookieless.close()
+
+
+_engine: Optional[FetchEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_fetch_engine() -> FetchEngine:
+    """Process-wide engine, so all scrapers in a run share limits and connections."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = FetchEngine()
+            atexit.register(_engine.close)
+        return _engine
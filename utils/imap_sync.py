@@ -0,0 +1,468 @@
+"""
+Incremental IMAP scanning - only look at mail that arrived since the last run.
+For every (server, account, mailbox, consumer) we persist the mailbox's
+UIDVALIDITY and the highest UID already processed in data/imap_cursors.json.
+The next scan asks the server for ``UID last+1:*`` instead of re-reading the
+whole ``SINCE <N days ago>`` window; if UIDVALIDITY changed (mailbox rebuilt,
+UIDs reassigned) or there is no cursor yet, it falls back to the date window.
+
+Messages are then read in two phases: selected headers and BODYSTRUCTURE for
+all of them in a few batched FETCHes, and only the body parts a scanner
+actually needs, only for the messages its header filter kept. Both phases
+request compact UID sets ("1:200,305") in chunks and yield messages one chunk
+at a time, so a 30-day window never sits in memory at once.
+"""
+
+import os
+import re
+import json
+import email
+import quopri
+import base64
+import atexit
+import binascii
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from email.message import Message
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+IMAP_CURSORS_PATH = os.getenv('IMAP_CURSORS_PATH', os.path.join(DATA_DIR, 'imap_cursors.json'))
+# Set IMAP_INCREMENTAL=false to always scan the full date window
+IMAP_INCREMENTAL = os.getenv('IMAP_INCREMENTAL', 'true').lower() not in ('0', 'false', 'no')
+
+
+class CursorStore:
+    """Thread-safe {cursor key: {'uidvalidity', 'last_uid', 'updated_at'}} backed by JSON."""
+
+    def __init__(self, path: str = IMAP_CURSORS_PATH):
+        self.path = path
+        self._cursors: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._load()
+
+    @staticmethod
+    def key(server: str, account: str, mailbox: str, consumer: str) -> str:
+        # Mailbox names are case-sensitive (except INBOX); server and account are not
+        return '|'.join((str(server or '').strip().lower(), str(account or '').strip().lower(),
+                         str(mailbox or ''), str(consumer or '')))
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._cursors = json.load(f)
+        except Exception as e:
+            logging.warning(f"⚠️ Could not load IMAP cursors ({e}) - next scan uses the date window")
+            self._cursors = {}
+
+    def get(self, key: str) -> Optional[Tuple[int, int]]:
+        """(uidvalidity, last_uid) or None."""
+        with self._lock:
+            cursor = self._cursors.get(key)
+            return (cursor['uidvalidity'], cursor['last_uid']) if cursor else None
+
+    def set(self, key: str, uidvalidity: int, last_uid: int):
+        with self._lock:
+            self._cursors[key] = {'uidvalidity': uidvalidity, 'last_uid': last_uid,
+                                  'updated_at': datetime.now().isoformat()}
+            self._dirty = True
+
+    def save(self):
+        """Atomically write the cursors."""
+        with self._lock:
+            if not self._dirty or not self.path:
+                return
+            data = dict(self._cursors)
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.warning(f"⚠️ Could not save IMAP cursors: {e}")
+
+
+_cursor_store: Optional[CursorStore] = None
+_cursor_store_lock = threading.Lock()
+
+
+def get_cursor_store() -> CursorStore:
+    """Process-wide cursor store (saved at interpreter exit)."""
+    global _cursor_store
+    with _cursor_store_lock:
+        if _cursor_store is None:
+            _cursor_store = CursorStore()
+            atexit.register(_cursor_store.save)
+        return _cursor_store
+
+
+def _parse_uids(data) -> List[int]:
+    if not data or not data[0]:
+        return []
+    return [int(uid) for uid in data[0].split()]
+
+
+class MailboxCursor:
+    """UID high-water mark of one consumer (e.g. 'bounces') over one mailbox.
+
+    Usage::
+
+        cursor = MailboxCursor(mail, server, account, 'bounces')
+        for uid in cursor.select_new(days_back=7):
+            ... mail.uid('FETCH', str(uid), ...) ...
+            cursor.advance(uid)
+        cursor.save()
+
+    ``advance`` is called after a message has been handled and ``save`` may be
+    called at any point, so a crash mid-scan re-reads only the unprocessed tail.
+    """
+
+    def __init__(self, mail, server: str, account: str, consumer: str,
+                 mailbox: str = 'INBOX', store: Optional[CursorStore] = None):
+        self.mail = mail
+        self.mailbox = mailbox
+        self.store = store or get_cursor_store()
+        self.key = CursorStore.key(server, account, mailbox, consumer)
+        self.uidvalidity: Optional[int] = None
+        self.uidnext: Optional[int] = None
+        self.last_uid = 0
+        self.incremental = False
+        self._positioned = False
+
+    def _mailbox_value(self, name: str) -> Optional[int]:
+        """UIDVALIDITY/UIDNEXT from the SELECT response, else from STATUS."""
+        _, data = self.mail.response(name)
+        if not data or data[0] is None:
+            _, status_data = self.mail.status(self.mailbox, f'({name})')
+            text = status_data[0].decode() if status_data and status_data[0] else ''
+            value = text.split(name, 1)[1].split()[0].strip(' )') if name in text else None
+        else:
+            value = data[0]
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    def select(self, readonly: bool = False) -> bool:
+        """SELECT the mailbox and note its UIDVALIDITY/UIDNEXT."""
+        status, _ = self.mail.select(self.mailbox, readonly=readonly)
+        if status != 'OK':
+            return False
+        self.uidvalidity = self._mailbox_value('UIDVALIDITY')
+        self.uidnext = self._mailbox_value('UIDNEXT')
+        return True
+
+    def adopt_selection(self, other: 'MailboxCursor'):
+        """Reuse another cursor's SELECT of the same mailbox on the same connection."""
+        self.uidvalidity = other.uidvalidity
+        self.uidnext = other.uidnext
+
+    def select_new(self, days_back: int = 7, readonly: bool = False) -> Optional[List[int]]:
+        """SELECT the mailbox and return the UIDs to process (None if SELECT/SEARCH failed)."""
+        if not self.select(readonly):
+            return None
+        return self.search_new(days_back)
+
+    def search_new(self, days_back: int = 7) -> Optional[List[int]]:
+        """UIDs above the saved high-water mark, or the date window (mailbox already selected)."""
+        saved = self.store.get(self.key) if IMAP_INCREMENTAL else None
+        if saved and self.uidvalidity is not None and saved[0] == self.uidvalidity:
+            self.last_uid = saved[1]
+            self.incremental = True
+            status, data = self.mail.uid('SEARCH', None, f'UID {self.last_uid + 1}:*')
+            if status != 'OK':
+                return None
+            self._positioned = True
+            # "n:*" always matches the highest UID, even when it is below n
+            return [uid for uid in _parse_uids(data) if uid > self.last_uid]
+
+        if saved and saved[0] != self.uidvalidity:
+            logging.info(f"📭 UIDVALIDITY of {self.mailbox} changed - rescanning the last {days_back} days")
+        since = (datetime.now() - timedelta(days=days_back)).strftime('%d-%b-%Y')
+        status, data = self.mail.uid('SEARCH', None, f'(SINCE {since})')
+        if status != 'OK':
+            return None
+        uids = _parse_uids(data)
+        # Start the cursor just below the window; mail older than it stays skipped
+        if uids:
+            self.last_uid = min(uids) - 1
+        elif self.uidnext:
+            self.last_uid = self.uidnext - 1
+        else:
+            return uids
+        self._positioned = True
+        return uids
+
+    def advance(self, uid: int):
+        """Mark ``uid`` (and everything below it) as processed."""
+        if uid > self.last_uid:
+            self.last_uid = uid
+
+    def save(self):
+        """Persist the high-water mark (once select_new() has established one)."""
+        if self.uidvalidity is None or not self._positioned:
+            return
+        self.store.set(self.key, self.uidvalidity, self.last_uid)
+        self.store.save()
+
+
+# --- Two-phase fetch: headers for everything, body parts only where needed ---
+
+# Headers every scanner decides on; everything else stays on the server
+HEADER_FIELDS = ('FROM', 'SUBJECT', 'DATE', 'MESSAGE-ID', 'IN-REPLY-TO', 'CONTENT-TYPE')
+# UIDs per FETCH command
+IMAP_FETCH_BATCH = int(os.getenv('IMAP_FETCH_BATCH', '200'))
+
+_TOKEN_RE = re.compile(
+    rb'\s*(?:(?P<open>\()|(?P<close>\))|"(?P<quoted>(?:[^"\\]|\\.)*)"'
+    rb'|(?P<atom>[^\s()"\[]+(?:\[[^\]]*\](?:<\d+>)?)?))'
+)
+
+
+@dataclass
+class MessagePart:
+    """One leaf of a BODYSTRUCTURE; ``part_id`` is the IMAP section number ("1", "2.1", ...)."""
+    part_id: str
+    mime_type: str
+    charset: str = ''
+    encoding: str = ''
+    size: int = 0
+
+
+@dataclass
+class MessageSummary:
+    """Phase-one result: selected headers and the MIME layout, no body bytes."""
+    uid: int
+    headers: Message
+    parts: List[MessagePart] = field(default_factory=list)
+
+    def find_parts(self, *mime_types: str) -> List[MessagePart]:
+        """The first part of each requested type, in the order given.
+
+        A single-part text message is its own body, whatever its subtype, so
+        it is returned when none of the requested types is present.
+        """
+        found = []
+        for mime_type in mime_types:
+            part = next((p for p in self.parts if p.mime_type == mime_type), None)
+            if part is not None:
+                found.append(part)
+        if not found and len(self.parts) == 1 and self.parts[0].part_id == '1' \
+                and self.parts[0].mime_type.startswith('text/'):
+            found.append(self.parts[0])
+        return found
+
+
+def _tokenize(data: bytes, literals: List[bytes]) -> list:
+    """Parse one FETCH response into nested lists; ``{n}`` markers take the next literal."""
+    stack = [[]]
+    pos = 0
+    while pos < len(data):
+        match = _TOKEN_RE.match(data, pos)
+        if not match or match.end() == pos:
+            break
+        pos = match.end()
+        if match.group('open'):
+            stack.append([])
+        elif match.group('close'):
+            if len(stack) > 1:
+                done = stack.pop()
+                stack[-1].append(done)
+        elif match.group('quoted') is not None:
+            stack[-1].append(re.sub(rb'\\(.)', rb'\1', match.group('quoted')))
+        else:
+            atom = match.group('atom')
+            if atom.upper() == b'NIL':
+                stack[-1].append(None)
+            elif atom.startswith(b'{') and atom.endswith(b'}'):
+                stack[-1].append(literals.pop(0) if literals else b'')
+            else:
+                stack[-1].append(atom)
+    while len(stack) > 1:
+        done = stack.pop()
+        stack[-1].append(done)
+    return stack[0]
+
+
+def _parse_message(current: List[bytes], literals: List[bytes]) -> Optional[list]:
+    parsed = _tokenize(b''.join(current), literals)
+    # [seq, [ITEM, value, ITEM, value, ...]]
+    return parsed[1] if len(parsed) >= 2 and isinstance(parsed[1], list) else None
+
+
+def _split_fetch_response(data: list) -> Iterator[list]:
+    """Yield one parsed item list per message from imaplib's flat FETCH data."""
+    current, literals = None, []
+    for element in data or []:
+        head = element[0] if isinstance(element, tuple) else element
+        if not isinstance(head, bytes):
+            continue
+        if re.match(rb'\d+ \(', head):
+            if current is not None:
+                items = _parse_message(current, literals)
+                if items is not None:
+                    yield items
+            current, literals = [], []
+        if current is None:
+            continue
+        current.append(head)
+        if isinstance(element, tuple):
+            literals.append(element[1])
+    if current is not None:
+        items = _parse_message(current, literals)
+        if items is not None:
+            yield items
+
+
+def _fetch_items(items: list) -> Dict[str, object]:
+    """{'UID': b'5', 'BODYSTRUCTURE': [...], 'BODY[1]': b'...'} for one message."""
+    result = {}
+    for name, value in zip(items[0::2], items[1::2]):
+        if isinstance(name, bytes):
+            key = name.decode('ascii', errors='ignore').upper()
+            # BODY[HEADER.FIELDS (FROM ...)] -> BODY[HEADER.FIELDS]
+            if '[' in key:
+                key = key.split(' ', 1)[0].rstrip(']') + ']'
+            result[key] = value
+    return result
+
+
+def _str(value) -> str:
+    return value.decode('utf-8', errors='ignore') if isinstance(value, bytes) else ''
+
+
+def _leaf_parts(structure, prefix: str = '') -> List[MessagePart]:
+    """Flatten a BODYSTRUCTURE into its leaf parts (message/rfc822 is not descended)."""
+    if not isinstance(structure, list) or not structure:
+        return []
+    if isinstance(structure[0], list):
+        parts = []
+        for index, child in enumerate(structure):
+            if not isinstance(child, list):
+                break  # Subtype and extension data follow the children
+            parts.extend(_leaf_parts(child, f"{prefix}{index + 1}."))
+        return parts
+    params = structure[2] if len(structure) > 2 and isinstance(structure[2], list) else []
+    charset = ''
+    for name, value in zip(params[0::2], params[1::2]):
+        if _str(name).lower() == 'charset':
+            charset = _str(value)
+    try:
+        size = int(structure[6]) if len(structure) > 6 else 0
+    except (TypeError, ValueError):
+        size = 0
+    return [MessagePart(
+        part_id=prefix.rstrip('.') or '1',
+        mime_type=f"{_str(structure[0])}/{_str(structure[1])}".lower(),
+        charset=charset,
+        encoding=_str(structure[5]).lower() if len(structure) > 5 else '',
+        size=size,
+    )]
+
+
+def _chunks(values: list, size: int):
+    for start in range(0, len(values), max(1, size)):
+        yield values[start:start + max(1, size)]
+
+
+def message_set(uids) -> str:
+    """[1, 2, 3, 7, 9, 10] -> '1:3,7,9:10' (IMAP sequence-set syntax)."""
+    ranges = []
+    for uid in sorted(set(int(uid) for uid in uids)):
+        if ranges and uid == ranges[-1][1] + 1:
+            ranges[-1][1] = uid
+        else:
+            ranges.append([uid, uid])
+    return ','.join(str(lo) if lo == hi else f'{lo}:{hi}' for lo, hi in ranges)
+
+
+def fetch_summaries(mail, uids: List[int], fields=HEADER_FIELDS,
+                    batch_size: int = IMAP_FETCH_BATCH) -> Iterator[MessageSummary]:
+    """Phase one: headers + BODYSTRUCTURE for many UIDs per FETCH, without setting \\Seen.
+
+    Yields summaries in UID order, one FETCH chunk at a time.
+    """
+    query = f"(UID BODYSTRUCTURE BODY.PEEK[HEADER.FIELDS ({' '.join(fields)})])"
+    for chunk in _chunks(sorted(uids), batch_size):
+        status, data = mail.uid('FETCH', message_set(chunk), query)
+        if status != 'OK':
+            logging.debug(f"Header FETCH failed for {len(chunk)} messages")
+            continue
+        summaries = []
+        for items in _split_fetch_response(data):
+            fetched = _fetch_items(items)
+            try:
+                uid = int(fetched.get('UID'))
+            except (TypeError, ValueError):
+                continue
+            header_bytes = fetched.get('BODY[HEADER.FIELDS]')
+            summaries.append(MessageSummary(
+                uid=uid,
+                headers=email.message_from_bytes(header_bytes if isinstance(header_bytes, bytes) else b''),
+                parts=_leaf_parts(fetched.get('BODYSTRUCTURE')),
+            ))
+        del data  # Raw response of this chunk is no longer needed
+        summaries.sort(key=lambda summary: summary.uid)
+        yield from summaries
+
+
+def _decode_part(raw: bytes, part: MessagePart) -> str:
+    if part.encoding == 'base64':
+        try:
+            raw = base64.b64decode(raw, validate=False)
+        except (binascii.Error, ValueError):
+            pass
+    elif part.encoding == 'quoted-printable':
+        raw = quopri.decodestring(raw)
+    try:
+        return raw.decode(part.charset or 'utf-8', errors='ignore')
+    except LookupError:
+        return raw.decode('utf-8', errors='ignore')
+
+
+def iter_parts(mail, wanted: Dict[int, List[MessagePart]],
+               batch_size: int = IMAP_FETCH_BATCH) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """Phase two: download and decode only the listed parts.
+
+    Messages needing the same sections share FETCH commands. Yields
+    (uid, {part_id: text}) per message as each chunk arrives; messages whose
+    FETCH failed are not yielded.
+    """
+    groups: Dict[Tuple[str, ...], List[int]] = {}
+    for uid, parts in wanted.items():
+        if parts:
+            groups.setdefault(tuple(p.part_id for p in parts), []).append(uid)
+
+    for part_ids, group_uids in groups.items():
+        query = '(UID ' + ' '.join(f'BODY.PEEK[{part_id}]' for part_id in part_ids) + ')'
+        for chunk in _chunks(sorted(group_uids), batch_size):
+            status, data = mail.uid('FETCH', message_set(chunk), query)
+            if status != 'OK':
+                logging.debug(f"Body FETCH failed for {len(chunk)} messages")
+                continue
+            for items in _split_fetch_response(data):
+                fetched = _fetch_items(items)
+                try:
+                    uid = int(fetched.get('UID'))
+                except (TypeError, ValueError):
+                    continue
+                texts = {}
+                for part in wanted.get(uid, []):
+                    raw = fetched.get(f'BODY[{part.part_id}]')
+                    if isinstance(raw, bytes):
+                        texts[part.part_id] = _decode_part(raw, part)
+                yield uid, texts
+
+
+def fetch_parts(mail, wanted: Dict[int, List[MessagePart]],
+                batch_size: int = IMAP_FETCH_BATCH) -> Dict[int, Dict[str, str]]:
+    """``iter_parts`` collected into {uid: {part_id: text}}."""
+    return {uid: texts for uid, texts in iter_parts(mail, wanted, batch_size) if texts}
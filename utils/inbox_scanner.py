@@ -0,0 +1,390 @@
+"""
+Inbox scanner - one IMAP login, one incremental pass, many consumers.
+Bounce extraction, reply categorization and response classification used to
+log in and walk the same messages separately. Here each of them is an
+``InboxHandler``: the scanner selects the mailbox once, fetches headers for
+everything new to any handler, asks each handler whether it wants a message,
+downloads the union of the body parts the interested handlers need and hands
+every message to them. Each handler keeps its own UID cursor, so running a
+standalone script after a shared pass (or the other way round) never re-reads
+mail that handler has already seen. A handler that raises on a message keeps
+its cursor below that message, so the message is offered again next pass.
+A cursor is only saved after its handler's results were: if ``save`` fails,
+the handler's mail is read again next run instead of being lost.
+
+``watch`` keeps the connection open and waits with IMAP IDLE (NOOP polling
+on servers without it), so replies and bounces are handled within seconds of
+arriving instead of at the next scheduled run.
+"""
+
+import os
+import re
+import ssl
+import time
+import select
+import imaplib
+import logging
+import threading
+from dataclasses import dataclass, field
+from email.message import Message
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from utils.imap_sync import MailboxCursor, MessagePart, fetch_summaries, iter_parts
+
+
+# RFC 2177: re-issue IDLE before the server's 30-minute inactivity timeout
+IMAP_IDLE_SECONDS = int(os.getenv('IMAP_IDLE_SECONDS', str(25 * 60)))
+# NOOP polling interval for servers without IDLE
+IMAP_POLL_SECONDS = int(os.getenv('IMAP_POLL_SECONDS', '30'))
+IMAP_RECONNECT_MAX_SECONDS = int(os.getenv('IMAP_RECONNECT_MAX_SECONDS', '300'))
+
+_NEW_MAIL_RE = re.compile(rb'^\* \d+ (?:EXISTS|RECENT)\b', re.I)
+
+
+@dataclass
+class InboxMessage:
+    """A message as handlers see it: selected headers plus the parts they asked for."""
+    uid: int
+    headers: Message
+    parts: List[MessagePart] = field(default_factory=list)
+    texts: Dict[str, str] = field(default_factory=dict)  # part_id -> decoded text
+
+    @property
+    def from_header(self) -> str:
+        return self.headers.get('From', '') or ''
+
+    @property
+    def from_address(self) -> str:
+        from_header = self.from_header
+        return from_header.split('<')[1].split('>')[0] if '<' in from_header else from_header
+
+    def body(self, parts: Sequence[MessagePart]) -> str:
+        """Decoded text of ``parts`` (in order) that were downloaded."""
+        return '\n'.join(self.texts[part.part_id] for part in parts if part.part_id in self.texts)
+
+
+class InboxHandler:
+    """One consumer of the shared inbox pass.
+
+    Subclasses set ``name`` (the cursor key) and ``body_parts`` (MIME types
+    to download for wanted messages, first match of each) and implement
+    ``wants`` (headers only - no body has been fetched yet), ``handle`` and
+    ``save``.
+    """
+
+    name = 'handler'
+    body_parts: Tuple[str, ...] = ('text/plain',)
+
+    def before_pass(self):
+        """Called before every pass (refresh lookup data in long-running watches)."""
+
+    def wants(self, message: InboxMessage) -> bool:
+        return True
+
+    def handle(self, message: InboxMessage, body: str):
+        raise NotImplementedError
+
+    def save(self):
+        """Write results collected since the last save to this handler's output files.
+
+        Raise if they could not be written; the handler's cursor is then left
+        where it was.
+        """
+
+
+class InboxScanner:
+    """Runs handlers over the new mail of one mailbox in a single pass."""
+
+    def __init__(self, server: str, port: int, account: str, password: str = '',
+                 mailbox: str = 'INBOX'):
+        self.server = server
+        self.port = port
+        self.account = account
+        self.password = password
+        self.mailbox = mailbox
+
+    def connect(self):
+        """Log in to the mailbox server (None on failure)."""
+        try:
+            mail = imaplib.IMAP4_SSL(self.server, self.port)
+            mail.login(self.account, self.password)
+            return mail
+        except Exception as e:
+            logging.error(f"❌ Failed to connect to inbox: {e}")
+            return None
+
+    def run(self, handlers: Sequence[InboxHandler], days_back: int = 7, mail=None) -> bool:
+        """Scan once and dispatch to ``handlers``; returns False if the pass failed.
+
+        ``days_back`` is the window for handlers without a cursor (first run,
+        or after the mailbox's UIDVALIDITY changed). ``mail`` may be an already
+        logged-in connection; it is logged out either way. Handlers' ``save``
+        runs at the end of the pass, before their cursors are saved.
+        """
+        mail = mail or self.connect()
+        if not mail or not handlers:
+            return False
+
+        cursors = None
+        try:
+            cursors = self._open(mail, handlers)
+            return cursors is not None and self._scan(mail, handlers, cursors, days_back) is not None
+        except Exception as e:
+            logging.error(f"Error scanning inbox: {e}")
+            return False
+        finally:
+            if cursors is not None:
+                self._commit(handlers, cursors)
+            try:
+                mail.logout()
+            except Exception:
+                pass
+
+    def _open(self, mail, handlers: Sequence[InboxHandler]) -> Optional[List[MailboxCursor]]:
+        """SELECT the mailbox once; one cursor per handler (None if SELECT failed)."""
+        cursors = [MailboxCursor(mail, self.server, self.account, handler.name, self.mailbox)
+                   for handler in handlers]
+        if not cursors[0].select():
+            logging.warning(f"Failed to select {self.mailbox}")
+            return None
+        for cursor in cursors[1:]:
+            cursor.adopt_selection(cursors[0])
+        return cursors
+
+    def _scan(self, mail, handlers: Sequence[InboxHandler], cursors: List[MailboxCursor],
+              days_back: int) -> Optional[int]:
+        """One pass over the new mail of an already selected mailbox.
+
+        Returns the number of messages dispatched to at least one handler,
+        or None if searching failed. Cursors are advanced but not saved; see
+        ``_commit``.
+        """
+        for handler in handlers:
+            handler.before_pass()
+
+        # Each handler's own range; the pass covers their union
+        uids_for: Dict[str, set] = {}
+        for handler, cursor in zip(handlers, cursors):
+            uids = cursor.search_new(days_back)
+            if uids is None:
+                logging.warning("Failed to search inbox")
+                return None
+            uids_for[handler.name] = set(uids)
+        all_uids = sorted(set().union(*uids_for.values()))
+        if not all_uids:
+            return 0
+        incremental = all(cursor.incremental for cursor in cursors)
+        logging.info(f"📬 Inbox pass: {len(all_uids)} {'new ' if incremental else ''}emails "
+                     f"for {', '.join(handler.name for handler in handlers)}")
+
+        # Phase 1: headers for everything, then let each handler filter
+        matches: Dict[int, Tuple[InboxMessage, List[Tuple[InboxHandler, List[MessagePart]]]]] = {}
+        wanted: Dict[int, Dict[str, MessagePart]] = {}
+        failed: Dict[str, int] = {}  # handler name -> lowest UID it raised on
+        for summary in fetch_summaries(mail, all_uids):
+            message = InboxMessage(summary.uid, summary.headers, summary.parts)
+            interested = []
+            for handler in handlers:
+                if summary.uid not in uids_for[handler.name]:
+                    continue
+                try:
+                    if not handler.wants(message):
+                        continue
+                except Exception as e:
+                    logging.warning(f"⚠️ {handler.name}: error filtering message {summary.uid}: {e}",
+                                    exc_info=True)
+                    self._hold(failed, handler.name, summary.uid)
+                    continue
+                parts = summary.find_parts(*handler.body_parts)
+                interested.append((handler, parts))
+                for part in parts:
+                    wanted.setdefault(summary.uid, {})[part.part_id] = part
+            if interested:
+                matches[summary.uid] = (message, interested)
+        dispatched = len(matches)
+
+        # Phase 2: the union of the parts the interested handlers need,
+        # dispatched as each chunk arrives; bodies are dropped once handled
+        for uid, texts in iter_parts(mail, {uid: list(parts.values()) for uid, parts in wanted.items()}):
+            if uid in matches:
+                message, interested = matches.pop(uid)
+                message.texts = texts
+                self._dispatch(message, interested, failed)
+        # Messages without wanted parts (or whose body FETCH failed)
+        for uid in sorted(matches):
+            self._dispatch(*matches[uid], failed)
+
+        for handler, cursor in zip(handlers, cursors):
+            # Stop just below a failed message so the next pass retries it
+            cursor.advance(failed[handler.name] - 1 if handler.name in failed else all_uids[-1])
+        return dispatched
+
+    @staticmethod
+    def _commit(handlers: Sequence[InboxHandler], cursors: List[MailboxCursor]):
+        """Save each handler's results, then - only if that worked - its cursor."""
+        for handler, cursor in zip(handlers, cursors):
+            try:
+                handler.save()
+            except Exception as e:
+                logging.error(f"❌ Could not save {handler.name} results: {e} - "
+                              f"its new mail will be read again")
+                continue
+            cursor.save()
+
+    @staticmethod
+    def _hold(failed: Dict[str, int], name: str, uid: int):
+        failed[name] = min(uid, failed.get(name, uid))
+
+    @classmethod
+    def _dispatch(cls, message: InboxMessage, interested: List[Tuple[InboxHandler, List[MessagePart]]],
+                  failed: Dict[str, int]):
+        for handler, parts in interested:
+            try:
+                handler.handle(message, message.body(parts))
+            except Exception as e:
+                logging.warning(f"⚠️ {handler.name}: error processing message {message.uid}: {e}",
+                                exc_info=True)
+                cls._hold(failed, handler.name, message.uid)
+
+    # --- Watch mode ---
+
+    @staticmethod
+    def _buffered(mail) -> bool:
+        """True if imaplib's reader already holds unread bytes (select() cannot see them).
+
+        A server may send the IDLE continuation and ``* n EXISTS`` in one
+        segment; readline() then pulls both into ``mail.file``. Peeking with
+        the socket non-blocking checks that buffer without waiting on the wire.
+        """
+        reader = getattr(mail, 'file', None)
+        if reader is None or not hasattr(reader, 'peek'):
+            return False
+        sock = mail.sock
+        timeout = sock.gettimeout()
+        sock.setblocking(False)
+        try:
+            return bool(reader.peek(1))
+        except (BlockingIOError, ssl.SSLWantReadError):
+            return False
+        finally:
+            sock.settimeout(timeout)
+
+    @classmethod
+    def _readable(cls, mail, timeout: float) -> bool:
+        if cls._buffered(mail):
+            return True
+        sock = mail.sock
+        # TLS may already hold decrypted bytes that select() cannot see
+        if hasattr(sock, 'pending') and sock.pending():
+            return True
+        ready, _, _ = select.select([sock], [], [], timeout)
+        return bool(ready)
+
+    def _idle(self, mail, timeout: float, stop: threading.Event) -> bool:
+        """IDLE until the server announces new mail, ``timeout`` passes or ``stop`` is set.
+
+        Returns True if new mail was announced.
+        """
+        tag = mail._new_tag()
+        mail.send(tag + b' IDLE\r\n')
+        line = mail.readline()
+        if not line.startswith(b'+'):
+            raise imaplib.IMAP4.error(f"IDLE refused: {line.strip()!r}")
+
+        new_mail = False
+        deadline = time.monotonic() + timeout
+        try:
+            while not new_mail and not stop.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                # Wake up at least once a second to notice ``stop``
+                if not self._readable(mail, min(remaining, 1.0)):
+                    continue
+                line = mail.readline()
+                if not line:
+                    raise imaplib.IMAP4.abort("connection closed during IDLE")
+                if line.upper().startswith(b'* BYE'):
+                    raise imaplib.IMAP4.abort(line.decode(errors='ignore').strip())
+                new_mail = bool(_NEW_MAIL_RE.match(line))
+        finally:
+            mail.send(b'DONE\r\n')
+            # Drain untagged updates until the IDLE command completes
+            while True:
+                line = mail.readline()
+                if not line:
+                    raise imaplib.IMAP4.abort("connection closed ending IDLE")
+                if line.startswith(tag):
+                    break
+                new_mail = new_mail or bool(_NEW_MAIL_RE.match(line))
+        return new_mail
+
+    def _poll(self, mail, interval: float, stop: threading.Event) -> bool:
+        """NOOP fallback: True if the server reported new mail."""
+        if stop.wait(interval):
+            return False
+        status, _ = mail.noop()
+        if status != 'OK':
+            raise imaplib.IMAP4.abort("NOOP failed")
+        _, exists = mail.response('EXISTS')
+        _, recent = mail.response('RECENT')
+        return bool((exists and exists[0] is not None) or (recent and recent[0] is not None))
+
+    def watch(self, handlers: Sequence[InboxHandler], days_back: int = 7,
+              stop: Optional[threading.Event] = None, idle_seconds: int = IMAP_IDLE_SECONDS,
+              poll_seconds: int = IMAP_POLL_SECONDS):
+        """Process new mail as it arrives until ``stop`` is set (or Ctrl+C).
+
+        Catches up with one pass, then waits for the server to announce new
+        mail (IDLE, or NOOP polling when IDLE is not advertised) and runs an
+        incremental pass each time. Handlers' ``save`` runs after every pass
+        that dispatched something, so results reach their output files within
+        seconds, and once more when the watch stops. Dropped connections are
+        re-established with backoff.
+        """
+        stop = stop or threading.Event()
+        try:
+            self._watch(handlers, days_back, stop, idle_seconds, poll_seconds)
+        except KeyboardInterrupt:
+            logging.info("🛑 Inbox watch stopped")
+
+    def _watch(self, handlers, days_back, stop, idle_seconds, poll_seconds):
+        backoff = 5
+        while not stop.is_set():
+            mail = self.connect()
+            if not mail:
+                stop.wait(backoff)
+                backoff = min(backoff * 2, IMAP_RECONNECT_MAX_SECONDS)
+                continue
+            cursors = None
+            try:
+                cursors = self._open(mail, handlers)
+                if cursors is None:
+                    raise imaplib.IMAP4.abort(f"cannot select {self.mailbox}")
+                use_idle = 'IDLE' in getattr(mail, 'capabilities', ())
+                logging.info(f"👀 Watching {self.mailbox} for new mail "
+                             f"({'IDLE' if use_idle else f'NOOP every {poll_seconds}s'})")
+                backoff = 5
+                new_mail = True  # Catch up on anything that arrived while we were away
+                while not stop.is_set():
+                    if new_mail and self._scan(mail, handlers, cursors, days_back):
+                        self._commit(handlers, cursors)
+                    if use_idle:
+                        new_mail = self._idle(mail, idle_seconds, stop)
+                    else:
+                        new_mail = self._poll(mail, poll_seconds, stop)
+            except (imaplib.IMAP4.abort, OSError) as e:
+                logging.warning(f"⚠️ Inbox connection lost ({e}) - reconnecting in {backoff}s")
+                stop.wait(backoff)
+                backoff = min(backoff * 2, IMAP_RECONNECT_MAX_SECONDS)
+            except Exception as e:
+                logging.error(f"Error watching inbox: {e}")
+                stop.wait(backoff)
+                backoff = min(backoff * 2, IMAP_RECONNECT_MAX_SECONDS)
+            finally:
+                if cursors is not None:
+                    self._commit(handlers, cursors)
+                try:
+                    mail.logout()
+                except Exception:
+                    pass
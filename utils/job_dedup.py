@@ -0,0 +1,218 @@
+"""
+Near-duplicate job detection with MinHash and locality-sensitive hashing.
+The same posting arrives from LinkedIn RSS, Indeed, Naukri, Foundit and the
+aggregators with slightly different titles, company spellings ("Pvt Ltd",
+"Technologies") and URLs. Exact ``drop_duplicates(['title', 'company'])``
+missed those, so one opening was matched, scored and emailed several times.
+
+Every job gets one MinHash signature over the character shingles of its
+normalized title and company together. Signatures are split into LSH bands
+and only jobs that share a band bucket are ever compared, so clustering
+takes about linear time. Neither field is banded alone: the same title
+("Data Analyst") is posted by hundreds of companies, and one company posts
+hundreds of different titles. Jobs with no company, or a placeholder the
+scrapers fill in ("Various", "Startup", "Tech Company"...), are never
+merged: the name says nothing about who is hiring.
+
+A candidate pair is a duplicate when two conditions hold. First, its
+companies' shingle Jaccard reaches JOB_DEDUP_COMPANY_THRESHOLD. Second,
+either its titles reach JOB_DEDUP_THRESHOLD, or its titles reach
+JOB_DEDUP_TITLE_FLOOR and its descriptions reach
+JOB_DEDUP_DESCRIPTION_THRESHOLD. Titles at different levels ("Software
+Engineer" / "Software Engineer II", "Analyst" / "Senior Analyst") are
+separate openings and never merge, however similar the rest is. Each
+cluster keeps its richest record: the one with the most filled fields,
+then the longest description.
+
+URLs are not compared: several sources give every job the same listing-page URL.
+"""
+
+import os
+import re
+import logging
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+JOB_DEDUP_THRESHOLD = float(os.getenv('JOB_DEDUP_THRESHOLD', '0.8'))
+JOB_DEDUP_COMPANY_THRESHOLD = float(os.getenv('JOB_DEDUP_COMPANY_THRESHOLD', '0.6'))
+JOB_DEDUP_TITLE_FLOOR = float(os.getenv('JOB_DEDUP_TITLE_FLOOR', '0.5'))
+JOB_DEDUP_DESCRIPTION_THRESHOLD = float(os.getenv('JOB_DEDUP_DESCRIPTION_THRESHOLD', '0.6'))
+# 16 bands of 4 rows: pairs above ~0.5 similarity almost always share a bucket
+JOB_DEDUP_PERMUTATIONS = int(os.getenv('JOB_DEDUP_PERMUTATIONS', '64'))
+JOB_DEDUP_BANDS = int(os.getenv('JOB_DEDUP_BANDS', '16'))
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, _PRIME, size=JOB_DEDUP_PERMUTATIONS).astype(np.uint64)
+_B = _rng.randint(0, _PRIME, size=JOB_DEDUP_PERMUTATIONS).astype(np.uint64)
+
+# Words that vary between listings of the same employer
+COMPANY_NOISE = frozenset({
+    'pvt', 'private', 'ltd', 'limited', 'llp', 'llc', 'inc', 'incorporated', 'corp', 'corporation',
+    'co', 'company', 'plc', 'gmbh', 'technologies', 'technology', 'tech', 'solutions', 'services',
+    'software', 'systems', 'labs', 'india', 'the',
+})
+TITLE_ABBREVIATIONS = {
+    'sr': 'senior', 'jr': 'junior', 'engg': 'engineer', 'mgr': 'manager', 'dev': 'developer',
+    'swe': 'software engineer', 'sde': 'software development engineer', 'ml': 'machine learning',
+}
+# Stand-ins scrapers emit when a listing names no employer (compared after _words)
+PLACEHOLDER_COMPANIES = frozenset({
+    '', 'various', 'startup', 'tech company', 'remote company', 'corporate', 'company', 'unknown',
+    'confidential', 'not disclosed', 'not specified', 'n a', 'na', 'nan', 'none',
+})
+# Seniority words and grade numerals; titles that differ in these are different openings
+TITLE_LEVELS = frozenset({
+    'intern', 'trainee', 'junior', 'associate', 'senior', 'lead', 'staff', 'principal',
+    'head', 'chief', 'director', 'vp',
+})
+ROMAN_LEVELS = {'i': '1', 'ii': '2', 'iii': '3', 'iv': '4', 'v': '5'}
+_GRADE_RE = re.compile(r'^l?(\d{1,2})$')
+
+
+def _words(value) -> List[str]:
+    if value is None or value != value:  # None or NaN from a DataFrame
+        return []
+    return re.sub(r'[^a-z0-9]+', ' ', str(value).lower()).split()
+
+
+def normalize_company(company) -> str:
+    words = [w for w in _words(company) if w not in COMPANY_NOISE]
+    return ' '.join(words) or ' '.join(_words(company))
+
+
+def is_placeholder_company(company) -> bool:
+    return ' '.join(_words(company)) in PLACEHOLDER_COMPANIES
+
+
+def normalize_title(title) -> str:
+    return ' '.join(TITLE_ABBREVIATIONS.get(w, w) for w in _words(title))
+
+
+def title_levels(title) -> frozenset:
+    """Level tokens of a title: seniority words and grades ("II", "2" and "L2" are all '2')."""
+    levels = set()
+    for word in normalize_title(title).split():
+        if word in TITLE_LEVELS:
+            levels.add(word)
+        elif word in ROMAN_LEVELS:
+            levels.add(ROMAN_LEVELS[word])
+        else:
+            grade = _GRADE_RE.match(word)
+            if grade:
+                levels.add(str(int(grade.group(1))))
+    return frozenset(levels)
+
+
+def _shingles(text: str, size: int) -> set:
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def _word_shingles(words: List[str], size: int = 3) -> set:
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash(shingles: set) -> Optional[np.ndarray]:
+    """MinHash signature of a shingle set (None for an empty set)."""
+    if not shingles:
+        return None
+    hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) & _PRIME for s in shingles),
+                         dtype=np.uint64, count=len(shingles))
+    # (a * h + b) mod p for every permutation and shingle; a, h < 2^31 so no overflow
+    return ((np.outer(_A, hashes) + _B[:, None]) % _PRIME).min(axis=1)
+
+
+def jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int):
+        i, j = self.find(i), self.find(j)
+        if i != j:
+            self.parent[max(i, j)] = min(i, j)
+
+
+def _buckets(signatures: Sequence[Optional[np.ndarray]]) -> Iterator[List[int]]:
+    """Members of each LSH bucket holding more than one job, one band at a time."""
+    rows = max(1, JOB_DEDUP_PERMUTATIONS // JOB_DEDUP_BANDS)
+    for band in range(JOB_DEDUP_BANDS):
+        buckets: Dict[bytes, List[int]] = defaultdict(list)
+        for i, signature in enumerate(signatures):
+            if signature is not None:
+                buckets[signature[band * rows:(band + 1) * rows].tobytes()].append(i)
+        for members in buckets.values():
+            if len(members) > 1:
+                yield members
+
+
+def _richness(record: dict) -> tuple:
+    filled = sum(1 for value in record.values() if value is not None and value == value and str(value).strip())
+    return filled, len(str(record.get('description') or ''))
+
+
+def cluster_jobs(records: Sequence[dict]) -> List[List[int]]:
+    """Indexes of ``records`` grouped into near-duplicate clusters, in first-seen order."""
+    titles, levels, companies, descriptions, signatures = [], [], [], [], []
+    for record in records:
+        titles.append(_shingles(normalize_title(record.get('title')), 3))
+        levels.append(title_levels(record.get('title')))
+        companies.append(set() if is_placeholder_company(record.get('company'))
+                         else _shingles(normalize_company(record.get('company')), 3))
+        descriptions.append(_word_shingles(_words(record.get('description'))))
+        # No company, no candidates - placeholder-company jobs never merge
+        signatures.append(minhash({'t' + s for s in titles[-1]} | {'c' + s for s in companies[-1]})
+                          if companies[-1] else None)
+
+    def duplicates(i: int, j: int) -> bool:
+        if levels[i] != levels[j] or jaccard(companies[i], companies[j]) < JOB_DEDUP_COMPANY_THRESHOLD:
+            return False
+        title_sim = jaccard(titles[i], titles[j])
+        return title_sim >= JOB_DEDUP_THRESHOLD or (
+            title_sim >= JOB_DEDUP_TITLE_FLOOR
+            and jaccard(descriptions[i], descriptions[j]) >= JOB_DEDUP_DESCRIPTION_THRESHOLD)
+
+    clusters = _UnionFind(len(records))
+    for members in _buckets(signatures):
+        for n, i in enumerate(members):
+            for j in members[n + 1:]:
+                # Pairs already joined (e.g. in an earlier band) aren't compared again
+                if clusters.find(i) != clusters.find(j) and duplicates(i, j):
+                    clusters.union(i, j)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(records)):
+        groups.setdefault(clusters.find(i), []).append(i)
+    return list(groups.values())
+
+
+def dedupe_jobs(df: pd.DataFrame) -> pd.DataFrame:
+    """Collapse near-duplicate jobs, keeping the richest row of each cluster."""
+    if df is None or len(df) < 2 or 'title' not in df.columns:
+        return df
+    records = df.to_dict('records')
+    keep = [max(cluster, key=lambda i: (_richness(records[i]), -i)) for cluster in cluster_jobs(records)]
+    removed = len(records) - len(keep)
+    if removed:
+        logging.info(f"🧬 Near-duplicate filter: {len(records)} → {len(keep)} jobs ({removed} duplicates)")
+    return df.iloc[sorted(keep)].reset_index(drop=True)
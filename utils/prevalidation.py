@@ -0,0 +1,104 @@
+"""
+Prevalidation pipeline - verify upcoming recipients while the sender sleeps.
+A small thread pool runs the slow per-recipient checks (DNS, SMTP RCPT probe,
+deliverability score) for the next K rows, so by the time the send loop gets
+to a row its verdict is usually ready and verification latency hides behind
+the politeness delay instead of adding to it.
+An optional ``prepare`` hook sees each newly admitted batch of rows first,
+so batchable work (DNS resolution, SMTP probes grouped by MX host) covers
+just the rows about to be sent rather than the whole campaign up front.
+"""
+
+import os
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+# How many rows ahead of the send loop to verify (0 = verify inline)
+DEFAULT_LOOKAHEAD = int(os.getenv('PREVALIDATION_LOOKAHEAD', '5'))
+DEFAULT_WORKERS = int(os.getenv('PREVALIDATION_WORKERS', '3'))
+
+
+class PrevalidationPipeline:
+    """Runs ``verify(item)`` for items ``index+1 .. index+lookahead`` in the background.
+
+    - ``result(index)`` returns the verdict for ``items[index]``, waiting only
+      if it is not finished yet, and tops the look-ahead window back up
+    - Items with the same ``key`` (e.g. one HR address for several jobs) are
+      verified once
+    - ``verify`` must be thread-safe; side effects belong in the consumer
+    - ``prepare(batch)``, if given, runs before the verifications of each
+      batch of new items; the window is then topped up ``lookahead`` items
+      at a time so the batches are worth grouping
+    """
+
+    def __init__(self, items: Sequence, verify: Callable[[Any], Any],
+                 key: Optional[Callable[[Any], Any]] = None,
+                 lookahead: int = DEFAULT_LOOKAHEAD, max_workers: int = DEFAULT_WORKERS,
+                 prepare: Optional[Callable[[List], Any]] = None):
+        self.items = list(items)
+        self.verify = verify
+        self.prepare = prepare
+        self.key = key or (lambda item: id(item))
+        self.lookahead = max(0, lookahead)
+        self._futures: List[Future] = []
+        self._by_key: Dict[Any, Future] = {}
+        self._executor = None
+        if self.lookahead > 0 and self.items:
+            self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers),
+                                                thread_name_prefix='prevalidate')
+            self._fill(self.lookahead + 1)
+            logging.info(f"🔎 Prevalidating up to {self.lookahead} recipients ahead "
+                         f"({max(1, max_workers)} workers)")
+
+    def _fill(self, upto: int):
+        """Make sure items[:upto] have been submitted."""
+        new = self.items[len(self._futures):upto]
+        fresh = {}
+        for item in new:
+            key = self.key(item)
+            if key not in self._by_key and key not in fresh:
+                fresh[key] = item
+        # Submitted first, so it is running before any verify that waits on it
+        prepared = None
+        if self.prepare is not None and fresh:
+            prepared = self._executor.submit(self._prepare, list(fresh.values()))
+        for key, item in fresh.items():
+            self._by_key[key] = self._executor.submit(self._verify, prepared, item)
+        self._futures.extend(self._by_key[self.key(item)] for item in new)
+
+    def _prepare(self, batch: List):
+        try:
+            self.prepare(batch)
+        except Exception as e:
+            # verify() still runs its own checks, just without the batched head start
+            logging.warning(f"⚠️ Prevalidation batch of {len(batch)} failed: {e}")
+
+    def _verify(self, prepared: Optional[Future], item):
+        if prepared is not None:
+            prepared.result()
+        return self.verify(item)
+
+    def result(self, index: int):
+        """Verdict for ``items[index]``; exceptions from ``verify`` are re-raised here."""
+        if self._executor is None:
+            return self.verify(self.items[index])
+        upto = index + 1 + self.lookahead
+        if self.prepare is not None and len(self._futures) < upto:
+            upto = max(upto, len(self._futures) + self.lookahead)
+        self._fill(upto)
+        return self._futures[index].result()
+
+    def close(self):
+        """Drop verifications that have not started yet."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,222 @@
+"""
+Persistent seen-job index - lets paged scrapers stop once they reach jobs an
+earlier run already collected.
+Scrapers used to fetch every page of every query and only dedupe afterwards,
+so a scheduled run re-downloaded the same listings each time. Jobs are now
+remembered in data/seen_jobs.json by a hash of the normalized (title,
+company, location). Jobs without a title or company fall back to their
+canonical URL (lower-case host; no tracking parameters, fragment or trailing
+slash). Several boards link every job to the same listing page, so a URL
+that more than one fingerprint uses never identifies a job.
+
+Each entry has first_seen/last_seen
+timestamps; entries not seen for SEEN_JOBS_RETENTION seconds are dropped.
+``all_known`` only counts entries first seen before the index was loaded,
+so a page another query of the same run already recorded doesn't stop
+pagination.
+"""
+
+import os
+import re
+import json
+import time
+import atexit
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+SEEN_JOBS_PATH = os.getenv('SEEN_JOBS_PATH', os.path.join(DATA_DIR, 'seen_jobs.json'))
+SEEN_JOBS_MAX_ENTRIES = int(os.getenv('SEEN_JOBS_MAX_ENTRIES', '100000'))
+SEEN_JOBS_RETENTION = int(os.getenv('SEEN_JOBS_RETENTION', str(30 * 86400)))
+
+# Query parameters that track the click rather than identify the job
+# (SimplyHired and Indeed keep the job id in the query, so the rest stays)
+TRACKING_PARAMS = {'gclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid', 'ref', 'refid', 'trk', 'trackingid'}
+
+
+def _is_tracking(param: str) -> bool:
+    param = param.lower()
+    return param.startswith('utm_') or param in TRACKING_PARAMS
+
+
+def canonical_url(url: str) -> str:
+    """Job URL without tracking parameters, fragment or trailing slash."""
+    url = str(url or '').strip()
+    if not url:
+        return ''
+    parts = urlsplit(url)
+    if not parts.netloc:
+        return url.lower()
+    query = urlencode(sorted((name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                             if not _is_tracking(name)))
+    return urlunsplit((parts.scheme.lower() or 'https', parts.netloc.lower(),
+                       parts.path.rstrip('/'), query, ''))
+
+
+def _normalize(value) -> str:
+    if value is None or value != value:  # None or NaN from a DataFrame
+        return ''
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', str(value).lower()).split())
+
+
+def job_fingerprint(job: dict) -> str:
+    """Hash of the normalized (title, company, location); '' without title and company."""
+    title, company = _normalize(job.get('title')), _normalize(job.get('company'))
+    if not title or not company:
+        return ''
+    key = '|'.join((title, company, _normalize(job.get('location'))))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+class SeenJobIndex:
+    """Thread-safe index of jobs collected by earlier runs.
+
+    ``_entries`` maps a fingerprint (or the canonical URL when a job has no
+    title/company) to ``{'url', 'first_seen', 'last_seen'}``; ``_urls`` maps
+    canonical URLs back to their entry, except URLs in ``_shared_urls`` -
+    those of more than one entry, such as a board's listing page.
+    """
+
+    def __init__(self, path: str = SEEN_JOBS_PATH, max_entries: int = SEEN_JOBS_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self._entries: 'OrderedDict[str, dict]' = OrderedDict()
+        self._urls: Dict[str, str] = {}
+        self._shared_urls: Set[str] = set()
+        self._lock = threading.Lock()
+        self._dirty = False
+        # Entries first seen from here on were recorded by this run
+        self.started_at = time.time()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            cutoff = time.time() - SEEN_JOBS_RETENTION
+            # Least recently seen first, so the LRU keeps the freshest if it overflows
+            for key, entry in sorted(raw.items(), key=lambda kv: kv[1].get('last_seen', 0)):
+                if entry.get('last_seen', 0) > cutoff:
+                    self._add(key, entry)
+            while len(self._entries) > self.max_entries:
+                self._evict()
+        except Exception as e:
+            logging.warning(f"⚠️ Could not load seen-job index ({e}) - starting empty")
+            self._entries.clear()
+            self._urls.clear()
+            self._shared_urls.clear()
+
+    def _add(self, key: str, entry: dict):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if entry.get('url'):
+            self._index_url(entry['url'], key)
+
+    def _index_url(self, url: str, key: str):
+        if url in self._shared_urls:
+            return
+        if self._urls.setdefault(url, key) != key:
+            # A listing page rather than a job page: never match on it
+            del self._urls[url]
+            self._shared_urls.add(url)
+
+    def _evict(self):
+        key, entry = self._entries.popitem(last=False)
+        if self._urls.get(entry.get('url')) == key:
+            del self._urls[entry['url']]
+        self._dirty = True
+
+    def _lookup(self, job: dict) -> Optional[str]:
+        fingerprint = job_fingerprint(job)
+        if fingerprint:
+            return fingerprint if fingerprint in self._entries else None
+        # Only jobs without title/company are identified by their URL
+        url = canonical_url(job.get('link') or job.get('url'))
+        if url in self._entries:
+            return url
+        return self._urls.get(url)
+
+    def is_known(self, job: dict) -> bool:
+        with self._lock:
+            return self._lookup(job) is not None
+
+    def _seen_before(self, job: dict, before: float) -> bool:
+        key = self._lookup(job)
+        return key is not None and self._entries[key].get('first_seen', 0) < before
+
+    def all_known(self, jobs: Iterable[dict], before: Optional[float] = None) -> bool:
+        """True if earlier runs saw every job (False for an empty page).
+
+        Only entries first seen before ``before`` (default: when the index was
+        loaded) count, so jobs this run recorded itself are not "known".
+        """
+        jobs = list(jobs)
+        before = self.started_at if before is None else before
+        with self._lock:
+            return bool(jobs) and all(self._seen_before(job, before) for job in jobs)
+
+    def record(self, jobs: Iterable[dict]) -> int:
+        """Mark jobs as seen now; returns how many were new."""
+        now = time.time()
+        new = 0
+        with self._lock:
+            for job in jobs:
+                url = canonical_url(job.get('link') or job.get('url'))
+                key = self._lookup(job)
+                if key is None:
+                    key = job_fingerprint(job) or url
+                    if not key:
+                        continue
+                    self._add(key, {'url': url, 'first_seen': now, 'last_seen': now})
+                    new += 1
+                else:
+                    entry = self._entries[key]
+                    entry['last_seen'] = now
+                    if url and not entry.get('url'):
+                        entry['url'] = url
+                        self._index_url(url, key)
+                    self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._evict()
+            self._dirty = True
+        return new
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def save(self):
+        """Atomically write the index."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = dict(self._entries)
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.warning(f"⚠️ Could not save seen-job index: {e}")
+
+
+_seen_jobs: Optional[SeenJobIndex] = None
+_seen_jobs_lock = threading.Lock()
+
+
+def get_seen_jobs() -> SeenJobIndex:
+    """Process-wide seen-job index (saved at interpreter exit)."""
+    global _seen_jobs
+    with _seen_jobs_lock:
+        if _seen_jobs is None:
+            _seen_jobs = SeenJobIndex()
+            atexit.register(_seen_jobs.save)
+        return _seen_jobs
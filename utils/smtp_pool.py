@@ -0,0 +1,185 @@
+"""
+Pooled, reusable SMTP sessions.
+Keeps one authenticated connection per (server, port, account) so a campaign
+pays the connect + STARTTLS + LOGIN handshake once instead of once per email.
+"""
+
+import os
+import ssl
+import time
+import atexit
+import logging
+import smtplib
+import threading
+from email.message import Message
+from typing import Dict, Optional, Tuple, Union
+
+
+# Recycle a session after this many messages (providers throttle long sessions)
+DEFAULT_MAX_MESSAGES_PER_SESSION = int(os.getenv('SMTP_MAX_MESSAGES_PER_SESSION', '50'))
+# Probe an idle session with NOOP before reusing it after this many seconds
+DEFAULT_IDLE_CHECK_SECONDS = int(os.getenv('SMTP_IDLE_CHECK_SECONDS', '60'))
+DEFAULT_TIMEOUT = int(os.getenv('SMTP_TIMEOUT', '30'))
+
+SessionKey = Tuple[str, int, str]
+
+
+class _PooledSession:
+    """An authenticated SMTP connection plus its usage counters."""
+
+    def __init__(self, conn: smtplib.SMTP):
+        self.conn = conn
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPSessionPool:
+    """Reuses authenticated SMTP sessions across sends.
+
+    - One session per (server, port, account), opened lazily on first send
+    - Transparent reconnect when the server drops an idle connection
+    - Sessions are recycled after ``max_messages_per_session`` messages
+    - The first SMTPAuthenticationError for an account is remembered and
+      re-raised on every later send, so a campaign stops instead of hammering
+      the provider with bad logins (and tripping its lockout)
+    """
+
+    def __init__(self, max_messages_per_session: int = DEFAULT_MAX_MESSAGES_PER_SESSION,
+                 idle_check_seconds: int = DEFAULT_IDLE_CHECK_SECONDS,
+                 timeout: int = DEFAULT_TIMEOUT):
+        self.max_messages_per_session = max(1, max_messages_per_session)
+        self.idle_check_seconds = idle_check_seconds
+        self.timeout = timeout
+        self._sessions: Dict[SessionKey, _PooledSession] = {}
+        self._auth_failures: Dict[SessionKey, smtplib.SMTPAuthenticationError] = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _key(smtp_server: str, smtp_port: int, account: str) -> SessionKey:
+        return (smtp_server.lower(), int(smtp_port), (account or '').lower())
+
+    def is_auth_failed(self, smtp_server: str, smtp_port: int, account: str) -> bool:
+        """True once a login for this account has been rejected by the server."""
+        return self._key(smtp_server, smtp_port, account) in self._auth_failures
+
+    def _connect(self, key: SessionKey, password: str) -> _PooledSession:
+        """Open, secure and authenticate a new session."""
+        smtp_server, smtp_port, account = key
+        if smtp_port == 465:
+            conn = smtplib.SMTP_SSL(smtp_server, smtp_port, timeout=self.timeout,
+                                    context=ssl.create_default_context())
+        else:
+            conn = smtplib.SMTP(smtp_server, smtp_port, timeout=self.timeout)
+        # Every failure once connected closes the socket (handshake, login...)
+        try:
+            if smtp_port != 465:
+                conn.starttls(context=ssl.create_default_context())
+            conn.login(account, password)
+        except smtplib.SMTPAuthenticationError as e:
+            self._auth_failures[key] = e
+            self._quit(conn)
+            logging.error(f"❌ SMTP login rejected for {account} - stopping all sends for this account")
+            raise
+        except Exception:
+            self._quit(conn)
+            raise
+        logging.debug(f"🔌 Opened SMTP session {account}@{smtp_server}:{smtp_port}")
+        return _PooledSession(conn)
+
+    @staticmethod
+    def _quit(conn: smtplib.SMTP):
+        try:
+            conn.quit()
+        except Exception:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _is_alive(self, session: _PooledSession) -> bool:
+        """NOOP-probe sessions that have been idle long enough to be dropped."""
+        if time.monotonic() - session.last_used < self.idle_check_seconds:
+            return True
+        try:
+            return session.conn.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _acquire(self, key: SessionKey, password: str) -> _PooledSession:
+        session = self._sessions.get(key)
+        if session is not None and not self._is_alive(session):
+            self._discard(key)
+            session = None
+        if session is None:
+            session = self._connect(key, password)
+            self._sessions[key] = session
+        return session
+
+    def _discard(self, key: SessionKey):
+        session = self._sessions.pop(key, None)
+        if session is not None:
+            self._quit(session.conn)
+
+    def sendmail(self, smtp_server: str, smtp_port: int, account: str, password: str,
+                 from_addr: str, to_addrs, msg: Union[str, bytes, Message]) -> dict:
+        """Send one message over the pooled session for ``account``.
+
+        ``msg`` may be a pre-rendered string/bytes (``SMTP.sendmail``) or an
+        ``email.message.Message`` (``SMTP.send_message``). Recipient/data
+        errors propagate unchanged; the session stays usable for the next send.
+        """
+        key = self._key(smtp_server, smtp_port, account)
+        with self._lock:
+            if key in self._auth_failures:
+                raise self._auth_failures[key]
+
+            for attempt in range(2):
+                session = self._acquire(key, password)
+                try:
+                    if isinstance(msg, Message):
+                        result = session.conn.send_message(msg, from_addr, to_addrs)
+                    else:
+                        result = session.conn.sendmail(from_addr, to_addrs, msg)
+                except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+                    # Server closed the connection between sends - reconnect once
+                    self._discard(key)
+                    if attempt:
+                        raise
+                    logging.info(f"🔄 SMTP session dropped ({e}) - reconnecting")
+                    continue
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError,
+                        smtplib.SMTPSenderRefused):
+                    session.last_used = time.monotonic()
+                    raise
+                except Exception:
+                    self._discard(key)
+                    raise
+
+                session.sent += 1
+                session.last_used = time.monotonic()
+                if session.sent >= self.max_messages_per_session:
+                    logging.debug(f"♻️ Recycling SMTP session after {session.sent} messages")
+                    self._discard(key)
+                return result
+
+    def close(self, smtp_server: Optional[str] = None, smtp_port: Optional[int] = None,
+              account: Optional[str] = None):
+        """Close one account's session, or every session when called without args."""
+        with self._lock:
+            if smtp_server is None:
+                for key in list(self._sessions):
+                    self._discard(key)
+            else:
+                self._discard(self._key(smtp_server, smtp_port, account))
+
+
+_shared_pool: Optional[SMTPSessionPool] = None
+
+
+def get_smtp_pool() -> SMTPSessionPool:
+    """Get the process-wide SMTP session pool shared by all senders."""
+    global _shared_pool
+    if _shared_pool is None:
+        _shared_pool = SMTPSessionPool()
+        atexit.register(_shared_pool.close)
+    return _shared_pool
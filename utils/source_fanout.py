@@ -0,0 +1,152 @@
+"""
+Source fan-out - run independent job sources concurrently.
+Scrapers used to call every source one after another, so a run took the sum
+of all their latencies. ``fan_out`` runs them on a bounded thread pool and
+yields each source's results as soon as it finishes, so the run takes about
+as long as the slowest source.
+
+Each source runs under a deadline. A source that overruns is reported with
+whatever it collected so far, and its next request raises
+``SourceDeadlineExceeded`` so it stops on its own. Per-host politeness is
+left to the shared fetch engine (utils.http_engine), which checks the
+deadline before every attempt.
+"""
+
+import os
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+
+SCRAPE_WORKERS = int(os.getenv('SCRAPE_WORKERS', '8'))
+# Seconds a single source may run before its partial results are taken
+SCRAPE_SOURCE_DEADLINE = float(os.getenv('SCRAPE_SOURCE_DEADLINE', '90'))
+
+
+class SourceDeadlineExceeded(BaseException):
+    """Raised inside a source that has run past its deadline.
+
+    A BaseException (like asyncio.CancelledError) so the sources' own
+    ``except Exception`` handlers don't swallow it and keep going.
+    """
+
+
+@dataclass
+class SourceResult:
+    """What one source produced; ``items`` is partial if it failed or timed out."""
+    name: str
+    items: list = field(default_factory=list)
+    elapsed: float = 0.0
+    error: Optional[BaseException] = None
+    timed_out: bool = False
+    # HTTP status codes (or exception names) of the source's requests, in order
+    status_codes: list = field(default_factory=list)
+
+
+class _SourceContext:
+    def __init__(self, name: str, deadline: float):
+        self.name = name
+        self.items: list = []
+        self.status_codes: list = []
+        self.budget = deadline
+        self.started: Optional[float] = None
+        self.deadline: Optional[float] = None
+
+    def expired(self, now: float) -> bool:
+        return self.deadline is not None and now > self.deadline
+
+
+_current = threading.local()
+
+
+def current_source() -> Optional[_SourceContext]:
+    """The source running on this thread (None outside ``fan_out``)."""
+    return getattr(_current, 'source', None)
+
+
+def check_deadline():
+    """Raise SourceDeadlineExceeded if the current source has overrun."""
+    source = current_source()
+    if source is not None and source.expired(time.monotonic()):
+        raise SourceDeadlineExceeded(source.name)
+
+
+def _run(source: _SourceContext, func: Callable[[], None]) -> Optional[BaseException]:
+    source.started = time.monotonic()
+    source.deadline = source.started + source.budget if source.budget > 0 else None
+    _current.source = source
+    try:
+        func()
+        return None
+    except (Exception, SourceDeadlineExceeded) as e:
+        return e
+    finally:
+        _current.source = None
+
+
+def fan_out(sources: Sequence[Tuple[str, Callable[[], None]]], max_workers: int = SCRAPE_WORKERS,
+            deadline: float = SCRAPE_SOURCE_DEADLINE) -> Iterator[SourceResult]:
+    """Run ``(name, func)`` sources concurrently; yield results in completion order.
+
+    A source reports its items with ``emit(item)``. Its deadline starts when a
+    worker picks it up. A source still running at its deadline is yielded
+    with ``timed_out=True`` and the items it has emitted so far.
+    """
+    if not sources:
+        return
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(sources))),
+                                  thread_name_prefix='source')
+    running: Dict[Future, _SourceContext] = {}
+    try:
+        for name, func in sources:
+            source = _SourceContext(name, deadline)
+            running[executor.submit(_run, source, func)] = source
+
+        while running:
+            done, _ = wait(list(running), timeout=0.5, return_when=FIRST_COMPLETED)
+            for future in done:
+                source = running.pop(future)
+                error = future.result()
+                yield SourceResult(source.name, list(source.items), time.monotonic() - source.started,
+                                   error=error, timed_out=isinstance(error, SourceDeadlineExceeded),
+                                   status_codes=list(source.status_codes))
+            now = time.monotonic()
+            for future, source in list(running.items()):
+                if source.expired(now):
+                    # Keep what it has so far; the thread stops at its next request
+                    running.pop(future)
+                    yield SourceResult(source.name, list(source.items), now - source.started,
+                                       error=SourceDeadlineExceeded(source.name), timed_out=True,
+                                       status_codes=list(source.status_codes))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def emit(item) -> bool:
+    """Add ``item`` to the current source's results (False outside ``fan_out``)."""
+    source = current_source()
+    if source is None:
+        return False
+    source.items.append(item)
+    return True
+
+
+def note_status(status):
+    """Record a request outcome (status code or exception name) for the current source."""
+    source = current_source()
+    if source is not None:
+        source.status_codes.append(status)
+
+
+def log_result(result: SourceResult):
+    """One log line per finished source."""
+    if result.timed_out:
+        logging.warning(f"   ⏱️ {result.name} hit its deadline after {result.elapsed:.0f}s "
+                        f"- kept {len(result.items)} jobs")
+    elif result.error is not None:
+        logging.warning(f"   ⚠️ {result.name} failed after {result.elapsed:.1f}s: {result.error}")
+    else:
+        logging.debug(f"   {result.name}: {len(result.items)} jobs in {result.elapsed:.1f}s")
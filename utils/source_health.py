@@ -0,0 +1,221 @@
+"""
+Per-source health records and circuit breakers for the job scrapers.
+Dead sources used to be handled by hand: a source blocked with constant 403s
+was commented out, and others quietly returned nothing while each run still
+paid their full timeouts. Every source run is now recorded in
+data/source_health.json:
+
+- success rate, latency percentiles, the last HTTP status codes
+- how many jobs it yielded, and how many of them were new (utils.seen_jobs)
+
+A run that yields no jobs counts as a failure, whether it raised or not.
+After SOURCE_FAILURE_THRESHOLD failures in a row a source's circuit opens and
+runs skip it for SOURCE_COOLDOWN seconds. After that one run probes it: a
+success closes the circuit, a failure opens it again for twice as long (up
+to SOURCE_COOLDOWN_MAX). Set SOURCE_BREAKER=0 to run every source regardless.
+"""
+
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from utils.source_fanout import SourceResult
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+SOURCE_HEALTH_PATH = os.getenv('SOURCE_HEALTH_PATH', os.path.join(DATA_DIR, 'source_health.json'))
+SOURCE_BREAKER_ENABLED = os.getenv('SOURCE_BREAKER', '1') != '0'
+SOURCE_FAILURE_THRESHOLD = int(os.getenv('SOURCE_FAILURE_THRESHOLD', '3'))
+SOURCE_COOLDOWN = int(os.getenv('SOURCE_COOLDOWN', str(6 * 3600)))
+SOURCE_COOLDOWN_MAX = int(os.getenv('SOURCE_COOLDOWN_MAX', str(7 * 86400)))
+# Recent runs kept per source for latencies, yields and status codes
+SOURCE_HEALTH_WINDOW = int(os.getenv('SOURCE_HEALTH_WINDOW', '20'))
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+
+def _percentile(values: Sequence[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _new_record() -> dict:
+    return {
+        'runs': 0, 'successes': 0, 'skips': 0, 'consecutive_failures': 0, 'trips': 0,
+        'state': CLOSED, 'open_until': 0.0,
+        'last_run': None, 'last_success': None, 'last_outcome': None, 'last_error': None,
+        'outcomes': [], 'latencies': [], 'jobs': [], 'new_jobs': [], 'status_codes': [],
+    }
+
+
+class SourceHealth:
+    """Thread-safe store of per-source run history plus a circuit breaker per source."""
+
+    def __init__(self, path: str = SOURCE_HEALTH_PATH):
+        self.path = path
+        self._records: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            self._records = {name: {**_new_record(), **record} for name, record in raw.items()}
+        except Exception as e:
+            logging.warning(f"⚠️ Could not load source health ({e}) - starting empty")
+            self._records = {}
+
+    def _record(self, name: str) -> dict:
+        return self._records.setdefault(name, _new_record())
+
+    def allow(self, name: str) -> bool:
+        """Whether ``name`` should run now (moves an expired open circuit to half-open)."""
+        if not SOURCE_BREAKER_ENABLED:
+            return True
+        with self._lock:
+            record = self._record(name)
+            if record['state'] == CLOSED:
+                return True
+            if record['state'] == OPEN and time.time() < record['open_until']:
+                record['skips'] += 1
+                self._dirty = True
+                return False
+            # Cool-down over: this run is the probe
+            record['state'] = HALF_OPEN
+            self._dirty = True
+            return True
+
+    def admit(self, sources: Sequence[Tuple[str, Callable[[], None]]]) -> List[Tuple[str, Callable[[], None]]]:
+        """The ``(name, func)`` sources whose circuit lets them run, logging the rest."""
+        admitted = []
+        for name, func in sources:
+            if self.allow(name):
+                if self.state(name) == HALF_OPEN:
+                    logging.info(f"   🔁 Probing {name} again after its cool-down")
+                admitted.append((name, func))
+            else:
+                record = self.get(name)
+                until = datetime.fromtimestamp(record['open_until']).strftime('%Y-%m-%d %H:%M')
+                logging.info(f"   ⏸️ Skipping {name}: {record['consecutive_failures']} failed runs in a row "
+                             f"(last: {record['last_error'] or record['last_outcome']}), retry after {until}")
+        return admitted
+
+    def record(self, result: SourceResult, new_jobs: Optional[int] = None):
+        """Add a finished source run and update its circuit."""
+        now = time.time()
+        jobs = len(result.items)
+        if jobs:
+            outcome = 'partial' if result.error is not None else 'ok'
+        else:
+            outcome = 'failed' if result.error is not None else 'empty'
+        with self._lock:
+            record = self._record(result.name)
+            record['runs'] += 1
+            record['last_run'] = now
+            record['last_outcome'] = outcome
+            record['last_error'] = ('timeout' if result.timed_out else
+                                    str(result.error)[:200] if result.error is not None else None)
+            for key, value in (('outcomes', outcome), ('latencies', round(result.elapsed, 2)),
+                               ('jobs', jobs), ('new_jobs', new_jobs)):
+                record[key] = (record[key] + [value])[-SOURCE_HEALTH_WINDOW:]
+            if result.status_codes:
+                record['status_codes'] = (record['status_codes'] + list(result.status_codes))[-SOURCE_HEALTH_WINDOW:]
+
+            if jobs:
+                record['successes'] += 1
+                record['last_success'] = now
+                record['consecutive_failures'] = 0
+                if record['state'] != CLOSED:
+                    logging.info(f"   ✅ {result.name} is producing jobs again - circuit closed")
+                record['state'], record['trips'], record['open_until'] = CLOSED, 0, 0.0
+            else:
+                record['consecutive_failures'] += 1
+                if record['state'] == HALF_OPEN or record['consecutive_failures'] >= SOURCE_FAILURE_THRESHOLD:
+                    self._trip(result.name, record, now)
+            self._dirty = True
+
+    def _trip(self, name: str, record: dict, now: float):
+        record['trips'] += 1
+        cooldown = min(SOURCE_COOLDOWN_MAX, SOURCE_COOLDOWN * 2 ** (record['trips'] - 1))
+        record['state'] = OPEN
+        record['open_until'] = now + cooldown
+        logging.warning(f"   🔌 {name} failed {record['consecutive_failures']} runs in a row - "
+                        f"skipping it for {cooldown / 3600:.0f}h")
+
+    def state(self, name: str) -> str:
+        with self._lock:
+            return self._record(name)['state']
+
+    def get(self, name: str) -> dict:
+        """A copy of a source's record."""
+        with self._lock:
+            return json.loads(json.dumps(self._record(name)))
+
+    def stats(self, name: str) -> dict:
+        """Derived figures for a source: success rate, latency p50/p90, yields."""
+        record = self.get(name)
+        outcomes = record['outcomes']
+        new_jobs = [n for n in record['new_jobs'] if n is not None]
+        return {
+            'success_rate': sum(o in ('ok', 'partial') for o in outcomes) / len(outcomes) if outcomes else None,
+            'latency_p50': _percentile(record['latencies'], 0.5),
+            'latency_p90': _percentile(record['latencies'], 0.9),
+            'avg_jobs': sum(record['jobs']) / len(record['jobs']) if record['jobs'] else None,
+            'avg_new_jobs': sum(new_jobs) / len(new_jobs) if new_jobs else None,
+            'last_status_codes': record['status_codes'][-5:],
+            'state': record['state'],
+        }
+
+    def log_summary(self, names: Sequence[str]):
+        """One line per source over its recent runs."""
+        logging.info("📈 Source health (recent runs):")
+        for name in names:
+            s = self.stats(name)
+            if s['success_rate'] is None:
+                continue
+            new = f", {s['avg_new_jobs']:.0f} new" if s['avg_new_jobs'] is not None else ''
+            codes = ','.join(str(code) for code in s['last_status_codes']) or '-'
+            state = '' if s['state'] == CLOSED else f"  [{s['state']}]"
+            logging.info(f"   {name:<22} {s['success_rate']:>4.0%} ok  p50 {s['latency_p50']:.1f}s "
+                         f"p90 {s['latency_p90']:.1f}s  {s['avg_jobs']:.0f} jobs{new}  last {codes}{state}")
+
+    def save(self):
+        """Atomically write every source's record."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.loads(json.dumps(self._records))
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.warning(f"⚠️ Could not save source health: {e}")
+
+
+_source_health: Optional[SourceHealth] = None
+_source_health_lock = threading.Lock()
+
+
+def get_source_health() -> SourceHealth:
+    """Process-wide source health store (saved at interpreter exit)."""
+    global _source_health
+    with _source_health_lock:
+        if _source_health is None:
+            _source_health = SourceHealth()
+            atexit.register(_source_health.save)
+        return _source_health
@@ -0,0 +1,650 @@
+"""
+Application state storage - one abstraction over the CSV files in data/.
+
+Two backends:
+- CSVStorage (default): the existing CSV files, with append-only writes for
+  logs and a per-process read cache that is dropped whenever the file
+  changes on disk; rewrites re-read the file under a cross-process lock
+- SQLiteStorage (STORAGE_BACKEND=sqlite): stdlib sqlite3 in WAL mode with
+  indexes on emails, company and timestamps, transactional upserts, and CSV
+  import/export so the dashboard and workflows keep seeing the same files.
+  Rows other scripts add to a CSV are merged in before it is exported again
+
+Scripts call get_storage() and use read_table / append_rows / upsert_rows /
+write_table instead of pd.read_csv / to_csv.
+"""
+
+import os
+import csv
+import atexit
+import logging
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from utils.csv_log import AppendOnlyCSVWriter, locked_file
+from utils.suppression_index import CSVTailFollower
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'csv').lower()
+STORAGE_DB_PATH = os.getenv('STORAGE_DB_PATH', os.path.join(DATA_DIR, 'automation.db'))
+# Keep the CSV files in sync with the database (dashboard + workflow caches read them)
+STORAGE_EXPORT_CSV = os.getenv('STORAGE_EXPORT_CSV', 'true').lower() == 'true'
+
+
+@dataclass
+class TableSpec:
+    """Layout of one logical table and the CSV file that backs it."""
+    filename: str
+    columns: List[str]
+    # Case-insensitive lookup columns (emails, company) - indexed on lower(col)
+    lookup: List[str] = field(default_factory=list)
+    # Timestamp columns - plain indexes for range scans / ordering
+    timestamps: List[str] = field(default_factory=list)
+    # Natural key for upserts (unique index in SQLite)
+    key: List[str] = field(default_factory=list)
+    # CSV append buffer; 1 = write through (file is read by other processes mid-run)
+    max_buffered: int = 10
+
+
+TABLES: Dict[str, TableSpec] = {
+    'sent_emails': TableSpec(
+        'sent_emails_log.csv',
+        ['recipient_email', 'company', 'job_title', 'sent_at', 'status', 'sender_email'],
+        lookup=['recipient_email', 'sender_email', 'company'], timestamps=['sent_at'],
+    ),
+    'bounced_emails': TableSpec(
+        'bounced_emails.csv',
+        ['email', 'company', 'reason', 'bounce_date', 'detected_at', 'source', 'bounce_type', 'status_code'],
+        lookup=['email', 'company'], timestamps=['bounce_date', 'detected_at'],
+        key=['email'], max_buffered=1,
+    ),
+    'invalid_emails': TableSpec(
+        'invalid_emails_log.csv',
+        ['email', 'company', 'reason', 'checked_at'],
+        lookup=['email', 'company'], timestamps=['checked_at'],
+    ),
+    'problematic_emails': TableSpec(
+        'problematic_emails.csv',
+        ['email', 'company', 'status', 'sent_at', 'reason'],
+        lookup=['email', 'company'], timestamps=['sent_at'],
+    ),
+    'verified_emails': TableSpec(
+        'verified_emails.csv',
+        ['email', 'company', 'status', 'sent_at'],
+        lookup=['email', 'company'], timestamps=['sent_at'],
+    ),
+    'company_blacklist': TableSpec(
+        'company_blacklist.csv',
+        ['company', 'hr_email', 'reason', 'blacklist_date', 'user'],
+        lookup=['company', 'hr_email'], timestamps=['blacklist_date'],
+    ),
+    'followup_log': TableSpec(
+        'followup_log.csv',
+        ['recipient_email', 'company', 'sent_at', 'status', 'stage', 'sender_email'],
+        lookup=['recipient_email', 'sender_email', 'company'], timestamps=['sent_at'],
+    ),
+    'application_tracker': TableSpec(
+        'application_tracker.csv',
+        ['application_id', 'company', 'job_title', 'hr_email', 'job_url',
+         'status', 'applied_date', 'last_updated', 'last_action',
+         'followup_count', 'response_date', 'response_type', 'notes',
+         'match_score', 'priority', 'sender_email'],
+        lookup=['hr_email', 'sender_email', 'company'], timestamps=['applied_date', 'last_updated'],
+    ),
+    'hr_replies': TableSpec(
+        'hr_replies.csv',
+        ['from_email', 'from_name', 'subject', 'date', 'category', 'confidence',
+         'keywords_matched', 'body_preview', 'detected_at', 'company', 'job_title', 'applied_at'],
+        lookup=['from_email'], timestamps=['detected_at'],
+        key=['from_email', 'subject', 'date'],
+    ),
+    'hr_replies_classified': TableSpec(
+        'hr_replies_classified.csv',
+        ['from_email', 'subject', 'date', 'response_text', 'classification'],
+        lookup=['from_email'],
+        key=['from_email', 'subject', 'date'],
+    ),
+    'interview_requests': TableSpec(
+        'interview_requests.csv',
+        ['from_email', 'from_name', 'subject', 'date', 'category', 'confidence',
+         'keywords_matched', 'body_preview', 'detected_at', 'company', 'job_title', 'applied_at'],
+        lookup=['from_email'], timestamps=['detected_at'],
+    ),
+    'discovered_hr_emails': TableSpec(
+        'discovered_hr_emails.csv',
+        ['email', 'company', 'domain', 'source', 'search_query', 'email_type',
+         'discovered_at', 'verified', 'last_used'],
+        lookup=['email', 'company'], timestamps=['discovered_at', 'last_used'],
+        key=['email'],
+    ),
+    'curated_hr_emails': TableSpec(
+        'curated_hr_emails.csv',
+        ['company', 'email', 'type', 'source', 'scraped_at'],
+        lookup=['email', 'company'], key=['email'],
+    ),
+    # Scrapers write 'hr_email', curated_hr_database.py and merge_hr_data.py 'email'
+    'all_hr_emails': TableSpec(
+        'all_hr_emails.csv',
+        ['hr_email', 'company', 'job_title', 'source'],
+        lookup=['hr_email', 'company'],
+    ),
+}
+
+
+def _spec(name: str) -> TableSpec:
+    if name not in TABLES:
+        raise KeyError(f"Unknown storage table: {name}")
+    return TABLES[name]
+
+
+def _clean_value(value):
+    """Convert pandas/numpy values into something csv/sqlite3 can store."""
+    if value is None:
+        return None
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    """(inode, mtime_ns, size) of a file - changes on every append or replace."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def _read_csv(path: str, columns: List[str], **kwargs) -> pd.DataFrame:
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        try:
+            return pd.read_csv(path, **kwargs)
+        except pd.errors.EmptyDataError:
+            pass
+    return pd.DataFrame(columns=columns)
+
+
+class CSVStorage:
+    """The original one-CSV-per-table layout.
+
+    Other processes write the same files (a campaign and ``inbox_scan --watch``
+    run side by side), so cached frames are only reused while the file's
+    signature is unchanged, and rewrites re-read the file under ``locked_file``.
+    """
+
+    backend = 'csv'
+
+    def __init__(self, data_dir: str = DATA_DIR):
+        self.data_dir = data_dir
+        self._writers: Dict[str, AppendOnlyCSVWriter] = {}
+        self._cache: Dict[str, Tuple[Optional[tuple], pd.DataFrame]] = {}
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.data_dir, _spec(name).filename)
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(self.path(name))
+
+    def _flush_table(self, name: str):
+        writer = self._writers.get(name)
+        if writer is not None:
+            writer.flush()
+
+    def _load(self, name: str) -> pd.DataFrame:
+        self._flush_table(name)
+        signature = _file_signature(self.path(name))
+        cached = self._cache.get(name)
+        if cached is None or cached[0] != signature:
+            cached = self._cache[name] = (signature, _read_csv(self.path(name), _spec(name).columns))
+        return cached[1]
+
+    def _rewrite(self, name: str, change: Callable[[pd.DataFrame], Optional[pd.DataFrame]]):
+        """Locked read-modify-replace of a table's file.
+
+        ``change`` gets the file as it is on disk now (never the cache) and
+        returns the new table, or None to leave the file alone.
+        """
+        self._flush_table(name)
+        path = self.path(name)
+        os.makedirs(self.data_dir, exist_ok=True)
+        with locked_file(path):
+            df = change(_read_csv(path, _spec(name).columns))
+            if df is not None:
+                tmp_path = f"{path}.tmp"
+                df.to_csv(tmp_path, index=False)
+                os.replace(tmp_path, path)
+        self._cache.pop(name, None)
+
+    @staticmethod
+    def _filter(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
+        """Case-insensitive equality filters; columns a legacy file lacks are ignored."""
+        mask = pd.Series(True, index=df.index)
+        for column, value in filters.items():
+            if value is None or value == '' or column not in df.columns:
+                continue
+            mask &= df[column].astype(str).str.lower() == str(value).lower()
+        return df[mask]
+
+    def read_table(self, name: str, **filters) -> pd.DataFrame:
+        df = self._load(name)
+        if filters:
+            df = self._filter(df, filters)
+        return df.copy()
+
+    def iter_rows(self, name: str) -> Iterator[dict]:
+        self._flush_table(name)
+        if not self.exists(name):
+            return
+        with open(self.path(name), 'r', newline='', encoding='utf-8') as f:
+            yield from csv.DictReader(f)
+
+    def count_rows(self, name: str, **filters) -> int:
+        df = self._load(name)
+        return len(self._filter(df, filters)) if filters else len(df)
+
+    def append_rows(self, name: str, rows: Iterable[dict]):
+        spec = _spec(name)
+        writer = self._writers.get(name)
+        if writer is None:
+            writer = self._writers[name] = AppendOnlyCSVWriter(
+                self.path(name), spec.columns, max_buffered=spec.max_buffered)
+        for row in rows:
+            writer.append(row)
+        self._cache.pop(name, None)
+
+    def write_table(self, name: str, df: pd.DataFrame):
+        self._rewrite(name, lambda _: df)
+
+    def upsert_rows(self, name: str, rows: Iterable[dict]) -> int:
+        """Insert rows, replacing existing rows with the same key (last write wins)."""
+        rows = list(rows)
+        if not rows:
+            return 0
+        key = _spec(name).key
+
+        def merge(df: pd.DataFrame) -> pd.DataFrame:
+            df = pd.DataFrame(rows) if df.empty else pd.concat([df, pd.DataFrame(rows)], ignore_index=True)
+            return df.drop_duplicates(subset=key, keep='last') if key else df
+
+        self._rewrite(name, merge)
+        return len(rows)
+
+    def update_column(self, name: str, column: str, key_column: str, mapping: Dict[str, object]) -> int:
+        """Set ``column`` for every row whose ``key_column`` (case-insensitive) is in ``mapping``."""
+        if not mapping or not self.exists(name):
+            return 0
+        lookup = {str(k).lower(): v for k, v in mapping.items()}
+        updated = 0
+
+        def update(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+            nonlocal updated
+            if key_column not in df.columns:
+                return None
+            keys = df[key_column].astype(str).str.lower()
+            mask = keys.isin(lookup)
+            updated = int(mask.sum())
+            if not updated:
+                return None
+            if column in df.columns:
+                df[column] = df[column].astype(object)
+            df.loc[mask, column] = keys[mask].map(lookup)
+            return df
+
+        self._rewrite(name, update)
+        return updated
+
+    def follow(self, name: str) -> CSVTailFollower:
+        """Follower that yields rows appended to the table after this call."""
+        self._flush_table(name)
+        return CSVTailFollower(self.path(name))
+
+    def import_csv(self, name: str, path: str = None) -> int:
+        if path and os.path.abspath(path) != os.path.abspath(self.path(name)):
+            self.write_table(name, pd.read_csv(path))
+        return self.count_rows(name)
+
+    def export_csv(self, name: str, path: str = None) -> int:
+        self._flush_table(name)
+        if path and os.path.abspath(path) != os.path.abspath(self.path(name)):
+            self.read_table(name).to_csv(path, index=False)
+        return self.count_rows(name)
+
+    def flush(self):
+        for writer in self._writers.values():
+            writer.flush()
+
+    def close(self):
+        self.flush()
+
+
+class _SQLiteFollower:
+    """Yields rows inserted after creation, tracked by rowid."""
+
+    def __init__(self, storage: 'SQLiteStorage', name: str):
+        self.storage = storage
+        self.name = name
+        self._last_rowid = storage._scalar(f'SELECT COALESCE(MAX(rowid), 0) FROM "{name}"')
+
+    def read_new_rows(self) -> List[dict]:
+        # Rows other scripts appended to the CSV arrive through the merge
+        self.storage._sync_csv(self.name)
+        rows = self.storage._query(f'SELECT rowid AS _rowid, * FROM "{self.name}" WHERE rowid > ? ORDER BY rowid',
+                                   (self._last_rowid,))
+        if rows:
+            self._last_rowid = rows[-1]['_rowid']
+        return [{k: v for k, v in row.items() if k != '_rowid'} for row in rows]
+
+
+class SQLiteStorage:
+    """SQLite (WAL) backend with indexed lookups and CSV import/export.
+
+    Scripts that were not migrated still append to the CSV files directly, so
+    each CSV's signature at the last import/export is kept in ``_csv_sync``.
+    When the file has changed since, the rows the database lacks are merged
+    in before the table is read or exported over the file.
+    """
+
+    backend = 'sqlite'
+
+    def __init__(self, db_path: str = STORAGE_DB_PATH, data_dir: str = DATA_DIR,
+                 export_csv: bool = STORAGE_EXPORT_CSV):
+        self.db_path = db_path
+        self.data_dir = data_dir
+        self.export_on_close = export_csv
+        self._lock = threading.RLock()
+        self._ready = set()
+        self._dirty = set()
+        # name -> CSV signature this process last synced with
+        self._synced: Dict[str, Optional[tuple]] = {}
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA busy_timeout=10000')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS "_csv_sync" '
+                          '(name TEXT PRIMARY KEY, inode INTEGER, mtime_ns INTEGER, size INTEGER)')
+
+    # -- schema ---------------------------------------------------------------
+
+    def csv_path(self, name: str) -> str:
+        return os.path.join(self.data_dir, _spec(name).filename)
+
+    def _columns(self, name: str) -> List[str]:
+        return [row[1] for row in self.conn.execute(f'PRAGMA table_info("{name}")')]
+
+    def _ensure_columns(self, name: str, columns: Iterable[str]):
+        existing = set(self._columns(name))
+        for column in columns:
+            if column not in existing:
+                self.conn.execute(f'ALTER TABLE "{name}" ADD COLUMN "{column}"')
+                existing.add(column)
+
+    def _ensure_table(self, name: str):
+        if name not in self._ready:
+            self._create_table(name)
+        self._sync_csv(name)
+
+    def _create_table(self, name: str):
+        spec = _spec(name)
+        with self._lock:
+            # Untyped columns keep whatever type is stored (ints stay ints)
+            cols = ', '.join(f'"{c}"' for c in spec.columns)
+            self.conn.execute(f'CREATE TABLE IF NOT EXISTS "{name}" ({cols})')
+            self._ensure_columns(name, spec.columns)
+            for column in spec.lookup:
+                self.conn.execute(f'CREATE INDEX IF NOT EXISTS "ix_{name}_{column}" '
+                                  f'ON "{name}" (lower("{column}"))')
+            for column in spec.timestamps:
+                self.conn.execute(f'CREATE INDEX IF NOT EXISTS "ix_{name}_{column}" ON "{name}" ("{column}")')
+            if spec.key:
+                key_cols = ', '.join(f'"{c}"' for c in spec.key)
+                self.conn.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS "ux_{name}" ON "{name}" ({key_cols})')
+            self._ready.add(name)
+
+    # -- CSV sync -------------------------------------------------------------
+
+    def _stored_signature(self, name: str) -> Optional[tuple]:
+        row = self.conn.execute('SELECT inode, mtime_ns, size FROM "_csv_sync" WHERE name = ?',
+                                (name,)).fetchone()
+        return tuple(row) if row else None
+
+    def _store_signature(self, name: str, signature: Optional[tuple]):
+        if signature is None:
+            return
+        self.conn.execute('INSERT OR REPLACE INTO "_csv_sync" (name, inode, mtime_ns, size) '
+                          'VALUES (?, ?, ?, ?)', (name, *signature))
+        self._synced[name] = signature
+
+    def _sync_csv(self, name: str):
+        """Merge in the CSV if it changed since this database last imported/exported it."""
+        signature = _file_signature(self.csv_path(name))
+        if signature is None or signature == self._synced.get(name):
+            return
+        with self._lock:
+            if signature != self._stored_signature(name):
+                # First use pulls in the whole file, so switching backends loses nothing
+                count = self._merge_csv(name, self.csv_path(name))
+                if count:
+                    logging.info(f"🗄️ Imported {count} rows into '{name}' from {_spec(name).filename}")
+            self._store_signature(name, signature)
+
+    def _merge_csv(self, name: str, path: str) -> int:
+        """Insert the CSV rows the table doesn't already have; returns how many."""
+        df = _read_csv(path, _spec(name).columns)
+        if df.empty:
+            return 0
+        rows = df.to_dict('records')
+        if not self._scalar(f'SELECT EXISTS (SELECT 1 FROM "{name}")'):
+            return self._insert(name, rows, upsert=True)
+        if _spec(name).key:
+            # Rows already in the table may be newer than the file; keep them
+            before = self._scalar(f'SELECT COUNT(*) FROM "{name}"')
+            self._insert(name, rows)
+            return self._scalar(f'SELECT COUNT(*) FROM "{name}"') - before
+        # No key: compare whole rows as the CSV writes them
+        text = _read_csv(path, _spec(name).columns, dtype=str, keep_default_na=False)
+        columns = [c for c in text.columns if c in set(self._columns(name))]
+        present = {tuple('' if row[c] is None else str(row[c]) for c in columns)
+                   for row in self._query(f'SELECT * FROM "{name}"')}
+        missing = [row for row, values in zip(rows, text[columns].itertuples(index=False, name=None))
+                   if tuple(values) not in present]
+        return self._insert(name, missing)
+
+    # -- helpers --------------------------------------------------------------
+
+    def _query(self, sql: str, params: tuple = ()) -> List[dict]:
+        with self._lock:
+            return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def _scalar(self, sql: str, params: tuple = ()):
+        with self._lock:
+            row = self.conn.execute(sql, params).fetchone()
+            return row[0] if row else None
+
+    def _where(self, name: str, filters: dict):
+        clauses, params = [], []
+        for column, value in filters.items():
+            if value is None or value == '':
+                continue
+            if column in _spec(name).lookup:
+                clauses.append(f'lower("{column}") = lower(?)')
+            else:
+                clauses.append(f'"{column}" = ?')
+            params.append(value)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', tuple(params)
+
+    def _insert(self, name: str, rows: List[dict], upsert: bool = False) -> int:
+        if not rows:
+            return 0
+        columns = list(dict.fromkeys(c for row in rows for c in row))
+        key = _spec(name).key
+        with self._lock:
+            self._ensure_columns(name, columns)
+            cols = ', '.join(f'"{c}"' for c in columns)
+            marks = ', '.join('?' for _ in columns)
+            sql = f'INSERT INTO "{name}" ({cols}) VALUES ({marks})'
+            if upsert and key:
+                updates = ', '.join(f'"{c}" = excluded."{c}"' for c in columns if c not in key)
+                conflict = ', '.join(f'"{c}"' for c in key)
+                sql += f' ON CONFLICT ({conflict}) DO ' + (f'UPDATE SET {updates}' if updates else 'NOTHING')
+            elif key:
+                # Plain appends never fail on a duplicate key
+                sql = sql.replace('INSERT INTO', 'INSERT OR IGNORE INTO', 1)
+            values = [tuple(_clean_value(row.get(c)) for c in columns) for row in rows]
+            self.conn.execute('BEGIN')
+            try:
+                self.conn.executemany(sql, values)
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+            self._dirty.add(name)
+        return len(rows)
+
+    # -- public API (same as CSVStorage) -------------------------------------
+
+    def exists(self, name: str) -> bool:
+        self._ensure_table(name)
+        return bool(self._scalar(f'SELECT EXISTS (SELECT 1 FROM "{name}")'))
+
+    def read_table(self, name: str, **filters) -> pd.DataFrame:
+        self._ensure_table(name)
+        where, params = self._where(name, filters)
+        with self._lock:
+            return pd.read_sql_query(f'SELECT * FROM "{name}"{where} ORDER BY rowid', self.conn, params=params)
+
+    def iter_rows(self, name: str) -> Iterator[dict]:
+        self._ensure_table(name)
+        yield from self._query(f'SELECT * FROM "{name}" ORDER BY rowid')
+
+    def count_rows(self, name: str, **filters) -> int:
+        self._ensure_table(name)
+        where, params = self._where(name, filters)
+        return int(self._scalar(f'SELECT COUNT(*) FROM "{name}"{where}', params) or 0)
+
+    def append_rows(self, name: str, rows: Iterable[dict]):
+        self._ensure_table(name)
+        self._insert(name, list(rows))
+
+    def upsert_rows(self, name: str, rows: Iterable[dict]) -> int:
+        self._ensure_table(name)
+        return self._insert(name, list(rows), upsert=True)
+
+    def write_table(self, name: str, df: pd.DataFrame):
+        """Replace the whole table in one transaction."""
+        self._ensure_table(name)
+        rows = df.to_dict('records')
+        with self._lock:
+            self._ensure_columns(name, df.columns)
+            self.conn.execute('BEGIN')
+            try:
+                self.conn.execute(f'DELETE FROM "{name}"')
+                if rows:
+                    cols = ', '.join(f'"{c}"' for c in df.columns)
+                    marks = ', '.join('?' for _ in df.columns)
+                    sql = f'INSERT OR REPLACE INTO "{name}" ({cols}) VALUES ({marks})'
+                    self.conn.executemany(sql, [tuple(_clean_value(r[c]) for c in df.columns) for r in rows])
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+            self._dirty.add(name)
+
+    def update_column(self, name: str, column: str, key_column: str, mapping: Dict[str, object]) -> int:
+        self._ensure_table(name)
+        if not mapping:
+            return 0
+        with self._lock:
+            self.conn.execute('BEGIN')
+            try:
+                updated = 0
+                for key, value in mapping.items():
+                    cur = self.conn.execute(
+                        f'UPDATE "{name}" SET "{column}" = ? WHERE lower("{key_column}") = lower(?)',
+                        (_clean_value(value), key))
+                    updated += cur.rowcount
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+            if updated:
+                self._dirty.add(name)
+        return updated
+
+    def follow(self, name: str) -> _SQLiteFollower:
+        self._ensure_table(name)
+        return _SQLiteFollower(self, name)
+
+    def import_csv(self, name: str, path: str = None) -> int:
+        """Load a CSV into the table (upserting on the table key, if any)."""
+        path = path or self.csv_path(name)
+        if not os.path.exists(path):
+            return 0
+        self._ensure_table(name)
+        df = _read_csv(path, _spec(name).columns)
+        return self._insert(name, df.to_dict('records'), upsert=True)
+
+    def export_csv(self, name: str, path: str = None) -> int:
+        """Write the table out as CSV (default: its usual data/ file).
+
+        The usual file is replaced under ``locked_file`` after merging in any
+        rows other scripts appended to it since the last sync.
+        """
+        if path and os.path.abspath(path) != os.path.abspath(self.csv_path(name)):
+            df = self.read_table(name)
+            df.to_csv(path, index=False)
+            return len(df)
+        path = self.csv_path(name)
+        os.makedirs(self.data_dir, exist_ok=True)
+        with locked_file(path):
+            df = self.read_table(name)
+            tmp_path = f"{path}.tmp"
+            df.to_csv(tmp_path, index=False)
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._store_signature(name, _file_signature(path))
+        return len(df)
+
+    def flush(self):
+        if not self.export_on_close:
+            return
+        for name in sorted(self._dirty):
+            try:
+                self.export_csv(name)
+            except Exception as e:
+                logging.warning(f"⚠️ Could not export '{name}' to CSV: {e}")
+        self._dirty.clear()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self.conn.close()
+
+
+_storage = None
+
+
+def get_storage():
+    """Process-wide storage backend selected by STORAGE_BACKEND (csv | sqlite)."""
+    global _storage
+    if _storage is None:
+        if STORAGE_BACKEND == 'sqlite':
+            _storage = SQLiteStorage()
+            logging.info(f"🗄️ Using SQLite storage: {_storage.db_path}")
+        else:
+            _storage = CSVStorage()
+        atexit.register(_storage.close)
+    return _storage
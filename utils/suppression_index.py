@@ -0,0 +1,285 @@
+"""
+Suppression index - every "do not send" rule in one place, built once per campaign.
+Merges known-bad emails, bounced emails, problematic domains, blacklisted
+(company, email) pairs and already-sent (email|job) keys into O(1) lookups.
+Very large key sets are compacted into a Bloom filter to bound memory.
+"""
+
+import os
+import io
+import csv
+import math
+import hashlib
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Key sets larger than this are compacted into a Bloom filter
+DEFAULT_BLOOM_THRESHOLD = int(os.getenv('SUPPRESSION_BLOOM_THRESHOLD', '250000'))
+# False positives only ever cause an extra skip, never a duplicate send
+DEFAULT_BLOOM_ERROR_RATE = float(os.getenv('SUPPRESSION_BLOOM_ERROR_RATE', '0.001'))
+
+
+class BloomFilter:
+    """Compact probabilistic set: no false negatives, tunable false positives."""
+
+    def __init__(self, capacity: int, error_rate: float = DEFAULT_BLOOM_ERROR_RATE):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+
+    def _positions(self, key: str):
+        # Kirsch-Mitzenmacher double hashing from one 128-bit digest
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self._count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def is_full(self) -> bool:
+        return self._count >= self.capacity
+
+
+class KeySet:
+    """A set of string keys that switches to a Bloom filter once it gets too big.
+
+    Supports the subset of the ``set`` API the senders use (``in``, ``add``,
+    ``update``, ``len``), so it can stand in for the old plain sets.
+    """
+
+    def __init__(self, keys: Iterable[str] = (), bloom_threshold: int = DEFAULT_BLOOM_THRESHOLD):
+        self.bloom_threshold = bloom_threshold
+        self._keys = set()
+        # Scalable Bloom filter: a new, larger and stricter layer is added
+        # whenever the current one fills up, so the error rate stays bounded
+        self._blooms: List[BloomFilter] = []
+        self.update(keys)
+
+    @property
+    def is_compact(self) -> bool:
+        return bool(self._blooms)
+
+    def _compact(self):
+        # Leave head-room so the error rate holds as the campaign adds keys
+        bloom = BloomFilter(capacity=len(self._keys) * 2, error_rate=DEFAULT_BLOOM_ERROR_RATE / 2)
+        for key in self._keys:
+            bloom.add(key)
+        self._blooms.append(bloom)
+        logging.info(f"🗜️ Compacted {len(self._keys):,} suppression keys into a Bloom filter "
+                     f"({len(bloom._bits) // 1024:,} KB)")
+        self._keys = set()
+
+    def add(self, key: str):
+        if self._blooms:
+            last = self._blooms[-1]
+            if last.is_full:
+                last = BloomFilter(capacity=last.capacity * 2, error_rate=last.error_rate / 2)
+                self._blooms.append(last)
+            last.add(key)
+            return
+        self._keys.add(key)
+        if len(self._keys) > self.bloom_threshold:
+            self._compact()
+
+    def update(self, keys: Iterable[str]):
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        if self._blooms:
+            return any(key in bloom for bloom in self._blooms)
+        return key in self._keys
+
+    def contains_many(self, keys: Iterable[str]) -> List[bool]:
+        """Membership of each key, in order (one pass, no per-call dispatch)."""
+        if self._blooms:
+            blooms = self._blooms
+            return [any(key in bloom for bloom in blooms) for key in keys]
+        members = self._keys
+        return [key in members for key in keys]
+
+    def __len__(self) -> int:
+        if self._blooms:
+            return sum(len(bloom) for bloom in self._blooms)
+        return len(self._keys)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __iter__(self):
+        # A Bloom filter cannot enumerate its members
+        return iter(()) if self._blooms else iter(self._keys)
+
+
+class SuppressionIndex:
+    """All suppression rules for one campaign, with O(1) membership checks."""
+
+    def __init__(self, bloom_threshold: int = DEFAULT_BLOOM_THRESHOLD):
+        self.known_bad: Dict[str, str] = {}
+        self.problematic_domains: Dict[str, str] = {}
+        self.blacklist: set = set()
+        self.bounced = KeySet(bloom_threshold=bloom_threshold)
+        self.sent = KeySet(bloom_threshold=bloom_threshold)
+
+    @staticmethod
+    def normalize(value) -> str:
+        return str(value or '').lower().strip()
+
+    @classmethod
+    def sent_key(cls, email: str, job_title: str) -> str:
+        return f"{cls.normalize(email)}|{cls.normalize(job_title)}"
+
+    def add_bounced(self, email: str):
+        self.bounced.add(self.normalize(email))
+
+    def add_sent(self, email: str, job_title: str):
+        self.sent.add(self.sent_key(email, job_title))
+
+    def is_sent(self, email: str, job_title: str) -> bool:
+        return self.sent_key(email, job_title) in self.sent
+
+    def is_blacklisted(self, company: str, email: str) -> bool:
+        return (self.normalize(company), self.normalize(email)) in self.blacklist
+
+    def suppression_reason(self, email: str, company: str = '', job_title: str = None) -> Optional[str]:
+        """Why ``email`` must not be sent to, or None if it is clear to send."""
+        email = self.normalize(email)
+        if job_title is not None and self.is_sent(email, job_title):
+            return "Already applied for this job"
+        if email in self.known_bad:
+            return f"Known bad: {self.known_bad[email]}"
+        if email in self.bounced:
+            return "Previously bounced - in blocklist"
+        domain = email.split('@')[-1]
+        if domain in self.problematic_domains:
+            return f"Problematic domain: {self.problematic_domains[domain]}"
+        if company and self.is_blacklisted(company, email):
+            return "Blacklisted company"
+        return None
+
+
+class CSVTailFollower:
+    """Reads only the rows appended to a CSV since the last call.
+
+    Lets a long-running campaign pick up bounces other processes append to
+    ``bounced_emails.csv`` for the cost of one ``stat`` per check.
+
+    - A file replaced (new inode), truncated, or rewritten in place (its
+      header or the bytes just before our offset changed) is read again
+      from the top
+    - Only complete records are consumed; a quoted field spanning lines or
+      a half-written row is picked up on a later call
+    """
+
+    # Bytes before the offset that must be unchanged for the file to count as appended to
+    ANCHOR_BYTES = 64
+
+    def __init__(self, path: str, start_at_end: bool = True):
+        self.path = path
+        self._header: Optional[List[str]] = None
+        self._header_raw = b''
+        self._anchor = b''
+        self._offset = 0
+        self._inode: Optional[int] = None
+        self._signature: Optional[tuple] = None
+        if start_at_end and os.path.exists(path):
+            with open(path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                # The header record alone (it may span lines if a column name is quoted)
+                head = b''
+                for line in iter(f.readline, b''):
+                    head += line
+                    if self._complete_records(head)[0]:
+                        self._header_raw = head
+                        self._header = self._parse(head)[0]
+                        break
+                self._offset = stat.st_size
+                f.seek(max(0, self._offset - self.ANCHOR_BYTES))
+                self._anchor = f.read(self._offset - f.tell())
+            self._inode = stat.st_ino
+            self._signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def _complete_records(chunk: bytes) -> Tuple[List[bytes], int]:
+        """Split ``chunk`` into whole CSV records; returns them and the bytes they span.
+
+        A record ends at a newline outside quotes, i.e. once the quotes seen
+        so far are balanced (an escaped quote is doubled, so it keeps the count even).
+        """
+        records, pending, consumed = [], b'', 0
+        for line in io.BytesIO(chunk).readlines():
+            pending += line
+            if pending.endswith(b'\n') and pending.count(b'"') % 2 == 0:
+                records.append(pending)
+                consumed += len(pending)
+                pending = b''
+        return records, consumed
+
+    @staticmethod
+    def _parse(data: bytes) -> List[List[str]]:
+        return list(csv.reader(io.StringIO(data.decode('utf-8', errors='replace'), newline='')))
+
+    def _rewritten(self, f, stat) -> bool:
+        if self._inode is None:
+            return False
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            return True
+        # Same file: what we've already read must still be where we left it
+        f.seek(0)
+        if f.read(len(self._header_raw)) != self._header_raw:
+            return True
+        f.seek(self._offset - len(self._anchor))
+        return f.read(len(self._anchor)) != self._anchor
+
+    def read_new_rows(self) -> List[Dict[str, str]]:
+        try:
+            stat = os.stat(self.path)
+            if (stat.st_ino, stat.st_mtime_ns, stat.st_size) == self._signature:
+                return []
+            f = open(self.path, 'rb')
+        except OSError:
+            return []
+        with f:
+            stat = os.fstat(f.fileno())
+            signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if signature == self._signature:
+                return []
+            if self._rewritten(f, stat):
+                # File was rewritten - start over from the top
+                self._offset = 0
+                self._header = None
+                self._header_raw = b''
+            self._inode = stat.st_ino
+            self._signature = signature
+            f.seek(self._offset)
+            chunk = f.read(stat.st_size - self._offset)
+            records, consumed = self._complete_records(chunk)
+            if not records:
+                return []
+            self._offset += consumed
+            f.seek(max(0, self._offset - self.ANCHOR_BYTES))
+            self._anchor = f.read(self._offset - f.tell())
+
+        if self._header is None:
+            self._header_raw = records.pop(0)
+            self._header = (self._parse(self._header_raw) or [None])[0]
+        if not self._header:
+            return []
+        return [dict(zip(self._header, row)) for row in self._parse(b''.join(records)) if row]
+
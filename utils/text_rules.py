@@ -0,0 +1,22 @@
+"""
+Pattern tables compiled once and matched in one scan.
+Bounce detection and auto-reply filtering used to run ``re.search`` once per
+table entry with ``re.IGNORECASE`` - a module-cache lookup and a full scan of
+the text per pattern. ``compile_any`` folds a table into a single regex.
+
+Callers lower-case the text and the patterns instead of passing
+``re.IGNORECASE``: the flag disables the regex engine's literal prefix search,
+which makes the combined pattern several times slower.
+
+Plain keyword lists (reply categories) stay as ``kw in text`` scans: on real
+reply bodies CPython's substring search beats any combined regex over them
+(see scripts/benchmark_inbox_rules.py).
+"""
+
+import re
+from typing import Iterable, Pattern
+
+
+def compile_any(patterns: Iterable[str], flags: int = 0) -> Pattern:
+    """One regex that matches wherever any of ``patterns`` would."""
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), flags)
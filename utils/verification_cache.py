@@ -0,0 +1,233 @@
+"""
+Persistent email verification cache - remembers verdicts across runs so a
+scheduled run only re-probes addresses whose verdict has gone stale.
+Entries are keyed by lowercase address and live in data/verification_cache.json.
+Each verdict type has its own TTL: a definitive 550 "no such mailbox" is
+trusted for weeks, a timeout or greylisting response only for a few hours.
+"""
+
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+VERIFY_CACHE_PATH = os.getenv('VERIFY_CACHE_PATH', os.path.join(DATA_DIR, 'verification_cache.json'))
+VERIFY_CACHE_MAX_ENTRIES = int(os.getenv('VERIFY_CACHE_MAX_ENTRIES', '50000'))
+
+# Seconds each kind of verdict stays trusted
+VERDICT_TTLS = {
+    'invalid': int(os.getenv('VERIFY_TTL_INVALID', str(30 * 86400))),     # 550 / known bad
+    'no_mx': int(os.getenv('VERIFY_TTL_NO_MX', str(7 * 86400))),          # domain cannot receive mail
+    'valid': int(os.getenv('VERIFY_TTL_VALID', str(14 * 86400))),         # 250 for the mailbox
+    'catch_all': int(os.getenv('VERIFY_TTL_CATCH_ALL', str(7 * 86400))),  # server accepts anything
+    'unknown': int(os.getenv('VERIFY_TTL_UNKNOWN', str(6 * 3600))),       # 4xx, other codes
+    'transient': int(os.getenv('VERIFY_TTL_TRANSIENT', '3600')),          # timeouts, disconnects
+}
+
+
+def smtp_verdict_kind(valid: Optional[bool], message: str) -> str:
+    """Classify an EmailVerifier.smtp_verify() result for TTL purposes."""
+    if valid is True:
+        return 'valid'
+    if valid is False:
+        return 'invalid'
+    message = str(message or '').lower()
+    if 'catch-all' in message:
+        return 'catch_all'
+    if message.startswith('smtp response'):
+        return 'unknown'
+    return 'transient'
+
+
+def result_verdict_kind(result: dict) -> str:
+    """Classify a calculate_deliverability_score() result by its weakest network check."""
+    checks = result.get('checks', {})
+    mx = checks.get('mx_record')
+    if mx is None:
+        # Decided by syntax/known-list/HR rules alone - nothing network-bound to remember
+        return ''
+    if mx.get('valid') is False:
+        return 'no_mx'
+    mx_message = str(mx.get('message', ''))
+    mx_kind = 'transient' if 'timeout' in mx_message.lower() or 'error' in mx_message.lower() else 'valid'
+    smtp = checks.get('smtp_verify')
+    if smtp is None:
+        return mx_kind
+    smtp_kind = smtp_verdict_kind(smtp.get('valid'), smtp.get('message'))
+    if smtp_kind == 'invalid':
+        return 'invalid'
+    # The shorter-lived of the two decides when the score must be recomputed
+    return min((mx_kind, smtp_kind), key=lambda kind: VERDICT_TTLS[kind])
+
+
+class VerificationCache:
+    """Thread-safe per-address store of SMTP verdicts and deliverability scores.
+
+    Each address may hold:
+    - ``smtp``: ``{'valid', 'message', 'kind', 'checked_at', 'expires_at'}``
+    - ``result``: the full calculate_deliverability_score() dict plus
+      ``kind``/``checked_at``/``expires_at``
+    Catch-all status is remembered per domain under ``domains``.
+    """
+
+    def __init__(self, path: str = VERIFY_CACHE_PATH, max_entries: int = VERIFY_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self._entries: 'OrderedDict[str, Dict[str, dict]]' = OrderedDict()
+        self._domains: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    @staticmethod
+    def _key(value: str) -> str:
+        return str(value or '').strip().lower()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            now = time.time()
+            entries = raw.get('emails', {})
+            # Least recently checked first, so the LRU keeps the freshest if it overflows
+            for email, entry in sorted(entries.items(), key=lambda kv: max(
+                    section.get('checked_at', 0) for section in kv[1].values())):
+                live = {name: section for name, section in entry.items() if section.get('expires_at', 0) > now}
+                if live:
+                    self._entries[email] = live
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._domains = {domain: info for domain, info in raw.get('domains', {}).items()
+                             if info.get('expires_at', 0) > now}
+        except Exception as e:
+            logging.warning(f"⚠️ Could not load verification cache ({e}) - starting empty")
+            self._entries.clear()
+            self._domains = {}
+
+    def _section(self, email: str, name: str) -> Optional[dict]:
+        key = self._key(email)
+        entry = self._entries.get(key)
+        section = entry.get(name) if entry else None
+        if section is None:
+            self.misses += 1
+            return None
+        if section['expires_at'] <= time.time():
+            del entry[name]
+            if not entry:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return section
+
+    def _store(self, email: str, name: str, section: dict):
+        key = self._key(email)
+        self._entries.setdefault(key, {})[name] = section
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._dirty = True
+
+    def get_smtp(self, email: str) -> Optional[Tuple[Optional[bool], str]]:
+        """Cached (valid, message) SMTP verdict, or None if unknown/stale."""
+        with self._lock:
+            section = self._section(email, 'smtp')
+            return (section['valid'], section['message']) if section else None
+
+    def put_smtp(self, email: str, verdict: Tuple[Optional[bool], str]):
+        valid, message = verdict
+        kind = smtp_verdict_kind(valid, message)
+        now = time.time()
+        with self._lock:
+            self._store(email, 'smtp', {'valid': valid, 'message': message, 'kind': kind,
+                                        'checked_at': now, 'expires_at': now + VERDICT_TTLS[kind]})
+
+    def get_result(self, email: str) -> Optional[dict]:
+        """Cached deliverability result (a copy, with ``email`` as passed in)."""
+        with self._lock:
+            section = self._section(email, 'result')
+            if section is None:
+                return None
+            result = {k: v for k, v in section.items() if k not in ('kind', 'checked_at', 'expires_at')}
+        result['email'] = email
+        return result
+
+    def put_result(self, email: str, result: dict):
+        """Remember a deliverability result; rule-only verdicts are not stored."""
+        kind = result_verdict_kind(result)
+        if not kind:
+            return
+        now = time.time()
+        with self._lock:
+            self._store(email, 'result', {**result, 'kind': kind, 'checked_at': now,
+                                          'expires_at': now + VERDICT_TTLS[kind]})
+
+    def get_catch_all(self, domain: str) -> Tuple[bool, Optional[bool]]:
+        """(known, is_catch_all) for a domain."""
+        with self._lock:
+            info = self._domains.get(self._key(domain))
+            if info is None or info['expires_at'] <= time.time():
+                return False, None
+            return True, info['catch_all']
+
+    def put_catch_all(self, domain: str, catch_all: Optional[bool]):
+        now = time.time()
+        # An inconclusive probe is retried soon; a definite answer is kept like an SMTP verdict
+        ttl = VERDICT_TTLS['catch_all'] if catch_all is not None else VERDICT_TTLS['unknown']
+        with self._lock:
+            self._domains[self._key(domain)] = {'catch_all': catch_all, 'checked_at': now,
+                                                 'expires_at': now + ttl}
+            self._dirty = True
+
+    def invalidate(self, email: str):
+        """Forget everything about an address (e.g. after it bounced)."""
+        with self._lock:
+            if self._entries.pop(self._key(email), None) is not None:
+                self._dirty = True
+
+    def save(self):
+        """Atomically write the non-expired entries."""
+        with self._lock:
+            if not self._dirty or not self.path:
+                return
+            now = time.time()
+            emails = {}
+            for email, entry in self._entries.items():
+                live = {name: section for name, section in entry.items() if section['expires_at'] > now}
+                if live:
+                    emails[email] = live
+            domains = {domain: info for domain, info in self._domains.items() if info['expires_at'] > now}
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'emails': emails, 'domains': domains}, f, default=str)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.warning(f"⚠️ Could not save verification cache: {e}")
+
+
+_verification_cache: Optional[VerificationCache] = None
+_verification_cache_lock = threading.Lock()
+
+
+def get_verification_cache() -> VerificationCache:
+    """Process-wide verification cache (saved at interpreter exit)."""
+    global _verification_cache
+    with _verification_cache_lock:
+        if _verification_cache is None:
+            _verification_cache = VerificationCache()
+            atexit.register(_verification_cache.save)
+        return _verification_cache